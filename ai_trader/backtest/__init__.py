@@ -0,0 +1,2 @@
+# Athena_v1/ai_trader/backtest/__init__.py
+# (이 파일은 backtest 폴더를 Python 패키지로 인식하게 합니다)
@@ -0,0 +1,293 @@
+# Athena_v1/ai_trader/backtest/engine.py
+# [신규] 2024.11.17 - (요청) Owl v1 벡터 백테스터 (국면/전술 판정 + RiskManager 규모 계산 + S1/S2/S4 청산)
+# [수정] 2024.11.17 - (요청) 미리 계산한 봉별 판정(signals)을 받아 구간만 시뮬레이션 (워크 포워드 구간 간 재사용)
+# [수정] 2024.11.17 - (오류) 백테스트 중 오류가 난 마켓을 결과(failed_symbols)에 기록 (로그만 남기고 빠지던 문제)
+"""
+Owl v1 백테스터 (Vectorized Backtest)
+
+과거 H1 캔들을 라이브 봇과 같은 규칙으로 재생합니다.
+
+- 진입: 각 봉 t의 마감 시점에 최근 window개 봉(라이브 fetch_ohlcv count, 마지막 봉 = t)으로
+  국면 / Tactic 1 / Tactic 3을 판정합니다. (strategy.panel.compute_signals - 모든 봉을 슬라이딩 윈도우로 한 번에 계산)
+  진입가 = 봉 t 종가, 규모 = RiskManager와 같은 계산 (risk_multiplier, 손실액 / 1개당 손실, 잔고 한도, 최소 5,000원)
+- 청산 (PositionManager.check_exit_conditions):
+  S1 손절 / S2 익절은 다음 봉부터 봉 안의 저가/고가로 확인합니다. (같은 봉에서 둘 다 닿으면 손절 우선,
+  시가가 이미 넘어선 경우 시가 체결) S4 국면 전환은 봉 마감 국면으로 확인해 종가에 청산합니다.
+  (라이브는 1분마다 현재가로 확인 - H1 봉 안의 순서는 알 수 없으므로 보수적으로 처리)
+- 포지션은 마켓당 1개, 청산한 봉 다음 봉부터 다시 진입할 수 있습니다.
+- 마켓마다 독립 계좌(initial_capital)로 계산하고, 전체 자산 곡선은 마켓별 손익을 합산합니다.
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ai_trader.risk_manager import RiskManager
+from ai_trader.strategy.features import OHLCV_COLUMNS, _ohlcv_values
+from ai_trader.strategy.panel import (
+    StrategyParams, DEFAULT_PARAMS, PanelSignals, compute_signals,
+    REGIME_NAMES, TACTIC_NONE, OPEN, HIGH, LOW, CLOSE
+)
+from ai_trader.utils.logger import setup_logger
+
+_BULL = REGIME_NAMES.index("BULL")
+_BEAR = REGIME_NAMES.index("BEAR")
+
+# (청산 사유 - PositionManager와 같은 이름)
+EXIT_STOP_LOSS = "StopLoss (S1)"
+EXIT_TAKE_PROFIT = "TakeProfit (S2)"
+EXIT_REGIME = "Regime Change (S4)"
+EXIT_END = "EndOfData"
+
+@dataclass(frozen=True)
+class BacktestParams:
+    window: int = 200 # (판정에 쓰는 최근 봉 수 - 라이브 fetch_ohlcv count)
+    initial_capital: float = 1_000_000 # (마켓별 계좌 / RiskManager total_capital)
+    base_risk_pct: float = 0.5 # (RiskManager base_risk_per_trade_pct)
+    fee_rate: float = 0.0005 # (업비트 KRW 마켓 수수료 - 매수/매도 각각)
+    min_order_krw: float = 5000
+    chunk_rows: int = 2048 # (슬라이딩 윈도우를 이 개수씩 묶어 계산 - 메모리 상한)
+    strategy: StrategyParams = DEFAULT_PARAMS
+
+@dataclass
+class Trade:
+    symbol: str
+    entry_time: pd.Timestamp
+    exit_time: pd.Timestamp
+    entry_price: float
+    exit_price: float
+    volume: float
+    size_krw: float
+    sl_price: float
+    tp_price: float
+    regime: str
+    tactic: str
+    score: int
+    exit_reason: str
+    pnl: float # (수수료 차감)
+    bars_held: int
+
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame # (Trade 컬럼, 청산 시각 순)
+    equity: pd.Series # (전체 자산 곡선 - 봉 종가 기준 평가액, KST 인덱스)
+    symbol_equity: Dict[str, pd.Series] = field(default_factory=dict)
+    params: BacktestParams = field(default_factory=BacktestParams)
+    failed_symbols: Dict[str, str] = field(default_factory=dict) # (오류로 제외된 마켓: 오류 메시지)
+
+    def summary(self) -> Dict[str, Any]:
+        """ 거래 수 / 승률 / 손익 / 손익비 / 최대 낙폭 (+ 오류로 제외된 마켓) """
+        trades = self.trades
+        pnl = trades['pnl'] if len(trades) else pd.Series(dtype='float64')
+        gross_win = float(pnl[pnl > 0].sum())
+        gross_loss = float(-pnl[pnl < 0].sum())
+
+        equity = self.equity.to_numpy(dtype='float64')
+        if len(equity):
+            peak = np.maximum.accumulate(equity)
+            max_drawdown_pct = float(np.max((peak - equity) / peak) * 100.0)
+        else:
+            max_drawdown_pct = 0.0
+
+        return {
+            "trades": int(len(trades)),
+            "win_rate": round(float((pnl > 0).mean()), 4) if len(pnl) else 0.0,
+            "total_pnl": round(float(pnl.sum()), 2),
+            "profit_factor": round(gross_win / gross_loss, 4) if gross_loss > 0 else None,
+            "max_drawdown_pct": round(max_drawdown_pct, 4),
+            "exit_reasons": trades['exit_reason'].value_counts().to_dict() if len(trades) else {},
+            "failed_symbols": sorted(self.failed_symbols),
+        }
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """ OHLCV 결측치 처리 (앞 값으로 채우고, 앞쪽에 남는 결측 봉은 제외 - run_symbol과 같은 처리) """
+    if not df[OHLCV_COLUMNS].isna().to_numpy().any():
+        return df
+    return df[OHLCV_COLUMNS].ffill().dropna()
+
+def slice_signals(signals: PanelSignals, start: int, stop: int) -> PanelSignals:
+    """ 봉별 판정의 행 구간 [start, stop) """
+    return PanelSignals(**{name: getattr(signals, name)[start:stop] for name in PanelSignals.__dataclass_fields__})
+
+def bar_signals(values: np.ndarray, window: int, params: StrategyParams = DEFAULT_PARAMS, chunk_rows: int = 2048) -> PanelSignals:
+    """
+    (봉 수, OHLCV) 배열 -> 봉별 판정 (행 k = 봉 window - 1 + k 마감 시점, 최근 window개 봉 기준)
+    (슬라이딩 윈도우 뷰를 chunk_rows개씩 compute_signals에 넘김 - 윈도우 복사 없음)
+    """
+    windows = [sliding_window_view(values[:, col], window) for col in (OPEN, HIGH, LOW, CLOSE)]
+    parts = [
+        compute_signals(*(w[start:start + chunk_rows] for w in windows), params=params)
+        for start in range(0, len(windows[0]), chunk_rows)
+    ]
+    return PanelSignals(**{
+        name: np.concatenate([getattr(part, name) for part in parts])
+        for name in PanelSignals.__dataclass_fields__
+    })
+
+class Backtester:
+
+    def __init__(self, params: Optional[BacktestParams] = None):
+        self.logger = setup_logger("Backtester", "athena_v1.log")
+        self.params = params or BacktestParams()
+
+    def run(self, frames: Dict[str, pd.DataFrame], signals: Optional[Dict[str, PanelSignals]] = None) -> BacktestResult:
+        """
+        { 마켓: H1 DataFrame (KST 인덱스, OHLCV) } -> BacktestResult
+        (signals: { 마켓: 미리 계산한 봉별 판정 } - 있으면 판정 계산 생략, run_symbol 참고)
+        """
+        trades: List[Trade] = []
+        symbol_equity: Dict[str, pd.Series] = {}
+        failed: Dict[str, str] = {}
+        signals = signals or {}
+
+        for symbol, df in frames.items():
+            try:
+                symbol_trades, equity = self.run_symbol(symbol, df, signals.get(symbol))
+            except Exception as e:
+                self.logger.error(f"[{symbol}] 백테스트 중 오류: {e}", exc_info=True)
+                failed[symbol] = f"{type(e).__name__}: {e}"
+                continue
+            trades.extend(symbol_trades)
+            if equity is not None:
+                symbol_equity[symbol] = equity
+
+        columns = list(Trade.__dataclass_fields__)
+        trades_df = pd.DataFrame([asdict(t) for t in trades], columns=columns)
+        if len(trades_df):
+            trades_df = trades_df.sort_values(['exit_time', 'symbol'], kind='stable').reset_index(drop=True)
+
+        return BacktestResult(trades_df, self._portfolio_equity(symbol_equity), symbol_equity, self.params, failed)
+
+    def run_symbol(self, symbol: str, df: pd.DataFrame, signals: Optional[PanelSignals] = None) -> Tuple[List[Trade], Optional[pd.Series]]:
+        """
+        마켓 1개 -> (거래 목록, 자산 곡선)
+        (signals: 결측치 처리된 df의 bar_signals() 결과 (행 k = 봉 window - 1 + k) - 같은 판정을 여러 구간에서 재사용할 때)
+        """
+        p = self.params
+        if df is None or len(df) <= p.window:
+            return [], None
+        if signals is None:
+            df = clean_frame(df)
+            if len(df) <= p.window:
+                return [], None
+
+        values = _ohlcv_values(df)
+        index = df.index
+        o, h, l, c = (values[:, col] for col in (OPEN, HIGH, LOW, CLOSE))
+
+        offset = p.window - 1 # (signals 행 k = 봉 offset + k)
+        if signals is None:
+            signals = bar_signals(values, p.window, p.strategy, p.chunk_rows)
+        elif len(signals.regime) != len(c) - offset:
+            raise ValueError(f"판정 행 수({len(signals.regime)})가 봉 수({len(c)}) - {offset}와 다릅니다.")
+
+        # (봉별 국면 - S4 청산 확인용, 판정 전 구간은 -1)
+        regime = np.full(len(c), -1, dtype='int8')
+        regime[offset:] = signals.regime
+        exits_bull = (regime != _BULL) & (regime >= 0) # (BULL 진입 -> RANGE/BEAR)
+        exits_range = regime == _BEAR # (RANGE 진입 -> BEAR)
+
+        entries = np.flatnonzero(signals.tactic != TACTIC_NONE) + offset
+        base_risk = p.initial_capital * (p.base_risk_pct / 100.0)
+
+        trades: List[Trade] = []
+        cash = p.initial_capital
+        realized = np.zeros(len(c))
+        holding = np.zeros(len(c)) # (보유 수량 - 봉 종가 평가용)
+        cost = np.zeros(len(c)) # (보유 중 매수 금액 + 매수 수수료)
+
+        k = 0
+        while k < len(entries):
+            t = entries[k]
+            row = t - offset
+            entry_price = float(c[t])
+            sl_price = float(signals.sl_price[row])
+            tp_price = float(signals.tp_price[row])
+            regime_name = REGIME_NAMES[signals.regime[row]]
+            score = int(signals.score[row])
+
+            # --- RiskManager.calculate_position_size (호가창 없음) ---
+            loss_per_coin = abs(entry_price - sl_price)
+            if loss_per_coin <= 0:
+                k += 1
+                continue
+            volume = base_risk * RiskManager.risk_multiplier(regime_name, score) / loss_per_coin
+            size_krw = volume * entry_price
+            if size_krw > cash:
+                size_krw = cash * (1.0 - RiskManager.UPBIT_FEE_BUFFER)
+                volume = size_krw / entry_price
+            if size_krw < p.min_order_krw:
+                k += 1
+                continue
+
+            # --- 청산 (S1 / S2 / S4) ---
+            exit_mask = exits_bull if regime_name == "BULL" else exits_range
+            exit_bar, exit_price, exit_reason = self._find_exit(t, o, h, l, c, sl_price, tp_price, exit_mask)
+
+            buy_fee = size_krw * p.fee_rate
+            sell_fee = volume * exit_price * p.fee_rate
+            pnl = volume * (exit_price - entry_price) - buy_fee - sell_fee
+            cash += pnl
+
+            realized[exit_bar] += pnl
+            holding[t:exit_bar] = volume
+            cost[t:exit_bar] = size_krw + buy_fee
+
+            reason = signals.reason(row)
+            trades.append(Trade(
+                symbol=symbol,
+                entry_time=index[t],
+                exit_time=index[exit_bar],
+                entry_price=entry_price,
+                exit_price=float(exit_price),
+                volume=float(volume),
+                size_krw=float(size_krw),
+                sl_price=sl_price,
+                tp_price=tp_price,
+                regime=regime_name,
+                tactic=reason,
+                score=score,
+                exit_reason=exit_reason,
+                pnl=float(pnl),
+                bars_held=int(exit_bar - t)
+            ))
+
+            # (청산한 봉 다음 봉부터 다시 진입)
+            k = int(np.searchsorted(entries, exit_bar + 1))
+
+        equity = p.initial_capital + np.cumsum(realized) + holding * c - cost
+        return trades, pd.Series(equity[offset:], index=index[offset:], name=symbol)
+
+    @staticmethod
+    def _find_exit(t: int, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
+                   sl_price: float, tp_price: float, exit_mask: np.ndarray) -> Tuple[int, float, str]:
+        """ 봉 t 마감 진입 -> (청산 봉, 청산가, 사유) - 구간을 늘려 가며 첫 조건 충족 봉을 벡터로 탐색 """
+        n = len(c)
+        start, size = t + 1, 64
+        while start < n:
+            end = min(start + size, n)
+            sl_hit = l[start:end] <= sl_price
+            tp_hit = h[start:end] >= tp_price
+            hit = sl_hit | tp_hit | exit_mask[start:end]
+            if hit.any():
+                j = int(np.argmax(hit))
+                bar = start + j
+                if sl_hit[j]:
+                    return bar, min(float(o[bar]), sl_price), EXIT_STOP_LOSS
+                if tp_hit[j]:
+                    return bar, max(float(o[bar]), tp_price), EXIT_TAKE_PROFIT
+                return bar, float(c[bar]), EXIT_REGIME
+            start, size = end, size * 4
+        return n - 1, float(c[n - 1]), EXIT_END
+
+    def _portfolio_equity(self, symbol_equity: Dict[str, pd.Series]) -> pd.Series:
+        """ 마켓별 자산 곡선 -> 전체 자산 곡선 (initial_capital + 마켓별 손익 합) """
+        if not symbol_equity:
+            return pd.Series(dtype='float64', name="equity")
+        pnl = pd.concat(
+            {symbol: equity - self.params.initial_capital for symbol, equity in symbol_equity.items()},
+            axis=1
+        ).sort_index().ffill().fillna(0.0)
+        return (self.params.initial_capital + pnl.sum(axis=1)).rename("equity")
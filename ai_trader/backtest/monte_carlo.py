@@ -0,0 +1,139 @@
+# Athena_v1/ai_trader/backtest/monte_carlo.py
+# [신규] 2024.11.17 - (요청) 몬테카를로 거래 순서 재표본 (부트스트랩/블록 부트스트랩 -> 최대 낙폭 분위수, 파산 확률)
+"""
+몬테카를로 리스크 분석 (MonteCarloSimulator)
+
+거래 목록(백테스트 결과 또는 trade_logs)을 R 배수(손익 / 거래당 리스크 금액)로 바꾼 뒤,
+순서를 무작위로 다시 뽑은 경로 수만 개를 만들어 거래당 리스크(%)별 최대 낙폭 분포와 파산 확률을 계산합니다.
+
+- 재표본: block_size=1이면 부트스트랩(복원 추출), 2 이상이면 원형 블록 부트스트랩
+  (연속 block_size개 거래를 묶어 뽑음 - 연승/연패 같은 거래 간 의존성 유지)
+- 자산: RiskManager와 같이 거래당 리스크 금액 = 초기 자본 x risk_pct% (고정 금액)
+  -> 자산 = 1 + risk_pct% x 누적 R (compound=True면 현재 자산 기준 복리: 누적 곱 (1 + risk_pct% x R))
+- 파산: 경로 중 고점 대비 낙폭이 ruin_drawdown_pct 이상인 적이 있으면 파산으로 봅니다.
+- 모든 경로를 (경로 수, 거래 수) 배열 하나로 계산합니다. (리스크 설정 간에는 재표본 경로를 공유)
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Sequence
+
+from ai_trader.data_models import TradeLog
+from ai_trader.utils.logger import setup_logger
+
+DEFAULT_RISK_PCTS = (0.25, 0.5, 1.0, 2.0)
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+def r_multiples_from_backtest(trades: pd.DataFrame) -> np.ndarray:
+    """
+    BacktestResult.trades -> R 배수 (청산 시각 순)
+    (리스크 금액 = 수량 x (진입가 - 손절가), 손절가가 진입가 이상인 거래는 제외)
+    """
+    if trades is None or not len(trades):
+        return np.empty(0)
+    trades = trades.sort_values('exit_time', kind='stable')
+    risk = trades['volume'].to_numpy(dtype='float64') * (
+        trades['entry_price'].to_numpy(dtype='float64') - trades['sl_price'].to_numpy(dtype='float64')
+    )
+    pnl = trades['pnl'].to_numpy(dtype='float64')
+    valid = risk > 0
+    return pnl[valid] / risk[valid]
+
+def r_multiples_from_trade_logs(logs: Iterable[TradeLog], risk_amount: float) -> np.ndarray:
+    """
+    trade_logs 청산(sell) 기록 -> R 배수 (시각 순)
+    (trade_logs에는 손절가가 없으므로 기록 당시 거래당 리스크 금액(RiskManager.base_risk_amount)으로 나눔)
+    """
+    if risk_amount <= 0:
+        raise ValueError("risk_amount는 0보다 커야 합니다.")
+    closes = sorted((log for log in logs if log.side == "sell"), key=lambda log: log.timestamp)
+    return np.array([log.profit or 0.0 for log in closes], dtype='float64') / risk_amount
+
+class MonteCarloSimulator:
+
+    def __init__(self,
+                 r_multiples: Sequence[float],
+                 n_paths: int = 20000,
+                 n_trades: Optional[int] = None,
+                 block_size: int = 1,
+                 ruin_drawdown_pct: float = 50.0,
+                 compound: bool = False,
+                 seed: Optional[int] = 0):
+        """
+        :param r_multiples: 거래별 R 배수 (r_multiples_from_backtest / r_multiples_from_trade_logs)
+        :param n_trades: 경로당 거래 수 (None이면 원래 거래 수)
+        :param block_size: 1이면 부트스트랩, 2 이상이면 원형 블록 부트스트랩
+        :param ruin_drawdown_pct: 파산으로 보는 고점 대비 낙폭(%)
+        """
+        self.logger = setup_logger("MonteCarlo", "athena_v1.log")
+        self.r = np.asarray(r_multiples, dtype='float64')
+        self.r = self.r[np.isfinite(self.r)]
+        if not len(self.r):
+            raise ValueError("R 배수가 없습니다. (거래 0개)")
+        self.n_paths = n_paths
+        self.n_trades = n_trades or len(self.r)
+        self.block_size = max(1, min(block_size, len(self.r)))
+        self.ruin_drawdown_pct = ruin_drawdown_pct
+        self.compound = compound
+        self.rng = np.random.default_rng(seed)
+
+    def resample(self) -> np.ndarray:
+        """ (경로 수, 거래 수) R 배수 경로 """
+        n, b = len(self.r), self.block_size
+        if b == 1:
+            return self.r[self.rng.integers(0, n, size=(self.n_paths, self.n_trades), dtype='int32')]
+        blocks = -(-self.n_trades // b)
+        starts = self.rng.integers(0, n, size=(self.n_paths, blocks, 1), dtype='int32')
+        index = ((starts + np.arange(b, dtype='int32')) % n).reshape(self.n_paths, blocks * b)[:, :self.n_trades]
+        return self.r[index]
+
+    def run(self, risk_pcts: Sequence[float] = DEFAULT_RISK_PCTS,
+            percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> pd.DataFrame:
+        """ 거래당 리스크(%)별 최대 낙폭 분위수 / 파산 확률 / 최종 수익률 분포 (행 = risk_pct) """
+        paths = self.resample()
+        cum_r = None if self.compound else np.cumsum(paths, axis=1)
+
+        rows = []
+        for risk_pct in risk_pcts:
+            f = risk_pct / 100.0
+            if self.compound:
+                # (1 + f x R <= 0이면 자산 소진 - 이후 0으로 유지)
+                equity = np.maximum(1.0 + f * paths, 0.0)
+                np.cumprod(equity, axis=1, out=equity)
+            else:
+                equity = f * cum_r
+                equity += 1.0
+            max_dd = self._max_drawdown_pct(equity)
+            final = equity[:, -1]
+            rows.append({
+                "risk_pct": risk_pct,
+                **{f"max_dd_p{p:g}": round(float(v), 4) for p, v in zip(percentiles, np.percentile(max_dd, percentiles))},
+                "risk_of_ruin": round(float(np.mean(max_dd >= self.ruin_drawdown_pct)), 6),
+                "prob_loss": round(float(np.mean(final < 1.0)), 6),
+                "return_p5": round(float(np.percentile(final, 5) - 1.0) * 100.0, 4),
+                "return_p50": round(float(np.median(final) - 1.0) * 100.0, 4),
+            })
+
+        report = pd.DataFrame(rows).set_index("risk_pct")
+        self.logger.info(
+            f"몬테카를로 완료: 거래 {len(self.r)}개 -> 경로 {self.n_paths}개 x {self.n_trades}거래 "
+            f"(블록 {self.block_size}, 파산 기준 낙폭 {self.ruin_drawdown_pct}%)"
+        )
+        return report
+
+    def summary(self) -> Dict[str, float]:
+        """ 원래 거래의 R 배수 통계 (거래 수 / 승률 / 평균 / 표준편차) """
+        return {
+            "trades": int(len(self.r)),
+            "win_rate": round(float(np.mean(self.r > 0)), 4),
+            "mean_r": round(float(self.r.mean()), 4),
+            "std_r": round(float(self.r.std(ddof=0)), 4),
+        }
+
+    @staticmethod
+    def _max_drawdown_pct(equity: np.ndarray) -> np.ndarray:
+        """ 경로별 최대 낙폭(%) (시작 자산 1.0도 고점에 포함, 자산이 0 아래로 가도 100%) """
+        # (낙폭 = 1 - 자산 / 고점 - 임시 배열 1개로 계산)
+        ratio = np.maximum.accumulate(equity, axis=1)
+        np.maximum(ratio, 1.0, out=ratio)
+        np.divide(equity, ratio, out=ratio)
+        return (1.0 - np.clip(ratio.min(axis=1), 0.0, 1.0)) * 100.0
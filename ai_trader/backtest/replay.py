@@ -0,0 +1,435 @@
+# Athena_v1/ai_trader/backtest/replay.py
+# [신규] 2024.11.17 - (요청) 가상 시계 리플레이 하네스 (trading_bot_task / PositionManager / MockExchange를 과거 캔들로 실행)
+"""
+리플레이 하네스 (ReplayHarness)
+
+실제 봇 코드(main.trading_bot_task -> PositionManager -> MockExchange)를 그대로 실행하되,
+시장 데이터는 과거 캔들에서, 시간은 가상 시계에서 가져옵니다.
+
+- VirtualTimeEventLoop: 실행할 콜백이 없으면 가장 가까운 타이머 시각으로 가상 시계를 바로 넘깁니다.
+  (asyncio.sleep(5) / 스케줄러 wait_for / 60초 하트비트가 기다리지 않고 즉시 진행 - 몇 주 분량을 몇 분에 재생)
+  (BaseEventLoop의 _ready / _scheduled를 직접 확인하므로 CPython asyncio 기준, 네트워크/스레드 작업이 없어야 함)
+- 시각을 직접 읽는 모듈(time.time/monotonic, datetime.now)은 재생 중에만 가상 시계로 바꿉니다.
+- ReplayMarketData: UpbitExchange 공개 API 대체 - 가상 시각까지 마감된 기준 봉만 보이며,
+  상위 봉(H1)은 기준 봉(예: 1분봉)에서 만들어 마지막 행이 미완성 봉이 됩니다. (기준 봉이 H1이면 마지막 마감 봉)
+- main의 전역 객체(스케줄러, 지표 엔진, 평가 실행기 등)는 재생 동안 새 인스턴스로 바꾸고, 끝나면 되돌립니다.
+  (캔들 저장소 미사용, 평가는 inline, 거래 기록은 별도 DB, 체결 스트림 없음 -> DataManager REST 캐시 경로 사용)
+"""
+import asyncio
+import heapq
+import importlib
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ai_trader import candle_builder as candle_builder_module
+from ai_trader import candle_scheduler as candle_scheduler_module
+from ai_trader import data_manager as data_manager_module
+from ai_trader import market_catalogue as market_catalogue_module
+from ai_trader import order_book as order_book_module
+from ai_trader import price_snapshot as price_snapshot_module
+from ai_trader import risk_manager as risk_manager_module
+from ai_trader.candle_builder import CandleBuilder, kst_index_to_ms, bars_to_frame
+from ai_trader.candle_scheduler import ServerClock, CandleCloseScheduler
+from ai_trader.data_manager import DataManager, TIMEFRAME_MINUTES
+from ai_trader.database import Database
+from ai_trader.evaluation_executor import EvaluationExecutor
+from ai_trader.market_data_hub import MarketDataHub
+from ai_trader.mock_exchange import MockExchange
+from ai_trader.order_book import OrderBookEngine
+from ai_trader.resampler import bar_ms, resample_bars
+from ai_trader.strategy.features import FeatureStore, OHLCV_COLUMNS, _ohlcv_values
+from ai_trader.utils.logger import setup_logger
+
+_HOUR_MS = 3600 * 1000
+
+class VirtualClock:
+    """ 리플레이 가상 시계 (time(): UTC epoch 초 / monotonic(): 생성 이후 경과 초) """
+
+    def __init__(self, start: float):
+        self._origin = float(start)
+        self._now = float(start)
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        # (epoch 초 그대로 쓰면 float 정밀도(~1e-7초)가 루프 시계 해상도보다 거칠어 타이머가 실행되지 않음)
+        return self._now - self._origin
+
+    def now_ms(self) -> int:
+        return int(self._now * 1000)
+
+    def advance_to(self, when: float):
+        """ 시계를 when(epoch 초)까지 진행 (되돌리지 않음) """
+        if when > self._now:
+            self._now = float(when)
+
+    def advance_monotonic(self, when: float):
+        """ 시계를 monotonic() 기준 when까지 진행 """
+        self.advance_to(self._origin + when)
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """ 가상 시계 이벤트 루프 (loop.time() = 가상 시계, 대기 중인 타이머가 있으면 바로 그 시각으로 이동) """
+
+    # (타이머 실행 판정 여유(초) - 가상 시계를 타이머 시각으로 옮긴 뒤 바로 실행되도록)
+    CLOCK_RESOLUTION = 1e-6
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__()
+        self.clock = clock
+        self._clock_resolution = self.CLOCK_RESOLUTION
+
+    def time(self) -> float:
+        return self.clock.monotonic()
+
+    def _run_once(self):
+        if not self._ready:
+            # (취소된 타이머로 시계를 넘기지 않도록 먼저 제거)
+            scheduled = self._scheduled
+            while scheduled and scheduled[0]._cancelled:
+                self._timer_cancelled_count -= 1
+                handle = heapq.heappop(scheduled)
+                handle._scheduled = False
+            if scheduled:
+                self.clock.advance_monotonic(scheduled[0]._when)
+        super()._run_once()
+
+class _VirtualTimeModule:
+    """ time 모듈 대체 (time()/monotonic()만 가상 시계, 나머지는 원래 time 모듈) """
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+
+    def time(self) -> float:
+        return self._clock.time()
+
+    def monotonic(self) -> float:
+        return self._clock.monotonic()
+
+    def __getattr__(self, name: str):
+        return getattr(time, name)
+
+def _virtual_datetime(clock: VirtualClock) -> type:
+    """ datetime.now()가 가상 시계를 따르는 datetime 하위 클래스 """
+    def now(cls, tz=None):
+        return datetime.fromtimestamp(clock.time(), tz)
+    return type("VirtualDatetime", (datetime,), {"now": classmethod(now)})
+
+class ReplayMarketData:
+    """
+    과거 캔들 재생 데이터 (UpbitExchange 공개 API / PriceSnapshotService 대체)
+    (frames: { 마켓: 기준 봉 DataFrame (KST 인덱스, OHLCV) } - 가상 시각까지 마감된 봉만 반환)
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], clock: VirtualClock, timeframe: str = "minute60"):
+        if timeframe not in TIMEFRAME_MINUTES:
+            raise ValueError(f"지원하지 않는 타임프레임: {timeframe}")
+        self.logger = setup_logger("ReplayMarketData", "athena_v1.log")
+        self.clock = clock
+        self.timeframe = timeframe
+
+        # (마켓별 봉 시작 ms / 마감 ms / KST 인덱스 / OHLCV 배열)
+        self._buckets: Dict[str, np.ndarray] = {}
+        self._index: Dict[str, pd.DatetimeIndex] = {}
+        self._closes: Dict[str, np.ndarray] = {}
+        self._values: Dict[str, np.ndarray] = {}
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            buckets = np.asarray(kst_index_to_ms(df.index), dtype='int64')
+            self._buckets[symbol] = buckets
+            self._index[symbol] = pd.DatetimeIndex(df.index)
+            self._closes[symbol] = buckets + bar_ms(timeframe)
+            self._values[symbol] = _ohlcv_values(df)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._buckets)
+
+    def first_ms(self, symbol: str) -> int:
+        return int(self._buckets[symbol][0])
+
+    def last_close_ms(self, symbol: str) -> int:
+        return int(self._closes[symbol][-1])
+
+    def close_events(self, start_ms: int, end_ms: int) -> Iterator[tuple]:
+        """ (start_ms, end_ms] 구간의 봉 마감 시각 순으로 (마감 ms, [(마켓, 종가), ...]) """
+        symbols = [s for s in self._closes]
+        if not symbols:
+            return
+        closes = np.concatenate([self._closes[s] for s in symbols])
+        owner = np.concatenate([np.full(len(self._closes[s]), i) for i, s in enumerate(symbols)])
+        rows = np.concatenate([np.arange(len(self._closes[s])) for s in symbols])
+        keep = (closes > start_ms) & (closes <= end_ms)
+        closes, owner, rows = closes[keep], owner[keep], rows[keep]
+        order = np.argsort(closes, kind='stable')
+        closes, owner, rows = closes[order], owner[order], rows[order]
+
+        bounds = np.flatnonzero(np.r_[True, closes[1:] != closes[:-1], True])
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            yield int(closes[a]), [
+                (symbols[owner[k]], float(self._values[symbols[owner[k]]][rows[k], 3])) for k in range(a, b)
+            ]
+
+    def _visible(self, symbol: str) -> int:
+        """ 가상 시각까지 마감된 봉 수 """
+        closes = self._closes.get(symbol)
+        if closes is None:
+            return 0
+        return int(np.searchsorted(closes, self.clock.now_ms(), side='right'))
+
+    # --- UpbitExchange 공개 API ---
+
+    async def get_market_all(self) -> List[Dict[str, Any]]:
+        return [{"market": symbol} for symbol in self._buckets]
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = 'minute60', count: int = 200) -> Optional[pd.DataFrame]:
+        """ 가상 시각 기준 최근 count개 (기준 봉보다 긴 타임프레임은 기준 봉에서 생성 - 마지막 행은 미완성 봉) """
+        interval = timeframe.replace('minutes', 'minute')
+        n = self._visible(symbol)
+        if n == 0 or interval not in TIMEFRAME_MINUTES:
+            return None
+        buckets, values = self._buckets[symbol], self._values[symbol]
+
+        if interval == self.timeframe:
+            start = max(n - count, 0)
+            # (기준 봉은 미리 만든 인덱스를 잘라 사용 - 봉 시각 변환 생략)
+            return pd.DataFrame(values[start:n], index=self._index[symbol][start:n], columns=OHLCV_COLUMNS, copy=True)
+
+        size = bar_ms(interval)
+        if size < bar_ms(self.timeframe) or size % bar_ms(self.timeframe):
+            self.logger.warning(f"[{symbol}] 기준 봉({self.timeframe})으로 만들 수 없는 타임프레임: {interval}")
+            return None
+        last_bucket = int(buckets[n - 1]) - int(buckets[n - 1]) % size
+        start = int(np.searchsorted(buckets, last_bucket - (count - 1) * size))
+        out_buckets, out = resample_bars(buckets[start:n], values[start:n], interval)
+        return bars_to_frame(out_buckets.tolist(), out.tolist())
+
+    async def get_current_price(self, symbol: str | List[str]) -> Any:
+        """ 가상 시각까지 마감된 마지막 봉의 종가 (str -> float, list -> dict) """
+        if isinstance(symbol, list):
+            prices = {s: self.price(s) for s in symbol}
+            return {s: p for s, p in prices.items() if p}
+        return self.price(symbol)
+
+    def price(self, symbol: str) -> float:
+        n = self._visible(symbol)
+        return float(self._values[symbol][n - 1, 3]) if n else 0.0
+
+class ReplayExchange(MockExchange):
+    """ MockExchange (주문/잔고 로직 그대로) + 재생 데이터 + 체결 기록 """
+
+    def __init__(self, market_data: ReplayMarketData):
+        super().__init__(price_service=market_data)
+        self.public_exchange = market_data
+        self.market_data = market_data
+        self.fills: List[Dict[str, Any]] = []
+
+    async def place_order(self, symbol: str, side: str, volume: float = 0, price: float = 0, order_type: str = 'limit') -> Optional[Dict[str, Any]]:
+        currency = symbol.replace("KRW-", "")
+        krw_before = self.mock_krw_balance
+        volume_before = self.mock_assets.get(currency, {}).get('balance', 0.0)
+
+        result = await super().place_order(symbol, side, volume=volume, price=price, order_type=order_type)
+
+        if result and 'error' not in result:
+            self.fills.append({
+                "time": pd.Timestamp(self.market_data.clock.now_ms(), unit='ms') + pd.Timedelta(hours=9),
+                "symbol": symbol,
+                "side": side,
+                "price": self.market_data.price(symbol),
+                "volume": abs(self.mock_assets.get(currency, {}).get('balance', 0.0) - volume_before),
+                "krw": self.mock_krw_balance - krw_before, # (수수료 포함 KRW 증감)
+                "krw_balance": self.mock_krw_balance,
+            })
+        return result
+
+    def equity(self) -> float:
+        """ KRW + 보유 코인 평가액 (가상 시각 현재가) """
+        return self.mock_krw_balance + sum(
+            asset['balance'] * self.market_data.price(f"KRW-{currency}")
+            for currency, asset in self.mock_assets.items()
+        )
+
+@dataclass
+class ReplayResult:
+    fills: pd.DataFrame # (체결 기록 - 가상 시각 KST)
+    equity: pd.Series # (H1 봉 마감마다 KRW + 코인 평가액)
+    final_krw: float
+    open_assets: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    replayed_sec: float = 0.0 # (재생한 가상 시간)
+    elapsed_sec: float = 0.0 # (실제 소요 시간)
+
+    def summary(self) -> Dict[str, Any]:
+        equity = self.equity.to_numpy(dtype='float64')
+        start = float(equity[0]) if len(equity) else MockExchange.STARTING_CAPITAL_KRW
+        end = float(equity[-1]) if len(equity) else self.final_krw
+        return {
+            "fills": int(len(self.fills)),
+            "final_equity": round(end, 2),
+            "return_pct": round((end / start - 1.0) * 100.0, 4),
+            "open_assets": len(self.open_assets),
+            "replayed_hours": round(self.replayed_sec / 3600, 2),
+            "elapsed_sec": round(self.elapsed_sec, 2),
+            "speedup": round(self.replayed_sec / self.elapsed_sec, 1) if self.elapsed_sec > 0 else None,
+        }
+
+class ReplayHarness:
+
+    # (H1 봇이 첫 평가에 쓰는 봉 수 - trading_bot_task fetch_ohlcv count)
+    WARMUP_BARS = 200
+
+    # (마지막 봉 마감 이후 진행 시간(초) - 마감 평가 + 주문 대기(sleep 5초)가 끝나도록)
+    SETTLE_SEC = 10.0
+
+    def __init__(self,
+                 frames: Dict[str, pd.DataFrame],
+                 timeframe: str = "minute60",
+                 start: Optional[pd.Timestamp] = None,
+                 end: Optional[pd.Timestamp] = None,
+                 db_path: str = "athena_v1_replay_trade_history.db",
+                 heartbeat_sec: float = CandleCloseScheduler.DEFAULT_HEARTBEAT_SEC,
+                 app_module: Optional[ModuleType] = None):
+        """
+        :param frames: { 마켓: 기준 봉 DataFrame (KST 인덱스, OHLCV) } - 앞부분 WARMUP_BARS시간은 워밍업
+        :param timeframe: frames의 봉 길이 (H1을 나누어떨어지는 분봉, 예: minute1 / minute60)
+        :param start, end: 재생 구간 (KST, 기본: 워밍업 이후 ~ 마지막 봉 마감)
+        :param app_module: trading_bot_task가 있는 모듈 (기본: main)
+        """
+        self.logger = setup_logger("ReplayHarness", "athena_v1.log")
+        self.frames = frames
+        self.timeframe = timeframe
+        self.start = start
+        self.end = end
+        self.db_path = db_path
+        self.heartbeat_sec = heartbeat_sec
+        self.app_module = app_module
+
+    def _range_ms(self, market_data: ReplayMarketData) -> tuple:
+        symbols = market_data.symbols
+        if self.start is not None:
+            start_ms = kst_index_to_ms(pd.DatetimeIndex([self.start]))[0]
+        else:
+            first = max(market_data.first_ms(s) for s in symbols)
+            start_ms = first - first % _HOUR_MS + (self.WARMUP_BARS + 1) * _HOUR_MS
+        if self.end is not None:
+            end_ms = kst_index_to_ms(pd.DatetimeIndex([self.end]))[0]
+        else:
+            end_ms = max(market_data.last_close_ms(s) for s in symbols)
+        return start_ms, end_ms
+
+    def run(self) -> ReplayResult:
+        """ 재생 실행 (동기 - 자체 가상 시계 이벤트 루프 사용, 실행 중인 이벤트 루프 안에서 호출 불가) """
+        app = self.app_module or importlib.import_module("main")
+
+        market_data = ReplayMarketData(self.frames, VirtualClock(0.0), self.timeframe)
+        if not market_data.symbols:
+            raise ValueError("재생할 캔들이 없습니다.")
+        start_ms, end_ms = self._range_ms(market_data)
+        if end_ms <= start_ms:
+            raise ValueError("재생 구간이 비어 있습니다. (워밍업 봉 부족)")
+        clock = market_data.clock = VirtualClock(start_ms / 1000)
+
+        Database(self.db_path).create_tables()
+        loop = VirtualTimeEventLoop(clock)
+        started = time.perf_counter()
+        try:
+            with self._patched(app, clock, market_data):
+                exchange = ReplayExchange(market_data)
+                equity = loop.run_until_complete(self._replay(app, exchange, market_data, start_ms, end_ms))
+        finally:
+            loop.close()
+        elapsed = time.perf_counter() - started
+
+        fills = pd.DataFrame(exchange.fills, columns=["time", "symbol", "side", "price", "volume", "krw", "krw_balance"])
+        result = ReplayResult(
+            fills=fills,
+            equity=equity,
+            final_krw=exchange.mock_krw_balance,
+            open_assets={c: dict(a) for c, a in exchange.mock_assets.items()},
+            replayed_sec=(end_ms - start_ms) / 1000 + self.SETTLE_SEC,
+            elapsed_sec=elapsed
+        )
+        self.logger.info(f"리플레이 완료: {result.summary()}")
+        return result
+
+    async def _replay(self, app: ModuleType, exchange: ReplayExchange, market_data: ReplayMarketData, start_ms: int, end_ms: int) -> pd.Series:
+        clock = market_data.clock
+        app.candle_scheduler.start()
+        tasks = {
+            symbol: asyncio.create_task(app.trading_bot_task(symbol=symbol, exchange=exchange))
+            for symbol in market_data.symbols
+        }
+        app.active_bots.update(tasks)
+
+        equity_index: List[int] = []
+        equity_values: List[float] = []
+        try:
+            for close_ms, closed in market_data.close_events(start_ms, end_ms):
+                await asyncio.sleep(max(close_ms / 1000 - clock.time(), 0.0))
+                # (MarketDataHub ticker 대신 - 봉 중간 가격 변동 평가)
+                for symbol, price in closed:
+                    app.candle_scheduler.on_ticker({"code": symbol, "trade_price": price})
+                if close_ms % _HOUR_MS == 0:
+                    equity_index.append(close_ms)
+                    equity_values.append(exchange.equity())
+            await asyncio.sleep(self.SETTLE_SEC)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            await app.candle_scheduler.stop()
+
+        index = pd.to_datetime(equity_index, unit='ms') + pd.Timedelta(hours=9)
+        return pd.Series(equity_values, index=pd.DatetimeIndex(index), name="equity", dtype='float64')
+
+    @contextmanager
+    def _patched(self, app: ModuleType, clock: VirtualClock, market_data: ReplayMarketData):
+        """ 재생 동안 시각 함수와 main 전역 객체를 교체 (끝나면 원래대로) """
+        virtual_time = _VirtualTimeModule(clock)
+        virtual_datetime = _virtual_datetime(clock)
+        server_clock = ServerClock()
+        replacements = [
+            (candle_scheduler_module, "time", virtual_time),
+            (candle_builder_module, "time", virtual_time),
+            (data_manager_module, "time", virtual_time),
+            (market_catalogue_module, "time", virtual_time),
+            (order_book_module, "time", virtual_time),
+            (price_snapshot_module, "time", virtual_time),
+            (data_manager_module, "datetime", virtual_datetime),
+            (risk_manager_module, "datetime", virtual_datetime),
+            (app, "DB_FILE_PATH", self.db_path),
+            (app, "candle_store", None),
+            (app, "candle_builder", CandleBuilder()),
+            (app, "price_service", market_data),
+            (app, "order_book_engine", OrderBookEngine()),
+            (app, "feature_store", FeatureStore()),
+            (app, "server_clock", server_clock),
+            (app, "candle_scheduler", CandleCloseScheduler(server_clock, heartbeat_sec=self.heartbeat_sec)),
+            (app, "evaluation_executor", EvaluationExecutor(inline=True)),
+            (app, "market_hub", MarketDataHub()),
+            (app, "active_bots", {}),
+            (app, "capital_lock", asyncio.Lock()),
+        ]
+        originals = [(target, name, getattr(target, name)) for target, name, _ in replacements]
+        DataManager.clear_cache()
+        try:
+            for target, name, value in replacements:
+                setattr(target, name, value)
+            yield
+        finally:
+            for target, name, value in originals:
+                setattr(target, name, value)
+            DataManager.clear_cache()
+
+def run_replay(frames: Dict[str, pd.DataFrame], timeframe: str = "minute60", **kwargs) -> ReplayResult:
+    """ ReplayHarness(frames, timeframe, ...).run() """
+    return ReplayHarness(frames, timeframe, **kwargs).run()
@@ -0,0 +1,334 @@
+# Athena_v1/ai_trader/backtest/sweep.py
+# [신규] 2024.11.17 - (요청) 파라미터 스윕 (그리드/랜덤 탐색 -> 프로세스 풀 백테스트, 결과 캐시, 실시간 순위표)
+# [수정] 2024.11.17 - (오류) 오류로 제외된 마켓(failed_symbols)이 있는 셀은 경고 후 캐시하지 않음
+"""
+파라미터 스윕 (SweepRunner)
+
+StrategyParams / BacktestParams 값 조합(셀)마다 Backtester를 실행하고 순위표를 만듭니다.
+
+- 탐색 공간: grid_space() (모든 조합) / random_space() (목록이면 선택, (하한, 상한)이면 구간에서 추출)
+  셀의 키는 StrategyParams 필드(예: min_score) 또는 BacktestParams 필드(예: base_risk_pct)입니다.
+- 캔들은 공유 메모리(SharedMemory) 1개에 마켓별 [봉 시각(int64) | OHLCV(float64)]로 한 번만 쓰고,
+  워커 프로세스는 시작할 때 붙어서 읽기 전용 DataFrame 뷰를 만듭니다. (셀마다 캔들을 pickle하지 않음)
+- 결과는 (파라미터 해시, 데이터 키)로 SQLite에 캐시합니다. 다시 실행하면 끝난 셀은 건너뜁니다.
+  (데이터 키 = 마켓별 첫/마지막 봉 시각 + 봉 수 + 종가 합 - 구간이나 캔들이 바뀌면 다시 계산)
+  (오류로 제외된 마켓이 있는 셀은 순위표에는 failed_symbols와 함께 올리되 캐시하지 않음 - 다시 실행하면 재시도)
+- 셀이 끝날 때마다 순위표(rank_by 기준)를 갱신해 iter_run()으로 내보내고, 1위가 바뀌면 로그에 남깁니다.
+"""
+import datetime
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, fields, replace
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, Column, String, DateTime, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import StaticPool
+
+from ai_trader.backtest.engine import Backtester, BacktestParams
+from ai_trader.strategy.features import OHLCV_COLUMNS, _ohlcv_values
+from ai_trader.strategy.panel import StrategyParams
+from ai_trader.utils.logger import setup_logger
+
+_STRATEGY_FIELDS = {f.name for f in fields(StrategyParams)}
+_BACKTEST_FIELDS = {f.name for f in fields(BacktestParams)} - {"strategy"}
+
+# (낮을수록 좋은 지표 - 순위표 오름차순)
+_LOWER_IS_BETTER = {"max_drawdown_pct"}
+
+# --- 탐색 공간 ---
+
+def grid_space(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """ { 필드: 값 목록 } -> 모든 조합 """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+def random_space(space: Dict[str, Any], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    { 필드: 값 목록 또는 (하한, 상한) } -> 무작위 n개
+    (값 목록이면 그중 하나, (하한, 상한)이면 구간에서 추출 - 둘 다 정수면 정수)
+    """
+    rng = np.random.default_rng(seed)
+    cells = []
+    for _ in range(n):
+        cell = {}
+        for key, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    cell[key] = int(rng.integers(low, high + 1))
+                else:
+                    cell[key] = float(rng.uniform(low, high))
+            else:
+                cell[key] = values[int(rng.integers(len(values)))]
+        cells.append(cell)
+    return cells
+
+def resolve_params(cell: Dict[str, Any], base: BacktestParams) -> BacktestParams:
+    """ 셀 -> BacktestParams (StrategyParams 필드는 base.strategy에, 나머지는 base에 반영) """
+    unknown = set(cell) - _STRATEGY_FIELDS - _BACKTEST_FIELDS
+    if unknown:
+        raise ValueError(f"알 수 없는 파라미터: {sorted(unknown)}")
+    strategy = replace(base.strategy, **{k: v for k, v in cell.items() if k in _STRATEGY_FIELDS})
+    return replace(base, strategy=strategy, **{k: v for k, v in cell.items() if k in _BACKTEST_FIELDS})
+
+def _json_default(value: Any) -> Any:
+    # (NumPy 스칼라 -> Python 값)
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"JSON 변환 불가: {type(value)}")
+
+def param_hash(params: BacktestParams) -> str:
+    """ 전체 파라미터(기본값 포함) 해시 - 기본값이 바뀌어도 다른 셀로 취급 """
+    text = json.dumps(asdict(params), sort_keys=True, default=_json_default)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+def data_key(frames: Dict[str, pd.DataFrame]) -> str:
+    """ 캔들 구간 키 (마켓별 첫/마지막 봉 시각, 봉 수, 종가 합) """
+    parts = [
+        [symbol, str(df.index[0]), str(df.index[-1]), len(df), round(float(df['close'].sum()), 6)]
+        for symbol, df in sorted(frames.items()) if df is not None and len(df)
+    ]
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()[:16]
+
+# --- 결과 캐시 ---
+
+Base = declarative_base()
+
+class SweepResultDB(Base):
+    """ SQLAlchemy 모델 - sweep_results 테이블 """
+    __tablename__ = 'sweep_results'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    param_hash = Column(String, primary_key=True)
+    data_key = Column(String, primary_key=True)
+    params = Column(String) # (JSON - 전체 BacktestParams)
+    summary = Column(String) # (JSON - BacktestResult.summary())
+    created_at = Column(DateTime, default=datetime.datetime.now)
+
+class SweepCache:
+
+    def __init__(self, db_path: str = "athena_v1_sweep_cache.db"):
+        self.db_path = db_path
+        self.engine = create_engine(
+            f'sqlite:///{db_path}',
+            echo=False,
+            poolclass=StaticPool,
+            connect_args={'check_same_thread': False}
+        )
+        self.logger = setup_logger("SweepCache", "athena_v1.log")
+        Base.metadata.create_all(bind=self.engine)
+
+    def get_many(self, key: str, hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """ 캐시된 요약 { 파라미터 해시: summary } """
+        hashes = list(hashes)
+        found: Dict[str, Dict[str, Any]] = {}
+        table = SweepResultDB.__table__
+        with self.engine.connect() as conn:
+            for i in range(0, len(hashes), 500):
+                stmt = select(table.c.param_hash, table.c.summary).where(
+                    table.c.data_key == key, table.c.param_hash.in_(hashes[i:i + 500])
+                )
+                for row in conn.execute(stmt):
+                    found[row.param_hash] = json.loads(row.summary)
+        return found
+
+    def put(self, hash_: str, key: str, params: BacktestParams, summary: Dict[str, Any]):
+        stmt = sqlite_insert(SweepResultDB.__table__).values(
+            param_hash=hash_,
+            data_key=key,
+            params=json.dumps(asdict(params), sort_keys=True, default=_json_default),
+            summary=json.dumps(summary, default=_json_default),
+            created_at=datetime.datetime.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['param_hash', 'data_key'],
+            set_={'params': stmt.excluded.params, 'summary': stmt.excluded.summary, 'created_at': stmt.excluded.created_at}
+        )
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(stmt)
+        except Exception as e:
+            self.logger.error(f"스윕 결과 저장 실패 ({hash_}): {e}")
+
+# --- 워커 프로세스 ---
+
+# (share_frames() 배치: 오프셋(바이트), 봉 수, 인덱스 단위('ns'/'us' ...), 인덱스 시간대(없으면 None))
+FrameLayout = Tuple[int, int, str, Optional[datetime.tzinfo]]
+
+_worker_frames: Optional[Dict[str, pd.DataFrame]] = None
+_worker_shm: Optional[SharedMemory] = None
+
+def _init_worker(name: str, layout: Dict[str, FrameLayout]):
+    """ 공유 메모리에 붙어 마켓별 읽기 전용 DataFrame 뷰 생성 (프로세스당 1번) """
+    global _worker_frames, _worker_shm
+    _worker_shm = SharedMemory(name=name)
+    _worker_frames = attach_frames(_worker_shm, layout)
+
+def share_frames(frames: Dict[str, pd.DataFrame]) -> Tuple[SharedMemory, Dict[str, FrameLayout]]:
+    """
+    전체 마켓 캔들 -> 공유 메모리 1개 [마켓별: 봉 시각(ns) | OHLCV] + 배치 { 마켓: (오프셋, 봉 수, 단위, 시간대) }
+    (시간대가 있는 인덱스는 UTC ns로 저장하고 attach_frames()에서 원래 단위/시간대로 되돌림)
+    """
+    row_bytes = (1 + len(OHLCV_COLUMNS)) * 8
+    size = sum(len(df) for df in frames.values()) * row_bytes
+    shm = SharedMemory(create=True, size=max(size, 1))
+
+    layout: Dict[str, FrameLayout] = {}
+    offset = 0
+    for symbol, df in frames.items():
+        rows = len(df)
+        np.ndarray((rows,), dtype='int64', buffer=shm.buf, offset=offset)[:] = \
+            np.asarray(df.index, dtype='datetime64[ns]').view('int64')
+        np.ndarray((rows, len(OHLCV_COLUMNS)), dtype='float64', buffer=shm.buf, offset=offset + rows * 8)[:] = \
+            _ohlcv_values(df)
+        layout[symbol] = (offset, rows, getattr(df.index, 'unit', 'ns'), getattr(df.index, 'tz', None))
+        offset += rows * row_bytes
+    return shm, layout
+
+def attach_frames(shm: SharedMemory, layout: Dict[str, FrameLayout]) -> Dict[str, pd.DataFrame]:
+    """ share_frames() 공유 메모리 -> { 마켓: 읽기 전용 DataFrame 뷰 } (OHLCV는 복사 없음, 인덱스 단위/시간대 복원) """
+    frames = {}
+    for symbol, (offset, rows, unit, tz) in layout.items():
+        ts = np.ndarray((rows,), dtype='int64', buffer=shm.buf, offset=offset)
+        ohlcv = np.ndarray((rows, len(OHLCV_COLUMNS)), dtype='float64', buffer=shm.buf, offset=offset + rows * 8)
+        ohlcv.flags.writeable = False
+        index = pd.DatetimeIndex(ts.view('datetime64[ns]').copy()).as_unit(unit)
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        frames[symbol] = pd.DataFrame(ohlcv, index=index, columns=OHLCV_COLUMNS, copy=False)
+    return frames
+
+def _run_cell(params: BacktestParams) -> Dict[str, Any]:
+    """ (워커에서 실행) 셀 1개 백테스트 -> 요약 """
+    return Backtester(params).run(_worker_frames).summary()
+
+# --- 부모 프로세스 ---
+
+@dataclass
+class SweepResult:
+    param_hash: str
+    cell: Dict[str, Any] # (탐색 공간에서 고른 값)
+    summary: Dict[str, Any]
+    cached: bool = False
+
+class SweepRunner:
+
+    def __init__(self,
+                 frames: Dict[str, pd.DataFrame],
+                 base_params: Optional[BacktestParams] = None,
+                 max_workers: Optional[int] = None,
+                 cache_path: str = "athena_v1_sweep_cache.db",
+                 rank_by: str = "total_pnl",
+                 inline: bool = False):
+        """
+        :param frames: { 마켓: H1 DataFrame (KST 인덱스, OHLCV) } - 모든 셀이 같은 캔들 사용
+        :param rank_by: 순위 기준 (summary 키 - max_drawdown_pct는 낮을수록 상위)
+        :param inline: 프로세스 풀 없이 현재 프로세스에서 실행 (디버깅용)
+        """
+        self.logger = setup_logger("SweepRunner", "athena_v1.log")
+        self.frames = {s: df for s, df in frames.items() if df is not None and len(df)}
+        self.base_params = base_params or BacktestParams()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = SweepCache(cache_path)
+        self.rank_by = rank_by
+        self.inline = inline
+        self.data_key = data_key(self.frames)
+
+    def run(self, cells: Iterable[Dict[str, Any]], on_update: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+        """ 모든 셀 실행 -> 최종 순위표 (on_update: 셀이 끝날 때마다 순위표 전달) """
+        leaderboard = self._leaderboard([])
+        for _, leaderboard in self.iter_run(cells):
+            if on_update is not None:
+                on_update(leaderboard)
+        return leaderboard
+
+    def iter_run(self, cells: Iterable[Dict[str, Any]]) -> Iterator[Tuple[SweepResult, pd.DataFrame]]:
+        """ 셀이 끝날 때마다 (결과, 현재 순위표) - 캐시된 셀이 먼저 나옴 """
+        pending: Dict[str, Tuple[Dict[str, Any], BacktestParams]] = {}
+        for cell in cells:
+            params = resolve_params(cell, self.base_params)
+            pending.setdefault(param_hash(params), (dict(cell), params))
+
+        results: List[SweepResult] = []
+        leader: Optional[str] = None
+
+        def publish(result: SweepResult):
+            nonlocal leader
+            results.append(result)
+            board = self._leaderboard(results)
+            top = board['param_hash'].iloc[0]
+            if top != leader:
+                leader = top
+                self.logger.info(f"스윕 1위 변경 ({len(results)}/{total}): {board.iloc[0].to_dict()}")
+            return result, board
+
+        total = len(pending)
+        cached = self.cache.get_many(self.data_key, pending)
+        for hash_, summary in cached.items():
+            cell, _ = pending.pop(hash_)
+            yield publish(SweepResult(hash_, cell, summary, cached=True))
+        if cached:
+            self.logger.info(f"캐시된 셀 {len(cached)}개 건너뜀 (남은 셀 {len(pending)}개).")
+
+        for hash_, summary in self._execute(pending):
+            cell, params = pending[hash_]
+            if summary.get("failed_symbols"):
+                self.logger.warning(f"스윕 셀 ({hash_} {cell}): 오류로 제외된 마켓 {summary['failed_symbols']} - 캐시하지 않습니다.")
+            else:
+                self.cache.put(hash_, self.data_key, params, summary)
+            yield publish(SweepResult(hash_, cell, summary))
+
+    def _execute(self, pending: Dict[str, Tuple[Dict[str, Any], BacktestParams]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """ 셀 실행 (완료 순서대로 (해시, 요약)) """
+        if not pending:
+            return
+        if self.inline or self.max_workers <= 1:
+            for hash_, (_, params) in pending.items():
+                yield hash_, Backtester(params).run(self.frames).summary()
+            return
+
+        shm, layout = share_frames(self.frames)
+        try:
+            # (spawn - EvaluationExecutor와 같은 이유로 fork 사용 안 함)
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(shm.name, layout)
+            ) as pool:
+                futures = {pool.submit(_run_cell, params): hash_ for hash_, (_, params) in pending.items()}
+                for future in as_completed(futures):
+                    hash_ = futures[future]
+                    try:
+                        yield hash_, future.result()
+                    except Exception as e:
+                        self.logger.error(f"스윕 셀 실행 실패 ({hash_} {pending[hash_][0]}): {e}")
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _leaderboard(self, results: List[SweepResult]) -> pd.DataFrame:
+        """ 결과 목록 -> 순위표 (셀 값 + 요약 지표, rank_by 순) """
+        rows = [
+            {"param_hash": r.param_hash, **r.cell,
+             **{k: v for k, v in r.summary.items() if k != "exit_reasons"}, "cached": r.cached}
+            for r in results
+        ]
+        board = pd.DataFrame(rows)
+        if board.empty or self.rank_by not in board.columns:
+            return board
+        board = board.sort_values(
+            self.rank_by, ascending=self.rank_by in _LOWER_IS_BETTER, na_position='last', kind='stable'
+        ).reset_index(drop=True)
+        board.index = board.index + 1
+        board.index.name = "rank"
+        return board
@@ -0,0 +1,405 @@
+# Athena_v1/ai_trader/backtest/walk_forward.py
+# [신규] 2024.11.17 - (요청) 워크 포워드 최적화 (학습 구간 스윕 -> 다음 검증 구간 평가, 윈도우 병렬, 봉별 판정 재사용)
+"""
+워크 포워드 최적화 (WalkForwardOptimizer)
+
+캔들을 [학습(in-sample) | 검증(out-of-sample)] 윈도우로 나눠 굴리면서,
+학습 구간에서 셀(파라미터 조합) 중 rank_by 1위를 고르고 바로 다음 검증 구간에서 평가합니다.
+
+- 윈도우: walk_forward_windows() - 전체 마켓 봉 시각(합집합) 기준, 검증 구간 길이만큼 이동
+  (anchored=True면 학습 시작을 고정하고 학습 구간을 늘려감)
+- 판정 재사용: 겹치는 윈도우마다 지표를 다시 계산하지 않도록, StrategyParams 조합별로 전체 시리즈의
+  봉별 판정(bar_signals)을 한 번만 계산해 공유 메모리에 두고, 윈도우에서는 행 구간만 잘라 씁니다.
+  (봉별 판정은 최근 window개 봉만 보므로 구간을 잘라도 결과가 같음 - BacktestParams만 다른 셀은 판정을 공유)
+- 병렬: 같은 프로세스 풀에서 1단계(판정 계산, StrategyParams 조합별) -> 2단계(윈도우별 학습 스윕 + 검증)
+  (캔들은 sweep.share_frames()와 같은 공유 메모리 - 워커는 시작할 때 한 번 붙음)
+- 결과: 윈도우별 보고서(학습/검증 지표, 선택 셀, WFE), 이어 붙인 검증 구간 자산 곡선/거래,
+  파라미터 안정성(윈도우 간 선택 값의 최빈값 비율/변경 횟수/변동계수)
+- 검증 구간 끝에 남은 포지션은 EndOfData로 청산합니다. (다음 윈도우는 새 파라미터로 새 계좌에서 시작)
+"""
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ai_trader.backtest.engine import Backtester, BacktestParams, clean_frame, bar_signals
+from ai_trader.backtest.sweep import FrameLayout, resolve_params, share_frames, attach_frames, _LOWER_IS_BETTER
+from ai_trader.strategy.features import _ohlcv_values
+from ai_trader.strategy.panel import PanelSignals, StrategyParams
+from ai_trader.utils.logger import setup_logger
+
+# (봉별 판정 1행 - 공유 메모리 배치용)
+_SIGNAL_DTYPE = np.dtype([
+    ('regime', 'int8'), ('tactic', 'int8'), ('score', 'int16'),
+    ('w_pattern', 'bool'), ('rsi_divergence', 'bool'),
+    ('sl_price', 'float64'), ('tp_price', 'float64'), ('price', 'float64'),
+    ('ob_low', 'float64'), ('rsi', 'float64'),
+])
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    number: int
+    train_start: pd.Timestamp
+    train_last: pd.Timestamp # (학습 구간 마지막 봉 - 포함)
+    test_start: pd.Timestamp
+    test_last: pd.Timestamp # (검증 구간 마지막 봉 - 포함)
+    train_bars: int
+    test_bars: int
+
+def walk_forward_windows(index: pd.Index, train_bars: int, test_bars: int,
+                         warmup_bars: int = 200, anchored: bool = False) -> List[WalkForwardWindow]:
+    """
+    봉 시각 -> 윈도우 목록 (검증 구간 길이(test_bars)만큼 이동, 마지막 불완전한 검증 구간은 제외)
+    (첫 학습 구간은 warmup_bars - 1번째 봉부터 - 그 전 봉은 판정에 쓰는 과거 봉)
+    """
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars / test_bars는 1 이상이어야 합니다.")
+    index = pd.DatetimeIndex(index).unique().sort_values()
+    first = max(warmup_bars - 1, 0)
+
+    windows: List[WalkForwardWindow] = []
+    k = 0
+    while True:
+        train_end = first + train_bars + k * test_bars
+        test_end = train_end + test_bars
+        if test_end > len(index):
+            break
+        train_start = first if anchored else train_end - train_bars
+        windows.append(WalkForwardWindow(
+            number=k + 1,
+            train_start=index[train_start], train_last=index[train_end - 1],
+            test_start=index[train_end], test_last=index[test_end - 1],
+            train_bars=train_end - train_start, test_bars=test_bars,
+        ))
+        k += 1
+    return windows
+
+# --- 워커 프로세스 ---
+
+_worker_frames: Optional[Dict[str, pd.DataFrame]] = None
+_worker_signals: Optional[np.ndarray] = None # ((StrategyParams 조합 수, 전체 판정 행 수) 구조체 배열)
+_worker_layout: Optional[Dict[str, Tuple[int, int]]] = None # ({ 마켓: (판정 행 시작, 행 수) })
+_worker_window: int = 0
+_worker_shm: List[SharedMemory] = []
+
+def _install(frames: Dict[str, pd.DataFrame], signals: np.ndarray, layout: Dict[str, Tuple[int, int]], window: int):
+    global _worker_frames, _worker_signals, _worker_layout, _worker_window
+    _worker_frames, _worker_signals, _worker_layout, _worker_window = frames, signals, layout, window
+
+def _init_worker(candles_name: str, candles_layout: Dict[str, FrameLayout],
+                 signals_name: str, signals_shape: Tuple[int, int],
+                 layout: Dict[str, Tuple[int, int]], window: int):
+    """ 캔들/판정 공유 메모리에 붙기 (프로세스당 1번) """
+    candles = SharedMemory(name=candles_name)
+    signals = SharedMemory(name=signals_name)
+    _worker_shm[:] = [candles, signals]
+    _install(
+        attach_frames(candles, candles_layout),
+        np.ndarray(signals_shape, dtype=_SIGNAL_DTYPE, buffer=signals.buf),
+        layout, window
+    )
+
+def _compute_signals(strategy_idx: int, params: BacktestParams) -> int:
+    """ (워커에서 실행) StrategyParams 조합 1개의 마켓별 전체 봉별 판정 -> 판정 배열 strategy_idx행 """
+    out = _worker_signals[strategy_idx]
+    for symbol, (start, rows) in _worker_layout.items():
+        signals = bar_signals(_ohlcv_values(_worker_frames[symbol]), params.window, params.strategy, params.chunk_rows)
+        target = out[start:start + rows]
+        for name in _SIGNAL_DTYPE.names:
+            target[name] = getattr(signals, name)
+    return strategy_idx
+
+def _slice(strategy_idx: int, first: pd.Timestamp, last: pd.Timestamp) -> Tuple[Dict[str, pd.DataFrame], Dict[str, PanelSignals]]:
+    """ 구간 [first, last]의 마켓별 (캔들 - 앞쪽 판정용 window - 1개 봉 포함, 봉별 판정) """
+    offset = _worker_window - 1
+    frames, signals = {}, {}
+    for symbol, df in _worker_frames.items():
+        a = int(df.index.searchsorted(first, side='left'))
+        b = int(df.index.searchsorted(last, side='right'))
+        lo = max(a - offset, 0)
+        if b - lo <= _worker_window:
+            continue
+        start, _ = _worker_layout[symbol]
+        rows = _worker_signals[strategy_idx, start + lo:start + b - offset]
+        frames[symbol] = df.iloc[lo:b]
+        signals[symbol] = PanelSignals(**{name: rows[name] for name in _SIGNAL_DTYPE.names})
+    return frames, signals
+
+def _rank_key(summary: Dict[str, Any], rank_by: str) -> float:
+    """ 클수록 상위 (값이 없으면 최하위) """
+    value = summary.get(rank_by)
+    if value is None:
+        return -np.inf
+    return -float(value) if rank_by in _LOWER_IS_BETTER else float(value)
+
+def _run_window(window: WalkForwardWindow, cells: List[Tuple[Dict[str, Any], BacktestParams, int]],
+                base: Tuple[BacktestParams, int], rank_by: str, min_trades: int) -> Dict[str, Any]:
+    """ (워커에서 실행) 윈도우 1개: 학습 구간 셀 스윕 -> 1위 셀로 검증 구간 백테스트 """
+    slices: Dict[Tuple[int, pd.Timestamp], Tuple[Dict[str, pd.DataFrame], Dict[str, PanelSignals]]] = {}
+
+    def backtest(params: BacktestParams, strategy_idx: int, first: pd.Timestamp, last: pd.Timestamp):
+        key = (strategy_idx, first)
+        if key not in slices:
+            slices[key] = _slice(strategy_idx, first, last)
+        frames, signals = slices[key]
+        return Backtester(params).run(frames, signals)
+
+    best: Optional[Tuple[float, int, Dict[str, Any]]] = None
+    for i, (cell, params, strategy_idx) in enumerate(cells):
+        summary = backtest(params, strategy_idx, window.train_start, window.train_last).summary()
+        if summary["trades"] < min_trades:
+            continue
+        key = _rank_key(summary, rank_by)
+        if best is None or key > best[0]:
+            best = (key, i, summary)
+
+    if best is None:
+        # (조건을 만족하는 셀이 없으면 기본 파라미터)
+        chosen, (params, strategy_idx) = None, base
+        is_summary = backtest(params, strategy_idx, window.train_start, window.train_last).summary()
+    else:
+        _, i, is_summary = best
+        chosen, params, strategy_idx = cells[i]
+
+    oos = backtest(params, strategy_idx, window.test_start, window.test_last)
+    # (검증 구간 자산 곡선은 학습 구간 끝부분(판정용 과거 봉) 제외)
+    equity = oos.equity[oos.equity.index >= window.test_start]
+    return {
+        "window": window,
+        "cell": chosen,
+        "is_summary": is_summary,
+        "oos_summary": oos.summary(),
+        "trades": oos.trades,
+        "equity": equity,
+    }
+
+# --- 부모 프로세스 ---
+
+@dataclass
+class WalkForwardResult:
+    windows: pd.DataFrame # (윈도우별 보고서 - 선택 셀 값, 학습/검증 지표, WFE)
+    equity: pd.Series # (검증 구간 자산 곡선을 이어 붙인 것)
+    trades: pd.DataFrame # (검증 구간 거래 + window 컬럼)
+    stability: pd.DataFrame # (파라미터별 윈도우 간 안정성)
+    initial_capital: float = 1_000_000
+    cells: List[Dict[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """ 검증 구간 전체 거래 수 / 승률 / 손익 / 최대 낙폭 / 평균 WFE """
+        pnl = self.trades['pnl'] if len(self.trades) else pd.Series(dtype='float64')
+        equity = self.equity.to_numpy(dtype='float64')
+        if len(equity):
+            peak = np.maximum.accumulate(equity)
+            max_drawdown_pct = float(np.max((peak - equity) / peak) * 100.0)
+        else:
+            max_drawdown_pct = 0.0
+        wfe = self.windows['wfe'].dropna() if 'wfe' in self.windows else pd.Series(dtype='float64')
+        return {
+            "windows": int(len(self.windows)),
+            "trades": int(len(pnl)),
+            "win_rate": round(float((pnl > 0).mean()), 4) if len(pnl) else 0.0,
+            "total_pnl": round(float(pnl.sum()), 2),
+            "max_drawdown_pct": round(max_drawdown_pct, 4),
+            "profitable_windows": int((self.windows['oos_total_pnl'] > 0).sum()) if len(self.windows) else 0,
+            "mean_wfe": round(float(wfe.mean()), 4) if len(wfe) else None,
+        }
+
+class WalkForwardOptimizer:
+
+    def __init__(self,
+                 frames: Dict[str, pd.DataFrame],
+                 train_bars: int,
+                 test_bars: int,
+                 base_params: Optional[BacktestParams] = None,
+                 anchored: bool = False,
+                 rank_by: str = "total_pnl",
+                 min_trades: int = 5,
+                 max_workers: Optional[int] = None,
+                 inline: bool = False):
+        """
+        :param frames: { 마켓: H1 DataFrame (KST 인덱스, OHLCV) }
+        :param train_bars / test_bars: 학습 / 검증 구간 봉 수 (검증 구간 길이만큼 이동)
+        :param rank_by: 학습 구간 셀 순위 기준 (summary 키 - max_drawdown_pct는 낮을수록 상위)
+        :param min_trades: 학습 구간 거래 수가 이보다 적은 셀은 제외 (모두 제외되면 기본 파라미터)
+        :param inline: 프로세스 풀 없이 현재 프로세스에서 실행 (디버깅용)
+        """
+        self.logger = setup_logger("WalkForward", "athena_v1.log")
+        # (결측치는 미리 처리 - 잘라 쓰는 판정 행과 봉 위치가 맞아야 함)
+        self.frames = {s: clean_frame(df) for s, df in frames.items() if df is not None and len(df)}
+        self.base_params = base_params or BacktestParams()
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.anchored = anchored
+        self.rank_by = rank_by
+        self.min_trades = min_trades
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.inline = inline
+
+    def windows(self) -> List[WalkForwardWindow]:
+        if not self.frames:
+            return []
+        index = pd.DatetimeIndex(np.concatenate([df.index.to_numpy() for df in self.frames.values()]))
+        return walk_forward_windows(index, self.train_bars, self.test_bars, self.base_params.window, self.anchored)
+
+    def run(self, cells: Sequence[Dict[str, Any]]) -> WalkForwardResult:
+        """ 셀 목록(grid_space / random_space) -> WalkForwardResult """
+        cells = [dict(c) for c in cells]
+        windows = self.windows()
+        if not windows:
+            self.logger.warning("워크 포워드 윈도우가 없습니다. (캔들 수 < window - 1 + train_bars + test_bars)")
+            return self._result([], cells)
+
+        # (window는 판정 배치를 정하므로 셀마다 바꿀 수 없음)
+        resolved = [resolve_params(c, self.base_params) for c in cells]
+        if any(p.window != self.base_params.window for p in resolved):
+            raise ValueError("워크 포워드에서는 window를 셀마다 바꿀 수 없습니다.")
+
+        # (StrategyParams 조합별 판정 1벌 - BacktestParams만 다른 셀은 공유)
+        strategies: Dict[StrategyParams, int] = {self.base_params.strategy: 0}
+        for params in resolved:
+            strategies.setdefault(params.strategy, len(strategies))
+        jobs = [(c, p, strategies[p.strategy]) for c, p in zip(cells, resolved)]
+        strategy_params = [(i, BacktestParams(window=self.base_params.window, chunk_rows=self.base_params.chunk_rows, strategy=s))
+                           for s, i in strategies.items()]
+
+        offset = self.base_params.window - 1
+        layout: Dict[str, Tuple[int, int]] = {}
+        total = 0
+        for symbol, df in self.frames.items():
+            rows = max(len(df) - offset, 0)
+            layout[symbol] = (total, rows)
+            total += rows
+        shape = (len(strategies), total)
+        self.logger.info(
+            f"워크 포워드 시작: 윈도우 {len(windows)}개 x 셀 {len(jobs)}개 "
+            f"(판정 {len(strategies)}벌, {shape[0] * shape[1] * _SIGNAL_DTYPE.itemsize / 1e6:.1f}MB)"
+        )
+
+        base = (self.base_params, 0)
+        outputs = []
+        if self.inline or self.max_workers <= 1:
+            _install(self.frames, np.zeros(shape, dtype=_SIGNAL_DTYPE), layout, self.base_params.window)
+            try:
+                for i, params in strategy_params:
+                    _compute_signals(i, params)
+                for window in windows:
+                    outputs.append(self._log_window(_run_window(window, jobs, base, self.rank_by, self.min_trades), len(windows)))
+            finally:
+                _install(None, None, None, 0)
+            return self._result(outputs, cells)
+
+        candles, candles_layout = share_frames(self.frames)
+        signals = SharedMemory(create=True, size=max(shape[0] * shape[1] * _SIGNAL_DTYPE.itemsize, 1))
+        try:
+            # (spawn - EvaluationExecutor와 같은 이유로 fork 사용 안 함)
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(candles.name, candles_layout, signals.name, shape, layout, self.base_params.window)
+            ) as pool:
+                # (1단계: 판정 계산 - 모두 끝나야 윈도우 실행)
+                for future in as_completed([pool.submit(_compute_signals, i, p) for i, p in strategy_params]):
+                    future.result()
+
+                # (2단계: 윈도우별 학습 스윕 + 검증)
+                futures = {pool.submit(_run_window, w, jobs, base, self.rank_by, self.min_trades): w for w in windows}
+                # (윈도우 하나라도 실패하면 남은 윈도우를 취소하고 예외 전파 - 빈/부분 결과를 돌려주지 않음)
+                for future in as_completed(futures):
+                    try:
+                        outputs.append(self._log_window(future.result(), len(windows)))
+                    except Exception as e:
+                        self.logger.error(f"워크 포워드 윈도우 {futures[future].number} 실행 실패: {e}")
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+        finally:
+            candles.close()
+            candles.unlink()
+            signals.close()
+            signals.unlink()
+        return self._result(outputs, cells)
+
+    def _log_window(self, output: Dict[str, Any], total: int) -> Dict[str, Any]:
+        window = output["window"]
+        self.logger.info(
+            f"윈도우 {window.number}/{total} 완료 ({window.test_start} ~ {window.test_last}): "
+            f"선택 {output['cell'] if output['cell'] is not None else '기본 파라미터'}, "
+            f"학습 {self.rank_by}={output['is_summary'].get(self.rank_by)}, 검증 손익={output['oos_summary']['total_pnl']}"
+        )
+        return output
+
+    def _result(self, outputs: List[Dict[str, Any]], cells: List[Dict[str, Any]]) -> WalkForwardResult:
+        """ 윈도우별 결과 -> 보고서 / 이어 붙인 자산 곡선 / 파라미터 안정성 """
+        outputs = sorted(outputs, key=lambda o: o["window"].number)
+        keys = list(dict.fromkeys(k for c in cells for k in c))
+        capital = self.base_params.initial_capital
+
+        rows, trades, segments = [], [], []
+        running = capital
+        for output in outputs:
+            window, is_summary, oos_summary = output["window"], output["is_summary"], output["oos_summary"]
+            chosen = output["cell"]
+            values = {k: (chosen if chosen is not None else {}).get(k, self._base_value(k)) for k in keys}
+
+            # (WFE = 봉당 검증 손익 / 봉당 학습 손익 - 학습 손익이 0 이하면 없음)
+            is_pnl, oos_pnl = is_summary["total_pnl"], oos_summary["total_pnl"]
+            wfe = (oos_pnl / window.test_bars) / (is_pnl / window.train_bars) if is_pnl > 0 else np.nan
+
+            rows.append({
+                "window": window.number,
+                "train_start": window.train_start, "train_last": window.train_last,
+                "test_start": window.test_start, "test_last": window.test_last,
+                "fallback": chosen is None,
+                **values,
+                **{f"is_{k}": v for k, v in is_summary.items() if k != "exit_reasons"},
+                **{f"oos_{k}": v for k, v in oos_summary.items() if k != "exit_reasons"},
+                "wfe": wfe,
+            })
+
+            if len(output["trades"]):
+                trades.append(output["trades"].assign(window=window.number))
+            equity = output["equity"]
+            if len(equity):
+                segment = equity - capital + running
+                running = float(segment.iloc[-1])
+                segments.append(segment)
+
+        report = pd.DataFrame(rows)
+        if len(report):
+            report = report.set_index("window")
+        equity = pd.concat(segments).rename("equity") if segments else pd.Series(dtype='float64', name="equity")
+        trades_df = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame()
+        return WalkForwardResult(report, equity, trades_df, self._stability(report, keys), capital, cells)
+
+    def _base_value(self, key: str) -> Any:
+        if hasattr(self.base_params.strategy, key):
+            return getattr(self.base_params.strategy, key)
+        return getattr(self.base_params, key)
+
+    @staticmethod
+    def _stability(report: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """ 파라미터별 윈도우 간 선택 값 안정성 (최빈값 비율이 높고 변경이 적을수록 안정) """
+        rows = []
+        for key in keys:
+            if key not in report:
+                continue
+            values = report[key]
+            counts = values.value_counts(dropna=False)
+            row = {
+                "param": key,
+                "unique": int(values.nunique(dropna=False)),
+                "mode": counts.index[0],
+                "mode_share": round(float(counts.iloc[0] / len(values)), 4),
+                "changes": int((values != values.shift()).iloc[1:].sum()),
+                "mean": None, "std": None, "cv": None,
+            }
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                mean, std = float(values.mean()), float(values.std(ddof=0))
+                row.update(mean=round(mean, 6), std=round(std, 6), cv=round(std / abs(mean), 4) if mean else None)
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["param", "unique", "mode", "mode_share", "changes", "mean", "std", "cv"]).set_index("param")
@@ -0,0 +1,154 @@
+# Athena_v1/ai_trader/candle_arrays.py
+# [신규] 2024.11.17 - (성능) 메모리 맵(memmap) 기반 컬럼형 캔들 배열 (프로세스/워커 간 페이지 공유, 복사 없는 조회)
+# [수정] 2024.11.17 - (오류) view()가 version을 확인하지 않아 다른 프로세스의 쓰기 도중 꼬리 캔들이 섞여 읽히던 문제
+"""
+메모리 맵 캔들 배열 (MappedCandleSeries)
+
+- (마켓, 타임프레임)마다 컬럼별 고정 폭 파일을 하나씩 둡니다.
+  ts.i8 (UTC epoch ms, int64) / open, high, low, close, volume .f8 (float64)
+- 파일은 capacity개 크기로 미리 만들어 두고, 실제 개수는 meta.i8 [length, version]에 기록합니다.
+  (version은 쓰기 시작 시 홀수, 끝나면 짝수 - 읽는 쪽에서 변경 여부/쓰기 중 여부 확인)
+- view()는 np.memmap의 읽기 전용 슬라이스를 반환하므로 DataFrame 복사가 생기지 않고,
+  같은 파일을 여는 모든 프로세스(gunicorn 워커 등)가 OS 페이지 캐시를 공유합니다.
+  읽기 전후 version이 같고 짝수일 때만 반환하며 (쓰기 중이거나 바뀌었으면 다시 읽음, 계속 겹치면
+  잠금을 잡고 복사본 반환), 반환된 뷰는 다음 쓰기 전까지만 유효합니다.
+  (오래 들고 있을 값은 copy=True 또는 version으로 변경 여부 확인)
+- 쓰기는 '꼬리' 방향만 지원합니다. (마지막 캔들 덮어쓰기 + 새 캔들 추가)
+  중간 구간이 바뀌면 CandleStore가 SQLite에서 다시 채웁니다 (replace=True).
+"""
+import os
+import time
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl # (Windows에는 없음 - 이 경우 프로세스 간 쓰기 잠금 생략)
+except ImportError:
+    fcntl = None
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+ARRAY_FIELDS = ('ts',) + OHLCV_FIELDS
+
+_META_LENGTH = 0
+_META_VERSION = 1
+
+# (쓰기와 겹친 읽기를 다시 시도하는 횟수 - 넘으면 잠금을 잡고 복사)
+VIEW_RETRIES = 8
+
+class MappedCandleSeries:
+
+    def __init__(self, path: str, capacity: int = 5000):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        # (기존 파일이 있으면 그 크기를 따름)
+        ts_file = os.path.join(path, 'ts.i8')
+        if os.path.exists(ts_file) and os.path.getsize(ts_file) > 0:
+            capacity = os.path.getsize(ts_file) // 8
+        self.capacity = capacity
+
+        self._meta = self._open('meta.i8', np.int64, 2)
+        self._columns: Dict[str, np.memmap] = {
+            name: self._open(f"{name}.{'i8' if name == 'ts' else 'f8'}",
+                             np.int64 if name == 'ts' else np.float64, capacity)
+            for name in ARRAY_FIELDS
+        }
+
+    def _open(self, filename: str, dtype, length: int) -> np.memmap:
+        file_path = os.path.join(self.path, filename)
+        if not os.path.exists(file_path):
+            with open(file_path, 'wb') as f:
+                f.truncate(length * np.dtype(dtype).itemsize)
+        return np.memmap(file_path, dtype=dtype, mode='r+', shape=(length,))
+
+    # --- 조회 (복사 없음) ---
+
+    def __len__(self) -> int:
+        return int(self._meta[_META_LENGTH])
+
+    @property
+    def version(self) -> int:
+        return int(self._meta[_META_VERSION])
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        n = len(self)
+        return int(self._columns['ts'][n - 1]) if n else None
+
+    def view(self, count: Optional[int] = None, copy: bool = False) -> Dict[str, np.ndarray]:
+        """
+        최근 count개의 컬럼별 읽기 전용 뷰 { 'ts': int64[], 'open': float64[], ... }
+        (쓰기와 겹치지 않은 일관된 상태만 반환 - copy=True면 복사본)
+        """
+        for attempt in range(VIEW_RETRIES):
+            before = self.version
+            if before % 2 == 0:
+                views = self._slice(count, copy)
+                if self.version == before:
+                    return views
+            time.sleep(0 if attempt < VIEW_RETRIES // 2 else 0.001)
+
+        # (쓰기가 계속 겹침 - 쓰기 잠금을 잡고 복사본 반환)
+        with self._write_lock():
+            return self._slice(count, True)
+
+    def _slice(self, count: Optional[int], copy: bool) -> Dict[str, np.ndarray]:
+        n = len(self)
+        start = 0 if count is None else max(n - count, 0)
+        views = {}
+        for name, column in self._columns.items():
+            v = column[start:n].view(np.ndarray)
+            if copy:
+                v = v.copy()
+            v.flags.writeable = False
+            views[name] = v
+        return views
+
+    # --- 쓰기 (CandleStore 전용) ---
+
+    @contextmanager
+    def _write_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write_tail(self, ts: np.ndarray, values: np.ndarray, replace: bool = False):
+        """
+        시간 오름차순 캔들(ts: int64[k], values: float64[k, 5])을 꼬리에 씁니다.
+        (ts[0] 이상인 기존 캔들은 덮어쓰고, 용량을 넘으면 가장 오래된 캔들부터 밀어냄)
+        (replace=True면 기존 캔들을 모두 버리고 교체 - 백필/누락 구간 복구 후 SQLite 기준으로 다시 채울 때)
+        """
+        if len(ts) > self.capacity:
+            ts, values = ts[-self.capacity:], values[-self.capacity:]
+        if len(ts) == 0 and not replace:
+            return
+
+        with self._write_lock():
+            n = 0 if replace else len(self)
+            pos = int(np.searchsorted(self._columns['ts'][:n], ts[0], side='left')) if n else 0
+            overflow = pos + len(ts) - self.capacity
+
+            self._meta[_META_VERSION] += 1 # (쓰기 시작 - 홀수)
+            if overflow > 0:
+                for column in self._columns.values():
+                    column[:pos - overflow] = column[overflow:pos]
+                pos -= overflow
+
+            end = pos + len(ts)
+            self._columns['ts'][pos:end] = ts
+            for i, name in enumerate(OHLCV_FIELDS):
+                self._columns[name][pos:end] = values[:, i]
+            self._meta[_META_LENGTH] = end
+            self._meta[_META_VERSION] += 1 # (쓰기 끝 - 짝수)
+
+    def flush(self):
+        self._meta.flush()
+        for column in self._columns.values():
+            column.flush()
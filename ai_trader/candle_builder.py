@@ -0,0 +1,169 @@
+# Athena_v1/ai_trader/candle_builder.py
+# [신규] 2024.11.16 - (성능) 체결(trade) 스트림으로 실시간 캔들 생성 (pyupbit.get_ohlcv 폴링 대체)
+# [수정] 2024.11.17 - (성능) kst_index_to_ms 정수 변환으로 교체 (증분 지표/피벗에서 매 주기 호출)
+# [수정] 2024.11.17 - (성능) 심볼별 시리즈를 MultiTimeframeResampler로 관리 (REST로 받지 않은 타임프레임은 메모리에서 파생)
+"""
+실시간 캔들 생성기 (CandleBuilder)
+
+MarketDataHub의 'trade' 이벤트(업비트 체결)를 받아 1분봉을 실시간으로 만들고,
+같은 체결을 상위 봉(예: minute60) 버킷에 누적(롤업)합니다.
+(심볼별 시리즈는 resampler.MultiTimeframeResampler가 관리 - 봉 경계/롤업/파생 규칙은 그쪽 참고)
+
+- 시작 시, 그리고 WebSocket 재연결 후에는 REST 캔들로 다시 맞춥니다 (seed).
+  REST 조회 시각 이전의 체결은 REST 캔들에 이미 포함된 것으로 보고 건너뜁니다.
+- get_ohlcv()는 DataManager.fetch_ohlcv()와 같은 형태의 DataFrame을 반환합니다.
+  (KST 기준 DatetimeIndex, 컬럼: open, high, low, close, volume)
+- REST로 받지 않은 타임프레임(예: H4/일봉)은 REST로 받은 더 짧은 봉 시리즈에서 만들어 반환합니다.
+  (원본 시리즈가 재동기화 대상이면 준비되지 않은 것으로 봄)
+"""
+import time
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ai_trader.data_manager import TIMEFRAME_MINUTES
+from ai_trader.resampler import Bar, MultiTimeframeResampler
+from ai_trader.utils.logger import setup_logger
+
+_KST_OFFSET = pd.Timedelta(hours=9)
+_KST_OFFSET_MS = 9 * 3600 * 1000
+
+def kst_index_to_ms(index: pd.DatetimeIndex) -> List[int]:
+    """ KST(naive) DatetimeIndex -> UTC epoch 밀리초 목록 """
+    # (Timedelta 연산 대신 datetime64[ms] 정수 변환 - 봉 200개 기준 수십 배 빠름)
+    ms = np.asarray(index, dtype='datetime64[ms]').astype('int64')
+    return (ms - _KST_OFFSET_MS).tolist()
+
+def ms_to_kst_index(ms_list: List[int]) -> pd.DatetimeIndex:
+    """ UTC epoch 밀리초 목록 -> KST(naive) DatetimeIndex """
+    return pd.DatetimeIndex(pd.to_datetime(ms_list, unit='ms') + _KST_OFFSET)
+
+def bars_to_frame(buckets: List[int], bars: List[Bar]) -> pd.DataFrame:
+    """ (버킷 시작 ms, 봉) 목록 -> DataManager.fetch_ohlcv()와 같은 형태의 DataFrame """
+    return pd.DataFrame(
+        bars,
+        index=ms_to_kst_index(buckets),
+        columns=['open', 'high', 'low', 'close', 'volume'],
+        dtype='float64'
+    )
+
+class CandleBuilder:
+
+    # (1분봉 보관 개수 - 하루치)
+    MAX_MINUTE_BARS = 1440
+
+    def __init__(self, max_bars: int = 2000):
+        self.logger = setup_logger("CandleBuilder", "athena_v1.log")
+        self.max_bars = max_bars
+
+        # (심볼별 1분봉 + 상위 봉 시리즈)
+        self._resamplers: Dict[str, MultiTimeframeResampler] = {}
+
+        # (재연결 등으로 REST 재동기화가 필요한 시리즈)
+        self._stale: Set[Tuple[str, str]] = set()
+
+        # (실시간 체결을 수신 중인 심볼 - 봇이 등록/해제, 참조 카운트)
+        self._tracked: Counter = Counter()
+
+        self.last_trade_ms: Dict[str, int] = {}
+
+        # (체결 스트림 연결 상태 - 끊겨 있으면 메모리 캔들을 신뢰하지 않음)
+        self.connected: bool = False
+
+    # --- 추적 심볼 관리 ---
+
+    def track(self, symbol: str):
+        """ 체결 스트림을 수신하는 심볼로 등록 (MarketDataHub 구독과 함께 호출) """
+        self._tracked[symbol] += 1
+        if symbol not in self._resamplers:
+            self._resamplers[symbol] = MultiTimeframeResampler(max_bars=self.max_bars, max_base_bars=self.MAX_MINUTE_BARS)
+
+    def untrack(self, symbol: str):
+        self._tracked[symbol] -= 1
+        if self._tracked[symbol] <= 0:
+            del self._tracked[symbol]
+            self._resamplers.pop(symbol, None)
+            self._stale = {key for key in self._stale if key[0] != symbol}
+
+    def is_tracked(self, symbol: str) -> bool:
+        return symbol in self._tracked
+
+    def is_ready(self, symbol: str, timeframe: str, count: int) -> bool:
+        """ REST 재동기화 없이 메모리 캔들만으로 count개를 제공할 수 있는지 (파생 타임프레임 포함) """
+        resampler = self._resamplers.get(symbol)
+        if not self.connected or resampler is None or timeframe not in TIMEFRAME_MINUTES:
+            return False
+        if not resampler.derive(timeframe):
+            return False
+        source = resampler.source_of(timeframe)
+        return (
+            resampler.is_seeded(source)
+            and (symbol, source) not in self._stale
+            and resampler.bar_count(timeframe) >= count
+        )
+
+    # --- REST 동기화 (reconcile) ---
+
+    def seed(self, symbol: str, timeframe: str, df: pd.DataFrame, fetched_at_ms: Optional[int] = None):
+        """
+        REST 캔들(DataFrame)로 (심볼, 타임프레임) 시리즈를 초기화/재동기화합니다.
+        (fetched_at_ms 이전의 체결은 REST 캔들에 포함된 것으로 간주)
+        """
+        if timeframe not in TIMEFRAME_MINUTES or df is None or df.empty or not self.is_tracked(symbol):
+            return
+
+        key = (symbol, timeframe)
+        buckets = kst_index_to_ms(df.index)
+        values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype='float64').tolist()
+
+        cutoff_ms = fetched_at_ms if fetched_at_ms is not None else int(time.time() * 1000)
+        self._resamplers[symbol].seed(timeframe, buckets, values, cutoff_ms)
+
+        if key in self._stale:
+            self._stale.discard(key)
+            self.logger.info(f"[{symbol}] {timeframe} REST 캔들로 재동기화 완료 ({len(buckets)}개).")
+
+    # --- 실시간 이벤트 (MarketDataHub 리스너) ---
+
+    def on_trade(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'trade' 리스너) 체결 1건을 1분봉/상위 봉에 반영 """
+        symbol = data.get('code')
+        if symbol not in self._tracked:
+            return
+
+        price = float(data['trade_price'])
+        volume = float(data['trade_volume'])
+        trade_ms = int(data['trade_timestamp'])
+        self.last_trade_ms[symbol] = trade_ms
+
+        # (1분봉 + 모든 상위 봉 롤업)
+        self._resamplers[symbol].add_trade(trade_ms, price, volume)
+
+    def on_status(self, data: Dict[str, Any]):
+        """
+        (MarketDataHub 'status' 리스너)
+        연결이 끊겨 있던 동안의 체결은 누락되므로, 연결/끊김 시 모든 시리즈를 재동기화 대상으로 표시
+        """
+        self.connected = bool(data.get('connected'))
+        keys = [
+            (symbol, tf) for symbol, resampler in self._resamplers.items()
+            for tf in TIMEFRAME_MINUTES if resampler.is_seeded(tf)
+        ]
+        if keys:
+            state = "연결" if self.connected else "끊김"
+            self.logger.info(f"WebSocket {state}. 캔들 {len(keys)}개 시리즈를 재동기화 대상으로 표시합니다.")
+        self._stale.update(keys)
+
+    # --- 조회 ---
+
+    def get_ohlcv(self, symbol: str, timeframe: str, count: int = 200) -> pd.DataFrame:
+        """ DataManager.fetch_ohlcv()와 같은 형태의 DataFrame (마지막 행은 미완성 봉) """
+        resampler = self._resamplers.get(symbol)
+        if resampler is None or timeframe not in TIMEFRAME_MINUTES:
+            return pd.DataFrame()
+
+        buckets, bars = resampler.bars(timeframe, count)
+        if not bars:
+            return pd.DataFrame()
+        return bars_to_frame(buckets, bars)
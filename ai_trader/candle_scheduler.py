@@ -0,0 +1,254 @@
+# Athena_v1/ai_trader/candle_scheduler.py
+# [신규] 2024.11.17 - (성능) 봉 마감 이벤트 스케줄러 (고정 asyncio.sleep(60) 대체 - 서버 시각 기준 마감 직후 평가)
+"""
+봉 마감 이벤트 스케줄러 (CandleCloseScheduler)
+
+봇 루프가 60초마다 고정으로 깨어나던 방식은 정시(봉 마감)와 어긋나므로,
+방금 마감된 H1 봉이 최대 1분 동안 처리되지 않고, 모든 봇이 같은 순간에 몰려 깨어납니다.
+
+- ServerClock: 업비트 WebSocket 메시지의 서버 시각(timestamp)으로 로컬 시계와의 차이를 추정합니다.
+- 봉 마감: 서버 시각 기준 봉 경계(+ CLOSE_DELAY_SEC)에 해당 타임프레임의 봇을 모두 깨웁니다.
+  (업비트 분/시간 봉 경계는 UTC epoch 기준 배수이며, KST(+9h)와도 일치 - 일봉은 KST 09:00)
+- 가격 변동: 마지막 평가 가격 대비 move_threshold_pct 이상 움직이면(ticker) 봉 중간에도 깨웁니다.
+- 하트비트: 위 이벤트가 없어도 heartbeat_sec마다 깨웁니다. (SL/TP 확인 주기 유지)
+  심볼마다 시작 위상을 다르게 두어 같은 순간에 몰리지 않게 합니다.
+- 깨어난 봇은 slot()(동시 실행 상한 max_workers)을 얻은 뒤 평가하므로, 마감 직후에도 CPU 사용이 분산됩니다.
+"""
+import asyncio
+import time
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from ai_trader.data_manager import TIMEFRAME_MINUTES
+from ai_trader.utils.logger import setup_logger
+
+# (깨운 이유 - 우선순위 순)
+REASON_CLOSE = "close"
+REASON_MOVE = "move"
+REASON_HEARTBEAT = "heartbeat"
+_REASON_ORDER = (REASON_CLOSE, REASON_MOVE, REASON_HEARTBEAT)
+
+class ServerClock:
+    """
+    거래소 서버 시각 추정
+    (메시지의 서버 시각 - 수신 로컬 시각 = 시계 차이 - 네트워크 지연 -> 최근 샘플 중 최댓값이 시계 차이에 가장 가까움)
+    """
+
+    # (시계 차이 계산에 쓰는 최근 샘플 수)
+    MAX_SAMPLES = 500
+
+    def __init__(self):
+        self._samples: Deque[int] = deque(maxlen=self.MAX_SAMPLES)
+        self._offset_ms: int = 0
+
+    @property
+    def offset_ms(self) -> int:
+        """ 서버 시각 - 로컬 시각 (ms, 샘플이 없으면 0) """
+        return self._offset_ms
+
+    def observe(self, server_ms: int, local_ms: Optional[int] = None):
+        local_ms = int(time.time() * 1000) if local_ms is None else local_ms
+        sample = int(server_ms) - local_ms
+        if len(self._samples) == self._samples.maxlen and self._samples[0] == self._offset_ms:
+            # (최댓값 샘플이 밀려나면 다시 계산)
+            self._samples.append(sample)
+            self._offset_ms = max(self._samples)
+            return
+        self._samples.append(sample)
+        if len(self._samples) == 1 or sample > self._offset_ms:
+            self._offset_ms = sample
+
+    def on_message(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'trade' / 'ticker' 리스너) 메시지 서버 시각 반영 """
+        server_ms = data.get('timestamp')
+        if server_ms:
+            self.observe(server_ms)
+
+    def now_ms(self) -> int:
+        """ 현재 서버 시각 추정값 (UTC epoch ms) """
+        return int(time.time() * 1000) + self._offset_ms
+
+class EvaluationTrigger:
+    """ 봇 1개의 평가 요청 (scheduler.register()가 반환) """
+
+    def __init__(self, symbol: str, timeframe: str, move_threshold_pct: Optional[float], next_heartbeat: float):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.move_threshold_pct = move_threshold_pct
+        self.reference_price: Optional[float] = None # (마지막 평가 시점 가격 - 변동 기준)
+        self.next_heartbeat = next_heartbeat # (monotonic)
+        self._reasons: Set[str] = set()
+        self._event = asyncio.Event()
+
+    def fire(self, reason: str):
+        self._reasons.add(reason)
+        self._event.set()
+
+    async def wait(self) -> str:
+        """ 다음 평가 요청까지 대기 -> 깨운 이유 (여러 개가 겹치면 우선순위가 높은 것) """
+        await self._event.wait()
+        self._event.clear()
+        reasons, self._reasons = self._reasons, set()
+        return next((r for r in _REASON_ORDER if r in reasons), REASON_HEARTBEAT)
+
+class CandleCloseScheduler:
+
+    # (동시에 평가하는 봇 수 상한)
+    DEFAULT_MAX_WORKERS = 4
+
+    # (봉 경계 이후 대기 시간(초) - 경계 직전 체결이 캔들에 반영될 여유)
+    CLOSE_DELAY_SEC = 0.3
+
+    # (이벤트가 없어도 평가하는 주기(초) - 기존 60초 루프와 같은 SL/TP 확인 주기)
+    DEFAULT_HEARTBEAT_SEC = 60.0
+
+    def __init__(self, clock: ServerClock, max_workers: int = DEFAULT_MAX_WORKERS, heartbeat_sec: float = DEFAULT_HEARTBEAT_SEC):
+        self.logger = setup_logger("CandleScheduler", "athena_v1.log")
+        self.clock = clock
+        self.heartbeat_sec = heartbeat_sec
+        self._slots = asyncio.Semaphore(max_workers)
+
+        # (심볼별 평가 요청 목록)
+        self._triggers: Dict[str, List[EvaluationTrigger]] = {}
+        # (타임프레임별 마지막으로 처리한 봉 경계(ms))
+        self._last_boundary: Dict[str, int] = {}
+
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    # --- 등록 ---
+
+    def register(self, symbol: str, timeframe: str, move_threshold_pct: Optional[float] = None) -> EvaluationTrigger:
+        """
+        봇 등록 -> EvaluationTrigger (봇은 trigger.wait()로 대기)
+        :param move_threshold_pct: 봉 중간 평가 기준 (마지막 평가 가격 대비 %, None이면 사용 안 함)
+        """
+        if timeframe not in TIMEFRAME_MINUTES:
+            raise ValueError(f"지원하지 않는 타임프레임: {timeframe}")
+
+        # (하트비트 위상을 심볼마다 다르게 - 같은 순간에 몰리지 않도록)
+        phase = (zlib.crc32(symbol.encode()) % 1000) / 1000 * self.heartbeat_sec
+        trigger = EvaluationTrigger(symbol, timeframe, move_threshold_pct, time.monotonic() + phase)
+        self._triggers.setdefault(symbol, []).append(trigger)
+        self._last_boundary.setdefault(timeframe, self._boundary(timeframe, self.clock.now_ms()))
+
+        # (등록 직후 1번 평가)
+        trigger.fire(REASON_HEARTBEAT)
+        self._changed.set()
+        return trigger
+
+    def unregister(self, trigger: EvaluationTrigger):
+        triggers = self._triggers.get(trigger.symbol, [])
+        if trigger in triggers:
+            triggers.remove(trigger)
+        if not triggers:
+            self._triggers.pop(trigger.symbol, None)
+        self._changed.set()
+
+    def slot(self) -> asyncio.Semaphore:
+        """ 평가 동시 실행 제한 (async with scheduler.slot(): ...) """
+        return self._slots
+
+    def mark_evaluated(self, trigger: EvaluationTrigger, price: Optional[float]):
+        """ 평가 완료 - 변동 기준 가격과 다음 하트비트 시각 갱신 """
+        if price:
+            trigger.reference_price = float(price)
+        trigger.next_heartbeat = time.monotonic() + self.heartbeat_sec
+
+    # --- 실시간 이벤트 (MarketDataHub 리스너) ---
+
+    def on_ticker(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'ticker' 리스너) 가격 변동이 기준 이상이면 봉 중간 평가 """
+        triggers = self._triggers.get(data.get('code'))
+        if not triggers:
+            return
+        price = float(data.get('trade_price') or 0)
+        if price <= 0:
+            return
+        for trigger in triggers:
+            ref = trigger.reference_price
+            if trigger.move_threshold_pct is None or not ref:
+                continue
+            if abs(price - ref) / ref * 100.0 >= trigger.move_threshold_pct:
+                trigger.reference_price = price # (같은 변동으로 반복해서 깨우지 않음)
+                trigger.fire(REASON_MOVE)
+
+    # --- 스케줄 ---
+
+    @staticmethod
+    def _boundary(timeframe: str, now_ms: int) -> int:
+        """ now_ms가 속한 봉의 시작 시각 (UTC epoch ms) """
+        bar_ms = TIMEFRAME_MINUTES[timeframe] * 60000
+        return now_ms - now_ms % bar_ms
+
+    def _fire_due(self):
+        now_ms = self.clock.now_ms()
+        delay_ms = int(self.CLOSE_DELAY_SEC * 1000)
+
+        # 1. 봉 마감
+        for timeframe, last in list(self._last_boundary.items()):
+            boundary = self._boundary(timeframe, now_ms - delay_ms)
+            if boundary > last:
+                self._last_boundary[timeframe] = boundary
+                closed = [t for triggers in self._triggers.values() for t in triggers if t.timeframe == timeframe]
+                for trigger in closed:
+                    trigger.fire(REASON_CLOSE)
+                if closed:
+                    self.logger.debug(f"{timeframe} 봉 마감 - 봇 {len(closed)}개 평가 요청.")
+
+        # 2. 하트비트
+        now = time.monotonic()
+        for triggers in self._triggers.values():
+            for trigger in triggers:
+                if now >= trigger.next_heartbeat:
+                    trigger.next_heartbeat = now + self.heartbeat_sec
+                    trigger.fire(REASON_HEARTBEAT)
+
+    def _seconds_until_next(self) -> float:
+        """ 다음 봉 마감 / 하트비트까지 남은 시간(초) """
+        now_ms = self.clock.now_ms()
+        delay_ms = int(self.CLOSE_DELAY_SEC * 1000)
+        waits = [self.heartbeat_sec]
+        for timeframe in self._last_boundary:
+            bar_ms = TIMEFRAME_MINUTES[timeframe] * 60000
+            next_close = self._boundary(timeframe, now_ms - delay_ms) + bar_ms + delay_ms
+            waits.append((next_close - now_ms) / 1000)
+        now = time.monotonic()
+        waits.extend(t.next_heartbeat - now for triggers in self._triggers.values() for t in triggers)
+        return max(min(waits), 0.0)
+
+    # --- 수명 주기 ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            # (wait_for 완료와 취소가 겹치면 취소가 무시될 수 있으므로 플래그로도 종료)
+            self._running = False
+            self._changed.set()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while self._running:
+            try:
+                self._fire_due()
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=self._seconds_until_next())
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"스케줄러 처리 중 오류: {e}", exc_info=True)
+                await asyncio.sleep(1)
@@ -0,0 +1,430 @@
+# Athena_v1/ai_trader/candle_store.py
+# [신규] 2024.11.17 - (요청) 로컬 캔들 저장소 (SQLite) - 과거 캔들 페이지 백필 / 증분 추가 / 누락 구간 복구
+# [수정] 2024.11.17 - (성능) 최근 캔들을 memmap 컬럼 배열(MappedCandleSeries)로도 유지 (복사 없는 조회)
+# [수정] 2024.11.17 - (오류) repair_gaps 남은 구간 계산 수정 (일부만 채워진 gap) + 거래 없음 구간 기록 (재조회 생략) + prepare_history
+# [수정] 2024.11.17 - (오류) get_arrays copy 옵션 (memmap 뷰는 다음 쓰기 전까지만 유효)
+"""
+로컬 캔들 저장소 (CandleStore)
+
+- (마켓, 타임프레임, 캔들 시작 시각) 단위로 캔들을 SQLite에 저장합니다.
+  (복합 기본키 = 범위 조회용 인덱스, WITHOUT ROWID 테이블)
+- 업비트 캔들 API의 'to' 커서로 200개씩 과거를 거슬러 올라가며 백필합니다.
+- 마지막 저장 캔들 이후만 증분으로 추가하고, 중간에 빠진 구간(gap)을 찾아 다시 받아옵니다.
+  (업비트는 체결이 없던 구간의 캔들을 만들지 않으므로, 재조회 후에도 남는 gap은 '거래 없음'으로 간주하고
+   candle_empty_gaps 테이블에 기록해 다음 복구 때 다시 요청하지 않음)
+- prepare_history(): 백필 + 증분 추가 + 누락 구간 복구 (DataManager.prepare_history - 봇 시작 시 호출)
+- mmap_dir가 주어지면 (마켓, 타임프레임)별 최근 캔들을 memmap 컬럼 배열로도 유지합니다.
+  (get_arrays() - SQLite 조회/DataFrame 생성 없이 NumPy 뷰 반환)
+"""
+import bisect
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, Column, String, Integer, Float, select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import StaticPool
+
+from ai_trader.candle_arrays import MappedCandleSeries
+from ai_trader.candle_builder import kst_index_to_ms, ms_to_kst_index
+from ai_trader.data_manager import TIMEFRAME_MINUTES
+from ai_trader.exchange_api import UpbitExchange, UPBIT_CANDLE_PAGE_SIZE
+from ai_trader.utils.logger import setup_logger
+
+Base = declarative_base()
+
+class CandleDB(Base):
+    """ SQLAlchemy 모델 - candles 테이블 """
+    __tablename__ = 'candles'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    market = Column(String, primary_key=True)
+    timeframe = Column(String, primary_key=True)
+    ts = Column(Integer, primary_key=True) # (캔들 시작 시각, UTC epoch ms)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+
+class CandleEmptyGapDB(Base):
+    """ SQLAlchemy 모델 - candle_empty_gaps 테이블 (재조회해도 캔들이 없던 '거래 없음' 구간) """
+    __tablename__ = 'candle_empty_gaps'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    market = Column(String, primary_key=True)
+    timeframe = Column(String, primary_key=True)
+    start_ts = Column(Integer, primary_key=True) # (gap 직전 캔들 ts)
+    end_ts = Column(Integer) # (gap 직후 캔들 ts)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def utc_ms_to_cursor(ts_ms: int) -> str:
+    """ UTC epoch ms -> 업비트 'to' 파라미터 형식 (예: '2024-11-15T09:00:00') """
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+def candles_to_rows(market: str, timeframe: str, candles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """ 업비트 캔들 원본 응답 -> candles 테이블 행 목록 """
+    return [
+        {
+            "market": market,
+            "timeframe": timeframe,
+            "ts": int(datetime.strptime(c['candle_date_time_utc'], '%Y-%m-%dT%H:%M:%S')
+                      .replace(tzinfo=timezone.utc).timestamp() * 1000),
+            "open": float(c['opening_price']),
+            "high": float(c['high_price']),
+            "low": float(c['low_price']),
+            "close": float(c['trade_price']),
+            "volume": float(c['candle_acc_trade_volume']),
+        }
+        for c in candles
+    ]
+
+class CandleStore:
+
+    # (SQLite 1회 INSERT 묶음 크기 - 바인딩 변수 한도 대응)
+    WRITE_CHUNK = 500
+
+    # (memmap 배열에 유지할 (마켓, 타임프레임)별 최근 캔들 수)
+    ARRAY_CAPACITY = 5000
+
+    def __init__(self, db_path: str = "athena_v1_candles.db", mmap_dir: Optional[str] = None):
+        """
+        캔들 DB 엔진 초기화
+        (Database와 동일하게 check_same_thread=False 및 StaticPool 사용, WAL 모드)
+        """
+        self.db_path = db_path
+        self.mmap_dir = mmap_dir
+        self._arrays: Dict[Tuple[str, str], MappedCandleSeries] = {}
+        self.engine = create_engine(
+            f'sqlite:///{db_path}',
+            echo=False,
+            poolclass=StaticPool,
+            connect_args={'check_same_thread': False}
+        )
+        event.listen(self.engine, "connect", self._set_sqlite_pragma)
+        self.logger = setup_logger("CandleStore", "athena_v1.log")
+
+    @staticmethod
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    def create_tables(self):
+        """ 테이블 생성 (candles, candle_empty_gaps) - (동기) """
+        try:
+            Base.metadata.create_all(bind=self.engine)
+            self.logger.info(f"캔들 저장소 '{self.db_path}' 초기화 완료.")
+        except Exception as e:
+            self.logger.error(f"캔들 테이블 생성 실패: {e}")
+
+    # --- 쓰기 ---
+
+    def upsert_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """ 캔들 행 저장 (같은 시각의 캔들은 덮어씀 - 미완성 캔들 갱신) """
+        if not rows:
+            return 0
+        table = CandleDB.__table__
+        with self.engine.begin() as conn:
+            for i in range(0, len(rows), self.WRITE_CHUNK):
+                stmt = sqlite_insert(table).values(rows[i:i + self.WRITE_CHUNK])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['market', 'timeframe', 'ts'],
+                    set_={col: stmt.excluded[col] for col in OHLCV_COLUMNS}
+                )
+                conn.execute(stmt)
+
+        if self.mmap_dir is not None:
+            self._mirror_rows(rows)
+        return len(rows)
+
+    def upsert_frame(self, market: str, timeframe: str, df: pd.DataFrame) -> int:
+        """ DataManager 형식의 DataFrame(KST 인덱스) 저장 """
+        if df is None or df.empty:
+            return 0
+        values = df[OHLCV_COLUMNS].to_numpy(dtype='float64')
+        rows = [
+            {"market": market, "timeframe": timeframe, "ts": int(ts),
+             "open": v[0], "high": v[1], "low": v[2], "close": v[3], "volume": v[4]}
+            for ts, v in zip(kst_index_to_ms(df.index), values.tolist())
+        ]
+        return self.upsert_rows(rows)
+
+    def upsert_new_bars(self, market: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        저장된 마지막 캔들 이후에 새 캔들이 생겼을 때만 저장 (마지막 저장 캔들 포함 - 마감 값으로 갱신)
+        (CandleBuilder 캔들처럼 매번 같은 캔들이 들어오는 경우 불필요한 쓰기 방지)
+        """
+        if df is None or df.empty:
+            return 0
+        last_ts = self.last_ts(market, timeframe)
+        df_ms = kst_index_to_ms(df.index[-1:])[0]
+        if last_ts is not None and df_ms < last_ts:
+            return 0
+        if df_ms == last_ts:
+            # (같은 봉 진행 중 - memmap 배열의 미완성 봉만 갱신, SQLite는 다음 봉이 열릴 때 반영)
+            if self.mmap_dir is not None:
+                self._series(market, timeframe).write_tail(
+                    np.array([df_ms], dtype='int64'),
+                    df[OHLCV_COLUMNS].to_numpy(dtype='float64')[-1:]
+                )
+            return 0
+        if last_ts is not None:
+            df = df[df.index >= ms_to_kst_index([last_ts])[0]]
+        return self.upsert_frame(market, timeframe, df)
+
+    def last_ts(self, market: str, timeframe: str) -> Optional[int]:
+        """ 마지막 저장 캔들 시각 (memmap 배열이 있으면 SQLite 조회 없음) """
+        if self.mmap_dir is not None:
+            series = self._series(market, timeframe)
+            if len(series):
+                return series.last_ts
+        return self.get_bounds(market, timeframe)[1]
+
+    # --- memmap 배열 ---
+
+    def _series(self, market: str, timeframe: str) -> MappedCandleSeries:
+        key = (market, timeframe)
+        series = self._arrays.get(key)
+        if series is None:
+            series = MappedCandleSeries(os.path.join(self.mmap_dir, market, timeframe), self.ARRAY_CAPACITY)
+            self._arrays[key] = series
+        return series
+
+    def _mirror_rows(self, rows: List[Dict[str, Any]]):
+        """ 저장한 행을 memmap 배열에 반영 (꼬리 추가가 아니면 SQLite에서 다시 채움) """
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault((row['market'], row['timeframe']), []).append(row)
+
+        for (market, timeframe), group in groups.items():
+            series = self._series(market, timeframe)
+            group.sort(key=lambda r: r['ts'])
+            last_ts = series.last_ts
+            if last_ts is not None and group[0]['ts'] < last_ts:
+                self.rebuild_arrays(market, timeframe)
+                continue
+            ts = np.array([r['ts'] for r in group], dtype='int64')
+            values = np.array([[r[col] for col in OHLCV_COLUMNS] for r in group], dtype='float64')
+            series.write_tail(ts, values)
+
+    def rebuild_arrays(self, market: str, timeframe: str):
+        """ memmap 배열을 SQLite의 최근 ARRAY_CAPACITY개로 다시 채움 """
+        series = self._series(market, timeframe)
+        ts, values = self._read_columns(market, timeframe, limit=series.capacity)
+        series.write_tail(ts, values, replace=True)
+
+    def get_arrays(self, market: str, timeframe: str, count: Optional[int] = None, copy: bool = False) -> Optional[Dict[str, np.ndarray]]:
+        """
+        최근 count개의 컬럼별 읽기 전용 NumPy 뷰 (복사 없음, mmap_dir 미설정 시 None)
+        { 'ts': int64[] (UTC epoch ms), 'open': float64[], 'high', 'low', 'close', 'volume' }
+        (뷰는 다음 쓰기 전까지만 유효 - 오래 들고 있을 값은 copy=True)
+        """
+        if self.mmap_dir is None:
+            return None
+        series = self._series(market, timeframe)
+        if len(series) == 0:
+            self.rebuild_arrays(market, timeframe)
+        return series.view(count, copy)
+
+    def get_array_version(self, market: str, timeframe: str) -> Optional[int]:
+        """ memmap 배열 변경 번호 (읽는 쪽의 캐시 무효화용) """
+        if self.mmap_dir is None:
+            return None
+        return self._series(market, timeframe).version
+
+    # --- 조회 ---
+
+    def get_range(self, market: str, timeframe: str,
+                  start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                  limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        범위 조회 (start_ms <= ts <= end_ms) -> DataManager.fetch_ohlcv()와 같은 형태의 DataFrame
+        (limit이 있으면 범위 안의 '최근' limit개)
+        """
+        ts, values = self._read_columns(market, timeframe, start_ms, end_ms, limit)
+        if len(ts) == 0:
+            return pd.DataFrame()
+        return pd.DataFrame(values, index=ms_to_kst_index(ts.tolist()), columns=OHLCV_COLUMNS)
+
+    def _read_columns(self, market: str, timeframe: str,
+                      start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                      limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """ 범위 조회 -> (ts int64[k], OHLCV float64[k, 5]) 시간 오름차순 """
+        table = CandleDB.__table__
+        stmt = select(table.c.ts, *[table.c[col] for col in OHLCV_COLUMNS]).where(
+            table.c.market == market, table.c.timeframe == timeframe
+        )
+        if start_ms is not None:
+            stmt = stmt.where(table.c.ts >= start_ms)
+        if end_ms is not None:
+            stmt = stmt.where(table.c.ts <= end_ms)
+        if limit is not None:
+            stmt = stmt.order_by(table.c.ts.desc()).limit(limit)
+        else:
+            stmt = stmt.order_by(table.c.ts)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+
+        if not rows:
+            return np.empty(0, dtype='int64'), np.empty((0, len(OHLCV_COLUMNS)), dtype='float64')
+
+        ts = np.array([r[0] for r in rows], dtype='int64')
+        values = np.array([r[1:] for r in rows], dtype='float64')
+        if limit is not None:
+            ts, values = ts[::-1].copy(), values[::-1].copy()
+        return ts, values
+
+    def get_bounds(self, market: str, timeframe: str) -> Tuple[Optional[int], Optional[int], int]:
+        """ (가장 오래된 ts, 가장 최근 ts, 개수) """
+        table = CandleDB.__table__
+        stmt = select(func.min(table.c.ts), func.max(table.c.ts), func.count()).where(
+            table.c.market == market, table.c.timeframe == timeframe
+        )
+        with self.engine.connect() as conn:
+            first_ts, last_ts, count = conn.execute(stmt).one()
+        return first_ts, last_ts, count
+
+    def find_gaps(self, market: str, timeframe: str,
+                  start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        누락 구간 목록 [(gap 직전 캔들 ts, gap 직후 캔들 ts), ...]
+        (타임프레임 간격보다 벌어진 곳)
+        """
+        bar_ms = TIMEFRAME_MINUTES[timeframe] * 60000
+        table = CandleDB.__table__
+        stmt = select(table.c.ts).where(table.c.market == market, table.c.timeframe == timeframe)
+        if start_ms is not None:
+            stmt = stmt.where(table.c.ts >= start_ms)
+        if end_ms is not None:
+            stmt = stmt.where(table.c.ts <= end_ms)
+
+        with self.engine.connect() as conn:
+            ts = np.array(conn.execute(stmt.order_by(table.c.ts)).scalars().all(), dtype='int64')
+
+        if len(ts) < 2:
+            return []
+        gap_idx = np.nonzero(np.diff(ts) > bar_ms)[0]
+        return [(int(ts[i]), int(ts[i + 1])) for i in gap_idx]
+
+    def get_empty_gaps(self, market: str, timeframe: str) -> List[Tuple[int, int]]:
+        """ 기록된 '거래 없음' 구간 [(gap 직전 캔들 ts, gap 직후 캔들 ts), ...] """
+        table = CandleEmptyGapDB.__table__
+        stmt = select(table.c.start_ts, table.c.end_ts).where(
+            table.c.market == market, table.c.timeframe == timeframe
+        ).order_by(table.c.start_ts)
+        with self.engine.connect() as conn:
+            return [(int(r[0]), int(r[1])) for r in conn.execute(stmt)]
+
+    def mark_empty_gaps(self, market: str, timeframe: str, gaps: List[Tuple[int, int]]):
+        """ 재조회해도 캔들이 없던 구간 기록 (같은 시작 시각이면 덮어씀) """
+        if not gaps:
+            return
+        rows = [{"market": market, "timeframe": timeframe, "start_ts": s, "end_ts": e} for s, e in gaps]
+        table = CandleEmptyGapDB.__table__
+        with self.engine.begin() as conn:
+            for i in range(0, len(rows), self.WRITE_CHUNK):
+                stmt = sqlite_insert(table).values(rows[i:i + self.WRITE_CHUNK])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['market', 'timeframe', 'start_ts'],
+                    set_={'end_ts': stmt.excluded.end_ts}
+                )
+                conn.execute(stmt)
+
+    # --- 거래소 동기화 (비동기) ---
+
+    async def backfill(self, exchange: UpbitExchange, market: str, timeframe: str, bars: int) -> int:
+        """
+        저장된 가장 오래된 캔들 이전으로 'to' 커서 페이지를 거슬러 올라가며 bars개까지 백필
+        (저장된 캔들이 없으면 현재 시점부터)
+        """
+        first_ts, _, count = self.get_bounds(market, timeframe)
+        cursor = utc_ms_to_cursor(first_ts) if first_ts is not None else None
+        saved = 0
+
+        while count + saved < bars:
+            page = await exchange.get_candles(market, timeframe, min(UPBIT_CANDLE_PAGE_SIZE, bars - count - saved), cursor)
+            if not page:
+                break
+            saved += self.upsert_rows(candles_to_rows(market, timeframe, page))
+            if len(page) < UPBIT_CANDLE_PAGE_SIZE:
+                break # (상장 시점 도달)
+            cursor = page[-1]['candle_date_time_utc']
+
+        self.logger.info(f"[{market}] {timeframe} 백필 {saved}개 저장 (총 {count + saved}개).")
+        return saved
+
+    async def sync_latest(self, exchange: UpbitExchange, market: str, timeframe: str) -> int:
+        """ 마지막 저장 캔들(미완성일 수 있음)부터 현재까지 증분 추가 """
+        _, last_ts, _ = self.get_bounds(market, timeframe)
+        if last_ts is None:
+            return await self.backfill(exchange, market, timeframe, UPBIT_CANDLE_PAGE_SIZE)
+
+        cursor = None
+        saved = 0
+        while True:
+            page = await exchange.get_candles(market, timeframe, UPBIT_CANDLE_PAGE_SIZE, cursor)
+            if not page:
+                break
+            rows = [r for r in candles_to_rows(market, timeframe, page) if r['ts'] >= last_ts]
+            saved += self.upsert_rows(rows)
+            if len(rows) < len(page) or len(page) < UPBIT_CANDLE_PAGE_SIZE:
+                break
+            cursor = page[-1]['candle_date_time_utc']
+        return saved
+
+    async def repair_gaps(self, exchange: UpbitExchange, market: str, timeframe: str) -> List[Tuple[int, int]]:
+        """
+        누락 구간을 다시 조회하여 채웁니다. (기록된 '거래 없음' 구간은 건너뜀)
+        :return: 재조회 후에도 남은 구간 (업비트에 캔들이 없는 '거래 없음' 구간 - candle_empty_gaps에 기록)
+        """
+        bar_ms = TIMEFRAME_MINUTES[timeframe] * 60000
+        known = set(self.get_empty_gaps(market, timeframe))
+        gaps = [g for g in self.find_gaps(market, timeframe) if g not in known]
+        if not gaps:
+            return []
+
+        for gap_start, gap_end in gaps:
+            cursor_ms = gap_end
+            while cursor_ms > gap_start + bar_ms:
+                missing = (cursor_ms - gap_start) // bar_ms - 1
+                page = await exchange.get_candles(market, timeframe, min(UPBIT_CANDLE_PAGE_SIZE, missing), utc_ms_to_cursor(cursor_ms))
+                rows = [r for r in candles_to_rows(market, timeframe, page) if gap_start < r['ts'] < gap_end]
+                self.upsert_rows(rows)
+                if not page or len(page) < min(UPBIT_CANDLE_PAGE_SIZE, missing):
+                    break
+                cursor_ms = rows[-1]['ts'] if rows else gap_start
+
+        # (남은 구간 = 재조회 후 gap 중 원래 구간 안에 있는 것 - 일부만 채워진 gap은 작은 gap 여러 개로 남음)
+        starts = [g[0] for g in gaps]
+        remaining = []
+        for start, end in self.find_gaps(market, timeframe, gaps[0][0], gaps[-1][1]):
+            i = bisect.bisect_right(starts, start) - 1
+            if i >= 0 and end <= gaps[i][1]:
+                remaining.append((start, end))
+        self.mark_empty_gaps(market, timeframe, remaining)
+
+        def missing_bars(ranges: List[Tuple[int, int]]) -> int:
+            return sum((end - start) // bar_ms - 1 for start, end in ranges)
+
+        untouched = len(set(gaps) & set(remaining))
+        partial = len({gaps[bisect.bisect_right(starts, s) - 1] for s, _ in remaining}) - untouched
+        self.logger.info(
+            f"[{market}] {timeframe} 누락 구간 {len(gaps)}개: 전체 복구 {len(gaps) - untouched - partial}개, "
+            f"일부 복구 {partial}개, 변화 없음 {untouched}개 (누락 봉 {missing_bars(gaps)} -> {missing_bars(remaining)}, "
+            f"남은 구간 {len(remaining)}개는 거래 없음 구간으로 기록)."
+        )
+        return remaining
+
+    async def prepare_history(self, exchange: UpbitExchange, market: str, timeframe: str, bars: int) -> int:
+        """ 백필(bars개까지) + 최신 캔들 증분 추가 + 누락 구간 복구 -> 저장된 캔들 수 """
+        await self.backfill(exchange, market, timeframe, bars)
+        await self.sync_latest(exchange, market, timeframe)
+        await self.repair_gaps(exchange, market, timeframe)
+        return self.get_bounds(market, timeframe)[2]
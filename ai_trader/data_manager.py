@@ -1,27 +1,218 @@
 # Athena_v1/ai_trader/data_manager.py
 # [수정] 2024.11.11 - (오류) SyntaxError: invalid syntax (// 주석 수정)
+# [수정] 2024.11.16 - (성능) (심볼, 타임프레임)별 캔들 캐시 추가 (마감된 캔들 재조회 방지, 증분 조회)
+# [수정] 2024.11.16 - (성능) CandleBuilder(실시간 체결 캔들)가 준비된 심볼은 REST 호출 없이 반환
+# [수정] 2024.11.16 - (성능) get_current_price를 PriceSnapshotService(메모리 테이블)에서 조회
+# [수정] 2024.11.17 - (성능) CandleStore(로컬 캔들 DB) 연동 - 재시작 시 디스크 캔들로 캐시 복원, 조회 결과 저장
+# [수정] 2024.11.17 - (성능) fetch_ohlcv_arrays() 추가 (memmap 컬럼 배열 뷰 반환 - DataFrame 복사 없음)
+# [수정] 2024.11.17 - (요청) prepare_history() 추가 (CandleStore 백필/증분/누락 복구 - 봇 시작 시 호출)
 """
 데이터 수집 및 DataFrame 변환/관리
 (exchange_api로부터 원본 데이터를 받아 pandas DataFrame으로 가공)
 """
+import asyncio
+import time
+import numpy as np
 import pandas as pd
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 from ai_trader.exchange_api import UpbitExchange
 from ai_trader.utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from ai_trader.candle_builder import CandleBuilder
+    from ai_trader.candle_store import CandleStore
+    from ai_trader.price_snapshot import PriceSnapshotService
+
+# (업비트 캔들 시간(candle_date_time_kst)은 한국 시간 기준)
+KST = timezone(timedelta(hours=9))
+
+# (pyupbit interval -> 캔들 1개의 길이(분))
+# (week/month는 길이가 일정하지 않으므로 캐시 대상에서 제외)
+TIMEFRAME_MINUTES: Dict[str, int] = {
+    "minute1": 1,
+    "minute3": 3,
+    "minute5": 5,
+    "minute10": 10,
+    "minute15": 15,
+    "minute30": 30,
+    "minute60": 60,
+    "minute240": 240,
+    "day": 1440,
+}
+
 class DataManager:
     
-    def __init__(self, exchange_api: UpbitExchange):
+    # [신규] (클래스 공용 캔들 캐시)
+    # (봇마다, /api/ohlcv 요청마다 DataManager를 새로 만들어도 같은 캐시를 공유)
+    # (예: { ("KRW-BTC", "minute60"): DataFrame(마감 캔들 + 마지막 미완성 캔들) })
+    _candle_cache: Dict[Tuple[str, str], pd.DataFrame] = {}
+    _cache_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+    
+    # (캐시에 보관할 최대 캔들 수 - 메모리 상한)
+    CACHE_MAX_BARS = 2000
+    
+    def __init__(self, 
+                 exchange_api: UpbitExchange, 
+                 candle_builder: Optional["CandleBuilder"] = None,
+                 price_service: Optional["PriceSnapshotService"] = None,
+                 candle_store: Optional["CandleStore"] = None):
         self.exchange_api = exchange_api
+        # [신규] (실시간 체결 캔들 - 없으면 REST만 사용)
+        self.candle_builder = candle_builder
+        # [신규] (현재가 스냅샷 - 없으면 거래소 API 직접 호출)
+        self.price_service = price_service
+        # [신규] (로컬 캔들 저장소 - 없으면 메모리 캐시만 사용)
+        self.candle_store = candle_store
         # [수정] 로거 생성을 __init__ 안으로 이동
         self.logger = setup_logger("DataManager", "athena_v1.log")
 
-    async def fetch_ohlcv(self, symbol: str, timeframe: str = 'minutes60', count: int = 200) -> pd.DataFrame:
+    @classmethod
+    def clear_cache(cls):
+        """ 캔들 캐시 전체 삭제 (테스트/재시작용) """
+        cls._candle_cache.clear()
+        cls._cache_locks.clear()
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = 'minutes60', count: int = 200, use_cache: bool = True, copy: bool = True) -> pd.DataFrame:
         """
         지정된 심볼과 타임프레임의 OHLCV 데이터를 비동기적으로 가져와
         Pandas DataFrame으로 변환합니다.
         
         [수정] exchange_api.get_ohlcv()가 DataFrame을 반환하도록 변경됨
+        [수정] (캐시) 이미 받아둔 마감 캔들은 재사용하고,
+               마지막 캐시 캔들 이후의 캔들(+ 미완성 캔들)만 거래소에 요청합니다.
+        [수정] (CandleBuilder) 체결 스트림으로 만든 캔들이 준비되어 있으면 그대로 반환하고,
+               REST로 조회한 경우에는 그 결과로 CandleBuilder를 다시 맞춥니다 (시작/재연결 시).
+        [수정] (CandleStore) 메모리 캐시가 비어 있으면(재시작 등) 디스크 캔들로 채운 뒤
+               그 이후의 캔들만 거래소에 요청하고, 거래소에서 받은 캔들은 디스크에 저장합니다.
+        (copy=False는 캐시 DataFrame의 슬라이스를 그대로 반환 - 읽기 전용으로만 사용)
         """
+        interval = timeframe.replace('minutes', 'minute')
+        bar_minutes = TIMEFRAME_MINUTES.get(interval)
+        
+        if not use_cache or bar_minutes is None:
+            return await self._load_ohlcv(symbol, interval, count)
+        
+        builder = self.candle_builder
+        if builder is not None and builder.is_ready(symbol, interval, count):
+            df = builder.get_ohlcv(symbol, interval, count)
+            if self.candle_store is not None:
+                # (새 봉이 열린 경우에만 디스크에 반영 - 직전 봉은 마감 값으로 갱신)
+                self._write_store(symbol, interval, df, new_bars_only=True)
+            return df
+        
+        key = (symbol, interval)
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        
+        # (같은 심볼을 여러 곳에서 동시에 요청해도 거래소 호출은 1번만)
+        async with lock:
+            cached = self._candle_cache.get(key)
+            refreshed = True
+            
+            if (cached is None or len(cached) < count) and self.candle_store is not None:
+                stored = self._read_store(symbol, interval, count)
+                if len(stored) >= count:
+                    cached = stored
+                    self.logger.debug(f"[{symbol}] {interval} 로컬 캔들 {len(stored)}개로 캐시 복원.")
+            
+            if cached is None or len(cached) < count:
+                df = await self._load_ohlcv(symbol, interval, count)
+                if df.empty:
+                    return df
+                self._candle_cache[key] = df
+                self._write_store(symbol, interval, df)
+                self.logger.debug(f"[{symbol}] {interval} 캐시 초기화 ({len(df)}개).")
+            else:
+                # (마지막 캐시 캔들은 미완성 캔들일 수 있으므로 다시 받아서 덮어씀)
+                now_kst = datetime.now(KST).replace(tzinfo=None)
+                elapsed_bars = int((now_kst - cached.index[-1]) / timedelta(minutes=bar_minutes))
+                fetch_count = max(elapsed_bars, 0) + 2
+                
+                if fetch_count >= count:
+                    df = await self._load_ohlcv(symbol, interval, count)
+                    if df.empty:
+                        return df
+                    self._candle_cache[key] = df
+                    self._write_store(symbol, interval, df)
+                else:
+                    df_new = await self._load_ohlcv(symbol, interval, fetch_count)
+                    if df_new.empty:
+                        self.logger.warning(f"[{symbol}] {interval} 증분 조회 실패. 캐시된 캔들을 반환합니다.")
+                        refreshed = False
+                        self._candle_cache[key] = cached
+                    else:
+                        merged = pd.concat([cached[cached.index < df_new.index[0]], df_new])
+                        self._candle_cache[key] = merged.iloc[-self.CACHE_MAX_BARS:]
+                        self._write_store(symbol, interval, df_new)
+                        self.logger.debug(f"[{symbol}] {interval} 증분 조회 {len(df_new)}개 병합 (캐시 {len(merged)}개).")
+            
+            if refreshed and builder is not None and builder.is_tracked(symbol):
+                builder.seed(symbol, interval, self._candle_cache[key], fetched_at_ms=int(time.time() * 1000))
+            
+            # (호출자가 지표 컬럼을 추가/수정해도 캐시가 오염되지 않도록 복사본 반환)
+            if not copy:
+                return self._candle_cache[key].iloc[-count:]
+            return self._candle_cache[key].iloc[-count:].copy()
+
+    def _read_store(self, symbol: str, timeframe: str, count: int) -> pd.DataFrame:
+        """ 로컬 캔들 저장소에서 최근 count개 조회 (실패 시 빈 DataFrame) """
+        try:
+            return self.candle_store.get_range(symbol, timeframe, limit=max(count, 1))
+        except Exception as e:
+            self.logger.error(f"[{symbol}] {timeframe} 로컬 캔들 조회 실패: {e}")
+            return pd.DataFrame()
+
+    def _write_store(self, symbol: str, timeframe: str, df: pd.DataFrame, new_bars_only: bool = False):
+        """ 거래소에서 받은 캔들을 로컬 캔들 저장소에 저장 (마지막 미완성 캔들은 다음 저장 시 덮어씀) """
+        if self.candle_store is None:
+            return
+        try:
+            if new_bars_only:
+                self.candle_store.upsert_new_bars(symbol, timeframe, df)
+            else:
+                self.candle_store.upsert_frame(symbol, timeframe, df)
+        except Exception as e:
+            self.logger.error(f"[{symbol}] {timeframe} 로컬 캔들 저장 실패: {e}")
+
+    async def prepare_history(self, symbol: str, timeframe: str = 'minute60', bars: int = CACHE_MAX_BARS) -> int:
+        """
+        로컬 캔들 저장소를 bars개까지 백필하고 최신 캔들/누락 구간을 맞춥니다. (저장된 캔들 수, 실패/저장소 없음 시 0)
+        (이후 fetch_ohlcv(count > 200)와 백테스트는 디스크 캔들을 사용)
+        """
+        if self.candle_store is None:
+            return 0
+        interval = timeframe.replace('minutes', 'minute')
+        try:
+            stored = await self.candle_store.prepare_history(self.exchange_api, symbol, interval, bars)
+            self.logger.info(f"[{symbol}] {interval} 로컬 캔들 준비 완료 ({stored}개).")
+            return stored
+        except Exception as e:
+            self.logger.error(f"[{symbol}] {interval} 로컬 캔들 백필 실패: {e}")
+            return 0
+
+    async def fetch_ohlcv_arrays(self, symbol: str, timeframe: str = 'minute60', count: int = 200) -> Optional[Dict[str, np.ndarray]]:
+        """
+        fetch_ohlcv()로 최신 캔들을 맞춘 뒤, 로컬 캔들 저장소의 memmap 컬럼 배열 뷰를 반환합니다.
+        (읽기 전용 NumPy 뷰 - 호출자마다 DataFrame을 복사하지 않음, 'ts'는 UTC epoch ms)
+        (저장소/memmap이 없거나 캔들이 부족하면 None -> fetch_ohlcv() 사용)
+        """
+        if self.candle_store is None or self.candle_store.mmap_dir is None:
+            return None
+        interval = timeframe.replace('minutes', 'minute')
+        df = await self.fetch_ohlcv(symbol, interval, count, copy=False)
+        if df.empty:
+            return None
+        try:
+            arrays = self.candle_store.get_arrays(symbol, interval, count)
+        except Exception as e:
+            self.logger.error(f"[{symbol}] {interval} memmap 캔들 조회 실패: {e}")
+            return None
+        if arrays is None or len(arrays['ts']) < min(count, len(df)):
+            return None
+        return arrays
+
+    async def _load_ohlcv(self, symbol: str, timeframe: str, count: int) -> pd.DataFrame:
+        """ 거래소에서 OHLCV를 직접 조회하여 표준 컬럼 DataFrame으로 변환 (캐시 미사용) """
         try:
             # exchange_api.get_ohlcv는 이제 KST 기준 DataFrame을 반환
             df = await self.exchange_api.get_ohlcv(symbol, timeframe, count)
@@ -63,5 +254,8 @@ class DataManager:
 
     async def get_current_price(self, symbol: str) -> float:
         """ 현재 가격 조회 """
-        price = await self.exchange_api.get_current_price(symbol)
-        return price if price else 0.0
\ No newline at end of file
+        if self.price_service is not None:
+            price = await self.price_service.get_current_price(symbol)
+        else:
+            price = await self.exchange_api.get_current_price(symbol)
+        return price if price else 0.0
@@ -1,5 +1,6 @@
 # Athena_v1/ai_trader/database.py
 # [수정] 2024.11.11 - (오류) SyntaxError: invalid syntax (// 주석 수정)
+# [수정] 2024.11.17 - (요청) get_trade_history 복구 (TradeLog에 없는 id 제거, position_type 채움) + side 필터 (몬테카를로용 청산 내역)
 """
 데이터베이스 (SQLite) 관리
 (거래 내역 저장 및 조회)
@@ -86,23 +87,25 @@ class Database:
         finally:
             session.close()
 
-    def get_trade_history(self, symbol: str = None, limit: int = 100) -> list[TradeLog]:
-        """ DB에서 최근 거래 내역 조회 - (동기) """
+    def get_trade_history(self, symbol: str = None, limit: int = 100, side: str = None) -> list[TradeLog]:
+        """ DB에서 최근 거래 내역 조회 (side: 'buy' / 'sell'만 조회) - (동기) """
         session = self.SessionLocal()
         try:
             query = session.query(TradeLogDB)
             if symbol:
                 query = query.filter(TradeLogDB.symbol == symbol)
+            if side:
+                query = query.filter(TradeLogDB.side == side)
             
             logs_db = query.order_by(TradeLogDB.timestamp.desc()).limit(limit).all()
             
             # (SQLAlchemy 객체 -> TradeLog (dataclass) 객체로 변환)
             logs_data = [
                 TradeLog(
-                    id=log.id,
                     timestamp=log.timestamp,
                     symbol=log.symbol,
                     side=log.side,
+                    position_type="LONG", # (trade_logs에 컬럼 없음 - 업비트 현물은 LONG만)
                     price=log.price,
                     volume=log.volume,
                     profit=log.profit,
@@ -0,0 +1,180 @@
+# Athena_v1/ai_trader/evaluation_executor.py
+# [신규] 2024.11.17 - (성능) 전략 평가 프로세스 풀 (이벤트 루프 밖에서 generate_signal_owl 실행, 캔들은 공유 메모리로 전달)
+# [수정] 2024.11.17 - (요청) 메모 키/카운터를 signal_engine(evaluation_memo_key, record_memo)에서 가져와 사용 (중복 정의 제거)
+# [수정] 2024.11.17 - (오류) 심볼을 워커 1개에 고정 (워커별 피벗/OB 상태가 달라 같은 봉에 다른 결과가 나올 수 있던 문제)
+"""
+전략 평가 실행기 (EvaluationExecutor)
+
+generate_signal_owl(국면 분석 / 패턴 탐색)은 CPU 작업이라 이벤트 루프 안에서 실행하면
+봇이 늘어날수록 WebSocket 브로드캐스트와 HTTP 응답이 그만큼 밀립니다.
+
+- 평가는 ProcessPoolExecutor(기본: CPU 코어 수)에서 실행하고, 이벤트 루프는 결과만 기다립니다.
+- 캔들은 DataFrame을 pickle하지 않고, 심볼별 공유 메모리(SharedMemory) 1개에
+  [봉 시각(int64) | OHLCV(float64)] 배열로 써서 이름만 넘깁니다. (워커는 붙어서 읽기만 함)
+- 워커 프로세스마다 SignalEngineOwlV1 1개를 두고 심볼별 피벗/OB 상태를 이어서 사용합니다.
+  피벗/OB 상태는 받은 봉 범위 밖(이전 평가)의 값도 가지고 있으므로, 워커마다 단일 프로세스 풀을 두고
+  심볼은 처음 평가한 워커에 고정합니다. (심볼 1개는 항상 같은 엔진이 inline 모드와 같은 순서로 같은 봉을 받음)
+- 평가 메모(마지막 확정 봉 + 미완성 봉 OHLC)는 부모 프로세스에서 먼저 확인합니다. (같은 봉이면 워커로 보내지 않음)
+- inline=True(디버깅용)이면 풀 없이 이벤트 루프에서 바로 실행합니다.
+  (풀이 깨지면(BrokenProcessPool) inline 모드로 전환)
+"""
+import asyncio
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_trader.signal_engine import SignalEngineOwlV1, evaluation_memo_key
+from ai_trader.strategy.features import OHLCV_COLUMNS, _ohlcv_values
+from ai_trader.utils.logger import setup_logger
+
+# (공유 메모리 1행: 봉 시각(ns) 1개 + OHLCV 5개, 모두 8바이트)
+_ROW_FIELDS = 1 + len(OHLCV_COLUMNS)
+_ROW_BYTES = _ROW_FIELDS * 8
+
+# --- 워커 프로세스 ---
+
+_worker_engine: Optional[SignalEngineOwlV1] = None
+
+def _init_worker():
+    global _worker_engine
+    _worker_engine = SignalEngineOwlV1()
+
+def _read_frame(name: str, rows: int) -> pd.DataFrame:
+    """ 공유 메모리 -> H1 DataFrame (복사본 - 읽은 뒤 바로 분리) """
+    shm = SharedMemory(name=name)
+    try:
+        ts = np.ndarray((rows,), dtype='int64', buffer=shm.buf).copy()
+        ohlcv = np.ndarray((rows, len(OHLCV_COLUMNS)), dtype='float64', buffer=shm.buf, offset=rows * 8).copy()
+    finally:
+        shm.close()
+    return pd.DataFrame(ohlcv, index=pd.DatetimeIndex(ts.view('datetime64[ns]')), columns=OHLCV_COLUMNS)
+
+def _evaluate_shared(name: str, rows: int, symbol: str) -> Optional[Dict[str, Any]]:
+    """ (워커에서 실행) 공유 메모리 캔들로 generate_signal_owl 실행 """
+    df_h1 = _read_frame(name, rows)
+    return _worker_engine.generate_signal_owl(df_h1, symbol)
+
+# --- 부모 프로세스 ---
+
+class EvaluationExecutor:
+
+    def __init__(self, max_workers: Optional[int] = None, inline: bool = False):
+        self.logger = setup_logger("EvaluationExecutor", "athena_v1.log")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.inline = inline
+
+        # (inline 모드 엔진 - 봇 태스크와 같은 이벤트 루프에서 실행)
+        self._engine: Optional[SignalEngineOwlV1] = None
+
+        # (워커별 단일 프로세스 풀 / 심볼 -> 워커 번호 - 실행기를 끌 때까지 유지)
+        self._pools: List[ProcessPoolExecutor] = []
+        self._lanes: Dict[str, int] = {}
+
+        # (심볼별 공유 메모리 - 봉 수가 늘어나면 다시 할당)
+        self._segments: Dict[str, SharedMemory] = {}
+
+        # (심볼별 마지막 평가: (메모 키, 결과) - 풀 모드에서 워커로 보내기 전에 확인)
+        self._memo: Dict[str, Tuple[Tuple, Optional[Dict[str, Any]]]] = {}
+
+    def start(self):
+        if self.inline:
+            self.logger.info("전략 평가 inline 모드 (이벤트 루프에서 실행).")
+            return
+        if not self._pools:
+            # (spawn - 실행 중인 이벤트 루프/스레드를 fork로 복제하지 않도록)
+            context = multiprocessing.get_context("spawn")
+            self._pools = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker)
+                for _ in range(self.max_workers)
+            ]
+            self.logger.info(f"전략 평가 프로세스 풀 시작 (워커 {self.max_workers}개).")
+
+    def shutdown(self):
+        self._stop_pools(wait=True)
+        for symbol in list(self._segments):
+            self.release(symbol)
+
+    def release(self, symbol: str):
+        """ 봇 종료 시 심볼의 공유 메모리 / 메모 해제 """
+        # (워커 고정(_lanes)은 유지 - 워커 엔진에 심볼의 피벗/OB 상태가 남아 있음)
+        self._memo.pop(symbol, None)
+        if self._engine is not None:
+            self._engine.reset_memo(symbol)
+        shm = self._segments.pop(symbol, None)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    async def evaluate(self, symbol: str, df_h1: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """ generate_signal_owl(df_h1, symbol)과 같은 결과 (풀 모드에서는 워커 프로세스에서 계산) """
+        if df_h1 is None or df_h1.empty:
+            return None
+        if self.inline or not self._pools:
+            return self._evaluate_inline(symbol, df_h1)
+
+        # (OHLCV 배열은 메모 키와 공유 메모리 쓰기에 같이 사용)
+        ohlcv = _ohlcv_values(df_h1)
+        memo_key = evaluation_memo_key(df_h1.index, ohlcv[-1, :4])
+        cached = self._memo.get(symbol)
+        if memo_key is not None and cached is not None and cached[0] == memo_key:
+            SignalEngineOwlV1.record_memo(hit=True)
+            return dict(cached[1]) if cached[1] else None
+        SignalEngineOwlV1.record_memo(hit=False)
+
+        try:
+            shm = self._write_frame(symbol, df_h1.index, ohlcv)
+            loop = asyncio.get_running_loop()
+            pool = self._pools[self._lane(symbol)]
+            signal_data = await loop.run_in_executor(pool, _evaluate_shared, shm.name, len(ohlcv), symbol)
+        except BrokenProcessPool as e:
+            self.logger.error(f"전략 평가 프로세스 풀 오류 - inline 모드로 전환합니다: {e}")
+            self.inline = True
+            self._stop_pools(wait=False)
+            return self._evaluate_inline(symbol, df_h1)
+        except Exception as e:
+            self.logger.error(f"[{symbol}] 전략 평가 중 오류: {e}", exc_info=True)
+            return None
+
+        if memo_key is not None:
+            self._memo[symbol] = (memo_key, dict(signal_data) if signal_data else None)
+        return signal_data
+
+    def _lane(self, symbol: str) -> int:
+        """ 심볼의 워커 번호 (처음이면 심볼이 가장 적은 워커에 고정 - 봇을 다시 시작해도 같은 워커) """
+        lane = self._lanes.get(symbol)
+        if lane is None:
+            counts = [0] * len(self._pools)
+            for assigned in self._lanes.values():
+                counts[assigned] += 1
+            lane = self._lanes[symbol] = counts.index(min(counts))
+        return lane
+
+    def _stop_pools(self, wait: bool):
+        for pool in self._pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools = []
+        self._lanes.clear()
+
+    def _evaluate_inline(self, symbol: str, df_h1: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        if self._engine is None:
+            self._engine = SignalEngineOwlV1()
+        return self._engine.generate_signal_owl(df_h1, symbol)
+
+    def _write_frame(self, symbol: str, index: pd.DatetimeIndex, ohlcv: np.ndarray) -> SharedMemory:
+        """ H1 캔들 -> 심볼 공유 메모리 [봉 시각(ns) | OHLCV] """
+        rows = len(ohlcv)
+        shm = self._segments.get(symbol)
+        if shm is None or shm.size < rows * _ROW_BYTES:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            shm = self._segments[symbol] = SharedMemory(create=True, size=rows * _ROW_BYTES)
+
+        np.ndarray((rows,), dtype='int64', buffer=shm.buf)[:] = np.asarray(index, dtype='datetime64[ns]').view('int64')
+        np.ndarray((rows, len(OHLCV_COLUMNS)), dtype='float64', buffer=shm.buf, offset=rows * 8)[:] = ohlcv
+        return shm
@@ -7,36 +7,100 @@
 # [수정] 2024.11.11 - (요청) get_current_price가 List[str]를 지원하도록 수정
 # [수정] 2024.11.12 - (오류) 'float' object has no attribute 'get' (pyupbit 단일 리스트 반환 버그 수정)
 # [수정] 2024.11.14 - (오류) [SSL: CERTIFICATE_VERIFY_FAILED] (certifi 라이브러리 강제 적용)
+# [수정] 2024.11.16 - (성능) pyupbit(스레드 executor) 제거 -> 공용 aiohttp 세션으로 캔들/현재가/잔고/주문 직접 호출
+# [수정] 2024.11.16 - (성능) place_order 비동기(async) 전환
+# [수정] 2024.11.16 - (성능) 모든 요청을 RequestScheduler(그룹별 토큰 버킷, Remaining-Req 반영) 경유
+# [수정] 2024.11.17 - (요청) get_market_details 추가 (유의/주의 종목 정보 포함 원본 목록 - MarketCatalogue용)
+# [수정] 2024.11.17 - (오류) 응답 처리 후 RequestScheduler 진행 자리 반납 (그룹 간 우선순위 대기열)
 
-import pyupbit
-import asyncio
-import aiohttp 
-import pandas as pd 
+import aiohttp
+import hashlib
+import pandas as pd
 from typing import Optional, List, Dict, Any
-import jwt  
-import uuid 
+from urllib.parse import urlencode
+import jwt
+import uuid
 import ssl # [신규] (SSL 오류 수정)
 import certifi # [신규] (SSL 오류 수정)
 
 from ai_trader.utils.logger import setup_logger
+from ai_trader.rate_limiter import RequestScheduler, route_request
+
+UPBIT_API_URL = "https://api.upbit.com"
+
+# (업비트 캔들 API는 1회 최대 200개)
+UPBIT_CANDLE_PAGE_SIZE = 200
+
+class UpbitAPIError(Exception):
+    """ 업비트 REST API 오류 응답 (HTTP 4xx/5xx) """
+
+    def __init__(self, status: int, name: str, message: str):
+        super().__init__(f"[{status}] {name}: {message}")
+        self.status = status
+        self.name = name
+        self.message = message
+
+def candle_endpoint(timeframe: str) -> str:
+    """
+    pyupbit 형식의 interval -> 업비트 캔들 API 경로
+    (예: 'minute60' -> '/v1/candles/minutes/60', 'day' -> '/v1/candles/days')
+    """
+    interval = timeframe.replace('minutes', 'minute')
+    if interval.startswith('minute'):
+        return f"/v1/candles/minutes/{interval[len('minute'):]}"
+    if interval in ('day', 'days'):
+        return "/v1/candles/days"
+    if interval in ('week', 'weeks'):
+        return "/v1/candles/weeks"
+    if interval in ('month', 'months'):
+        return "/v1/candles/months"
+    raise ValueError(f"지원하지 않는 타임프레임: {timeframe}")
+
+def candles_to_frame(candles: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    업비트 캔들 응답(list) -> pyupbit.get_ohlcv()와 같은 형태의 DataFrame
+    (KST 기준 DatetimeIndex, 오름차순, 컬럼: open, high, low, close, volume, value)
+    """
+    df = pd.DataFrame(
+        candles,
+        columns=['candle_date_time_kst', 'opening_price', 'high_price', 'low_price',
+                 'trade_price', 'candle_acc_trade_volume', 'candle_acc_trade_price']
+    )
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop('candle_date_time_kst')))
+    df.index.name = None
+    df.columns = ['open', 'high', 'low', 'close', 'volume', 'value']
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.astype('float64')
 
 class UpbitExchange:
-    
+
     _session: Optional[aiohttp.ClientSession] = None
 
+    # [신규] (프로세스 공용 요청 스케줄러 - 모든 UpbitExchange 인스턴스가 공유)
+    _scheduler: RequestScheduler = RequestScheduler()
+
+    # (429 응답 시 재시도 횟수 - 429는 서버가 요청을 처리하지 않은 것이므로 주문도 안전)
+    MAX_THROTTLE_RETRIES = 2
+
     # [수정] (SSL 오류 수정)
     @classmethod
     async def get_session(cls) -> aiohttp.ClientSession:
         if cls._session is None or cls._session.closed:
-            
+
             # [신규] OS의 인증서 대신 certifi의 최신 인증서 목록 사용
             ssl_context = ssl.create_default_context(cafile=certifi.where())
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            
+            # [수정] (keep-alive 연결 재사용 - 모든 봇/요청이 이 커넥터를 공유)
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context,
+                limit=100,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+
             timeout = aiohttp.ClientTimeout(total=5)
             # [수정] (connector 주입)
             cls._session = aiohttp.ClientSession(timeout=timeout, connector=connector)
-            
+
         return cls._session
     # --- (수정 끝) ---
 
@@ -45,125 +109,191 @@ class UpbitExchange:
         if cls._session and not cls._session.closed:
             await cls._session.close()
             cls._session = None
-    
+
     def __init__(self, access_key: str = None, secret_key: str = None):
         self.logger = setup_logger("UpbitAPI", "athena_v1.log")
-        
+
         self.access_key = access_key
         self.secret_key = secret_key
-        
-        try:
-            if self.access_key and self.secret_key:
-                self.upbit = pyupbit.Upbit(self.access_key, self.secret_key)
-                self.logger.info("Upbit (Private) API 클라이언트 초기화 완료.")
+
+        if self.access_key and self.secret_key:
+            self.logger.info("Upbit (Private) API 클라이언트 초기화 완료.")
+        else:
+            self.logger.info("Upbit (Public) API 클라이언트 초기화 완료.")
+
+    # --- 공통 요청 (aiohttp) ---
+
+    def _auth_headers(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """ Private API용 JWT 인증 헤더 (파라미터가 있으면 query_hash 포함) """
+        payload = {
+            'access_key': self.access_key,
+            'nonce': str(uuid.uuid4()),
+        }
+        if params:
+            query_string = urlencode(params).encode()
+            payload['query_hash'] = hashlib.sha512(query_string).hexdigest()
+            payload['query_hash_alg'] = 'SHA512'
+        jwt_token = jwt.encode(payload, self.secret_key)
+        return {'Authorization': f'Bearer {jwt_token}'}
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, private: bool = False) -> Any:
+        """
+        업비트 REST API 호출 (공용 aiohttp 세션 사용)
+        요청 전 스케줄러에서 그룹 토큰/진행 자리를 받고(우선순위 순), 응답의 Remaining-Req 헤더를 반영한 뒤 자리를 반납합니다.
+        오류 응답은 UpbitAPIError로 변환합니다.
+        """
+        group, priority = route_request(method, path)
+        session = await self.get_session()
+        url = f"{UPBIT_API_URL}{path}"
+
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            await self._scheduler.acquire(group, priority)
+
+            # (JWT nonce는 요청마다 새로 생성해야 함)
+            headers = self._auth_headers(params) if private else {}
+            if method == "GET":
+                request_ctx = session.get(url, params=params, headers=headers)
             else:
-                self.upbit = None 
-                self.logger.info("Upbit (Public) API 클라이언트 초기화 완료.")
-        except Exception as e:
-            self.logger.error(f"Upbit 클라이언트 초기화 실패: {e}")
-            self.upbit = None
+                request_ctx = session.request(method, url, json=params, headers=headers)
 
-    async def get_market_all(self) -> List[Dict[str, Any]]:
-        url = "https://api.upbit.com/v1/market/all"
-        params = {"isDetails": "true"} 
-        
+            try:
+                async with request_ctx as response:
+                    self._scheduler.on_response(group, response.status, response.headers.get('Remaining-Req'))
+
+                    if response.status == 429 and attempt < self.MAX_THROTTLE_RETRIES:
+                        continue
+
+                    if response.status >= 400:
+                        try:
+                            error = (await response.json(content_type=None)).get('error', {})
+                        except Exception:
+                            error = {}
+                        raise UpbitAPIError(response.status, error.get('name', 'HTTPError'), error.get('message', response.reason))
+                    return await response.json()
+            finally:
+                self._scheduler.release()
+
+    # --- Public API ---
+
+    async def get_market_details(self) -> List[Dict[str, Any]]:
+        """
+        전체 마켓 원본 목록 (/v1/market/all?isDetails=true)
+        (market, korean_name, english_name, market_warning, market_event 포함 - 실패 시 빈 리스트)
+        """
         try:
-            session = await self.get_session()
-            async with session.get(url, params=params) as response:
-                response.raise_for_status() 
-                all_markets = await response.json()
-                
+            all_markets = await self._request("GET", "/v1/market/all", {"isDetails": "true"})
+
             if not all_markets:
                 self.logger.warning("API로부터 마켓 목록을 받았으나 비어있습니다.")
                 return []
-                
-            krw_markets = [
-                {"market": m["market"], "korean_name": m["korean_name"]}
-                for m in all_markets
-                if m["market"].startswith("KRW-")
-            ]
-            
-            self.logger.info(f"업비트 KRW 마켓 {len(krw_markets)}개 목록 로드 완료 (aiohttp).")
-            return krw_markets
-            
-        except aiohttp.ClientError as e:
+            return all_markets
+
+        except (aiohttp.ClientError, UpbitAPIError) as e:
             self.logger.error(f"전체 마켓 조회 실패 (aiohttp): {e}")
             return []
         except Exception as e:
             self.logger.error(f"전체 마켓 조회 중 알 수 없는 오류: {e}")
             return []
 
+    async def get_market_all(self) -> List[Dict[str, Any]]:
+        all_markets = await self.get_market_details()
+
+        krw_markets = [
+            {"market": m["market"], "korean_name": m["korean_name"]}
+            for m in all_markets
+            if m["market"].startswith("KRW-")
+        ]
+
+        if krw_markets:
+            self.logger.info(f"업비트 KRW 마켓 {len(krw_markets)}개 목록 로드 완료 (aiohttp).")
+        return krw_markets
+
+    async def get_candles(self, symbol: str, timeframe: str = 'minute60', count: int = UPBIT_CANDLE_PAGE_SIZE, to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        업비트 캔들 원본 응답 (최신순, 최대 200개)
+        :param to: 이 시각 '이전'의 캔들을 조회 (UTC, 예: '2024-11-15T09:00:00')
+        """
+        params: Dict[str, Any] = {"market": symbol, "count": min(count, UPBIT_CANDLE_PAGE_SIZE)}
+        if to:
+            params["to"] = to
+        return await self._request("GET", candle_endpoint(timeframe), params)
+
     async def get_ohlcv(self, symbol: str, timeframe: str = 'minutes60', count: int = 200) -> Optional[pd.DataFrame]:
         try:
-            loop = asyncio.get_running_loop()
-            
-            pyupbit_interval = timeframe.replace('minutes', 'minute')
-            
-            df = await loop.run_in_executor(
-                None, 
-                pyupbit.get_ohlcv, 
-                symbol, 
-                pyupbit_interval, 
-                count
-            )
-            
-            if df is None:
+            # (200개 초과 요청 시 'to' 커서로 과거 페이지를 이어서 조회)
+            candles: List[Dict[str, Any]] = []
+            to = None
+            while len(candles) < count:
+                page = await self.get_candles(symbol, timeframe, count - len(candles), to)
+                if not page:
+                    break
+                candles.extend(page)
+                if len(page) < UPBIT_CANDLE_PAGE_SIZE:
+                    break
+                to = page[-1]['candle_date_time_utc']
+
+            if not candles:
                 self.logger.warning(f"[{symbol}] {timeframe} OHLCV 데이터 없음 (None).")
-                return pd.DataFrame() 
-                
-            return df
-            
+                return pd.DataFrame()
+
+            return candles_to_frame(candles)
+
         except Exception as e:
             self.logger.error(f"[{symbol}] {timeframe} OHLCV 조회 실패: {e}")
-            return pd.DataFrame() 
+            return pd.DataFrame()
 
-    async def get_current_price(self, symbol: str | List[str]) -> Any: 
+    async def get_current_price(self, symbol: str | List[str]) -> Any:
         try:
             is_list_request = isinstance(symbol, list)
-            
-            loop = asyncio.get_running_loop()
-            price_data = await loop.run_in_executor(None, pyupbit.get_current_price, symbol)
+            markets = symbol if is_list_request else [symbol]
+
+            if not markets:
+                return {}
+
+            tickers = await self._request("GET", "/v1/ticker", {"markets": ",".join(markets)})
+            price_data = {t['market']: float(t['trade_price']) for t in tickers}
 
             if not price_data:
                 return {} if is_list_request else 0.0
 
-            if is_list_request and isinstance(price_data, float):
-                return {symbol[0]: price_data}
-            
+            if not is_list_request:
+                return price_data.get(symbol, 0.0)
+
             return price_data
-            
+
         except Exception as e:
             self.logger.error(f"[{symbol}] 현재가 조회 실패: {e}")
-            return {} if isinstance(symbol, list) else 0.0 
+            return {} if isinstance(symbol, list) else 0.0
 
     # --- Private API (키 필요) ---
 
     async def get_balance(self, ticker: str = "KRW", verbose: bool = False, use_cache: bool = True) -> Optional[float]:
-        if not self.upbit or not self.access_key:
+        """
+        잔고 조회
+        [수정] (pyupbit 제거) use_cache와 관계없이 항상 /v1/accounts를 직접 조회
+               (use_cache는 기존 호출부 호환을 위해 유지)
+        """
+        if not self.access_key or not self.secret_key:
             self.logger.warning(f"[{ticker}] 잔고 조회 실패 (Private API 키 없음).")
             if verbose:
                 return {"error": "API key is not set."}
             return None
-            
+
         try:
-            if use_cache:
-                loop = asyncio.get_running_loop()
-                balance_data = await loop.run_in_executor(None, self.upbit.get_balance, ticker, verbose)
-            else:
-                self.logger.debug(f"[{ticker}] (No-Cache) 잔고 조회 시도...")
-                balance_data = await self.get_balance_no_cache(ticker, verbose)
-            
+            self.logger.debug(f"[{ticker}] 잔고 조회 시도...")
+            balance_data = await self.get_balance_no_cache(ticker, verbose)
+
             if verbose:
-                return balance_data 
+                return balance_data
             else:
-                return float(balance_data) 
-            
+                return float(balance_data)
+
         except Exception as e:
             self.logger.error(f"[{ticker}] 잔고 조회 실패: {e}")
             if verbose:
                 return {"error": str(e)}
-            return None 
-            
+            return None
+
     async def get_krw_balance(self, use_cache: bool = True) -> float:
         balance = await self.get_balance(ticker="KRW", verbose=False, use_cache=use_cache)
         return balance if balance else 0.0
@@ -173,45 +303,37 @@ class UpbitExchange:
         if balance_data and 'avg_buy_price' in balance_data:
             return float(balance_data['avg_buy_price'])
         return 0.0
-        
+
     async def get_balance_no_cache(self, ticker: str = "KRW", verbose: bool = False) -> Optional[float | List[Dict]]:
         if not self.access_key or not self.secret_key:
             return None
 
+        # [수정] ('KRW-BTC' 형식도 허용 -> 'BTC')
+        if ticker and '-' in ticker:
+            ticker = ticker.split('-')[1]
+
         try:
-            payload = {
-                'access_key': self.access_key,
-                'nonce': str(uuid.uuid4()),
-            }
-            jwt_token = jwt.encode(payload, self.secret_key)
-            headers = {'Authorization': f'Bearer {jwt_token}'}
-
-            session = await self.get_session()
-            url = "https://api.upbit.com/v1/accounts"
-            
-            async with session.get(url, headers=headers) as response:
-                response.raise_for_status()
-                all_accounts = await response.json()
+            all_accounts = await self._request("GET", "/v1/accounts", private=True)
 
             if ticker is None:
                 if verbose:
-                    return all_accounts 
+                    return all_accounts
                 else:
-                    return all_accounts 
+                    return all_accounts
 
             for account in all_accounts:
                 if account['currency'] == ticker:
                     if verbose:
-                        return account 
+                        return account
                     else:
-                        return float(account['balance']) 
-            
+                        return float(account['balance'])
+
             if verbose:
                 return {"currency": ticker, "balance": "0.0", "locked": "0.0", "avg_buy_price": "0.0"}
             else:
                 return 0.0
 
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, UpbitAPIError) as e:
             self.logger.error(f"[{ticker}] (No-Cache) 잔고 조회 실패 (aiohttp): {e}")
             if verbose:
                 return {"error": str(e)}
@@ -222,36 +344,46 @@ class UpbitExchange:
                 return {"error": str(e)}
             return None
 
-            
-    def place_order(self, symbol: str, side: str, volume: float = 0, price: float = 0, order_type: str = 'limit') -> Optional[Dict[str, Any]]:
-        if not self.upbit or not self.access_key:
+
+    async def place_order(self, symbol: str, side: str, volume: float = 0, price: float = 0, order_type: str = 'limit') -> Optional[Dict[str, Any]]:
+        """
+        주문 실행 (/v1/orders)
+        - 시장가 매수: price = 총 매수 금액(KRW)
+        - 시장가 매도: volume = 매도 수량
+        """
+        if not self.access_key or not self.secret_key:
             self.logger.error(f"[{symbol}] 주문 실패 (API 키 없음).")
             return {"error": "API key is not set."}
-            
+
         try:
-            result = None
+            body: Optional[Dict[str, str]] = None
             if side == 'buy':
-                if order_type == 'limit': 
-                    result = self.upbit.buy_limit_order(symbol, price, volume)
-                elif order_type == 'market': 
-                    result = self.upbit.buy_market_order(symbol, price) 
-            
+                if order_type == 'limit':
+                    body = {"market": symbol, "side": "bid", "volume": str(volume), "price": str(price), "ord_type": "limit"}
+                elif order_type == 'market':
+                    body = {"market": symbol, "side": "bid", "price": str(price), "ord_type": "price"}
+
             elif side == 'sell':
-                if order_type == 'limit': 
-                    result = self.upbit.sell_limit_order(symbol, price, volume)
-                elif order_type == 'market': 
-                    result = self.upbit.sell_market_order(symbol, volume) 
-            
-            if result is None:
-                self.logger.warning(f"[{symbol}] 주문 API가 None을 반환했습니다. (InsufficientFundsBid 또는 Rate Limit 가능성)")
-                return None
-            
-            if 'error' in result:
-                raise Exception(result['error'].get('message', 'Unknown error'))
+                if order_type == 'limit':
+                    body = {"market": symbol, "side": "ask", "volume": str(volume), "price": str(price), "ord_type": "limit"}
+                elif order_type == 'market':
+                    body = {"market": symbol, "side": "ask", "volume": str(volume), "ord_type": "market"}
+
+            if body is None:
+                raise Exception(f"지원하지 않는 주문 유형: {side} {order_type}")
+
+            result = await self._request("POST", "/v1/orders", body, private=True)
 
             self.logger.info(f"주문 전송: {symbol} {side} {order_type} (결과: {result.get('uuid', 'Success')})")
             return result
-            
+
+        except UpbitAPIError as e:
+            if e.status == 429:
+                self.logger.warning(f"[{symbol}] 주문 API가 429를 반환했습니다. (Rate Limit)")
+                return None
+            self.logger.error(f"[{symbol}] 주문 실행 실패: {e}")
+            return {"error": {"name": e.name, "message": e.message}}
+
         except Exception as e:
             self.logger.error(f"[{symbol}] 주문 실행 실패: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
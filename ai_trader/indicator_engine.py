@@ -0,0 +1,294 @@
+# Athena_v1/ai_trader/indicator_engine.py
+# [신규] 2024.11.17 - (성능) 증분(스트리밍) 지표 엔진 - EMA / 볼린저 밴드 / RSI(Wilder)를 봉마다 O(1)로 갱신
+# [수정] 2024.11.17 - (오류) BBands 표준편차(ddof=1) / RSI 평활(첫 변화량 시드)을 NumPy 커널(pandas-ta 0.4)과 맞춤
+"""
+증분 지표 엔진 (IndicatorEngine)
+
+매 주기마다 200개 전체 봉으로 ta.ema / ta.bbands / ta.rsi 를 다시 계산하는 대신,
+(심볼, 타임프레임, 지표)마다 이전 봉까지의 상태만 들고 있다가 새 봉/수정된 봉만 반영합니다.
+
+- 마지막 봉(미완성 봉)은 '미리보기' 값으로만 계산하고, 다음 봉이 열릴 때 상태에 확정(commit)합니다.
+  (같은 봉이 다시 들어오면(수정) 확정 상태에서 다시 계산 -> O(1))
+- 계산 방식은 ai_trader/indicators.py(NumPy 커널, pandas-ta 0.4 기본값)와 같습니다.
+  EMA: 첫 값 = 처음 N개 SMA, 이후 alpha = 2/(N+1)
+  BBands: N개 SMA ± k * 표준편차(ddof=1), 밴드폭 = 100 * (U - L) / M, %B = (C - L) / (U - L)
+  RSI: Wilder 평활 (alpha = 1/N, 첫 값 = 첫 변화량) 평균 상승폭 / (평균 상승폭 + 평균 하락폭)
+  (RSI는 변화량이 N개 이상일 때부터 값이 나옴 - 커널은 전체 봉이 N개를 넘으면 앞쪽 봉까지 채우므로 처음 N봉만 다름)
+- 컬럼 이름은 strategy/constants.py와 같으므로, 결과를 DataFrame에 그대로 붙여 기존 함수에서 사용할 수 있습니다.
+"""
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ai_trader.candle_builder import kst_index_to_ms
+from ai_trader.strategy.constants import (
+    RSI_PERIOD, RSI_COL,
+    BBANDS_PERIOD, BBANDS_STD,
+    BBANDS_LOW_COL, BBANDS_MID_COL, BBANDS_UPPER_COL,
+    BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL,
+    REGIME_EMA_PERIOD,
+)
+from ai_trader.utils.logger import setup_logger
+
+_NAN = float('nan')
+
+class StreamingIndicator:
+    """
+    증분 지표 공통 처리 (봉 시각 기준 확정/수정 판단 + 최근 값 기록)
+    (하위 클래스는 _preview(x) / _apply(x)만 구현)
+    """
+
+    columns: Tuple[str, ...] = ()
+
+    def __init__(self, history: int):
+        self._ts: Optional[int] = None # (현재(미완성) 봉 시각)
+        self._pending: Optional[float] = None # (현재 봉의 마지막 값 - 아직 상태에 미반영)
+        self._current: Dict[str, float] = {col: _NAN for col in self.columns}
+        # (확정 봉 값 - 현재 봉 포함 history개를 제공)
+        self._history: Dict[str, Deque[float]] = {col: deque(maxlen=max(history - 1, 0)) for col in self.columns}
+
+    def update(self, ts: int, x: float) -> Dict[str, float]:
+        """ 봉 1개 반영 (같은 ts면 수정, 새 ts면 이전 봉을 확정하고 새 봉 시작) """
+        if self._ts is not None and ts < self._ts:
+            return self._current # (이미 지난 봉 - 무시)
+        if self._ts is not None and ts > self._ts:
+            self._apply(self._pending)
+            for col, value in self._current.items():
+                self._history[col].append(value)
+        self._ts = ts
+        self._pending = x
+        self._current = self._preview(x)
+        return self._current
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return self._ts
+
+    @property
+    def current(self) -> Dict[str, float]:
+        return self._current
+
+    def history(self, col: str, count: Optional[int] = None) -> np.ndarray:
+        """ 최근 값 (확정 봉 + 현재 봉, 시간 오름차순) """
+        values = list(self._history[col]) + [self._current[col]]
+        if count is not None:
+            values = values[-count:]
+        return np.array(values, dtype='float64')
+
+    def _preview(self, x: float) -> Dict[str, float]:
+        raise NotImplementedError
+
+    def _apply(self, x: float):
+        raise NotImplementedError
+
+class StreamingEMA(StreamingIndicator):
+
+    def __init__(self, period: int, history: int):
+        self.period = period
+        self.columns = (f'EMA_{period}',)
+        super().__init__(history)
+        self._alpha = 2.0 / (period + 1)
+        self._count = 0
+        self._seed_sum = 0.0
+        self._ema: Optional[float] = None
+
+    def _next(self, x: float) -> Optional[float]:
+        if self._ema is not None:
+            return self._ema + self._alpha * (x - self._ema)
+        if self._count + 1 == self.period:
+            return (self._seed_sum + x) / self.period # (SMA 시드)
+        return None
+
+    def _preview(self, x: float) -> Dict[str, float]:
+        value = self._next(x)
+        return {self.columns[0]: _NAN if value is None else value}
+
+    def _apply(self, x: float):
+        self._ema = self._next(x)
+        self._count += 1
+        self._seed_sum += x
+
+class StreamingBBands(StreamingIndicator):
+
+    # (누적 합 오차 방지를 위해 이 횟수마다 창(window)에서 합계를 다시 계산)
+    RESUM_INTERVAL = 1000
+
+    def __init__(self, period: int, std: float, history: int):
+        self.period = period
+        self.std = std
+        self.columns = (BBANDS_LOW_COL, BBANDS_MID_COL, BBANDS_UPPER_COL, BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL) \
+            if (period, std) == (BBANDS_PERIOD, BBANDS_STD) else tuple(
+                f'{p}_{period}_{float(std)}' for p in ('BBL', 'BBM', 'BBU', 'BBB', 'BBP'))
+        super().__init__(history)
+        # (확정된 최근 period-1개 값 + 기준값(shift)을 뺀 합/제곱합)
+        self._window: Deque[float] = deque(maxlen=period - 1)
+        self._shift: Optional[float] = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._applied = 0
+
+    def _preview(self, x: float) -> Dict[str, float]:
+        if len(self._window) + 1 < self.period:
+            return {col: _NAN for col in self.columns}
+        shift = self._shift if self._shift is not None else x
+        d = x - shift
+        total = self._sum + d
+        mid = total / self.period + shift
+        # (표본 분산 ddof=1 - 기간 1이면 표준편차 없음)
+        var = max((self._sumsq + d * d - total * total / self.period) / (self.period - 1), 0.0) if self.period > 1 else _NAN
+        band = self.std * math.sqrt(var)
+        lower, upper = mid - band, mid + band
+        return {
+            self.columns[0]: lower,
+            self.columns[1]: mid,
+            self.columns[2]: upper,
+            self.columns[3]: 100.0 * (upper - lower) / mid if mid else _NAN,
+            self.columns[4]: (x - lower) / (upper - lower) if upper != lower else _NAN,
+        }
+
+    def _apply(self, x: float):
+        if self._shift is None:
+            self._shift = x
+        if self.period == 1:
+            return
+        if len(self._window) == self._window.maxlen:
+            old = self._window[0] - self._shift
+            self._sum -= old
+            self._sumsq -= old * old
+        self._window.append(x)
+        d = x - self._shift
+        self._sum += d
+        self._sumsq += d * d
+
+        self._applied += 1
+        if self._applied % self.RESUM_INTERVAL == 0:
+            # (기준값을 최근 값으로 옮기고 합계를 다시 계산)
+            self._shift = x
+            diffs = [v - self._shift for v in self._window]
+            self._sum = math.fsum(diffs)
+            self._sumsq = math.fsum(d * d for d in diffs)
+
+class StreamingRSI(StreamingIndicator):
+
+    def __init__(self, period: int, history: int):
+        self.period = period
+        self.columns = (f'RSI_{period}',)
+        super().__init__(history)
+        self._alpha = 1.0 / period
+        self._prev: Optional[float] = None
+        self._gain = 0.0 # (Wilder 평균 상승폭 - 첫 값은 첫 변화량)
+        self._loss = 0.0
+        self._count = 0 # (반영된 변화량 개수)
+
+    def _next(self, x: float) -> Tuple[float, float]:
+        change = x - self._prev
+        up, down = (change if change > 0 else 0.0), (-change if change < 0 else 0.0)
+        if self._count == 0:
+            return up, down
+        return (
+            self._gain + self._alpha * (up - self._gain),
+            self._loss + self._alpha * (down - self._loss),
+        )
+
+    def _preview(self, x: float) -> Dict[str, float]:
+        if self._prev is None or self._count + 1 < self.period:
+            return {self.columns[0]: _NAN}
+        gain, loss = self._next(x)
+        total = gain + loss
+        return {self.columns[0]: 100.0 * gain / total if total > 0 else _NAN}
+
+    def _apply(self, x: float):
+        if self._prev is not None:
+            self._gain, self._loss = self._next(x)
+            self._count += 1
+        self._prev = x
+
+class IndicatorEngine:
+
+    # (지표별로 보관할 최근 값 개수 - 패턴 탐색 lookback(최대 30) + 여유)
+    DEFAULT_HISTORY = 60
+
+    def __init__(self, history: int = DEFAULT_HISTORY):
+        self.logger = setup_logger("IndicatorEngine", "athena_v1.log")
+        self.history = history
+        # ({ (symbol, timeframe): [StreamingIndicator, ...] })
+        self._states: Dict[Tuple[str, str], List[StreamingIndicator]] = {}
+
+    def _create(self) -> List[StreamingIndicator]:
+        """ 기본 지표 세트 (analyze_regime / patterns.py에서 사용하는 지표) """
+        return [
+            StreamingEMA(REGIME_EMA_PERIOD, self.history),
+            StreamingBBands(BBANDS_PERIOD, BBANDS_STD, self.history),
+            StreamingRSI(RSI_PERIOD, self.history),
+        ]
+
+    def reset(self, symbol: str, timeframe: Optional[str] = None):
+        for key in [k for k in self._states if k[0] == symbol and (timeframe is None or k[1] == timeframe)]:
+            del self._states[key]
+
+    def update_bar(self, symbol: str, timeframe: str, ts_ms: int, close: float) -> Dict[str, float]:
+        """ 봉 1개(새 봉 또는 마지막 봉 수정) 반영 후 현재 값 반환 """
+        indicators = self._states.setdefault((symbol, timeframe), self._create())
+        values: Dict[str, float] = {}
+        for indicator in indicators:
+            values.update(indicator.update(ts_ms, close))
+        return values
+
+    def update_frame(self, symbol: str, timeframe: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        DataManager.fetch_ohlcv() 결과로 상태를 맞춥니다.
+        (마지막으로 반영한 봉부터만 다시 반영 - 보통 1~2개 / 처음이거나 이어지지 않으면 전체 재계산)
+        :return: get_history()와 같음
+        """
+        if df is None or df.empty:
+            return {}
+
+        ts_list = kst_index_to_ms(df.index)
+        closes = df['close'].to_numpy(dtype='float64')
+        key = (symbol, timeframe)
+
+        indicators = self._states.get(key)
+        last_ts = indicators[0].last_ts if indicators else None
+        start = int(np.searchsorted(ts_list, last_ts)) if last_ts is not None else 0
+
+        if last_ts is None or start >= len(ts_list) or ts_list[start] != last_ts:
+            # (처음 또는 중간 봉이 빠진 경우 - 전체 봉으로 다시 계산)
+            if last_ts is not None:
+                self.logger.info(f"[{symbol}] {timeframe} 지표 상태 재계산 (봉 {len(ts_list)}개).")
+            self._states[key] = self._create()
+            start = 0
+
+        for ts, close in zip(ts_list[start:], closes[start:].tolist()):
+            self.update_bar(symbol, timeframe, ts, close)
+
+        return self.get_history(symbol, timeframe)
+
+    def get_values(self, symbol: str, timeframe: str) -> Dict[str, float]:
+        """ 현재(마지막 봉) 지표 값 { 'EMA_50': ..., 'BBL_20_2.0_2.0': ..., 'RSI_14': ... } """
+        values: Dict[str, float] = {}
+        for indicator in self._states.get((symbol, timeframe), []):
+            values.update(indicator.current)
+        return values
+
+    def get_history(self, symbol: str, timeframe: str, count: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """ 지표별 최근 값 배열 (시간 오름차순, 마지막 원소 = 현재 봉) """
+        return {
+            col: indicator.history(col, count)
+            for indicator in self._states.get((symbol, timeframe), [])
+            for col in indicator.columns
+        }
+
+def attach_indicators(df: pd.DataFrame, history: Dict[str, np.ndarray]):
+    """
+    지표 최근 값 배열을 DataFrame 꼬리에 맞춰 컬럼으로 붙입니다 (앞쪽 봉은 NaN).
+    (patterns.py 등 기존 함수가 컬럼 이름으로 지표를 읽을 수 있도록)
+    """
+    n = len(df)
+    for col, values in history.items():
+        column = np.full(n, np.nan)
+        k = min(n, len(values))
+        if k:
+            column[n - k:] = values[len(values) - k:]
+        df[col] = column
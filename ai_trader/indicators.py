@@ -0,0 +1,145 @@
+# Athena_v1/ai_trader/indicators.py
+# [신규] 2024.11.17 - (성능) NumPy 벡터 지표 커널 (EMA / SMA / BBands / RSI / ATR) - pandas-ta 대체
+# [수정] 2024.11.17 - (오류) pandas-ta 0.4(배포 이미지 버전) 공식과 일치 (BBands ddof=1, rma adjust=False, ATR SMA 시드, 첫 봉 TR)
+"""
+NumPy 지표 커널
+
+- float64 배열을 그대로 받아 같은 길이의 float64 배열을 반환합니다. (DataFrame 생성 없음)
+- 2차원 이상 배열은 axis(기본: 마지막 축 = 시간)를 따라 계산합니다.
+  (예: (심볼 수, 봉 수) 배열을 한 번에 계산)
+- 결과는 pandas-ta 0.4 기본 설정(Docker 이미지 Python 3.12에서 설치되는 버전)과 같습니다.
+  (tests/data/pandas_ta_golden.npz와 비교 - 값이 정의되지 않는 앞부분은 NaN)
+  EMA: 첫 값 = 처음 N개 SMA, 이후 alpha = 2/(N+1)
+  BBands: SMA ± k * 표준편차(ddof=1), 밴드폭 = 100 * (U - L) / M, %B = (C - L) / (U - L)
+  RSI: Wilder 평활 (rma: alpha = 1/N, adjust=False - 첫 변화량부터 시작), 봉 수가 N개 이하면 모두 NaN
+  ATR: 첫 값 = 처음 N개 TR 평균(첫 봉 TR = H - L), 이후 rma
+  (밴드폭이 0인 구간의 %B는 pandas-ta처럼 epsilon을 더하지 않고 NaN)
+- 입력에 NaN이 섞여 있으면 결과가 달라질 수 있으므로, 결측치는 호출 전에 처리합니다.
+"""
+import numpy as np
+from typing import NamedTuple
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+class BBands(NamedTuple):
+    lower: np.ndarray
+    mid: np.ndarray
+    upper: np.ndarray
+    bandwidth: np.ndarray
+    percent: np.ndarray
+
+# (지수 평활 블록 길이 결정용 - 블록 안 가중치 비율(1/decay^m) 상한)
+_EWM_MAX_GROWTH = 1e3
+
+def _as_last_axis(x: np.ndarray, axis: int) -> np.ndarray:
+    return np.moveaxis(np.asarray(x, dtype='float64'), axis, -1)
+
+def _ewm(x: np.ndarray, alpha: float, init: np.ndarray) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t]  (y[-1] = init, 마지막 축 기준)
+    (시간 루프 대신 블록 단위 누적합으로 계산 - 블록 길이는 가중치가 _EWM_MAX_GROWTH배를 넘지 않도록 제한)
+    """
+    n = x.shape[-1]
+    out = np.empty_like(x)
+    if n == 0:
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[...] = x
+        return out
+
+    block = max(1, min(n, int(np.log(_EWM_MAX_GROWTH) / -np.log(decay))))
+    powers = decay ** np.arange(block + 1, dtype='float64') # (decay^0 .. decay^block)
+    inv_powers = 1.0 / powers[:block]
+
+    prev = np.asarray(init, dtype='float64')
+    for start in range(0, n, block):
+        chunk = x[..., start:start + block]
+        m = chunk.shape[-1]
+        # (y[s+j] = decay^(j+1) * prev + alpha * decay^j * sum_{k<=j} x[s+k] * decay^-k)
+        acc = np.cumsum(chunk * inv_powers[:m], axis=-1)
+        out[..., start:start + m] = powers[1:m + 1] * prev[..., None] + alpha * powers[:m] * acc
+        prev = out[..., start + m - 1]
+    return out
+
+def sma(x: np.ndarray, length: int, axis: int = -1) -> np.ndarray:
+    """ 단순 이동평균 """
+    values = _as_last_axis(x, axis)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= length:
+        out[..., length - 1:] = sliding_window_view(values, length, axis=-1).mean(axis=-1)
+    return np.moveaxis(out, -1, axis)
+
+def ema(x: np.ndarray, length: int, axis: int = -1) -> np.ndarray:
+    """ 지수 이동평균 (첫 값 = 처음 length개 SMA) """
+    values = _as_last_axis(x, axis)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= length:
+        seed = values[..., :length].mean(axis=-1)
+        out[..., length - 1] = seed
+        out[..., length:] = _ewm(values[..., length:], 2.0 / (length + 1), seed)
+    return np.moveaxis(out, -1, axis)
+
+def bbands(x: np.ndarray, length: int = 20, std: float = 2.0, axis: int = -1) -> BBands:
+    """ 볼린저 밴드 (하단, 중심, 상단, 밴드폭(%), %B) """
+    values = _as_last_axis(x, axis)
+    mid = np.full(values.shape, np.nan)
+    dev = np.full(values.shape, np.nan)
+    if values.shape[-1] >= length:
+        windows = sliding_window_view(values, length, axis=-1)
+        mid[..., length - 1:] = windows.mean(axis=-1)
+        if length > 1:
+            dev[..., length - 1:] = windows.std(axis=-1, ddof=1)
+
+    lower = mid - std * dev
+    upper = mid + std * dev
+    width = upper - lower
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bandwidth = 100.0 * width / mid
+        percent = np.where(width != 0, (values - lower) / width, np.nan)
+
+    return BBands(*(np.moveaxis(a, -1, axis) for a in (lower, mid, upper, bandwidth, percent)))
+
+def rsi(close: np.ndarray, length: int = 14, axis: int = -1) -> np.ndarray:
+    """ RSI (Wilder) - 100 * 평균 상승폭 / (평균 상승폭 + 평균 하락폭) """
+    values = _as_last_axis(close, axis)
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    if n > length:
+        change = np.diff(values, axis=-1)
+        up = np.maximum(change, 0.0)
+        down = np.maximum(-change, 0.0)
+        alpha = 1.0 / length
+        # (rma 첫 값 = 첫 변화량 - 이후 y[t] = (1 - alpha) * y[t-1] + alpha * x[t])
+        gain = _ewm(up, alpha, up[..., 0])
+        loss = _ewm(down, alpha, down[..., 0])
+        total = gain + loss
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[..., 1:] = np.where(total > 0, 100.0 * gain / total, np.nan)
+    return np.moveaxis(out, -1, axis)
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, axis: int = -1) -> np.ndarray:
+    """ TR = max(H - L, |H - 이전 C|, |L - 이전 C|) (첫 봉은 H - L) """
+    h, l, c = (_as_last_axis(a, axis) for a in (high, low, close))
+    out = np.full(h.shape, np.nan)
+    if h.shape[-1] > 0:
+        out[..., 0] = h[..., 0] - l[..., 0]
+    if h.shape[-1] > 1:
+        prev = c[..., :-1]
+        out[..., 1:] = np.maximum.reduce([
+            h[..., 1:] - l[..., 1:],
+            np.abs(h[..., 1:] - prev),
+            np.abs(l[..., 1:] - prev),
+        ])
+    return np.moveaxis(out, -1, axis)
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14, axis: int = -1) -> np.ndarray:
+    """ ATR (첫 값 = 처음 length개 TR 평균, 이후 Wilder 평활) """
+    tr = _as_last_axis(true_range(high, low, close, axis=axis), axis)
+    n = tr.shape[-1]
+    out = np.full(tr.shape, np.nan)
+    if n > length:
+        seed = tr[..., :length].mean(axis=-1)
+        out[..., length - 1] = seed
+        out[..., length:] = _ewm(tr[..., length:], 1.0 / length, seed)
+    return np.moveaxis(out, -1, axis)
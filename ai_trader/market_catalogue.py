@@ -0,0 +1,118 @@
+# Athena_v1/ai_trader/market_catalogue.py
+# [신규] 2024.11.17 - (성능) 마켓 목록 캐시 (TTL 백그라운드 갱신 + 마켓 코드별 O(1) 조회)
+"""
+마켓 목록 캐시 (MarketCatalogue)
+
+- /v1/market/all?isDetails=true 를 한 번 받아 마켓 코드별 딕셔너리로 보관합니다.
+- TTL(기본 1시간)이 지나면 백그라운드에서 다시 받아오며,
+  갱신 중이거나 갱신에 실패해도 기존 목록을 그대로 제공합니다.
+- /api/markets, 자산 요약(한글 이름) 등은 HTTP 호출 없이 메모리에서 조회합니다.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from ai_trader.exchange_api import UpbitExchange
+from ai_trader.utils.logger import setup_logger
+
+class MarketCatalogue:
+
+    # (마켓 목록 갱신 주기(초))
+    DEFAULT_TTL_SEC = 3600.0
+
+    # (갱신 실패 시 재시도 간격(초))
+    RETRY_INTERVAL_SEC = 30.0
+
+    def __init__(self, exchange: UpbitExchange, ttl_sec: float = DEFAULT_TTL_SEC):
+        self.logger = setup_logger("MarketCatalogue", "athena_v1.log")
+        self.exchange = exchange
+        self.ttl_sec = ttl_sec
+
+        # (마켓 코드 -> 원본 정보 { market, korean_name, english_name, market_warning, market_event })
+        self._by_code: Dict[str, Dict[str, Any]] = {}
+
+        # (/api/markets 응답 형식 - get_market_all()과 동일: [{market, korean_name}, ...])
+        self._krw_markets: List[Dict[str, str]] = []
+
+        self._loaded_at: float = 0.0 # (monotonic, 0이면 미로드)
+        self._load_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # --- 조회 (HTTP 호출 없음) ---
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at > 0
+
+    def get(self, market: str) -> Optional[Dict[str, Any]]:
+        """ 마켓 코드별 원본 정보 (없으면 None) """
+        return self._by_code.get(market)
+
+    def korean_name(self, market: str, default: Optional[str] = None) -> Optional[str]:
+        info = self._by_code.get(market)
+        return info['korean_name'] if info else default
+
+    def is_warning(self, market: str) -> bool:
+        """ 투자유의 종목 여부 (market_warning == 'CAUTION' 또는 market_event.warning) """
+        info = self._by_code.get(market)
+        if not info:
+            return False
+        event = info.get('market_event') or {}
+        return info.get('market_warning') == 'CAUTION' or bool(event.get('warning'))
+
+    def caution_flags(self, market: str) -> Dict[str, bool]:
+        """ 주의 종목 세부 사유 (market_event.caution - 예: PRICE_FLUCTUATIONS) """
+        info = self._by_code.get(market) or {}
+        return dict((info.get('market_event') or {}).get('caution') or {})
+
+    async def get_krw_markets(self) -> List[Dict[str, str]]:
+        """ KRW 마켓 목록 (아직 한 번도 받지 못했으면 지금 받아옴) """
+        if not self.is_loaded:
+            await self.load()
+        return self._krw_markets
+
+    # --- 갱신 ---
+
+    async def load(self, force: bool = False) -> bool:
+        """ 마켓 목록을 다시 받아옴 (동시에 여러 곳에서 요청해도 HTTP 호출은 1번) """
+        requested_at = time.monotonic()
+        async with self._load_lock:
+            if not force and self._loaded_at >= requested_at:
+                return True
+
+            all_markets = await self.exchange.get_market_details()
+            if not all_markets:
+                self.logger.warning("마켓 목록 갱신 실패. 기존 목록을 유지합니다.")
+                return False
+
+            self._by_code = {m['market']: m for m in all_markets}
+            self._krw_markets = [
+                {"market": m["market"], "korean_name": m["korean_name"]}
+                for m in all_markets
+                if m["market"].startswith("KRW-")
+            ]
+            self._loaded_at = time.monotonic()
+            self.logger.info(f"마켓 목록 갱신 완료 (전체 {len(self._by_code)}개, KRW {len(self._krw_markets)}개).")
+            return True
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                ok = await self.load(force=True)
+            except Exception as e:
+                self.logger.error(f"마켓 목록 갱신 중 오류: {e}")
+                ok = False
+            await asyncio.sleep(self.ttl_sec if ok else self.RETRY_INTERVAL_SEC)
@@ -0,0 +1,330 @@
+# Athena_v1/ai_trader/market_data_hub.py
+# [신규] 2024.11.16 - (성능) 업비트 WebSocket 단일 연결 공유 허브 (봇 + GUI 차트)
+# [수정] 2024.11.17 - (성능) 리스너별 큐/태스크로 전달 (느린 리스너가 WebSocket 수신을 막지 않도록)
+"""
+시장 데이터 허브 (MarketDataHub)
+
+업비트 WebSocket 연결 1개로 ticker / trade / orderbook 을 한 번에(멀티플렉스) 구독하고,
+프로세스 내부 구독자(봇, GUI 차트 등)에게 이벤트를 전달합니다.
+
+- 구독자(consumer)마다 필요한 심볼을 등록하면 (참조 카운트),
+  허브는 모든 구독자의 합집합만 업비트에 구독합니다.
+- 구독 목록이 바뀌어도 재연결하지 않고, 같은 연결에 새 구독 메시지만 보냅니다.
+  (업비트는 같은 연결에서 새 구독 메시지를 받으면 기존 구독을 대체함)
+- 연결이 끊기면 지수 백오프로 재연결하며, 'status' 이벤트로 연결 상태를 알립니다.
+- 리스너마다 전용 큐와 태스크가 있어, 수신 루프는 큐에 넣기만 하고 바로 다음 메시지를 읽습니다.
+  (느린 리스너(GUI 전송 등)는 자기 큐만 밀리고 다른 리스너/수신은 영향 없음 - 리스너별 순서는 유지)
+  큐가 가득 차면 가장 오래된 이벤트를 버리고 경고를 남깁니다.
+"""
+import asyncio
+import inspect
+import json
+import uuid
+import websockets
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ai_trader.utils.logger import setup_logger
+
+# (업비트 WebSocket 구독 타입)
+STREAM_TYPES: Tuple[str, ...] = ("ticker", "trade", "orderbook")
+
+# (리스너 콜백: 이벤트 dict를 받음. 동기 함수 또는 코루틴 함수 모두 허용)
+Listener = Callable[[Dict[str, Any]], Any]
+
+class _ListenerQueue:
+    """ 리스너 1개의 전용 큐 + 전달 태스크 """
+
+    def __init__(self, stream: str, callback: Listener, maxsize: int, logger):
+        self.stream = stream
+        self.callback = callback
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.logger = logger
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def put(self, data: Dict[str, Any]):
+        """ (수신 루프에서 호출 - 기다리지 않음) 가득 차면 가장 오래된 이벤트를 버림 """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                self.logger.warning(
+                    f"[{self.stream}] 리스너 {getattr(self.callback, '__qualname__', self.callback)} 처리 지연 "
+                    f"- 오래된 이벤트 누적 {self.dropped}개 버림"
+                )
+        self.queue.put_nowait(data)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            data = await self.queue.get()
+            try:
+                result = self.callback(data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.logger.error(f"[{self.stream}] 리스너 처리 중 오류: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    async def stop(self, timeout: float):
+        """ 남은 이벤트를 timeout초까지 처리한 뒤 태스크 종료 """
+        if self.task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+class MarketDataHub:
+
+    UPBIT_WS_URI = "wss://api.upbit.com/websocket/v1"
+
+    RECONNECT_DELAY_MIN = 1.0 # (초)
+    RECONNECT_DELAY_MAX = 30.0 # (초)
+
+    # (짧은 시간에 여러 구독 변경이 몰리면 1번만 전송)
+    SUBSCRIBE_DEBOUNCE_SEC = 0.2
+
+    # (리스너별 큐 크기 / 종료 시 남은 이벤트 처리 대기)
+    LISTENER_QUEUE_SIZE = 10000
+    LISTENER_DRAIN_TIMEOUT_SEC = 1.0
+
+    def __init__(self):
+        self.logger = setup_logger("MarketDataHub", "athena_v1.log")
+
+        # (구독자별 구독 목록: { consumer_id: { stream_type: {symbol, ...} } })
+        self._consumers: Dict[str, Dict[str, Set[str]]] = {}
+
+        # (프로세스 내부 리스너: { stream_type 또는 'status': [callback, ...] })
+        self._listeners: Dict[str, List[_ListenerQueue]] = {s: [] for s in STREAM_TYPES + ("status",)}
+
+        # (심볼별 마지막 ticker 메시지)
+        self.last_ticker: Dict[str, Dict[str, Any]] = {}
+
+        self.connected: bool = False
+
+        self._task: Optional[asyncio.Task] = None
+        self._subscription_changed = asyncio.Event()
+        self._sent_subscription: Optional[Dict[str, Tuple[str, ...]]] = None
+
+    # --- 구독 관리 (참조 카운트) ---
+
+    def acquire(self, consumer_id: str, symbols: Iterable[str], streams: Iterable[str] = STREAM_TYPES):
+        """ 구독자(consumer_id)의 구독 목록에 심볼을 추가합니다. """
+        consumer = self._consumers.setdefault(consumer_id, {})
+        for stream in streams:
+            consumer.setdefault(stream, set()).update(symbols)
+        self._subscription_changed.set()
+
+    def release(self, consumer_id: str, symbols: Optional[Iterable[str]] = None, streams: Optional[Iterable[str]] = None):
+        """
+        구독자의 구독을 해제합니다.
+        (symbols/streams가 None이면 해당 구독자의 전체 구독을 해제)
+        """
+        consumer = self._consumers.get(consumer_id)
+        if consumer is None:
+            return
+
+        if symbols is None and streams is None:
+            del self._consumers[consumer_id]
+        else:
+            symbols_set = set(symbols) if symbols is not None else None
+            for stream in (streams if streams is not None else list(consumer.keys())):
+                if stream not in consumer:
+                    continue
+                if symbols_set is None:
+                    consumer[stream].clear()
+                else:
+                    consumer[stream] -= symbols_set
+            if not any(consumer.values()):
+                del self._consumers[consumer_id]
+
+        self._subscription_changed.set()
+
+    def set_symbols(self, consumer_id: str, symbols: Iterable[str], streams: Iterable[str] = STREAM_TYPES):
+        """ 구독자의 구독 목록을 새 심볼 목록으로 교체합니다. (GUI 차트 목록 변경용) """
+        symbols_set = set(symbols)
+        if symbols_set:
+            self._consumers[consumer_id] = {stream: set(symbols_set) for stream in streams}
+        else:
+            self._consumers.pop(consumer_id, None)
+        self._subscription_changed.set()
+
+    def symbols_for(self, stream: str, consumer_prefix: Optional[str] = None) -> Set[str]:
+        """ 특정 스트림의 구독 심볼 합집합 (consumer_prefix로 구독자 필터 가능) """
+        result: Set[str] = set()
+        for consumer_id, streams in self._consumers.items():
+            if consumer_prefix and not consumer_id.startswith(consumer_prefix):
+                continue
+            result |= streams.get(stream, set())
+        return result
+
+    def get_ref_counts(self) -> Dict[str, Dict[str, int]]:
+        """ 스트림/심볼별 참조 카운트 (몇 개의 구독자가 필요로 하는지) """
+        counts: Dict[str, Dict[str, int]] = {stream: {} for stream in STREAM_TYPES}
+        for streams in self._consumers.values():
+            for stream, symbols in streams.items():
+                for symbol in symbols:
+                    counts[stream][symbol] = counts[stream].get(symbol, 0) + 1
+        return counts
+
+    def _desired_subscription(self) -> Dict[str, Tuple[str, ...]]:
+        return {stream: tuple(sorted(self.symbols_for(stream))) for stream in STREAM_TYPES}
+
+    # --- 이벤트 리스너 (프로세스 내부 구독) ---
+
+    def add_listener(self, stream: str, callback: Listener):
+        """ stream: 'ticker' | 'trade' | 'orderbook' | 'status' (허브 실행 중에 추가해도 됨) """
+        if stream not in self._listeners:
+            raise ValueError(f"알 수 없는 스트림 타입: {stream}")
+        listener = _ListenerQueue(stream, callback, self.LISTENER_QUEUE_SIZE, self.logger)
+        self._listeners[stream].append(listener)
+        if self._task is not None:
+            listener.start()
+
+    def remove_listener(self, stream: str, callback: Listener):
+        for listener in list(self._listeners.get(stream, [])):
+            if listener.callback == callback:
+                self._listeners[stream].remove(listener)
+                if listener.task is not None:
+                    listener.task.cancel()
+
+    def get_last_price(self, symbol: str) -> Optional[float]:
+        """ 마지막 ticker의 현재가 (수신 전이면 None) """
+        ticker = self.last_ticker.get(symbol)
+        return float(ticker['trade_price']) if ticker else None
+
+    def _dispatch(self, stream: str, data: Dict[str, Any]):
+        """ 리스너별 큐에 넣기만 함 (리스너 처리를 기다리지 않음) """
+        for listener in self._listeners.get(stream, []):
+            listener.put(data)
+
+    def _set_connected(self, connected: bool):
+        if self.connected == connected:
+            return
+        self.connected = connected
+        self._dispatch("status", {"type": "status", "connected": connected})
+
+    # --- 수명 주기 ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            for listeners in self._listeners.values():
+                for listener in listeners:
+                    listener.start()
+            self._task = asyncio.create_task(self._run())
+            self.logger.info("시장 데이터 허브 시작.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # (연결 끊김 'status' 등 남은 이벤트까지 전달한 뒤 리스너 태스크 종료)
+        await asyncio.gather(*(
+            listener.stop(self.LISTENER_DRAIN_TIMEOUT_SEC)
+            for listeners in self._listeners.values() for listener in listeners
+        ))
+        self.logger.info("시장 데이터 허브 종료.")
+
+    async def _run(self):
+        delay = self.RECONNECT_DELAY_MIN
+
+        while True:
+            # (구독할 심볼이 없으면 연결하지 않고 대기)
+            if not any(self._desired_subscription().values()):
+                self._subscription_changed.clear()
+                await self._subscription_changed.wait()
+                continue
+
+            try:
+                async with websockets.connect(self.UPBIT_WS_URI) as ws:
+                    delay = self.RECONNECT_DELAY_MIN
+                    await self._send_subscription(ws)
+                    self._set_connected(True)
+
+                    reader = asyncio.create_task(self._read_loop(ws))
+                    watcher = asyncio.create_task(self._watch_subscription(ws))
+                    try:
+                        done, _ = await asyncio.wait({reader, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            task.result() # (예외 전파)
+                    finally:
+                        reader.cancel()
+                        watcher.cancel()
+
+            except asyncio.CancelledError:
+                self._set_connected(False)
+                raise
+            except websockets.exceptions.ConnectionClosed as e:
+                self.logger.warning(f"업비트 WebSocket 연결 끊김 ({delay:.0f}초 후 재연결): {e}")
+            except Exception as e:
+                self.logger.error(f"업비트 WebSocket 오류 ({delay:.0f}초 후 재연결): {e}", exc_info=True)
+
+            self._sent_subscription = None
+            self._set_connected(False)
+
+            if any(self._desired_subscription().values()):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_DELAY_MAX)
+
+    async def _send_subscription(self, ws):
+        desired = self._desired_subscription()
+
+        request: List[Dict[str, Any]] = [{"ticket": f"athena-hub-{uuid.uuid4()}"}]
+        for stream, codes in desired.items():
+            if codes:
+                request.append({"type": stream, "codes": list(codes)})
+
+        await ws.send(json.dumps(request))
+        self._sent_subscription = desired
+
+        summary = ", ".join(f"{stream} {len(codes)}개" for stream, codes in desired.items())
+        self.logger.info(f"업비트 WebSocket 구독 갱신 ({summary}).")
+
+    async def _watch_subscription(self, ws):
+        """ 구독 목록 변경을 감지하여 같은 연결에 새 구독 메시지를 보냄 """
+        while True:
+            await self._subscription_changed.wait()
+            await asyncio.sleep(self.SUBSCRIBE_DEBOUNCE_SEC)
+            self._subscription_changed.clear()
+
+            desired = self._desired_subscription()
+            if not any(desired.values()):
+                self.logger.info("구독자가 없습니다. 업비트 WebSocket 연결을 닫습니다.")
+                await ws.close()
+                return
+
+            if desired != self._sent_subscription:
+                await self._send_subscription(ws)
+
+    async def _read_loop(self, ws):
+        async for message in ws:
+            try:
+                data = json.loads(message.decode('utf-8') if isinstance(message, bytes) else message)
+            except json.JSONDecodeError:
+                self.logger.warning("업비트 WebSocket: JSON 디코딩 실패")
+                continue
+
+            stream = data.get('type')
+            if stream not in STREAM_TYPES:
+                continue
+
+            if stream == "ticker":
+                self.last_ticker[data.get('code')] = data
+
+            self._dispatch(stream, data)
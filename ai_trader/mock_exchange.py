@@ -1,12 +1,15 @@
 # Athena_v1/ai_trader/mock_exchange.py
 # [신규] 2024.11.12 - (요청) 모의 투자 (페이퍼 트레이딩) 기능
 # [수정] 2024.11.12 - (오류) 'Upbit' object has no attribute 'get_current_price' 버그 수정
+# [수정] 2024.11.16 - (성능) place_order 비동기 전환 (pyupbit 동기 현재가 조회 제거)
+# [수정] 2024.11.16 - (성능) 현재가를 PriceSnapshotService(메모리 테이블)에서 조회
+# [수정] 2024.11.17 - (요청) 로컬 호가창(OrderBookEngine)이 있으면 호가를 따라 체결 (현재가 단일 체결 대체)
+# [수정] 2024.11.17 - (요청) get_candles pass-through (CandleStore 백필)
 """
 가상 거래소 (MockExchange)
 UpbitExchange와 동일한 인터페이스(함수)를 가지지만,
 실제 주문 대신 가상의 자산(10,000,000 KRW)을 이용해 모의 투자를 실행합니다.
 """
-import pyupbit
 import asyncio
 import pandas as pd
 from typing import Optional, List, Dict, Any
@@ -14,6 +17,8 @@ import uuid # [수정] (모의 주문 ID용)
 
 # (중요) 공개(Public) API는 실제 UpbitExchange를 사용합니다.
 from ai_trader.exchange_api import UpbitExchange
+from ai_trader.price_snapshot import PriceSnapshotService
+from ai_trader.order_book import OrderBookEngine
 from ai_trader.utils.logger import setup_logger
 
 class MockExchange:
@@ -21,16 +26,22 @@ class MockExchange:
     # (가상 자산)
     STARTING_CAPITAL_KRW = 10000000.0 # (시작 자본: 천만원)
     
-    def __init__(self, access_key: str = None, secret_key: str = None):
+    def __init__(self, access_key: str = None, secret_key: str = None, 
+                 price_service: Optional[PriceSnapshotService] = None,
+                 order_book_engine: Optional[OrderBookEngine] = None):
         """
         모의 거래소 초기화
         (access_key, secret_key는 무시하지만, UpbitExchange와 인터페이스를 맞추기 위해 받음)
+        (price_service가 있으면 현재가를 메모리 스냅샷에서 조회)
+        (order_book_engine이 있으면 시장가 주문을 호가를 따라 체결 - 호가가 없으면 현재가로 체결)
         """
         self.logger = setup_logger("MockExchange", "athena_v1.log")
         
         # 1. 공개(Public) API는 실제 업비트 데이터를 사용
         # (전략 테스트는 실제 데이터를 기반으로 해야 함)
         self.public_exchange = UpbitExchange(access_key=None, secret_key=None)
+        self.price_service = price_service
+        self.order_book_engine = order_book_engine
         
         # 2. 가상 자산 (Private)
         self.mock_krw_balance = self.STARTING_CAPITAL_KRW
@@ -50,7 +61,12 @@ class MockExchange:
     async def get_ohlcv(self, symbol: str, timeframe: str = 'minutes60', count: int = 200) -> Optional[pd.DataFrame]:
         return await self.public_exchange.get_ohlcv(symbol, timeframe, count)
 
+    async def get_candles(self, symbol: str, timeframe: str = 'minute60', count: int = 200, to: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.public_exchange.get_candles(symbol, timeframe, count, to)
+
     async def get_current_price(self, symbol: str | List[str]) -> Any:
+        if self.price_service is not None:
+            return await self.price_service.get_current_price(symbol)
         return await self.public_exchange.get_current_price(symbol)
 
     # --- Private API (가상 자산 반환) ---
@@ -122,15 +138,27 @@ class MockExchange:
         """ (모의) 비-캐시 자산 조회 (get_balance와 동일하게 작동) """
         return await self.get_balance(ticker, verbose, use_cache=False)
 
+
+    def _estimate_fill(self, symbol: str, side: str, krw_amount: Optional[float] = None, volume: Optional[float] = None):
+        """ 호가 기준 예상 체결 (호가가 없거나 오래되었거나, 호가창 안에서 다 체결되지 않으면 None) """
+        if self.order_book_engine is None:
+            return None
+        book = self.order_book_engine.get(symbol)
+        if book is None:
+            return None
+        fill = book.estimate_fill(side, krw_amount=krw_amount, volume=volume)
+        if fill is None or not fill.fully_filled:
+            return None
+        return fill
             
-    def place_order(self, symbol: str, side: str, volume: float = 0, price: float = 0, order_type: str = 'limit') -> Optional[Dict[str, Any]]:
-        """ (모의) 주문 실행 (동기) """
+    async def place_order(self, symbol: str, side: str, volume: float = 0, price: float = 0, order_type: str = 'limit') -> Optional[Dict[str, Any]]:
+        """ (모의) 주문 실행 """
         
         try:
-            # [오류 수정] (self.pyupbit_public.get_current_price -> pyupbit.get_current_price)
-            current_price = pyupbit.get_current_price(symbol)
+            # [수정] (pyupbit 동기 호출 -> 공용 비동기 API)
+            current_price = await self.get_current_price(symbol)
             if not current_price:
-                raise Exception(f"현재가 조회 실패 (pyupbit.get_current_price가 None 반환)")
+                raise Exception(f"현재가 조회 실패 (get_current_price가 0 반환)")
         except Exception as e:
             self.logger.error(f"[{symbol}] (모의) 주문 실패: 현재가 조회 실패. {e}")
             return {"error": "모의 주문 실패 (현재가 조회 실패)"}
@@ -145,6 +173,11 @@ class MockExchange:
                 self.logger.warning(f"[{symbol}] (모의) 주문 실패: 잔고 부족 (요청: {total_krw_to_buy:,.0f} / 보유: {self.mock_krw_balance:,.0f})")
                 return None # (InsufficientFundsBid 시뮬레이션)
             
+            # [수정] (호가가 있으면 매도 호가를 따라 체결)
+            fill = self._estimate_fill(symbol, 'buy', krw_amount=total_krw_to_buy)
+            if fill is not None:
+                current_price = fill.avg_price
+            
             bought_volume = total_krw_to_buy / current_price
             currency = symbol.replace("KRW-", "")
             
@@ -175,6 +208,11 @@ class MockExchange:
                 self.logger.warning(f"[{symbol}] (모의) 주문 실패: 코인 수량 부족 (요청: {volume_to_sell} / 보유: {self.mock_assets.get(currency, {}).get('balance', 0)})")
                 return None 
 
+            # [수정] (호가가 있으면 매수 호가를 따라 체결)
+            fill = self._estimate_fill(symbol, 'sell', volume=volume_to_sell)
+            if fill is not None:
+                current_price = fill.avg_price
+            
             sold_value_krw = volume_to_sell * current_price
             fee = sold_value_krw * 0.0005
             
@@ -0,0 +1,211 @@
+# Athena_v1/ai_trader/order_book.py
+# [신규] 2024.11.17 - (요청) 로컬 호가창 (orderbook WebSocket 스냅샷 -> 배열 기반 호가, 예상 체결가 계산)
+"""
+로컬 호가창 (OrderBookEngine)
+
+- MarketDataHub의 'orderbook' 이벤트(업비트 호가 스냅샷, 15단계)를 받아
+  마켓별 호가를 NumPy 배열([가격, 수량] x 단계)로 보관합니다.
+- 최우선 매수/매도 호가, 스프레드, 잔량(KRW)을 메모리에서 바로 조회하고,
+  "N원어치를 시장가로 사면 평균 얼마에 체결되는가"를 호가를 따라 내려가며(book walk) 계산합니다.
+- RiskManager(유동성 기반 진입 규모), MockExchange(호가 기반 모의 체결)에서 REST 호출 없이 사용합니다.
+"""
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ai_trader.utils.logger import setup_logger
+
+_PRICE = 0
+_SIZE = 1
+
+@dataclass
+class FillEstimate:
+    """ 시장가 주문의 예상 체결 결과 (호가 기준) """
+    side: str # ('buy' | 'sell')
+    avg_price: float # (평균 체결가)
+    volume: float # (체결 수량 - 코인)
+    krw_amount: float # (체결 금액 - KRW)
+    worst_price: float # (마지막으로 닿은 호가)
+    levels_used: int # (사용한 호가 단계 수)
+    fully_filled: bool # (호가창 안에서 전부 체결되는지)
+
+    def slippage_pct(self, reference_price: float) -> float:
+        """ 기준가(예: 최우선 호가) 대비 평균 체결가 차이 (%) - 불리한 방향이 양수 """
+        if reference_price <= 0:
+            return 0.0
+        diff = self.avg_price - reference_price if self.side == 'buy' else reference_price - self.avg_price
+        return diff / reference_price * 100.0
+
+class OrderBook:
+    """ 마켓 1개의 호가 스냅샷 (asks: 가격 오름차순, bids: 가격 내림차순) """
+
+    __slots__ = ('market', 'asks', 'bids', 'timestamp_ms', 'received_at')
+
+    def __init__(self, market: str, asks: np.ndarray, bids: np.ndarray, timestamp_ms: int):
+        self.market = market
+        self.asks = asks # (float64[n, 2]: [가격, 수량])
+        self.bids = bids
+        self.timestamp_ms = timestamp_ms
+        self.received_at = time.monotonic()
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "OrderBook":
+        """ 업비트 orderbook 메시지 -> OrderBook """
+        units = data.get('orderbook_units') or []
+        levels = np.array(
+            [(u['ask_price'], u['ask_size'], u['bid_price'], u['bid_size']) for u in units],
+            dtype='float64'
+        ).reshape(-1, 4)
+        asks = levels[:, 0:2]
+        bids = levels[:, 2:4]
+        # (업비트는 1단계부터 최우선 호가 순으로 주지만, 정렬을 보장하기 위해 확인)
+        if len(asks) > 1 and np.any(np.diff(asks[:, _PRICE]) < 0):
+            asks = asks[np.argsort(asks[:, _PRICE])]
+        if len(bids) > 1 and np.any(np.diff(bids[:, _PRICE]) > 0):
+            bids = bids[np.argsort(-bids[:, _PRICE])]
+        # (수량 0인 단계 제외)
+        asks = np.ascontiguousarray(asks[asks[:, _SIZE] > 0])
+        bids = np.ascontiguousarray(bids[bids[:, _SIZE] > 0])
+        return cls(data.get('code'), asks, bids, int(data.get('timestamp', 0)))
+
+    # --- 조회 ---
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return float(self.asks[0, _PRICE]) if len(self.asks) else None
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return float(self.bids[0, _PRICE]) if len(self.bids) else None
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        if not len(self.asks) or not len(self.bids):
+            return None
+        return (self.best_ask + self.best_bid) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        if not len(self.asks) or not len(self.bids):
+            return None
+        return self.best_ask - self.best_bid
+
+    def age_sec(self) -> float:
+        return time.monotonic() - self.received_at
+
+    def depth_krw(self, side: str, max_slippage_pct: Optional[float] = None) -> float:
+        """
+        한쪽 호가 잔량 합계 (KRW)
+        (side='buy'는 매도 호가(asks), 'sell'은 매수 호가(bids) / max_slippage_pct가 있으면 최우선 호가 대비 그 범위 안만)
+        """
+        levels = self.asks if side == 'buy' else self.bids
+        if not len(levels):
+            return 0.0
+        if max_slippage_pct is not None:
+            best = levels[0, _PRICE]
+            if side == 'buy':
+                levels = levels[levels[:, _PRICE] <= best * (1 + max_slippage_pct / 100.0)]
+            else:
+                levels = levels[levels[:, _PRICE] >= best * (1 - max_slippage_pct / 100.0)]
+        return float(np.dot(levels[:, _PRICE], levels[:, _SIZE]))
+
+    def estimate_fill(self, side: str, krw_amount: Optional[float] = None, volume: Optional[float] = None) -> Optional[FillEstimate]:
+        """
+        시장가 주문의 예상 평균 체결가 (호가를 따라 내려가며 계산)
+        :param side: 'buy' (매도 호가 소진) | 'sell' (매수 호가 소진)
+        :param krw_amount: 주문 금액 (KRW) - 업비트 시장가 매수 방식
+        :param volume: 주문 수량 (코인) - 업비트 시장가 매도 방식
+        (둘 중 하나만 지정, 호가가 비어 있으면 None)
+        """
+        levels = self.asks if side == 'buy' else self.bids
+        if not len(levels) or (krw_amount is None) == (volume is None):
+            return None
+
+        prices = levels[:, _PRICE]
+        sizes = levels[:, _SIZE]
+        if krw_amount is not None:
+            target = krw_amount
+            cum = np.cumsum(prices * sizes) # (단계별 누적 금액)
+        else:
+            target = volume
+            cum = np.cumsum(sizes) # (단계별 누적 수량)
+
+        # (target을 다 채우는 첫 단계)
+        last = int(np.searchsorted(cum, target, side='left'))
+        fully_filled = last < len(levels)
+        if not fully_filled:
+            last = len(levels) - 1
+            target = float(cum[-1])
+
+        # (마지막 단계 전까지는 전량, 마지막 단계는 남은 만큼)
+        filled_before = float(cum[last - 1]) if last > 0 else 0.0
+        remaining = target - filled_before
+        full_volume = float(sizes[:last].sum())
+        full_krw = float(np.dot(prices[:last], sizes[:last]))
+        if krw_amount is not None:
+            total_krw = full_krw + remaining
+            total_volume = full_volume + remaining / prices[last]
+        else:
+            total_volume = full_volume + remaining
+            total_krw = full_krw + remaining * prices[last]
+
+        if total_volume <= 0:
+            return None
+        return FillEstimate(
+            side=side,
+            avg_price=float(total_krw / total_volume),
+            volume=float(total_volume),
+            krw_amount=float(total_krw),
+            worst_price=float(prices[last]),
+            levels_used=last + 1,
+            fully_filled=fully_filled,
+        )
+
+class OrderBookEngine:
+
+    # (이 시간(초)보다 오래된 호가는 사용하지 않음)
+    DEFAULT_MAX_AGE_SEC = 5.0
+
+    def __init__(self, max_age_sec: float = DEFAULT_MAX_AGE_SEC):
+        self.logger = setup_logger("OrderBookEngine", "athena_v1.log")
+        self.max_age_sec = max_age_sec
+        self._books: Dict[str, OrderBook] = {}
+
+    # --- 실시간 이벤트 (MarketDataHub 리스너) ---
+
+    def on_orderbook(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'orderbook' 리스너) 스냅샷으로 호가 교체 """
+        try:
+            book = OrderBook.from_message(data)
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"호가 메시지 변환 실패: {e}")
+            return
+        self._books[book.market] = book
+
+    def on_status(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'status' 리스너) 연결이 끊기면 호가를 모두 버림 (오래된 호가로 체결 계산 방지) """
+        if not data.get('connected'):
+            self._books.clear()
+
+    # --- 조회 ---
+
+    def get(self, market: str, max_age_sec: Optional[float] = None) -> Optional[OrderBook]:
+        """ 최신 호가 (없거나 오래되었으면 None) """
+        book = self._books.get(market)
+        if book is None:
+            return None
+        max_age = self.max_age_sec if max_age_sec is None else max_age_sec
+        if book.age_sec() > max_age:
+            return None
+        return book
+
+    def expected_fill_price(self, market: str, side: str, krw_amount: Optional[float] = None, volume: Optional[float] = None) -> Optional[float]:
+        """ N원(또는 N개) 시장가 주문의 예상 평균 체결가 (호가 없음/부족 시 None) """
+        book = self.get(market)
+        if book is None:
+            return None
+        estimate = book.estimate_fill(side, krw_amount=krw_amount, volume=volume)
+        if estimate is None or not estimate.fully_filled:
+            return None
+        return estimate.avg_price
@@ -8,6 +8,8 @@
 # [수정] 2024.11.12 - (오류) AttributeError: 'SignalV3_5' object has no attribute 'strategy_id' 버그 수정
 # [수정] 2024.11.14 - (Owl v1) ImportError: cannot import name 'SignalV3_5' (SignalOwlV1로 변경)
 # [수정] 2024.11.15 - (Owl v1.1) S4: 국면 전환 시 청산 (Regime Change Exit) 로직 구현
+# [수정] 2024.11.16 - (성능) place_order 비동기 전환 (await)
+# [수정] 2024.11.17 - (성능) S4 청산: 피처 프레임의 국면 재사용 (analyze_regime(df_h1.copy()) 생략)
 
 import asyncio
 import pandas as pd
@@ -22,6 +24,7 @@ from ai_trader.utils.logger import setup_logger
 
 # [신규] (Owl v1.1) S4 청산을 위한 국면 분석기 임포트
 from ai_trader.strategy.regime import analyze_regime
+from ai_trader.strategy.features import FeatureFrame
 
 class PositionManager:
     
@@ -82,7 +85,7 @@ class PositionManager:
 
         try:
             # --- 주문 실행 ---
-            order_result = self.exchange_api.place_order(
+            order_result = await self.exchange_api.place_order(
                 symbol=self.symbol,
                 side=order_side,
                 price=total_krw_to_buy,
@@ -157,18 +160,20 @@ class PositionManager:
             self.current_position = None
 
     # [수정] (Owl v1.1) (current_data: pd.Series -> df_h1: pd.DataFrame)
-    async def check_exit_conditions(self, position: Position, df_h1: pd.DataFrame):
+    # [수정] (features: FeatureStore.get() 결과 - 있으면 국면을 다시 계산하지 않음)
+    # [수정] (features는 진입 신호와 같은 봉 / 같은 커널로 만든 것이어야 함 - IndicatorEngine 값을 붙이면 진입 국면과 어긋날 수 있음)
+    async def check_exit_conditions(self, position: Position, df_h1: pd.DataFrame, features: Optional[FeatureFrame] = None):
         if not self.has_position():
             return
             
-        current_price = df_h1.iloc[-1]['close']
+        current_price = df_h1['close'].iloc[-1]
         is_long = position.position_type == "LONG"
         
         # (S4가 S1/S2보다 우선순위가 높아야 함)
 
         # --- [신규] S4: 국면 전환 시 청산 (Regime Change Exit) ---
-        # (df_h1이 국면 분석으로 인해 변경될 수 있으므로, .copy() 사용)
-        new_regime = analyze_regime(df_h1.copy()) 
+        # (피처 프레임이 없으면, df_h1이 국면 분석으로 인해 변경될 수 있으므로 .copy() 사용)
+        new_regime = features.regime if features is not None else analyze_regime(df_h1.copy())
         entry_regime = position.entry_regime
         
         if new_regime != entry_regime:
@@ -256,7 +261,7 @@ class PositionManager:
 
         try:
             # (LONG: 매도)
-            order_result = self.exchange_api.place_order(
+            order_result = await self.exchange_api.place_order(
                 symbol=self.symbol,
                 side=order_side,
                 volume=volume_or_price_arg, # (LONG: 수량 전달)
@@ -0,0 +1,140 @@
+# Athena_v1/ai_trader/price_snapshot.py
+# [신규] 2024.11.16 - (성능) 현재가 스냅샷 서비스 (메모리 테이블 + 일괄 /v1/ticker 조회 + WebSocket 반영)
+# [수정] 2024.11.17 - (오류) 일괄 갱신 후에도 max_age를 다시 확인 (갱신 실패 시 오래된 가격 반환 방지, allow_stale로만 허용)
+"""
+현재가 스냅샷 서비스 (PriceSnapshotService)
+
+- 심볼별 현재가를 메모리 테이블에 보관하고, 허용된 시간(max_age) 안의 값이면
+  HTTP 호출 없이 바로 반환합니다. (O(1) 조회)
+- MarketDataHub가 연결되어 있으면 ticker 이벤트로 테이블이 계속 갱신됩니다.
+- 오래된 값이 있으면, 지금까지 조회된 모든 마켓을 /v1/ticker 1회로 일괄 갱신합니다.
+  (갱신 후에도 오래된 값은 제외 - allow_stale=True일 때만 경고 로그와 함께 반환)
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ai_trader.exchange_api import UpbitExchange
+from ai_trader.utils.logger import setup_logger
+
+class PriceSnapshotService:
+
+    # (이 시간(초)보다 오래된 가격은 다시 조회)
+    DEFAULT_MAX_AGE_SEC = 2.0
+
+    # (백그라운드 일괄 갱신 주기(초) - WebSocket 미연결 시에만 동작)
+    REFRESH_INTERVAL_SEC = 1.0
+
+    def __init__(self, exchange: UpbitExchange, max_age_sec: float = DEFAULT_MAX_AGE_SEC):
+        self.logger = setup_logger("PriceSnapshot", "athena_v1.log")
+        self.exchange = exchange
+        self.max_age_sec = max_age_sec
+
+        # (심볼 -> (현재가, 갱신 시각(monotonic)))
+        self._prices: Dict[str, Tuple[float, float]] = {}
+
+        # (일괄 갱신 대상 마켓 - 한 번이라도 가격 조회에 성공한 심볼)
+        # (업비트는 목록에 잘못된 마켓이 하나라도 있으면 전체 요청을 거부하므로, 성공한 심볼만 추가)
+        self._markets: Set[str] = set()
+
+        # (WebSocket ticker가 들어오는 동안은 백그라운드 REST 갱신 생략)
+        self.ws_connected: bool = False
+
+        self._refresh_lock = asyncio.Lock()
+        self._refreshed_at: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # --- 실시간 이벤트 (MarketDataHub 리스너) ---
+
+    def on_ticker(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'ticker' 리스너) """
+        self._prices[data['code']] = (float(data['trade_price']), time.monotonic())
+
+    def on_status(self, data: Dict[str, Any]):
+        """ (MarketDataHub 'status' 리스너) """
+        self.ws_connected = bool(data.get('connected'))
+
+    # --- 조회 ---
+
+    def get_price(self, symbol: str, max_age_sec: Optional[float] = None) -> Optional[float]:
+        """ 메모리 테이블 조회 (없거나 오래되었으면 None) - HTTP 호출 없음 """
+        entry = self._prices.get(symbol)
+        if entry is None:
+            return None
+        max_age = self.max_age_sec if max_age_sec is None else max_age_sec
+        if time.monotonic() - entry[1] > max_age:
+            return None
+        return entry[0]
+
+    async def get_prices(self, symbols: List[str], max_age_sec: Optional[float] = None,
+                         allow_stale: bool = False) -> Dict[str, float]:
+        """
+        여러 심볼의 현재가 (오래된 값이 있으면 일괄 갱신 1회)
+        (갱신 후에도 max_age보다 오래된 심볼은 제외 - allow_stale=True면 마지막 값을 반환)
+        """
+        prices = {s: self.get_price(s, max_age_sec) for s in symbols}
+        if any(p is None for p in prices.values()):
+            await self.refresh(extra=[s for s, p in prices.items() if p is None])
+            prices = {s: self.get_price(s, max_age_sec) for s in symbols}
+
+            stale = [s for s, p in prices.items() if p is None and s in self._prices]
+            if stale:
+                now = time.monotonic()
+                ages = ", ".join(f"{s} {now - self._prices[s][1]:.1f}s" for s in stale)
+                if allow_stale:
+                    self.logger.warning(f"현재가 갱신 실패 - 오래된 가격 사용: {ages}")
+                    prices.update({s: self._prices[s][0] for s in stale})
+                else:
+                    self.logger.warning(f"현재가 갱신 실패 - 오래된 가격 제외: {ages}")
+
+        self._markets.update(s for s, p in prices.items() if p is not None)
+        return {s: p for s, p in prices.items() if p is not None}
+
+    async def get_current_price(self, symbol: str | List[str]) -> Any:
+        """ UpbitExchange.get_current_price()와 같은 반환 형식 (str -> float, list -> dict) """
+        if isinstance(symbol, list):
+            return await self.get_prices(symbol)
+        prices = await self.get_prices([symbol])
+        return prices.get(symbol, 0.0)
+
+    # --- 갱신 ---
+
+    async def refresh(self, extra: Optional[List[str]] = None):
+        """ 추적 중인 모든 마켓(+ extra)의 현재가를 /v1/ticker 1회로 일괄 갱신 """
+        # (동시에 여러 곳에서 요청해도 HTTP 호출은 1번)
+        requested_at = time.monotonic()
+        async with self._refresh_lock:
+            if self._refreshed_at >= requested_at and all(s in self._prices for s in extra or []):
+                return
+
+            markets = sorted(self._markets.union(extra or []))
+            if not markets:
+                return
+
+            price_data = await self.exchange.get_current_price(markets)
+            now = time.monotonic()
+            for market, price in price_data.items():
+                self._prices[market] = (float(price), now)
+            self._refreshed_at = now
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                if not self.ws_connected and self._markets:
+                    await self.refresh()
+            except Exception as e:
+                self.logger.error(f"현재가 일괄 갱신 실패: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL_SEC)
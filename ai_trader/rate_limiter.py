@@ -0,0 +1,245 @@
+# Athena_v1/ai_trader/rate_limiter.py
+# [신규] 2024.11.16 - (성능) 업비트 Remaining-Req 헤더 기반 요청 스케줄러 (429 방지)
+# [수정] 2024.11.17 - (오류) 우선순위를 그룹 간 공용 대기열(동시 요청 수 제한)로 적용, 헤더 그룹명을 경로 그룹으로 매핑
+"""
+업비트 REST 요청 스케줄러 (RequestScheduler)
+
+- 업비트 요청 그룹(group)마다 토큰 버킷을 두고 초당 요청 수를 제한합니다.
+- 응답의 'Remaining-Req' 헤더(예: "group=default; min=1799; sec=29")를 읽어
+  남은 요청 수에 맞춰 토큰을 줄이고, 429 응답 시 속도를 절반으로 낮췄다가
+  정상 응답이 이어지면 조금씩 원래 속도로 회복합니다 (AIMD).
+- 모든 그룹의 대기 요청은 하나의 우선순위 대기열에 있고, 동시에 진행 중인 요청 수(max_in_flight)를
+  넘지 않는 범위에서 우선순위가 높은 요청(주문 > 캔들 > 시세 > 잔고)부터 내보냅니다.
+  (그룹 토큰이 없는 요청은 건너뛰고 다음 순위 요청을 봄 - 다른 그룹 때문에 막히지 않음)
+  요청을 받은 쪽은 응답을 처리한 뒤 release()로 자리를 반납해야 합니다.
+"""
+import asyncio
+import heapq
+import itertools
+from typing import Dict, List, Optional, Set, Tuple
+
+from ai_trader.utils.logger import setup_logger
+
+# --- 우선순위 (낮을수록 먼저) ---
+PRIORITY_ORDER = 0
+PRIORITY_CANDLE = 1
+PRIORITY_QUOTATION = 2
+PRIORITY_ACCOUNT = 3
+
+# --- 업비트 그룹별 초당 요청 한도 ---
+# (Quotation: 그룹별 초당 10회 / Exchange: 주문 초당 8회, 그 외 초당 30회)
+DEFAULT_GROUP_LIMITS: Dict[str, float] = {
+    "market": 10,
+    "candles": 10,
+    "ticker": 10,
+    "orderbook": 10,
+    "crix-trades": 10,
+    "order": 8,
+    "default": 30,
+}
+UNKNOWN_GROUP_LIMIT = 10
+
+# (동시에 진행 중인 요청 수 상한 - 넘으면 우선순위 순으로 대기)
+DEFAULT_MAX_IN_FLIGHT = 8
+
+def route_request(method: str, path: str) -> Tuple[str, int]:
+    """ (HTTP 메서드, API 경로) -> (업비트 요청 그룹, 우선순위) """
+    # (/v1/orderbook은 시세 그룹 - "/v1/order" 접두어로 비교하면 안 됨)
+    if path in ("/v1/order", "/v1/orders") or path.startswith("/v1/orders/"):
+        if method != "GET":
+            return "order", PRIORITY_ORDER
+        return "default", PRIORITY_ACCOUNT
+    if path.startswith("/v1/candles"):
+        return "candles", PRIORITY_CANDLE
+    if path.startswith("/v1/market"):
+        return "market", PRIORITY_QUOTATION
+    if path.startswith("/v1/ticker"):
+        return "ticker", PRIORITY_QUOTATION
+    if path.startswith("/v1/orderbook"):
+        return "orderbook", PRIORITY_QUOTATION
+    if path.startswith("/v1/trades"):
+        return "crix-trades", PRIORITY_QUOTATION
+    return "default", PRIORITY_ACCOUNT
+
+def parse_remaining_req(header: Optional[str]) -> Optional[Tuple[str, int]]:
+    """ 'group=default; min=1799; sec=29' -> ('default', 29) """
+    if not header:
+        return None
+    try:
+        fields = dict(
+            part.strip().split("=", 1)
+            for part in header.split(";")
+            if "=" in part
+        )
+        return fields["group"], int(fields["sec"])
+    except (KeyError, ValueError):
+        return None
+
+class TokenBucket:
+    """ 초당 rate개 토큰이 채워지는 버킷 (용량 = 1초치) """
+
+    # (429 이후 회복 단계: 정상 응답마다 rate에 더하는 값)
+    RECOVERY_STEP = 0.5
+    MIN_RATE = 1.0
+
+    def __init__(self, rate: float, now: float):
+        self.nominal_rate = float(rate)
+        self.rate = float(rate)
+        self.tokens = float(rate)
+        self.updated = now
+        self.hold_until = 0.0
+
+    def _refill(self, now: float):
+        start = max(self.updated, self.hold_until)
+        if now > start:
+            self.tokens = min(self.rate, self.tokens + (now - start) * self.rate)
+        self.updated = max(self.updated, now)
+
+    def time_until_token(self, now: float) -> float:
+        self._refill(now)
+        if now < self.hold_until:
+            return self.hold_until - now
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1.0
+
+    def on_remaining(self, remaining_sec: int, now: float):
+        """ 서버가 알려준 이번 1초의 남은 요청 수로 토큰을 맞춤 """
+        self._refill(now)
+        self.tokens = min(self.tokens, float(remaining_sec))
+        if remaining_sec <= 0:
+            self.hold_until = max(self.hold_until, now + 1.0)
+        elif self.rate < self.nominal_rate:
+            self.rate = min(self.nominal_rate, self.rate + self.RECOVERY_STEP)
+
+    def on_throttled(self, now: float):
+        """ 429 응답: 1초 대기 + 속도 절반 """
+        self.tokens = 0.0
+        self.hold_until = max(self.hold_until, now + 1.0)
+        self.rate = max(self.MIN_RATE, self.rate / 2)
+
+class RequestScheduler:
+
+    def __init__(self, group_limits: Optional[Dict[str, float]] = None, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        self.logger = setup_logger("RateLimiter", "athena_v1.log")
+        self.group_limits = dict(DEFAULT_GROUP_LIMITS if group_limits is None else group_limits)
+        self.max_in_flight = max_in_flight
+        self._buckets: Dict[str, TokenBucket] = {}
+        # (전체 그룹 공용 대기열: (우선순위, 순번, 그룹, future))
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.in_flight = 0
+
+        # (모니터링용)
+        self.throttled_count: Dict[str, int] = {}
+        self._unknown_header_groups: Set[str] = set()
+
+    def _bucket(self, group: str) -> TokenBucket:
+        bucket = self._buckets.get(group)
+        if bucket is None:
+            rate = self.group_limits.get(group, UNKNOWN_GROUP_LIMIT)
+            bucket = TokenBucket(rate, asyncio.get_running_loop().time())
+            self._buckets[group] = bucket
+        return bucket
+
+    async def acquire(self, group: str, priority: int = PRIORITY_ACCOUNT):
+        """ 그룹 토큰 1개 + 진행 중 요청 자리 1개를 받을 때까지 대기 (우선순위 순) - 응답 후 release() 필수 """
+        loop = asyncio.get_running_loop()
+        bucket = self._bucket(group)
+
+        if not self._waiters and self.in_flight < self.max_in_flight and bucket.time_until_token(loop.time()) == 0.0:
+            bucket.take()
+            self.in_flight += 1
+            return
+
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), group, future))
+        self._drain()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # (자리를 받은 직후 취소되면 반납)
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """ 요청 완료 (응답 처리 후) - 진행 중 요청 자리 반납 """
+        self.in_flight = max(0, self.in_flight - 1)
+        if self._waiters:
+            self._drain()
+
+    def _drain(self):
+        """ 우선순위 순으로 자리/토큰이 있는 요청을 내보내고, 토큰을 기다리는 그룹이 있으면 타이머 예약 """
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = loop.time()
+        remaining = []
+        next_wait: Optional[float] = None
+        for entry in sorted(self._waiters):
+            future = entry[3]
+            if future.done(): # (대기 중 취소된 요청)
+                continue
+            if self.in_flight >= self.max_in_flight:
+                remaining.append(entry)
+                continue
+            bucket = self._bucket(entry[2])
+            wait = bucket.time_until_token(now)
+            if wait > 0:
+                remaining.append(entry)
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+                continue
+            bucket.take()
+            self.in_flight += 1
+            future.set_result(None)
+
+        self._waiters = remaining
+        heapq.heapify(self._waiters)
+        # (자리가 비면 release()가 다시 호출하므로 토큰 대기만 타이머로)
+        if next_wait is not None and self.in_flight < self.max_in_flight:
+            self._timer = loop.call_later(next_wait, self._drain)
+
+    def on_response(self, group: str, status: int, remaining_req: Optional[str] = None):
+        """ 응답 헤더/상태 코드를 반영하여 그룹의 요청 속도를 조정 (group: route_request()의 그룹) """
+        now = asyncio.get_running_loop().time()
+        parsed = parse_remaining_req(remaining_req)
+        if parsed and parsed[0] != group:
+            # (헤더 그룹명이 경로 그룹과 다르면 알려진 그룹일 때만 따름 - 모르는 이름으로 새 버킷을 만들지 않음)
+            if parsed[0] in self.group_limits:
+                group = parsed[0]
+            elif parsed[0] not in self._unknown_header_groups:
+                self._unknown_header_groups.add(parsed[0])
+                self.logger.warning(f"알 수 없는 Remaining-Req 그룹 '{parsed[0]}' -> '{group}' 그룹으로 처리합니다.")
+        bucket = self._bucket(group)
+
+        if status == 429:
+            bucket.on_throttled(now)
+            self.throttled_count[group] = self.throttled_count.get(group, 0) + 1
+            self.logger.warning(f"[{group}] 429 Too Many Requests. 속도 조정: 초당 {bucket.rate:.1f}회")
+        elif parsed:
+            bucket.on_remaining(parsed[1], now)
+
+        if self._waiters:
+            self._drain()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        waiting: Dict[str, int] = {}
+        for _, _, group, future in self._waiters:
+            if not future.done():
+                waiting[group] = waiting.get(group, 0) + 1
+        return {
+            group: {
+                "rate": bucket.rate,
+                "nominal_rate": bucket.nominal_rate,
+                "waiting": waiting.get(group, 0),
+                "throttled": self.throttled_count.get(group, 0),
+            }
+            for group, bucket in self._buckets.items()
+        }
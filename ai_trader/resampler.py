@@ -0,0 +1,175 @@
+# Athena_v1/ai_trader/resampler.py
+# [신규] 2024.11.17 - (성능) 멀티 타임프레임 리샘플러 (1분봉 기준 시리즈에서 5분/15분/H1/H4/일봉 파생, 업비트 KST 봉 경계)
+"""
+멀티 타임프레임 리샘플러 (MultiTimeframeResampler)
+
+심볼 1개의 1분봉(기준 시리즈)과 상위 봉 시리즈를 함께 관리합니다.
+
+- 봉 경계: 업비트 분/시간 봉은 UTC epoch 기준 배수이고, 일봉은 KST 09:00(= UTC 00:00) 시작이므로
+  모든 타임프레임의 버킷 시작 = ms - ms % (봉 길이) 입니다. (H4: KST 01/05/09/13/17/21시)
+- REST로 받은 시리즈(seed)는 그대로 보관하고, 그 이후의 체결은 모든 시리즈에 누적(롤업)합니다.
+  (OHLCV 병합은 결합법칙이 성립하므로 1분봉을 합친 결과와 동일)
+- REST로 받지 않은 타임프레임은, 봉 길이가 그 타임프레임을 나누어떨어지는 시리즈 중
+  가장 오래된 구간까지 덮는 시리즈(원본)에서 한 번에 묶어 만들고(derive), 이후에는 체결로 이어서 갱신합니다.
+  (예: 1분봉 1440개 -> 5분/15분봉, H1 200개 -> H4/일봉 / 원본 첫 봉이 버킷 중간이면 그 버킷은 제외)
+- 원본이 다시 seed되면 파생 시리즈는 버리고, 다음 조회 때 다시 만듭니다.
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from ai_trader.data_manager import TIMEFRAME_MINUTES
+
+# (봉 1개: [open, high, low, close, volume])
+Bar = List[float]
+
+BASE_TIMEFRAME = "minute1"
+
+def bar_ms(timeframe: str) -> int:
+    return TIMEFRAME_MINUTES[timeframe] * 60000
+
+def bucket_start(ms: int, timeframe: str) -> int:
+    """ 시각(UTC epoch ms)이 속한 봉의 시작 시각 (업비트 KST 봉 경계와 같음) """
+    size = bar_ms(timeframe)
+    return ms - ms % size
+
+def merge_trade(bars: Dict[int, Bar], bucket: int, price: float, volume: float) -> bool:
+    """ 체결 1건을 버킷 봉에 누적합니다. (새 봉이 생성되면 True) """
+    bar = bars.get(bucket)
+    if bar is None:
+        bars[bucket] = [price, price, price, price, volume]
+        return True
+    if price > bar[1]:
+        bar[1] = price
+    if price < bar[2]:
+        bar[2] = price
+    bar[3] = price
+    bar[4] += volume
+    return False
+
+def resample_bars(buckets: np.ndarray, values: np.ndarray, timeframe: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    시간 오름차순 봉 (시작 ms, OHLCV) -> timeframe 봉 (벡터 계산)
+    (첫 봉이 버킷 시작이 아니면 그 버킷은 일부만 있으므로 제외)
+    """
+    buckets = np.asarray(buckets, dtype='int64')
+    values = np.asarray(values, dtype='float64').reshape(-1, 5)
+    if not len(buckets):
+        return np.empty(0, dtype='int64'), np.empty((0, 5))
+
+    target = buckets - buckets % bar_ms(timeframe)
+    starts = np.flatnonzero(np.r_[True, target[1:] != target[:-1]])
+    ends = np.r_[starts[1:], len(target)] - 1
+
+    out = np.empty((len(starts), 5))
+    out[:, 0] = values[starts, 0]
+    out[:, 1] = np.maximum.reduceat(values[:, 1], starts)
+    out[:, 2] = np.minimum.reduceat(values[:, 2], starts)
+    out[:, 3] = values[ends, 3]
+    out[:, 4] = np.add.reduceat(values[:, 4], starts)
+
+    out_buckets = target[starts]
+    if buckets[0] != out_buckets[0]:
+        out_buckets, out = out_buckets[1:], out[1:]
+    return out_buckets, out
+
+class MultiTimeframeResampler:
+    """ 심볼 1개의 1분봉 + 상위 봉 시리즈 """
+
+    def __init__(self, max_bars: int = 2000, max_base_bars: int = 1440):
+        self.max_bars = max_bars
+        self.max_base_bars = max_base_bars
+
+        # ({ 타임프레임: { 버킷 시작 ms: bar } } - 1분봉은 항상 보유)
+        self._series: Dict[str, Dict[int, Bar]] = {BASE_TIMEFRAME: {}}
+        # (REST로 받은 시리즈: 이 시각(ms) 이전의 체결은 REST 캔들에 이미 포함됨)
+        self._cutoff_ms: Dict[str, int] = {}
+        # (파생 시리즈 -> 원본 타임프레임)
+        self._sources: Dict[str, str] = {}
+
+    def is_seeded(self, timeframe: str) -> bool:
+        return timeframe in self._cutoff_ms
+
+    def source_of(self, timeframe: str) -> Optional[str]:
+        """ 시리즈의 원본 (REST로 받은 시리즈는 자기 자신, 파생 시리즈는 원본, 없으면 None) """
+        if timeframe in self._sources:
+            return self._sources[timeframe]
+        if timeframe in self._series:
+            return timeframe
+        return None
+
+    # --- 갱신 ---
+
+    def seed(self, timeframe: str, buckets: List[int], values: List[Bar], cutoff_ms: int):
+        """ REST 캔들로 시리즈를 초기화/재동기화 (이 시리즈에서 만든 파생 시리즈는 버림) """
+        self._series[timeframe] = dict(zip(buckets, values))
+        self._cutoff_ms[timeframe] = cutoff_ms
+        self._sources.pop(timeframe, None)
+        for derived, source in list(self._sources.items()):
+            if source == timeframe:
+                self.drop(derived)
+
+    def drop(self, timeframe: str):
+        if timeframe == BASE_TIMEFRAME:
+            self._series[BASE_TIMEFRAME] = {}
+        else:
+            self._series.pop(timeframe, None)
+        self._cutoff_ms.pop(timeframe, None)
+        self._sources.pop(timeframe, None)
+
+    def add_trade(self, trade_ms: int, price: float, volume: float):
+        """ 체결 1건을 모든 시리즈에 누적 (REST 조회 시각 이전 체결은 해당 시리즈에서 건너뜀) """
+        for timeframe, bars in self._series.items():
+            if trade_ms < self._cutoff_ms.get(self._sources.get(timeframe, timeframe), 0):
+                continue
+            if merge_trade(bars, bucket_start(trade_ms, timeframe), price, volume):
+                self._trim(bars, self.max_base_bars if timeframe == BASE_TIMEFRAME else self.max_bars)
+
+    def derive(self, timeframe: str) -> bool:
+        """ 보유하지 않은 타임프레임을 원본 시리즈에서 만듭니다. (이미 있거나 만들었으면 True) """
+        if timeframe in self._series:
+            return True
+        source = self._best_source(timeframe)
+        if source is None:
+            return False
+
+        bars = self._series[source]
+        buckets = sorted(bars)
+        out_buckets, out = resample_bars(np.array(buckets, dtype='int64'), np.array([bars[b] for b in buckets]), timeframe)
+        self._series[timeframe] = dict(zip(out_buckets.tolist(), out.tolist()))
+        self._sources[timeframe] = source
+        self._trim(self._series[timeframe], self.max_bars)
+        return True
+
+    def _best_source(self, timeframe: str) -> Optional[str]:
+        """ 봉 길이가 timeframe을 나누어떨어지는 시리즈 중 가장 오래 전부터 덮는 것 (같으면 짧은 봉) """
+        minutes = TIMEFRAME_MINUTES[timeframe]
+        best, best_key = None, None
+        for source, bars in self._series.items():
+            if source in self._sources or not bars:
+                continue
+            source_minutes = TIMEFRAME_MINUTES[source]
+            if source_minutes >= minutes or minutes % source_minutes:
+                continue
+            key = (-min(bars), source_minutes)
+            if best_key is None or key > best_key:
+                best, best_key = source, key
+        return best
+
+    # --- 조회 ---
+
+    def bar_count(self, timeframe: str) -> int:
+        return len(self._series.get(timeframe, ()))
+
+    def bars(self, timeframe: str, count: int) -> Tuple[List[int], List[Bar]]:
+        """ 최근 count개 (버킷 시작 ms 목록, 봉 목록) - 보유하지 않은 타임프레임은 먼저 derive """
+        if not self.derive(timeframe):
+            return [], []
+        series = self._series[timeframe]
+        buckets = sorted(series)[-count:]
+        return buckets, [series[b] for b in buckets]
+
+    @staticmethod
+    def _trim(bars: Dict[int, Bar], max_len: int):
+        if len(bars) > max_len:
+            for bucket in sorted(bars)[:len(bars) - max_len]:
+                del bars[bucket]
@@ -4,6 +4,8 @@
 # [수정] 2024.11.14 - (Owl v1) ImportError: cannot import name 'SignalV3_5' (SignalOwlV1로 변경)
 # [수정] 2024.11.14 - (Owl v1) 리팩토링 (SL/TP를 SignalEngine에서 수신)
 # [수정] 2024.11.14 - (Owl v1) Phase 3 (동적 리스크 관리) 로직 구현
+# [수정] 2024.11.17 - (요청) 로컬 호가창(OrderBook)이 있으면 예상 체결가/호가 잔량 기준으로 규모 계산
+# [수정] 2024.11.17 - (요청) 리스크 배율 계산을 risk_multiplier()로 분리 (백테스터와 공유)
 """
 Strategy Owl v1 - Phase 3: 동적 리스크 및 포지션 규모 계산
 
@@ -12,14 +14,20 @@ Phase 3(동적 리스크)를 적용하여 최종 포지션 규모(SignalOwlV1)
 """
 from ai_trader.utils.logger import setup_logger
 from ai_trader.data_models import SignalOwlV1, MarketRegime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, TYPE_CHECKING
 import math
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from ai_trader.order_book import OrderBook
+
 class RiskManager:
     
     UPBIT_FEE_BUFFER = 0.001 # (0.1%)
     
+    # [신규] (호가 기반 규모 제한: 최우선 호가 대비 이 범위(%) 안의 잔량까지만 진입)
+    MAX_SLIPPAGE_PCT = 0.5
+    
     def __init__(self, 
                  total_capital: float, 
                  base_risk_per_trade_pct: float = 0.5):
@@ -34,11 +42,39 @@ class RiskManager:
         
         self.logger.info(f"RiskManager 초기화: 총 자본금 {total_capital:,.0f} KRW, 기본 리스크 {self.base_risk_amount:,.0f} KRW ({base_risk_per_trade_pct}%)")
 
+    @staticmethod
+    def risk_multiplier(regime: Optional[MarketRegime], score: int) -> float:
+        """ (Phase 3) 국면 / 점수 기반 리스크 배율 (백테스터와 공유) """
+        
+        # 2-1. (국면 기반)
+        if regime == "BULL" or regime == "BEAR":
+            # (강한 추세 확인 시 - TODO: HTF Confluence)
+            regime_risk_multiplier = 1.0 # (임시 1.0배)
+        elif regime == "RANGE":
+            # (횡보 국면)
+            regime_risk_multiplier = 0.8 # (0.8배)
+        else:
+            regime_risk_multiplier = 1.0
+
+        # 2-2. (v3.5 레거시 점수 기반)
+        if score >= 18:
+            score_risk_multiplier = 1.5 
+        elif score >= 16:
+            score_risk_multiplier = 1.2
+        elif score <= 13:
+            score_risk_multiplier = 0.8
+        else:
+            score_risk_multiplier = 1.0 
+
+        # (최종 리스크 배율: 두 배율 중 '더 보수적인(낮은)' 값을 선택)
+        return min(regime_risk_multiplier, score_risk_multiplier)
+
     # [수정] (Owl v1) (SL/TP를 SignalEngine으로부터 수신)
     def calculate_position_size(self, 
                                 signal_data: Dict[str, Any], 
                                 current_price: float,
-                                krw_balance: float) -> Optional[SignalOwlV1]:
+                                krw_balance: float,
+                                order_book: Optional["OrderBook"] = None) -> Optional[SignalOwlV1]:
         """
         Phase 3: 동적 리스크 및 포지션 규모 계산
         
@@ -46,6 +82,8 @@ class RiskManager:
                             (regime, tactic, sl_price, tp_price 등 포함)
         :param current_price: 현재가 (진입가 계산용)
         :param krw_balance: 현재 보유 KRW (주문 가능 금액)
+        :param order_book: [신규] 로컬 호가창 (있으면 진입가 = 호가 기준 예상 평균 체결가,
+                           진입 규모 = 최우선 호가 대비 MAX_SLIPPAGE_PCT 안의 잔량 이내)
         """
         
         try:
@@ -61,29 +99,7 @@ class RiskManager:
             score = signal_data.get('score', 12) # (점수 없으면 12점)
 
             # --- 2. [신규] (Phase 3) 동적 리스크 조절 ---
-            
-            # 2-1. (국면 기반)
-            if regime == "BULL" or regime == "BEAR":
-                # (강한 추세 확인 시 - TODO: HTF Confluence)
-                regime_risk_multiplier = 1.0 # (임시 1.0배)
-            elif regime == "RANGE":
-                # (횡보 국면)
-                regime_risk_multiplier = 0.8 # (0.8배)
-            else:
-                regime_risk_multiplier = 1.0
-
-            # 2-2. (v3.5 레거시 점수 기반)
-            if score >= 18:
-                score_risk_multiplier = 1.5 
-            elif score >= 16:
-                score_risk_multiplier = 1.2
-            elif score <= 13:
-                score_risk_multiplier = 0.8
-            else:
-                score_risk_multiplier = 1.0 
-
-            # (최종 리스크 배율: 두 배율 중 '더 보수적인(낮은)' 값을 선택)
-            risk_multiplier = min(regime_risk_multiplier, score_risk_multiplier)
+            risk_multiplier = self.risk_multiplier(regime, score)
             
             # (최종 손실 확정 금액)
             loss_amount_krw = self.base_risk_amount * risk_multiplier
@@ -104,6 +120,30 @@ class RiskManager:
             
             # 3-4. (LONG/SHORT 공통) 총 투입 금액 (KRW)
             total_position_size_krw = final_volume_coin * avg_entry_price
+            
+            # 3-5. [신규] (호가 기반) 예상 체결가로 다시 계산 + 유동성 한도
+            if order_book is not None:
+                side = 'buy' if signal_data.get('signal_type', "LONG") == "LONG" else 'sell'
+                liquidity_krw = order_book.depth_krw(side, self.MAX_SLIPPAGE_PCT)
+                if total_position_size_krw > liquidity_krw:
+                    self.logger.warning(f"포지션 규모 축소: 호가 잔량({liquidity_krw:,.0f}원, 슬리피지 {self.MAX_SLIPPAGE_PCT}% 이내) 초과")
+                    total_position_size_krw = liquidity_krw
+                
+                estimate = order_book.estimate_fill(side, krw_amount=total_position_size_krw)
+                if estimate is not None:
+                    avg_entry_price = estimate.avg_price
+                    loss_per_coin = abs(avg_entry_price - sl_price)
+                    if loss_per_coin <= 0:
+                        raise ValueError(f"1주당 손실액이 0 이하입니다 (예상 체결가: {avg_entry_price}, SL: {sl_price}).")
+                    
+                    final_volume_coin = loss_amount_krw / loss_per_coin
+                    total_position_size_krw = min(final_volume_coin * avg_entry_price, liquidity_krw)
+                    final_volume_coin = total_position_size_krw / avg_entry_price
+                    self.logger.info(f"  > 호가 기준 예상 체결가: {avg_entry_price:,.2f} (현재가 {current_price:,.2f}, {estimate.levels_used}단계)")
+                
+                if total_position_size_krw < 5000:
+                    self.logger.error(f"진입 취소: 호가 잔량 기준 진입 금액({total_position_size_krw:,.0f}원)이 최소 주문 금액(5,000원) 미만입니다.")
+                    return None
 
             # --- 4. 잔고 확인 ---
             if total_position_size_krw > krw_balance:
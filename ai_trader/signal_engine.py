@@ -5,6 +5,13 @@
 # [수정] 2024.11.14 - (오류) ImportError: cannot import name 'find_bullish_ob_v3_5' (오타 수정)
 # [수정] 2024.11.14 - (Owl v1) Tactic 3 (Range Bounce) 구현
 # [수정] 2024.11.14 - (Owl v1) RiskManager 리팩토링 (SL/TP를 SignalEngine에서 계산)
+# [수정] 2024.11.17 - (성능) IndicatorEngine(증분 지표) 결과를 받아 국면 분석/패턴 탐색에서 재사용
+# [수정] 2024.11.17 - (성능) calculate_pivots(전체 재계산) -> 심볼별 PivotTracker(증분 피벗)
+# [수정] 2024.11.17 - (성능) 심볼별 OrderBlockIndex (새 봉만 OB 스캔, 현재가 포함 OB 조회)
+# [수정] 2024.11.17 - (성능) 피처 프레임(FeatureFrame)을 받아 국면/전술이 같은 지표를 공유 (df 복사 없음)
+# [신규] 2024.11.17 - (성능) 평가 메모 (마지막 확정 봉 + 미완성 봉 OHLC가 같으면 국면/전술 재평가 생략, 적중/실패 카운터)
+# [신규] 2024.11.17 - (성능) 전체 마켓 일괄 평가 generate_signals_batch (3차원 NumPy 패널)
+# [수정] 2024.11.17 - (요청) 메모 키를 모듈 함수 evaluation_memo_key로 분리, 카운터는 record_memo() (EvaluationExecutor와 공유)
 """
 Strategy Owl v1 - Phase 2: 국면별 진입 신호 분석 (Tactical Signal Analysis)
 
@@ -14,36 +21,151 @@ Phase 1(Regime)의 분석 결과를 받아, 3가지 전술(Bull, Bear, Range) 
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 # [신규] (Owl v1) Phase 1 국면 분석기 임포트
 from ai_trader.strategy.regime import analyze_regime, MarketRegime
 # (v3.5 레거시 임포트)
-from ai_trader.strategy.context import calculate_pivots
+from ai_trader.strategy.context import PivotTracker
+from ai_trader.strategy.order_block import OrderBlockIndex
 from ai_trader.strategy.patterns import (
     find_bullish_ob, 
     find_w_pattern, 
     find_rsi_divergence,
     find_bollinger_bounce_long # [신규] (Tactic 3)
 )
+from ai_trader.strategy.features import FeatureFrame
+from ai_trader.strategy.panel import build_panel, evaluate_panel
 from ai_trader.utils.logger import setup_logger
 
+def evaluation_memo_key(index: pd.Index, last_ohlc) -> Optional[Tuple]:
+    """
+    평가 메모 키 (봉 개수, 마지막 확정 봉 시각, 미완성 봉 O/H/L/C) - 봉이 2개 미만이면 None (메모 안 함)
+    (SignalEngineOwlV1 / EvaluationExecutor가 같은 키 사용)
+    """
+    if len(index) < 2:
+        return None
+    return (len(index), index[-2].value, *(float(v) for v in last_ohlc))
+
 class SignalEngineOwlV1:
 
+    # (v3.5 피벗 기준: 좌 10봉 / 우 5봉)
+    PIVOT_LEFT = 10
+    PIVOT_RIGHT = 5
+
+    # [신규] (평가 메모 적중/실패 횟수 - 모든 봇(엔진 인스턴스) 합계)
+    memo_hits = 0
+    memo_misses = 0
+
     def __init__(self):
         self.logger = setup_logger("SignalEngineOwlV1", "athena_v1.log")
         self.logger.info("--- Strategy Owl v1 (Signal Engine) 초기화 ---")
 
-    def generate_signal_owl(self, df_h1: pd.DataFrame, symbol: str) -> Optional[Dict[str, Any]]:
+        # [신규] (심볼별 마지막 평가: (메모 키, 결과))
+        self._memo: Dict[str, Tuple[Tuple, Optional[Dict[str, Any]]]] = {}
+
+        # [신규] (심볼별 증분 피벗 상태)
+        self.pivot_trackers: Dict[str, PivotTracker] = {}
+        # [신규] (심볼별 OB 구간 인덱스)
+        self.ob_indexes: Dict[str, OrderBlockIndex] = {}
+
+    def generate_signal_owl(self, df_h1: pd.DataFrame, symbol: str, indicators: Optional[Dict[str, np.ndarray]] = None, features: Optional[FeatureFrame] = None) -> Optional[Dict[str, Any]]:
         """
         Owl v1 전략의 메인 진입점 (Phase 1 -> Phase 2)
         
         1. (Phase 1) H1 차트를 분석하여 현재 시장 국면(Regime)을 판독합니다.
         2. (Phase 2) 국면에 맞는 전술(Tactic)을 실행하여 신호를 생성합니다.
+        
+        [신규] indicators: IndicatorEngine.update_frame() 결과 (EMA/BBands/RSI 최근 값)
+               (features가 없을 때 피처 프레임을 만드는 데 사용 - 지표 재계산 생략)
+        [신규] features: FeatureStore.get() 결과 (있으면 df_h1 대신 사용 / 읽기 전용으로 공유)
+        [신규] (심볼, 마지막 확정 봉 시각, 미완성 봉 OHLC)가 직전 평가와 같으면 재평가 없이 이전 결과를 반환
         """
         
+        # [신규] (평가 메모 - 입력 봉이 그대로면 이전 결과 반환)
+        memo_key = self._memo_key(df_h1, features)
+        cached = self._memo.get(symbol)
+        if memo_key is not None and cached is not None and cached[0] == memo_key:
+            self.record_memo(hit=True)
+            return dict(cached[1]) if cached[1] else None
+        self.record_memo(hit=False)
+        
+        signal_data = self._evaluate(df_h1, symbol, indicators, features)
+        if memo_key is not None:
+            self._memo[symbol] = (memo_key, dict(signal_data) if signal_data else None)
+        return signal_data
+
+    def generate_signals_batch(self, frames: Dict[str, pd.DataFrame], bars: int = 200) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        [신규] 전체 마켓 일괄 평가 (마켓 x 봉 x OHLCV 패널 1개로 국면/전술 조건을 한 번에 계산)
+        
+        :param frames: { 마켓: H1 DataFrame (DataManager.fetch_ohlcv() 결과) }
+        :param bars: 마켓별로 사용할 최근 봉 수 (fetch_ohlcv의 count와 같게 두면 generate_signal_owl과 같은 결과)
+        :return: { 마켓: 신호 dict 또는 None }
+        (봉이 부족하거나 결측치가 있어 패널에서 제외된 마켓은 generate_signal_owl로 개별 평가)
+        """
+        panel = build_panel(frames, bars=bars)
+        try:
+            results = evaluate_panel(panel)
+        except Exception as e:
+            self.logger.error(f"일괄 평가 중 오류 (마켓 {len(panel.symbols)}개): {e}", exc_info=True)
+            results = {}
+            panel.skipped.extend(panel.symbols)
+        
+        for symbol in panel.skipped:
+            df = frames[symbol]
+            results[symbol] = self.generate_signal_owl(df, symbol) if df is not None and not df.empty else None
+        
+        detected = [symbol for symbol, signal in results.items() if signal]
+        if detected:
+            self.logger.info(f"일괄 평가: 마켓 {len(results)}개 중 {len(detected)}개 신호 감지 ({', '.join(detected)})")
+        return results
+
+    @staticmethod
+    def _memo_key(df_h1: pd.DataFrame, features: Optional[FeatureFrame]) -> Optional[Tuple]:
+        """ evaluation_memo_key (피처 프레임이 있으면 그 컬럼 사용) """
+        frame = features.frame if features is not None else df_h1
+        if len(frame) < 2:
+            return None
+        if features is not None:
+            ohlc = [features.column(col)[-1] for col in ('open', 'high', 'low', 'close')]
+        else:
+            ohlc = [df_h1[col].to_numpy()[-1] for col in ('open', 'high', 'low', 'close')]
+        return evaluation_memo_key(frame.index, ohlc)
+
+    @classmethod
+    def record_memo(cls, hit: bool):
+        """ 평가 메모 적중/실패 1회 기록 (EvaluationExecutor의 부모 프로세스 메모도 같은 카운터 사용) """
+        if hit:
+            cls.memo_hits += 1
+        else:
+            cls.memo_misses += 1
+
+    @classmethod
+    def memo_stats(cls) -> Dict[str, Any]:
+        """ 평가 메모 통계 (/api/status) """
+        total = cls.memo_hits + cls.memo_misses
+        return {
+            "hits": cls.memo_hits,
+            "misses": cls.memo_misses,
+            "hit_rate": round(cls.memo_hits / total, 4) if total else 0.0
+        }
+
+    def reset_memo(self, symbol: Optional[str] = None):
+        if symbol is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(symbol, None)
+
+    def _evaluate(self, df_h1: pd.DataFrame, symbol: str, indicators: Optional[Dict[str, np.ndarray]], features: Optional[FeatureFrame]) -> Optional[Dict[str, Any]]:
+        """ (Phase 1 -> Phase 2 전체 평가 - 메모 실패 시) """
+        
+        if features is None:
+            features = FeatureFrame.build(df_h1, indicators)
+        df_h1 = features.frame
+        
         # --- Phase 1: 시장 국면 분석 ---
-        current_regime = analyze_regime(df_h1)
+        current_regime = features.regime
         
         signal_data: Optional[Dict[str, Any]] = None
 
@@ -85,12 +207,21 @@ class SignalEngineOwlV1:
             current_price = df.iloc[-1]['close']
             
             # --- 1. 컨텍스트 분석 (v3.5) ---
-            df = calculate_pivots(df, left=10, right=5)
+            tracker = self.pivot_trackers.get(symbol)
+            if tracker is None:
+                tracker = self.pivot_trackers[symbol] = PivotTracker(left=self.PIVOT_LEFT, right=self.PIVOT_RIGHT)
+            # (피처 프레임은 공유 중이므로, PH/PL 컬럼은 얕은 복사본에 추가)
+            df = tracker.update_frame(df.copy(deep=False))
+            
+            ob_index = self.ob_indexes.get(symbol)
+            if ob_index is None:
+                ob_index = self.ob_indexes[symbol] = OrderBlockIndex()
+            ob_index.update_frame(df)
             
             # --- 2. 신호 분석 (v3.5) ---
             
             # 2-1. (필수) 지지 오더블록 (Bullish OB)
-            ob_signal = find_bullish_ob(df, current_price)
+            ob_signal = find_bullish_ob(df, current_price, ob_index=ob_index)
             if not ob_signal:
                 return None
             
@@ -161,7 +292,7 @@ class SignalEngineOwlV1:
         try:
             current_price = df.iloc[-1]['close']
             
-            # (df에는 analyze_regime에서 계산한 BBANDS, RSI 지표가 이미 포함되어 있음)
+            # (df(피처 프레임)에는 BBANDS, RSI 지표가 이미 포함되어 있음)
             
             # 1. 롱(Long) 신호 확인
             long_signal = find_bollinger_bounce_long(df, current_price)
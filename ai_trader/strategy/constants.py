@@ -1,6 +1,8 @@
 # Athena_v1/ai_trader/strategy/constants.py
 # [신규] 2024.11.15 - (Owl v1) pandas-ta 버그 수정을 위한 공용 설정 파일
 # [수정] 2024.11.15 - (오류) 'BBL_20_2.0_2.0' 버그 (ta 라이브러리 반환값에 강제 일치)
+# [수정] 2024.11.17 - (성능) REGIME_EMA_PERIOD를 regime.py에서 이동 (IndicatorEngine과 공유)
+# [수정] 2024.11.17 - (성능) pandas-ta 제거 (ai_trader.indicators) - 컬럼 이름은 기존 그대로 유지
 """
 Strategy Owl v1 - 기술적 분석(TA) 공용 설정
 
@@ -8,15 +10,19 @@ regime.py, patterns.py 등 여러 파일에서 동일한 지표 컬럼 이름을
 모든 TA 주기를 이 파일에서 중앙 관리합니다.
 """
 
+# === EMA (국면 분석) ===
+REGIME_EMA_PERIOD = 50
+REGIME_EMA_COL = f'EMA_{REGIME_EMA_PERIOD}'
+
 # === RSI ===
 RSI_PERIOD = 14
 RSI_COL = f'RSI_{RSI_PERIOD}'
 
 # === 볼린저 밴드 (Bollinger Bands) ===
 BBANDS_PERIOD = 20
-BBANDS_STD = 2 # (라이브러리가 int 2를 2.0_2.0으로 반환하는 버그 대응)
+BBANDS_STD = 2
 
-# [오류 수정] (pandas-ta 라이브러리 버그로 인해, '2.0_2.0'을 강제로 사용)
+# (컬럼 이름 접미사 - pandas-ta 시절 이름('2.0_2.0')을 그대로 유지하여 기존 코드/로그와 호환)
 BBANDS_STD_STR_BUG = "2.0_2.0" 
 
 BBANDS_LOW_COL = f'BBL_{BBANDS_PERIOD}_{BBANDS_STD_STR_BUG}'
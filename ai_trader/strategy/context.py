@@ -2,41 +2,193 @@
 # [수정] 2024.11.11 - (오류) SyntaxError: invalid syntax (// 주석 수정)
 # [수정] 2024.11.11 - (경고) FutureWarning: fillna(method='ffill') -> ffill()
 # [수정] 2024.11.14 - (Owl v1) 임시 함수 'check_channel_v3_4' 제거
+# [수정] 2024.11.17 - (성능) 임시 피벗 -> 좌/우 구간을 나눈 정확한 피벗 (NumPy 슬라이딩 윈도우, 임시 컬럼 제거)
+# [신규] 2024.11.17 - (성능) PivotTracker (증분 피벗 - 새 봉은 right봉 전 후보 1개만 확인)
 """
 Strategy v3.5 (Owl - Tactic 1) - 1단계: 컨텍스트 분석
 (피벗, 채널 등)
+
+피벗 정의 (좌 left봉 / 우 right봉):
+- 피벗 하이(PH): 고가가 왼쪽 left봉보다 모두 높고(>), 오른쪽 right봉보다 낮지 않은(>=) 봉
+- 피벗 로우(PL): 저가가 왼쪽 left봉보다 모두 낮고(<), 오른쪽 right봉보다 높지 않은(<=) 봉
+  (같은 값이 이어지는 평평한 고점/저점은 첫 봉 1개만 피벗)
+- 피벗은 오른쪽 right봉이 모두 나온 봉(피벗 + right)에서 확정되며, 그 봉부터 다음 피벗까지 값을 유지(ffill)합니다.
+  (확정 전 값을 미리 쓰지 않음 - 미래 참조 없음)
 """
 import pandas as pd
 import numpy as np
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ai_trader.candle_builder import kst_index_to_ms
+
+def _pivot_high_mask(values: np.ndarray, left: int, right: int) -> np.ndarray:
+    """ 피벗 하이 위치 (bool 배열, 피벗 봉 자체 위치 기준) """
+    n = len(values)
+    mask = np.zeros(n, dtype=bool)
+    window = left + right + 1
+    if n < window:
+        return mask
+
+    windows = sliding_window_view(values, window)
+    center = windows[:, left]
+    is_pivot = np.ones(len(center), dtype=bool)
+    if left:
+        is_pivot &= center > windows[:, :left].max(axis=1)
+    if right:
+        is_pivot &= center >= windows[:, left + 1:].max(axis=1)
+    mask[left:n - right] = is_pivot
+    return mask
+
+def find_pivot_highs(high: np.ndarray, left: int, right: int) -> np.ndarray:
+    """ 피벗 하이 위치 (bool 배열) """
+    return _pivot_high_mask(np.asarray(high, dtype='float64'), left, right)
+
+def find_pivot_lows(low: np.ndarray, left: int, right: int) -> np.ndarray:
+    """ 피벗 로우 위치 (bool 배열) - 부호를 뒤집어 피벗 하이와 같은 계산 사용 """
+    return _pivot_high_mask(-np.asarray(low, dtype='float64'), left, right)
+
+def _confirmed_levels(values: np.ndarray, mask: np.ndarray, right: int) -> np.ndarray:
+    """ 피벗 값을 확정 봉(피벗 + right)에 놓고 다음 피벗까지 유지 (ffill) """
+    n = len(values)
+    confirm_idx = np.flatnonzero(mask) + right
+    last_idx = np.full(n, -1)
+    last_idx[confirm_idx] = confirm_idx
+    np.maximum.accumulate(last_idx, out=last_idx)
+
+    levels = np.full(n, np.nan)
+    has_pivot = last_idx >= 0
+    levels[has_pivot] = values[last_idx[has_pivot] - right]
+    return levels
 
 def calculate_pivots(df: pd.DataFrame, left: int, right: int) -> pd.DataFrame:
     """
     v3.5 1-1. 피벗 하이(PH) / 피벗 로우(PL) 계산
-    (ZigZag 인디케이터와 유사)
+    (ZigZag 인디케이터와 유사 / v3.5 기준: 좌 10, 우 5)
     """
-    
-    # (임시 구현)
-    # TODO: v3.5 기준(좌:10, 우:5)에 맞는 정확한 피벗 계산 로직 구현 필요
-    
-    # (초간단 임시 피벗: 5일 최고가/최저가)
-    window_size = left + right + 1
-    df['PH_temp'] = df['high'].rolling(window=window_size).max()
-    df['PL_temp'] = df['low'].rolling(window=window_size).min()
-
-    # (간단한 피벗 찾기: window_size 내 최고/최저)
-    df['PH'] = df['high'][(df['high'] == df['PH_temp'])].shift(right)
-    df['PL'] = df['low'][(df['low'] == df['PL_temp'])].shift(right)
-    
-    # [수정] (FutureWarning: 'method' is deprecated)
-    # (최신 피벗이 NaN이 되는 것을 방지하기 위해 ffill)
-    df['PH'] = df['PH'].ffill()
-    df['PL'] = df['PL'].ffill()
-    # --- (수정 끝) ---
-    
-    df.drop(columns=['PH_temp', 'PL_temp'], inplace=True)
-    
+    high = df['high'].to_numpy(dtype='float64')
+    low = df['low'].to_numpy(dtype='float64')
+
+    df['PH'] = _confirmed_levels(high, find_pivot_highs(high, left, right), right)
+    df['PL'] = _confirmed_levels(low, find_pivot_lows(low, left, right), right)
+
     return df
 
+class PivotTracker:
+    """
+    증분 피벗 (심볼 1개, 타임프레임 1개)
+
+    - 확정된 봉(마지막 봉 제외)은 최근 left + right봉만 들고 있다가,
+      새 봉이 확정될 때 그 봉 기준 right봉 전 후보 1개만 확인합니다. (봉당 O(left + right))
+    - 마지막 봉(미완성 봉)은 상태에 넣지 않고 매번 미리보기로만 확인합니다.
+    - 확정된 피벗은 (확정 봉 시각, 값) 목록으로 보관하므로, DataFrame 창이 밀려나도 이전 피벗 값을 이어서 씁니다.
+    """
+
+    # (보관할 최근 피벗 개수)
+    DEFAULT_MAX_PIVOTS = 500
+
+    def __init__(self, left: int, right: int, max_pivots: int = DEFAULT_MAX_PIVOTS):
+        self.left = left
+        self.right = right
+        self.max_pivots = max_pivots
+        self.reset()
+
+    def reset(self):
+        self._last_ts: Optional[int] = None # (마지막으로 확정한 봉 시각)
+        # (최근 확정 봉 left + right개: (ts, high, low))
+        self._bars: Deque[Tuple[int, float, float]] = deque(maxlen=self.left + self.right)
+        # (확정 피벗: (확정 봉 시각, 값))
+        self._highs: Deque[Tuple[int, float]] = deque(maxlen=self.max_pivots)
+        self._lows: Deque[Tuple[int, float]] = deque(maxlen=self.max_pivots)
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return self._last_ts
+
+    def _check(self, ts: int, high: float, low: float) -> Tuple[Optional[float], Optional[float]]:
+        """ (ts 봉이 들어왔을 때) right봉 전 후보가 피벗인지 확인 -> (PH 값, PL 값) """
+        if len(self._bars) < self._bars.maxlen:
+            return None, None
+        highs = np.array([b[1] for b in self._bars] + [high])
+        lows = np.array([b[2] for b in self._bars] + [low])
+        ph = highs[self.left] if _pivot_high_mask(highs, self.left, self.right)[self.left] else None
+        pl = lows[self.left] if _pivot_high_mask(-lows, self.left, self.right)[self.left] else None
+        return ph, pl
+
+    def update_bar(self, ts: int, high: float, low: float) -> Tuple[Optional[float], Optional[float]]:
+        """ 확정 봉 1개 반영 -> 이 봉에서 새로 확정된 (PH 값, PL 값) (없으면 None) """
+        if self._last_ts is not None and ts <= self._last_ts:
+            return None, None
+        ph, pl = self._check(ts, high, low)
+        if ph is not None:
+            self._highs.append((ts, float(ph)))
+        if pl is not None:
+            self._lows.append((ts, float(pl)))
+        self._bars.append((ts, high, low))
+        self._last_ts = ts
+        return ph, pl
+
+    def _rebuild(self, ts_list: np.ndarray, highs: np.ndarray, lows: np.ndarray):
+        """ 확정 봉 전체로 상태를 다시 만듦 (벡터 계산) """
+        self.reset()
+        if not len(ts_list):
+            return
+        for values, mask, pivots in (
+            (highs, find_pivot_highs(highs, self.left, self.right), self._highs),
+            (lows, find_pivot_lows(lows, self.left, self.right), self._lows),
+        ):
+            idx = np.flatnonzero(mask)
+            pivots.extend(zip(ts_list[idx + self.right].tolist(), values[idx].tolist()))
+        keep = self._bars.maxlen
+        if keep:
+            self._bars.extend(zip(ts_list[-keep:].tolist(), highs[-keep:].tolist(), lows[-keep:].tolist()))
+        self._last_ts = int(ts_list[-1])
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        DataManager.fetch_ohlcv() 결과로 상태를 맞추고 PH / PL 컬럼을 붙여 반환합니다. (calculate_pivots와 같은 컬럼)
+        (마지막으로 확정한 봉 다음부터만 반영 / 처음이거나 이어지지 않으면 확정 봉 전체로 다시 계산)
+        """
+        if df is None or df.empty:
+            return df
+
+        ts_list = np.asarray(kst_index_to_ms(df.index), dtype='int64')
+        highs = df['high'].to_numpy(dtype='float64')
+        lows = df['low'].to_numpy(dtype='float64')
+        final = len(ts_list) - 1 # (마지막 봉은 미완성 봉)
+
+        start = int(np.searchsorted(ts_list[:final], self._last_ts, side='right')) if self._last_ts is not None else 0
+        if self._last_ts is None or start == 0 or ts_list[start - 1] != self._last_ts:
+            self._rebuild(ts_list[:final], highs[:final], lows[:final])
+        else:
+            for i in range(start, final):
+                self.update_bar(int(ts_list[i]), float(highs[i]), float(lows[i]))
+
+        # (미완성 봉 미리보기 - 상태에는 반영하지 않음)
+        last_ts = int(ts_list[final])
+        preview_ph, preview_pl = self._check(last_ts, float(highs[final]), float(lows[final]))
+
+        df['PH'] = self._levels(ts_list, self._highs, last_ts, preview_ph)
+        df['PL'] = self._levels(ts_list, self._lows, last_ts, preview_pl)
+        return df
+
+    def _levels(self, ts_list: np.ndarray, pivots: Deque[Tuple[int, float]], preview_ts: int, preview: Optional[float]) -> np.ndarray:
+        """ 확정 피벗 목록 -> 봉별 최근 피벗 값 (ffill과 같음) """
+        points = list(pivots)
+        if preview is not None:
+            points.append((preview_ts, float(preview)))
+        levels = np.full(len(ts_list), np.nan)
+        if not points:
+            return levels
+        confirm_ts = np.array([p[0] for p in points], dtype='int64')
+        values = np.array([p[1] for p in points], dtype='float64')
+        pos = np.searchsorted(confirm_ts, ts_list, side='right') - 1
+        has_pivot = pos >= 0
+        levels[has_pivot] = values[pos[has_pivot]]
+        return levels
+
 # [제거] (Owl v1) (v3.5의 임시 채널 함수 제거)
 # def check_channel_v3_4(df: pd.DataFrame, current_price: float) -> bool:
-#    ...
\ No newline at end of file
+#    ...
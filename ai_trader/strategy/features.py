@@ -0,0 +1,163 @@
+# Athena_v1/ai_trader/strategy/features.py
+# [신규] 2024.11.17 - (성능) 봉별 피처 프레임 (지표를 1번만 계산해 국면 분석 / 전술 / 청산에서 공유)
+"""
+Strategy Owl v1 - 피처 프레임 (Feature Frame)
+
+한 주기 안에서 같은 지표를 여러 번 계산하던 것을 (심볼, 타임프레임, 마지막 봉)당 1번으로 줄입니다.
+(기존: analyze_regime(복사본), find_w_pattern / find_rsi_divergence / find_bollinger_bounce_long(각각 복사 + RSI 재계산),
+ PositionManager S4 청산(analyze_regime(복사본)))
+
+- build_features(): OHLCV + 전략 지표 컬럼(EMA_50, BBands, RSI_14)을 가진 새 DataFrame을 만듭니다.
+  IndicatorEngine 최근 값이 있으면 그대로 붙이고, 없으면 NumPy 커널로 전체 봉을 계산합니다.
+- FeatureFrame: 위 DataFrame + 국면(regime, 처음 조회할 때 1번만 계산)
+- FeatureStore: 마지막 봉(시각 + OHLCV)이 같으면 이전 FeatureFrame을 그대로 반환합니다.
+
+(피처 프레임은 여러 곳에서 공유하므로 값 배열을 읽기 전용으로 잠급니다. 컬럼을 추가해야 하면 df.copy(deep=False)에 추가)
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+from ai_trader import indicators as kernels
+from ai_trader.strategy.constants import (
+    RSI_PERIOD, RSI_COL,
+    BBANDS_PERIOD, BBANDS_STD,
+    REGIME_EMA_PERIOD, REGIME_EMA_COL,
+    BBANDS_LOW_COL, BBANDS_MID_COL, BBANDS_UPPER_COL,
+    BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL
+)
+from ai_trader.strategy.regime import analyze_regime, MarketRegime
+from ai_trader.utils.logger import setup_logger
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# (피처 프레임이 항상 가지는 지표 컬럼)
+FEATURE_COLUMNS = (
+    REGIME_EMA_COL,
+    BBANDS_LOW_COL, BBANDS_MID_COL, BBANDS_UPPER_COL,
+    BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL,
+    RSI_COL,
+)
+
+def _feature_block(close: np.ndarray, indicators: Optional[Dict[str, np.ndarray]]) -> np.ndarray:
+    """ 종가 -> 지표 배열 (봉 수, len(FEATURE_COLUMNS)) """
+    n = len(close)
+    block = np.full((n, len(FEATURE_COLUMNS)), np.nan)
+
+    if indicators and all(col in indicators for col in FEATURE_COLUMNS):
+        # (IndicatorEngine 최근 값을 꼬리에 붙임 - attach_indicators와 같음)
+        for j, col in enumerate(FEATURE_COLUMNS):
+            values = indicators[col]
+            k = min(n, len(values))
+            if k:
+                block[n - k:, j] = values[len(values) - k:]
+        return block
+
+    bb = kernels.bbands(close, length=BBANDS_PERIOD, std=BBANDS_STD)
+    columns = {
+        REGIME_EMA_COL: kernels.ema(close, REGIME_EMA_PERIOD),
+        BBANDS_LOW_COL: bb.lower,
+        BBANDS_MID_COL: bb.mid,
+        BBANDS_UPPER_COL: bb.upper,
+        BBANDS_BANDWIDTH_COL: bb.bandwidth,
+        BBANDS_PERCENT_COL: bb.percent,
+        RSI_COL: kernels.rsi(close, length=RSI_PERIOD),
+    }
+    for j, col in enumerate(FEATURE_COLUMNS):
+        block[:, j] = columns[col]
+    return block
+
+def _ohlcv_values(df: pd.DataFrame) -> np.ndarray:
+    """ OHLCV 2차원 배열 (DataManager 결과처럼 컬럼이 OHLCV 순서 그대로면 컬럼 선택 없이 변환) """
+    if list(df.columns) == OHLCV_COLUMNS:
+        return df.to_numpy(dtype='float64')
+    return df[OHLCV_COLUMNS].to_numpy(dtype='float64')
+
+def _build_block(df: pd.DataFrame, ohlcv: np.ndarray, indicators: Optional[Dict[str, np.ndarray]]) -> Tuple[pd.Index, np.ndarray]:
+    """ OHLCV 배열 -> (인덱스, OHLCV + 지표 2차원 배열) """
+    index = df.index
+
+    # (오류 방어) OHLCV 결측치 처리 (analyze_regime와 같은 방식)
+    if np.isnan(ohlcv).any():
+        cleaned = pd.DataFrame(ohlcv, index=index, columns=OHLCV_COLUMNS).ffill().dropna()
+        index = cleaned.index
+        ohlcv = cleaned.to_numpy(dtype='float64')
+
+    return index, np.hstack([ohlcv, _feature_block(ohlcv[:, 3], indicators)])
+
+def build_features(df: pd.DataFrame, indicators: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+    """
+    OHLCV DataFrame -> 피처 DataFrame (원본 df는 변경하지 않음)
+    :param indicators: IndicatorEngine.update_frame() 결과 (있으면 지표를 다시 계산하지 않고 꼬리에 붙임)
+    """
+    return FeatureFrame.build(df, indicators).frame
+
+class FeatureFrame:
+    """
+    봉 1개(마지막 봉) 기준 피처 + 국면
+    (컬럼을 하나씩 추가하지 않고, OHLCV + 지표를 2차원 배열 1개로 만들어 DataFrame을 1번 생성)
+    """
+
+    __slots__ = ('frame', 'key', '_columns', '_regime')
+
+    def __init__(self, index: pd.Index, block: np.ndarray, key: Optional[Tuple] = None):
+        names = OHLCV_COLUMNS + list(FEATURE_COLUMNS)
+        block.flags.writeable = False # (DataFrame 생성 전에 잠가야 frame을 통한 값 수정도 막힘)
+        self.frame = pd.DataFrame(block, index=index, columns=names, copy=False)
+        self.key = key
+        self._columns: Dict[str, np.ndarray] = {name: block[:, j] for j, name in enumerate(names)}
+        self._regime: Optional[MarketRegime] = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, indicators: Optional[Dict[str, np.ndarray]] = None) -> "FeatureFrame":
+        ohlcv = _ohlcv_values(df)
+        index, block = _build_block(df, ohlcv, indicators)
+        return cls(index, block, _frame_key(df, ohlcv))
+
+    @property
+    def regime(self) -> MarketRegime:
+        """ 현재 국면 (처음 조회할 때 1번만 계산) """
+        if self._regime is None:
+            self._regime = analyze_regime(self.frame, self._columns)
+        return self._regime
+
+    @property
+    def current_price(self) -> float:
+        return float(self._columns['close'][-1])
+
+    def column(self, col: str) -> np.ndarray:
+        """ 컬럼 값 (읽기 전용 배열) """
+        return self._columns[col]
+
+def _frame_key(df: pd.DataFrame, ohlcv: np.ndarray) -> Optional[Tuple]:
+    """ (봉 개수, 마지막 봉 시각, 마지막 봉 OHLCV) - 미완성 봉이 바뀌면 키도 바뀜 """
+    if not len(ohlcv):
+        return None
+    return (len(ohlcv), df.index[-1].value, *ohlcv[-1].tolist())
+
+class FeatureStore:
+    """ (심볼, 타임프레임)별 최근 FeatureFrame 1개 보관 """
+
+    def __init__(self):
+        self.logger = setup_logger("FeatureStore", "athena_v1.log")
+        self._frames: Dict[Tuple[str, str], FeatureFrame] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, timeframe: str, df: pd.DataFrame, indicators: Optional[Dict[str, np.ndarray]] = None) -> FeatureFrame:
+        """ 마지막 봉이 같으면 이전 결과를, 아니면 새로 계산한 FeatureFrame을 반환 """
+        ohlcv = _ohlcv_values(df)
+        key = _frame_key(df, ohlcv)
+        cached = self._frames.get((symbol, timeframe))
+        if cached is not None and key is not None and cached.key == key:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        features = FeatureFrame(*_build_block(df, ohlcv, indicators), key)
+        self._frames[(symbol, timeframe)] = features
+        return features
+
+    def reset(self, symbol: str, timeframe: Optional[str] = None):
+        for key in [k for k in self._frames if k[0] == symbol and (timeframe is None or k[1] == timeframe)]:
+            del self._frames[key]
@@ -1,10 +1,173 @@
 # Athena_v1/ai_trader/strategy/order_block.py
 # [수정] 2024.11.11 - (오류) SyntaxError: invalid syntax (// 주석 수정)
+# [신규] 2024.11.17 - (성능) 벡터 OB 스캐너 (전체 봉 1회 스캔) + OrderBlockIndex (가격 포함 OB 조회 / 새 봉만 추가 스캔)
 """
 Strategy v3.5 - 2-A단계: 오더블록(OB) 정의
+
+(OB 후보 기준 - patterns.find_bullish_ob와 동일)
+- Bullish OB: 음봉(C < O) 다음 봉이 음봉이 아니고(C >= O), 그 종가가 음봉의 고가를 돌파(C > H)
+- Bearish OB: 양봉(C > O) 다음 봉이 양봉이 아니고(C <= O), 그 종가가 양봉의 저가를 이탈(C < L)
+- OB 구간은 OB 봉(음봉/양봉)의 [저가, 고가]이며, 다음 봉(돌파 봉)에서 확정됩니다.
 """
 import pandas as pd
-from typing import Optional, Dict, Any
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Literal, Tuple
+
+from ai_trader.candle_builder import kst_index_to_ms
+
+OBSide = Literal["bull", "bear"]
+
+_BULL = 1
+_BEAR = -1
+
+def scan_order_blocks(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    전체 봉에서 OB 후보를 한 번에 찾습니다 (벡터 계산).
+    :return: (bullish OB 봉 위치, bearish OB 봉 위치) - 각각 오름차순 정수 배열 (확정 봉 = 위치 + 1)
+    """
+    o, h, l, c = (np.asarray(a, dtype='float64') for a in (open_, high, low, close))
+    if len(c) < 2:
+        empty = np.empty(0, dtype='int64')
+        return empty, empty
+
+    is_down = c < o
+    is_up = c > o
+    bull = is_down[:-1] & ~is_down[1:] & (c[1:] > h[:-1])
+    bear = is_up[:-1] & ~is_up[1:] & (c[1:] < l[:-1])
+    return np.flatnonzero(bull), np.flatnonzero(bear)
+
+@dataclass
+class OrderBlock:
+    side: str # ('bull' | 'bear')
+    ts: int # (OB 봉 시각 - UTC epoch ms)
+    confirm_ts: int # (돌파 봉 시각)
+    low: float
+    high: float
+
+    @property
+    def height(self) -> float:
+        return self.high - self.low
+
+class OrderBlockIndex:
+    """
+    OB 구간 인덱스 (심볼 1개, 타임프레임 1개)
+
+    - 처음(또는 봉이 이어지지 않을 때)은 전체 봉을 scan_order_blocks()로 한 번에 스캔하고,
+      이후에는 마지막으로 스캔한 봉 다음부터만 추가 스캔합니다.
+    - 구간은 저가(low) 기준으로 정렬해 두고, "가격 P를 포함하는 OB"는
+      low <= P 인 앞부분을 이진 탐색으로 자른 뒤 high >= P 만 남깁니다.
+    - 마지막 봉(미완성 봉)으로 확정되는 OB는 인덱스에 넣지 않고 조회 때만 미리보기로 더합니다.
+    """
+
+    # (보관할 최근 OB 개수 - 넘으면 오래된 것부터 제거)
+    DEFAULT_MAX_BLOCKS = 2000
+
+    def __init__(self, max_blocks: int = DEFAULT_MAX_BLOCKS):
+        self.max_blocks = max_blocks
+        self.reset()
+
+    def reset(self):
+        self._last_ts: Optional[int] = None # (마지막으로 스캔한 확정 봉 시각)
+
+        # (OB 구간 - 추가 순서(시간순) 배열)
+        self._side = np.empty(0, dtype='int8')
+        self._ts = np.empty(0, dtype='int64')
+        self._confirm_ts = np.empty(0, dtype='int64')
+        self._low = np.empty(0, dtype='float64')
+        self._high = np.empty(0, dtype='float64')
+
+        self._order: Optional[np.ndarray] = None # (low 오름차순 정렬 순서 - 추가 후 첫 조회 때 다시 계산)
+        self._preview: List[OrderBlock] = []
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return self._last_ts
+
+    def _append(self, side: np.ndarray, ts: np.ndarray, confirm_ts: np.ndarray, low: np.ndarray, high: np.ndarray):
+        if not len(ts):
+            return
+        self._side = np.concatenate([self._side, side.astype('int8')])[-self.max_blocks:]
+        self._ts = np.concatenate([self._ts, ts])[-self.max_blocks:]
+        self._confirm_ts = np.concatenate([self._confirm_ts, confirm_ts])[-self.max_blocks:]
+        self._low = np.concatenate([self._low, low])[-self.max_blocks:]
+        self._high = np.concatenate([self._high, high])[-self.max_blocks:]
+        self._order = None
+
+    def _scan(self, ts_list: np.ndarray, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """ 봉 배열 -> 새 OB (side, ts, confirm_ts, low, high) - 확정 봉 시각 순 """
+        bull, bear = scan_order_blocks(o, h, l, c)
+        pos = np.concatenate([bull, bear])
+        side = np.concatenate([np.full(len(bull), _BULL), np.full(len(bear), _BEAR)])
+        order = np.argsort(pos, kind='stable')
+        pos, side = pos[order], side[order]
+        return side, ts_list[pos], ts_list[pos + 1], l[pos], h[pos]
+
+    def update_frame(self, df: pd.DataFrame):
+        """
+        DataManager.fetch_ohlcv() 결과로 인덱스를 맞춥니다.
+        (마지막으로 스캔한 봉 다음부터만 스캔 / 처음이거나 이어지지 않으면 전체 다시 스캔)
+        """
+        self._preview = []
+        if df is None or df.empty:
+            return
+
+        ts_list = np.asarray(kst_index_to_ms(df.index), dtype='int64')
+        o, h, l, c = (df[col].to_numpy(dtype='float64') for col in ('open', 'high', 'low', 'close'))
+        final = len(ts_list) - 1 # (마지막 봉은 미완성 봉)
+
+        start = int(np.searchsorted(ts_list[:final], self._last_ts, side='right')) if self._last_ts is not None else 0
+        if self._last_ts is None or start == 0 or ts_list[start - 1] != self._last_ts:
+            self.reset()
+            begin = 0
+        else:
+            begin = start - 1 # (이전 확정 봉과 새 봉을 짝지어 확인)
+
+        if final > begin:
+            self._append(*self._scan(ts_list[begin:final], o[begin:final], h[begin:final], l[begin:final], c[begin:final]))
+        if final > 0:
+            self._last_ts = int(ts_list[final - 1])
+
+        # (미완성 봉 미리보기 - 마지막 확정 봉 + 미완성 봉)
+        if final > 0:
+            side, ts, confirm_ts, low, high = self._scan(ts_list[final - 1:], o[final - 1:], h[final - 1:], l[final - 1:], c[final - 1:])
+            self._preview = [
+                OrderBlock('bull' if s == _BULL else 'bear', int(t), int(ct), float(lo), float(hi))
+                for s, t, ct, lo, hi in zip(side, ts, confirm_ts, low, high)
+            ]
+
+    def containing(self, price: float, side: Optional[OBSide] = None, since_ts: Optional[int] = None) -> List[OrderBlock]:
+        """ 가격을 포함하는 OB 목록 (low <= price <= high, 최근 OB 봉 순) """
+        if self._order is None:
+            self._order = np.argsort(self._low, kind='stable')
+
+        # (low <= price 인 앞부분만 남긴 뒤 high >= price 확인)
+        candidates = self._order[:int(np.searchsorted(self._low[self._order], price, side='right'))]
+        keep = self._high[candidates] >= price
+        if side is not None:
+            keep &= self._side[candidates] == (_BULL if side == 'bull' else _BEAR)
+        if since_ts is not None:
+            keep &= self._ts[candidates] >= since_ts
+        found = candidates[keep]
+
+        blocks = [
+            OrderBlock('bull' if self._side[i] == _BULL else 'bear', int(self._ts[i]), int(self._confirm_ts[i]), float(self._low[i]), float(self._high[i]))
+            for i in found
+        ]
+        blocks.extend(
+            b for b in self._preview
+            if b.low <= price <= b.high and (side is None or b.side == side) and (since_ts is None or b.ts >= since_ts)
+        )
+        blocks.sort(key=lambda b: b.ts, reverse=True)
+        return blocks
+
+    def latest_containing(self, price: float, side: OBSide, since_ts: Optional[int] = None) -> Optional[OrderBlock]:
+        """ 가격을 포함하는 가장 최근 OB (없으면 None) """
+        blocks = self.containing(price, side=side, since_ts=since_ts)
+        return blocks[0] if blocks else None
 
 def find_valid_ob_v3_5(df_h1: pd.DataFrame, current_price: float) -> Optional[Dict[str, Any]]:
     """
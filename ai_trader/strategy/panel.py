@@ -0,0 +1,276 @@
+# Athena_v1/ai_trader/strategy/panel.py
+# [신규] 2024.11.17 - (성능) 전체 마켓 일괄 신호 평가 (3차원 NumPy 패널: 마켓 x 봉 x OHLCV)
+# [수정] 2024.11.17 - (요청) 판정 배열 계산(compute_signals) 분리 + 전략 기준값(StrategyParams) - 백테스터와 공유
+# [수정] 2024.11.17 - (요청) StrategyParams에 국면 EMA 기간 / W-패턴 RSI 구간 추가 (파라미터 스윕 대상)
+"""
+Strategy Owl v1 - 전체 마켓 일괄 평가 (Candle Panel)
+
+마켓마다 DataFrame 파이프라인(국면 -> 전술)을 따로 돌리는 대신,
+마켓별 최근 N개 봉을 (마켓 수, 봉 수, OHLCV) 배열 1개로 쌓아 모든 마켓의 조건을 한 번에 계산합니다.
+
+- 지표(EMA_50, BBands, RSI_14)는 ai_trader.indicators 커널을 시간 축으로 한 번에 계산합니다.
+- 판정 기준은 SignalEngineOwlV1(피처 프레임 경로)과 같습니다.
+  국면: _classify_regime / Tactic 1: find_bullish_ob + find_w_pattern + find_rsi_divergence /
+  Tactic 3: find_bollinger_bounce_long
+- 마켓마다 자기 최근 N개 봉을 오른쪽 정렬로 쌓습니다. (봉 시각이 아닌 위치 기준 - 단일 마켓 평가와 같은 입력)
+  봉이 N개보다 적거나 OHLCV 결측치가 있는 마켓은 패널에서 제외합니다. (skipped - 개별 평가 대상)
+- (피벗(PH/PL)은 Tactic 1 판정에 쓰이지 않으므로 계산하지 않습니다)
+- compute_signals()는 (행 수, 봉 수) OHLC 배열의 각 행(마지막 봉 기준)을 판정해 배열로 반환합니다.
+  (행 = 마켓(패널) 또는 같은 마켓의 연속 구간(백테스트 슬라이딩 윈도우))
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ai_trader import indicators as kernels
+from ai_trader.strategy.constants import (
+    RSI_PERIOD, BBANDS_PERIOD, BBANDS_STD, REGIME_EMA_PERIOD
+)
+from ai_trader.strategy.features import OHLCV_COLUMNS, _ohlcv_values
+
+# (패널 마지막 축 - OHLCV_COLUMNS 순서)
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(OHLCV_COLUMNS))
+
+# (국면 코드 -> 이름)
+REGIME_NAMES = ("RANGE", "BULL", "BEAR")
+_RANGE, _BULL, _BEAR = range(len(REGIME_NAMES))
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """ Owl v1 판정 기준값 (기본값 = 라이브 전략: regime.py / patterns.py / signal_engine.py) """
+    # (국면: EMA 기간 / 밴드폭 스퀴즈 기준 / EMA 기울기 횡보 기준)
+    regime_ema_period: int = REGIME_EMA_PERIOD
+    squeeze_bandwidth: float = 5.0
+    flat_slope: float = 0.0001
+    # (Tactic 1: OB 탐색 구간 / 패턴 구간 / 최소 점수 / SL 여유(OB 높이 배수) / 목표 R:R)
+    ob_lookback: int = 10
+    pattern_lookback: int = 30
+    min_score: int = 12
+    ob_sl_buffer: float = 0.2
+    reward_risk: float = 2.0
+    # (W-패턴: 과매도 터치 RSI / 현재 RSI 하한 / 상한)
+    w_oversold_rsi: float = 35.0
+    w_rsi_low: float = 38.0
+    w_rsi_high: float = 45.0
+    # (Tactic 3: BB 하단 터치 배수 / RSI 과매도 / SL 배수)
+    bounce_touch: float = 1.001
+    bounce_rsi: float = 35.0
+    bounce_sl: float = 0.995
+
+DEFAULT_PARAMS = StrategyParams()
+
+# (진입 전술 코드)
+TACTIC_NONE, TACTIC_BULL_OB, TACTIC_RANGE_BOUNCE = range(3)
+
+@dataclass
+class PanelSignals:
+    """ compute_signals() 결과 (모두 (행 수,) 배열) """
+    regime: np.ndarray # (국면 코드 - REGIME_NAMES)
+    tactic: np.ndarray # (진입 전술 코드 - TACTIC_NONE이면 신호 없음)
+    score: np.ndarray
+    sl_price: np.ndarray
+    tp_price: np.ndarray
+    price: np.ndarray
+    # (사유 문자열용)
+    ob_low: np.ndarray
+    w_pattern: np.ndarray
+    rsi_divergence: np.ndarray
+    rsi: np.ndarray
+
+    def reason(self, i: int) -> str:
+        """ generate_signal_owl과 같은 사유 문자열 """
+        if self.tactic[i] == TACTIC_RANGE_BOUNCE:
+            return f"Range Bounce Long (RSI: {self.rsi[i]:.1f})"
+        reason = f"Bullish OB ({self.ob_low[i]:.2f})"
+        if self.w_pattern[i]:
+            reason += " + W-Pattern"
+        if self.rsi_divergence[i]:
+            reason += " + RSI Div"
+        return reason
+
+@dataclass
+class CandlePanel:
+    symbols: List[str]
+    values: np.ndarray # ((마켓 수, 봉 수, 5) float64 - 마켓별 최근 봉, 오른쪽 정렬)
+    skipped: List[str] # (봉 부족 / 결측치로 제외된 마켓)
+
+    @property
+    def bars(self) -> int:
+        return self.values.shape[1]
+
+def build_panel(frames: Dict[str, pd.DataFrame], bars: int = 200) -> CandlePanel:
+    """ { 마켓: DataManager.fetch_ohlcv() 결과 } -> CandlePanel (마켓별 최근 bars개 봉) """
+    symbols: List[str] = []
+    skipped: List[str] = []
+    values = np.empty((len(frames), bars, len(OHLCV_COLUMNS)), dtype='float64')
+
+    for symbol, df in frames.items():
+        if df is None or len(df) < bars:
+            skipped.append(symbol)
+            continue
+        ohlcv = _ohlcv_values(df.iloc[-bars:])
+        if np.isnan(ohlcv).any():
+            skipped.append(symbol)
+            continue
+        values[len(symbols)] = ohlcv
+        symbols.append(symbol)
+
+    return CandlePanel(symbols, values[:len(symbols)], skipped)
+
+def _classify_regimes(close: np.ndarray, ema: np.ndarray, bandwidth: np.ndarray, params: StrategyParams) -> np.ndarray:
+    """ (regime._classify_regime 벡터판) -> 국면 코드 배열 (마켓 수,) """
+    price = close[:, -1]
+    ema_now = ema[:, -1]
+    slope = ema[:, -1] - ema[:, -2]
+    bw = bandwidth[:, -1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flat = np.abs(slope / ema_now) < params.flat_slope
+    valid = ~(np.isnan(bw) | np.isnan(ema_now) | np.isnan(slope))
+    trending = valid & ~(bw < params.squeeze_bandwidth) & ~flat
+
+    regime = np.full(len(close), _RANGE, dtype='int8')
+    regime[trending & (price > ema_now) & (slope > 0)] = _BULL
+    regime[trending & (price < ema_now) & (slope < 0)] = _BEAR
+    return regime
+
+def _latest_bullish_ob(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, lookback: int) -> np.ndarray:
+    """
+    (find_bullish_ob 벡터판) 최근 lookback봉에서 현재가를 포함하는 가장 최근 Bullish OB 봉 위치
+    (없으면 -1, 확정 봉 = 위치 + 1 <= 마지막(미완성) 봉)
+    """
+    n = c.shape[1]
+    first = max(n - lookback, 0) + 1
+    price = c[:, -1:]
+
+    # (scan_order_blocks와 같은 조건 - 위치 p: OB 봉, p + 1: 돌파 봉)
+    is_down = c[:, first:] < o[:, first:]
+    bull = is_down[:, :-1] & ~is_down[:, 1:] & (c[:, first + 1:] > h[:, first:-1])
+    bull &= (l[:, first:-1] <= price) & (price <= h[:, first:-1])
+
+    found = bull.any(axis=1)
+    last = bull.shape[1] - 1 - np.argmax(bull[:, ::-1], axis=1)
+    return np.where(found, first + last, -1)
+
+def _w_patterns(h: np.ndarray, rsi: np.ndarray, params: StrategyParams):
+    """ (find_w_pattern 벡터판) -> (W-패턴 여부, 목표가) """
+    lookback = params.pattern_lookback
+    recent = rsi[:, -lookback:]
+    current = recent[:, -1]
+    touches = (recent < params.w_oversold_rsi).sum(axis=1)
+    found = (touches >= 2) & (current >= params.w_rsi_low) & (current <= params.w_rsi_high)
+    return found, h[:, -lookback:].max(axis=1)
+
+def _rsi_divergences(l: np.ndarray, rsi: np.ndarray, lookback: int) -> np.ndarray:
+    """ (find_rsi_divergence 벡터판) 최근 저점 이후 두 번째 저점이 더 낮고 RSI는 더 높은지 """
+    low = l[:, -lookback:]
+    recent = rsi[:, -lookback:]
+    rows = np.arange(len(low))
+    k = low.shape[1]
+
+    first = np.argmin(low, axis=1)
+    after = np.where(np.arange(k) > first[:, None], low, np.inf)
+    second = np.argmin(after, axis=1)
+
+    has_rsi = ~np.isnan(recent).all(axis=1)
+    has_second = first < k - 1
+    return (
+        has_rsi & has_second
+        & (low[rows, second] < low[rows, first])
+        & (recent[rows, second] > recent[rows, first])
+    )
+
+def compute_signals(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, params: StrategyParams = DEFAULT_PARAMS) -> PanelSignals:
+    """
+    (행 수, 봉 수) OHLC 배열 -> 행별 국면 / 진입 신호 (각 행의 마지막 봉 = 현재 봉)
+    (봉 수가 params.regime_ema_period보다 적으면 국면은 RANGE - analyze_regime과 같음)
+    """
+    rows = np.arange(len(c))
+    price = c[:, -1]
+
+    # --- 지표 (시간 축으로 전체 행 한 번에) ---
+    ema = kernels.ema(c, params.regime_ema_period)
+    bb = kernels.bbands(c, length=BBANDS_PERIOD, std=BBANDS_STD)
+    rsi = kernels.rsi(c, length=RSI_PERIOD)
+
+    # --- Phase 1: 국면 ---
+    if c.shape[1] < params.regime_ema_period:
+        regime = np.full(len(c), _RANGE, dtype='int8')
+    else:
+        regime = _classify_regimes(c, ema, bb.bandwidth, params)
+
+    # --- Tactic 1 (BULL): Bullish OB + (W-패턴 / RSI 다이버전스) ---
+    ob_pos = _latest_bullish_ob(o, h, l, c, params.ob_lookback)
+    has_ob = ob_pos >= 0
+    ob_low = np.where(has_ob, l[rows, ob_pos], np.nan)
+    ob_high = np.where(has_ob, h[rows, ob_pos], np.nan)
+
+    w_found, w_target = _w_patterns(h, rsi, params)
+    div_found = _rsi_divergences(l, rsi, params.pattern_lookback)
+    score = 10 + 4 * w_found + 4 * div_found
+
+    sl_bull = ob_low - (ob_high - ob_low) * params.ob_sl_buffer
+    tp_bull = np.where(w_found & (w_target != 0), w_target, price + (price - sl_bull) * params.reward_risk)
+    bull = (regime == _BULL) & has_ob & (score >= params.min_score) & (sl_bull < price) & (tp_bull > price)
+
+    # --- Tactic 3 (RANGE): BB 하단 터치 + RSI 과매도 ---
+    bb_low = bb.lower[:, -1]
+    bb_mid = bb.mid[:, -1]
+    rsi_now = rsi[:, -1]
+    sl_range = bb_low * params.bounce_sl
+    risk = price - sl_range
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rr = (bb_mid - price) / risk
+    bounce = (
+        (regime == _RANGE) & (price <= bb_low * params.bounce_touch) & (rsi_now <= params.bounce_rsi)
+        & (risk > 0) & ~(rr < 1.0)
+    )
+
+    tactic = np.full(len(c), TACTIC_NONE, dtype='int8')
+    tactic[bull] = TACTIC_BULL_OB
+    tactic[bounce] = TACTIC_RANGE_BOUNCE
+
+    return PanelSignals(
+        regime=regime,
+        tactic=tactic,
+        score=np.where(bounce, 12, score),
+        sl_price=np.where(bounce, sl_range, sl_bull),
+        tp_price=np.where(bounce, bb_mid, tp_bull),
+        price=price,
+        ob_low=ob_low,
+        w_pattern=w_found,
+        rsi_divergence=div_found,
+        rsi=rsi_now
+    )
+
+def evaluate_panel(panel: CandlePanel, params: StrategyParams = DEFAULT_PARAMS) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    패널의 모든 마켓을 한 번에 평가합니다.
+    :return: { 마켓: RiskManager.calculate_position_size()용 신호 dict 또는 None } (generate_signal_owl과 같은 형태)
+    """
+    results: Dict[str, Optional[Dict[str, Any]]] = {symbol: None for symbol in panel.symbols}
+    if not panel.symbols:
+        return results
+
+    values = panel.values
+    signals = compute_signals(*(values[:, :, i] for i in (OPEN, HIGH, LOW, CLOSE)), params=params)
+
+    # --- 신호 dict (generate_signal_owl과 같은 키) ---
+    for i in np.flatnonzero(signals.tactic != TACTIC_NONE):
+        results[panel.symbols[i]] = signal_dict(signals, i, panel.symbols[i])
+    return results
+
+def signal_dict(signals: PanelSignals, i: int, symbol: str) -> Dict[str, Any]:
+    """ 행 i의 신호 -> generate_signal_owl과 같은 형태의 dict """
+    reason = signals.reason(i)
+    return {
+        "symbol": symbol,
+        "signal_type": "LONG",
+        "score": int(signals.score[i]),
+        "reason": reason,
+        "sl_price": float(signals.sl_price[i]),
+        "tp_price": float(signals.tp_price[i]),
+        "regime": REGIME_NAMES[signals.regime[i]],
+        "tactic": reason
+    }
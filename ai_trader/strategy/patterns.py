@@ -4,15 +4,21 @@
 # [수정] 2024.11.15 - (오류) pandas-ta append=True 버그 (RSI 수동 할당 방식으로 변경)
 # [수정] 2024.11.15 - (오류) df.ta (확장) 대신 ta.rsi (직접 호출) 방식으로 변경
 # [수정] 2024.11.15 - (오류) 'BBL_20_2.0_2.0' 버그 (constants.py에서 공용 설정 로드)
+# [수정] 2024.11.17 - (성능) ta.rsi -> ai_trader.indicators.rsi (NumPy 커널)
+# [수정] 2024.11.17 - (성능) find_bullish_ob 루프/.iloc 제거 (벡터 OB 스캔 또는 OrderBlockIndex 조회)
+# [수정] 2024.11.17 - (성능) 패턴 함수의 df.copy() 제거 (RSI 컬럼이 없을 때만 _get_rsi가 복사본에 계산)
 """
 Strategy Owl v1 - 패턴 및 신호 검색 헬퍼
 (Tactic 1: v3.5 / Tactic 3: Range)
 """
 import pandas as pd
-import pandas_ta as ta 
 import numpy as np
 from typing import Dict, Any, Optional
 
+from ai_trader import indicators
+from ai_trader.candle_builder import kst_index_to_ms
+from ai_trader.strategy.order_block import OrderBlockIndex, scan_order_blocks
+
 # [신규] (공용 설정 임포트)
 from ai_trader.strategy.constants import (
     RSI_PERIOD, RSI_COL,
@@ -22,16 +28,16 @@ from ai_trader.strategy.constants import (
 # --- (공통) RSI 계산 헬퍼 ---
 def _get_rsi(df: pd.DataFrame) -> Optional[pd.DataFrame]:
     """
-    (공용 설정) DataFrame의 복사본('copy')에 RSI를 계산하여 반환합니다.
+    (공용 설정) RSI 컬럼이 있는 DataFrame을 반환합니다.
+    (이미 있으면(피처 프레임) df 그대로, 없으면 복사본('copy')에 계산 - 입력 df는 변경하지 않음)
     """
     if RSI_COL not in df.columns:
         try:
-            rsi_series = ta.rsi(df['close'], length=RSI_PERIOD)
-            
-            if rsi_series is None or rsi_series.empty:
+            if len(df) <= RSI_PERIOD:
                 print(f"[WARN] patterns.py: {RSI_COL} 계산 실패 (데이터 부족?).")
                 return None
-            df[RSI_COL] = rsi_series
+            df = df.copy()
+            df[RSI_COL] = indicators.rsi(df['close'].to_numpy(dtype='float64'), length=RSI_PERIOD)
         except Exception as e:
             print(f"[WARN] patterns.py: _get_rsi() 중 오류: {e}")
             return None
@@ -39,43 +45,46 @@ def _get_rsi(df: pd.DataFrame) -> Optional[pd.DataFrame]:
 
 # --- (Tactic 1: Bull Trend) v3.5 헬퍼 ---
 
-def find_bullish_ob(df: pd.DataFrame, current_price: float, lookback: int = 10) -> Optional[Dict[str, float]]:
+def find_bullish_ob(df: pd.DataFrame, current_price: float, lookback: int = 10, ob_index: Optional[OrderBlockIndex] = None) -> Optional[Dict[str, float]]:
     """
     [v3.5 계승] Bullish OB (지지 오더블록)를 찾습니다.
     (마지막 음봉 + 강한 양봉 돌파 + 현재가 리테스트)
-    """
-    df_recent = df.iloc[-lookback:].copy()
     
-    is_down_candle = df_recent['close'] < df_recent['open']
+    (최근 lookback봉 중 첫 봉을 제외한 구간에서, 현재가를 포함하는 가장 최근 OB)
+    [신규] ob_index: update_frame(df)을 마친 OrderBlockIndex (있으면 다시 스캔하지 않고 조회만 함)
+    """
+    n = len(df)
+    first = max(n - lookback, 0) + 1 # (기존 루프와 같이 lookback 구간의 첫 봉은 제외)
+    if first > n - 2:
+        return None
     
-    for i in range(len(df_recent) - 2, 0, -1):
-        if is_down_candle.iloc[i]:
-            if not is_down_candle.iloc[i+1]:
-                bullish_candle = df_recent.iloc[i+1]
-                bearish_candle = df_recent.iloc[i] 
-                
-                if bullish_candle['close'] > bearish_candle['high']:
-                    ob_high = bearish_candle['high']
-                    ob_low = bearish_candle['low']
-                    ob_height = ob_high - ob_low
-                    
-                    if current_price >= ob_low and current_price <= ob_high:
-                        
-                        return {
-                            "ob_low": ob_low,
-                            "ob_high": ob_high,
-                            "ob_height": ob_height
-                        }
+    if ob_index is not None:
+        since_ts = kst_index_to_ms(df.index[first:first + 1])[0]
+        ob = ob_index.latest_containing(current_price, 'bull', since_ts=since_ts)
+        if ob is None:
+            return None
+        ob_low, ob_high = ob.low, ob.high
+    else:
+        window = slice(first, n)
+        o, h, l, c = (df[col].to_numpy(dtype='float64')[window] for col in ('open', 'high', 'low', 'close'))
+        bull, _ = scan_order_blocks(o, h, l, c)
+        inside = bull[(l[bull] <= current_price) & (current_price <= h[bull])]
+        if not len(inside):
+            return None
+        i = inside[-1]
+        ob_low, ob_high = float(l[i]), float(h[i])
     
-    return None
+    return {
+        "ob_low": ob_low,
+        "ob_high": ob_high,
+        "ob_height": ob_high - ob_low
+    }
 
 def find_w_pattern(df: pd.DataFrame, current_price: float, lookback: int = 30) -> Optional[Dict[str, float]]:
     """
     [v3.5 계승] W-패턴(이중 바닥)을 찾습니다.
     """
-    df_recent = df.iloc[-lookback:].copy()
-    
-    df_recent = _get_rsi(df_recent)
+    df_recent = _get_rsi(df.iloc[-lookback:])
     if df_recent is None or RSI_COL not in df_recent.columns:
         return None
         
@@ -100,9 +109,7 @@ def find_rsi_divergence(df: pd.DataFrame, lookback: int = 30) -> bool:
     [v3.5 계승] RSI 상승 다이버전스를 찾습니다.
     (가격은 하락(LL)하는데, RSI는 상승(HL)하는 경우)
     """
-    df_recent = df.iloc[-lookback:].copy()
-    
-    df_recent = _get_rsi(df_recent)
+    df_recent = _get_rsi(df.iloc[-lookback:])
     if df_recent is None or RSI_COL not in df_recent.columns or df_recent[RSI_COL].isnull().all():
         return False
         
@@ -151,18 +158,15 @@ def find_bollinger_bounce_long(df: pd.DataFrame, current_price: float) -> Option
     bb_mid_col = BBANDS_MID_COL
     
     try:
-        df_copy = df.copy()
-        df_copy = _get_rsi(df_copy)
+        df_rsi = _get_rsi(df)
         
-        if df_copy is None or bb_low_col not in df_copy.columns or RSI_COL not in df_copy.columns:
+        if df_rsi is None or bb_low_col not in df_rsi.columns or RSI_COL not in df_rsi.columns:
             print("[WARN] find_bollinger_bounce_long: BBands 또는 RSI가 df에 없습니다.")
             return None
             
-        latest_data = df_copy.iloc[-1]
-        
-        bb_low = latest_data[bb_low_col]
-        bb_mid = latest_data[bb_mid_col]
-        rsi = latest_data[RSI_COL]
+        bb_low = df_rsi[bb_low_col].iloc[-1]
+        bb_mid = df_rsi[bb_mid_col].iloc[-1]
+        rsi = df_rsi[RSI_COL].iloc[-1]
         
         # (TTactic 3 롱 진입 조건)
         is_touch_bb_low = (current_price <= bb_low * 1.001)
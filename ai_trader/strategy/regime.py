@@ -8,33 +8,58 @@
 # [수정] 2024.11.15 - (오류) df.ta (확장) 대신 ta.ema/ta.bbands (직접 호출) 방식으로 변경
 # [수정] 2024.11.15 - (오류) BBands 컬럼 반환 실패 (강화된 디버깅 로그 추가)
 # [수정] 2024.11.15 - (오류) 'BBL_20_2.0_2.0' 버그 (constants.py에서 STD=2(int) 로드)
+# [수정] 2024.11.17 - (성능) IndicatorEngine(증분 지표) 값이 주어지면 ta.ema/ta.bbands 재계산 생략
+# [수정] 2024.11.17 - (성능) pandas-ta -> ai_trader.indicators (NumPy 커널)로 교체 (컬럼 누락 방어 코드 제거)
+# [수정] 2024.11.17 - (성능) 피처 프레임(EMA/밴드폭 컬럼이 이미 있는 df)은 재계산/복사 없이 판독
 """
 Strategy Owl v1 - Phase 1: 시장 국면 분석 (Market Regime Analysis)
 """
 import pandas as pd
-import pandas_ta as ta 
-from typing import Literal
+import numpy as np
+from typing import Dict, Literal, Optional
 
+from ai_trader import indicators as kernels # (인자 이름 indicators와 구분)
 # [신규] (공용 설정 임포트)
 from ai_trader.strategy.constants import (
     RSI_PERIOD, BBANDS_PERIOD, BBANDS_STD,
+    REGIME_EMA_PERIOD, REGIME_EMA_COL,
     BBANDS_LOW_COL, BBANDS_MID_COL, BBANDS_UPPER_COL,
-    BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL,
-    EXPECTED_BBANDS_COLS
+    BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL
 )
 
 MarketRegime = Literal["BULL", "BEAR", "RANGE"]
 
-# --- EMA 설정 ---
-REGIME_EMA_PERIOD = 50 
-
-def analyze_regime(df: pd.DataFrame) -> MarketRegime:
+def analyze_regime(df: pd.DataFrame, indicators: Optional[Dict[str, np.ndarray]] = None) -> MarketRegime:
     """
     H1 DataFrame을 받아, 현재 시장 국면(BULL, BEAR, RANGE)을 반환합니다.
+    
+    [신규] indicators: IndicatorEngine.get_history() 결과 (EMA/BBands 최근 값 - 있으면 재계산하지 않음)
+    [신규] df에 EMA / 밴드폭 컬럼이 이미 있으면(피처 프레임) 그 값으로 판독 (df를 변경하지 않음)
     """
     
     if df.empty:
         return "RANGE"
+    
+    if indicators and REGIME_EMA_COL in indicators and BBANDS_BANDWIDTH_COL in indicators:
+        if len(df) < REGIME_EMA_PERIOD:
+            return "RANGE"
+        return _classify_regime(
+            current_price=df['close'].iloc[-1],
+            ema_series=indicators[REGIME_EMA_COL],
+            bb_bandwidth=indicators[BBANDS_BANDWIDTH_COL][-1],
+            bars=len(df)
+        )
+        
+    # [신규] (피처 프레임 - strategy/features.py에서 지표 컬럼을 이미 계산한 경우, df를 변경하지 않음)
+    if REGIME_EMA_COL in df.columns and BBANDS_BANDWIDTH_COL in df.columns:
+        if len(df) < REGIME_EMA_PERIOD:
+            return "RANGE"
+        return _classify_regime(
+            current_price=df['close'].iloc[-1],
+            ema_series=df[REGIME_EMA_COL].to_numpy()[-2:],
+            bb_bandwidth=df[BBANDS_BANDWIDTH_COL].iloc[-1],
+            bars=len(df)
+        )
         
     try:
         # --- (오류 방어) 데이터 청소 (NaN 값 처리) ---
@@ -47,63 +72,62 @@ def analyze_regime(df: pd.DataFrame) -> MarketRegime:
         
         # --- 1. 지표 계산 ---
         
-        ema_col = f'EMA_{REGIME_EMA_PERIOD}'
-        
-        # (1-1. EMA 계산)
-        ema_series = ta.ema(df['close'], length=REGIME_EMA_PERIOD)
-        # (1-2. BBands 계산) (BBANDS_STD = 2 (int) 사용)
-        bbands_df = ta.bbands(df['close'], length=BBANDS_PERIOD, std=BBANDS_STD)
+        ema_col = REGIME_EMA_COL
         
-        # --- (방어 코드) ---
-        if ema_series is None or bbands_df is None or bbands_df.empty:
-            print(f"[FATAL] 'analyze_regime': EMA 또는 BBands 계산 실패 (NaN/데이터 부족?).")
-            return "RANGE"
+        close = df['close'].to_numpy(dtype='float64')
         
-        if not all(col in bbands_df.columns for col in EXPECTED_BBANDS_COLS):
-            print(f"[FATAL] 'analyze_regime': ta.bbands()가 BBands 컬럼을 반환하지 않았습니다.")
-            print(f"  > 예상 컬럼 (Expected): {EXPECTED_BBANDS_COLS}")
-            print(f"  > 실제 반환 (Actual): {list(bbands_df.columns)}")
-            return "RANGE"
-        # --- (방어 코드 끝) ---
+        # (1-1. EMA 계산)
+        ema_values = kernels.ema(close, REGIME_EMA_PERIOD)
+        # (1-2. BBands 계산)
+        bb = kernels.bbands(close, length=BBANDS_PERIOD, std=BBANDS_STD)
 
-        # (1-3. 수동으로 DataFrame에 합치기)
-        df[ema_col] = ema_series
-        df[BBANDS_LOW_COL] = bbands_df[BBANDS_LOW_COL]
-        df[BBANDS_MID_COL] = bbands_df[BBANDS_MID_COL]
-        df[BBANDS_UPPER_COL] = bbands_df[BBANDS_UPPER_COL]
-        df[BBANDS_BANDWIDTH_COL] = bbands_df[BBANDS_BANDWIDTH_COL]
+        # (1-3. DataFrame에 합치기 - Tactic 3에서 BBands 컬럼 사용)
+        df[ema_col] = ema_values
+        df[BBANDS_LOW_COL] = bb.lower
+        df[BBANDS_MID_COL] = bb.mid
+        df[BBANDS_UPPER_COL] = bb.upper
+        df[BBANDS_BANDWIDTH_COL] = bb.bandwidth
 
-        ema_slope = df[ema_col].diff().iloc[-1]
-        
-        bb_bandwidth = df[BBANDS_BANDWIDTH_COL].iloc[-1]
-        
-        # --- 2. 변수 준비 ---
-        
-        current_price = df['close'].iloc[-1]
-        ema_50 = df[ema_col].iloc[-1]
-        
-        if pd.isna(bb_bandwidth) or pd.isna(ema_50) or pd.isna(ema_slope):
-             print(f"[WARN] 'analyze_regime': 지표 계산 결과가 NaN입니다. (데이터 {len(df)}개)")
-             return "RANGE"
-        
-        is_squeeze = bb_bandwidth < 5.0
-        
-        # --- 3. 국면 판독 (Regime Analysis) ---
-        
-        if is_squeeze or (abs(ema_slope / ema_50) < 0.0001): # (기울기가 0.01% 미만)
-            return "RANGE"
-            
-        if current_price > ema_50 and ema_slope > 0:
-            return "BULL"
-            
-        if current_price < ema_50 and ema_slope < 0:
-            return "BEAR"
-            
-        return "RANGE"
+        return _classify_regime(
+            current_price=df['close'].iloc[-1],
+            ema_series=df[ema_col].to_numpy(),
+            bb_bandwidth=df[BBANDS_BANDWIDTH_COL].iloc[-1],
+            bars=len(df)
+        )
 
     except KeyError as ke:
         print(f"[FATAL] 'analyze_regime' (KeyError): {ke}. (데이터가 {len(df)}개뿐일 수 있습니다.)")
         return "RANGE"
     except Exception as e:
         print(f"[FATAL] 'analyze_regime' (Unknown Error): {e}")
-        return "RANGE"
\ No newline at end of file
+        return "RANGE"
+
+def _classify_regime(current_price: float, ema_series: np.ndarray, bb_bandwidth: float, bars: int) -> MarketRegime:
+    """ (국면 판독) 현재가 / EMA 최근 값 / 밴드폭 -> BULL, BEAR, RANGE """
+    
+    if len(ema_series) < 2:
+        return "RANGE"
+    
+    # --- 2. 변수 준비 ---
+    
+    ema_50 = ema_series[-1]
+    ema_slope = ema_series[-1] - ema_series[-2]
+    
+    if pd.isna(bb_bandwidth) or pd.isna(ema_50) or pd.isna(ema_slope):
+         print(f"[WARN] 'analyze_regime': 지표 계산 결과가 NaN입니다. (데이터 {bars}개)")
+         return "RANGE"
+    
+    is_squeeze = bb_bandwidth < 5.0
+    
+    # --- 3. 국면 판독 (Regime Analysis) ---
+    
+    if is_squeeze or (abs(ema_slope / ema_50) < 0.0001): # (기울기가 0.01% 미만)
+        return "RANGE"
+        
+    if current_price > ema_50 and ema_slope > 0:
+        return "BULL"
+        
+    if current_price < ema_50 and ema_slope < 0:
+        return "BEAR"
+        
+    return "RANGE"
@@ -20,6 +20,16 @@ LOG_FILE_PATH = os.getenv("LOG_FILE", "athena_v1.log")
 # 2. DB 파일 경로
 DB_FILE_PATH = os.getenv("DB_NAME", "athena_v1_trade_history.db")
 
+# 2-1. 캔들 DB 파일 경로 (로컬 캔들 저장소)
+CANDLE_DB_FILE_PATH = os.getenv("CANDLE_DB_NAME", "athena_v1_candles.db")
+
+# 2-2. 캔들 memmap 배열 폴더 (마켓/타임프레임별 컬럼 파일, 프로세스 간 공유)
+CANDLE_MMAP_DIR = os.getenv("CANDLE_MMAP_DIR", "athena_v1_candles_mmap")
+
+# 2-3. 전략 평가 프로세스 풀 (워커 수: 0이면 CPU 코어 수 / EVAL_INLINE=1이면 풀 없이 이벤트 루프에서 실행 - 디버깅용)
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "0"))
+EVAL_INLINE = os.getenv("EVAL_INLINE", "0") == "1"
+
 # 3. 로그 레벨
 # (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR)
 LOG_LEVEL = logging.INFO 
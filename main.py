@@ -16,14 +16,27 @@
 # [수정] 2024.11.12 - (요청) 자산 요약(수량) 갱신을 위한 /api/account-summary 엔드포인트 신설
 # [수정] 2024.11.14 - (Owl v1) SignalEngineV3_5 -> SignalEngineOwlV1로 교체
 # [수정] 2024.11.15 - (Owl v1.1) S4 청산 위해 check_exit_conditions에 df_h1 전체 전달
+# [수정] 2024.11.16 - (성능) /api/ohlcv가 봇과 같은 DataManager 캔들 캐시를 사용
+# [수정] 2024.11.16 - (성능) 차트 Ticker WS를 MarketDataHub(단일 연결 공유)로 교체 (재연결 폭주 제거)
+# [수정] 2024.11.16 - (성능) 봇 H1 캔들을 CandleBuilder(체결 스트림 집계)에서 공급
+# [수정] 2024.11.16 - (성능) 자산 요약/모의 주문 현재가를 PriceSnapshotService에서 조회
+# [수정] 2024.11.17 - (요청) 로컬 캔들 저장소(CandleStore) 연동 (재시작 시 디스크 캔들 재사용)
+# [수정] 2024.11.17 - (성능) /api/ohlcv를 memmap 캔들 배열에서 직렬화 (DataFrame 복사/시간대 변환 제거)
+# [수정] 2024.11.17 - (성능) /api/markets, 자산 요약 한글 이름을 MarketCatalogue(TTL 캐시)에서 조회
+# [수정] 2024.11.17 - (요청) 로컬 호가창(OrderBookEngine) - 진입 규모 계산/모의 체결에 사용
+# [수정] 2024.11.17 - (성능) 봇 지표를 IndicatorEngine(증분 갱신)으로 계산
+# [수정] 2024.11.17 - (성능) 봇 루프 고정 60초 대기를 봉 마감 이벤트 스케줄러(CandleCloseScheduler)로 교체
+# [수정] 2024.11.17 - (성능) 진입 신호 평가를 프로세스 풀(EvaluationExecutor)로 이동 (이벤트 루프 블로킹 제거)
+# [수정] 2024.11.17 - (요청) 봇 시작 시 로컬 캔들 저장소 백필/누락 복구 (DataManager.prepare_history)
+# [수정] 2024.11.17 - (오류) 평가 슬롯을 캔들 조회/신호 평가로 한정 (주문 대기 중 슬롯 점유 방지), 평가 후 갱신을 finally로
+# [수정] 2024.11.17 - (오류) S4 청산 국면을 진입 국면과 같은 기준(같은 200봉 + NumPy 커널)으로 계산 (IndicatorEngine 누적 상태 사용 중단)
+# [수정] 2024.11.17 - (성능) 봇 루프 피처 계산은 포지션 보유 시에만 (미보유 시 지표/국면 계산은 평가 워커에서 1번만)
 
 import sys
 import os
 import asyncio
 import pandas as pd 
 import json 
-import websockets 
-import uuid 
 from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Set, Any 
 from fastapi import FastAPI, WebSocket, HTTPException, WebSocketDisconnect
@@ -39,7 +52,7 @@ if project_root_dir not in sys.path:
 # --- 경로 설정 끝 ---
 
 # --- 모듈 임포트 ---
-from config import LOG_FILE_PATH, DB_FILE_PATH, LOG_LEVEL
+from config import LOG_FILE_PATH, DB_FILE_PATH, CANDLE_DB_FILE_PATH, CANDLE_MMAP_DIR, LOG_LEVEL, EVAL_WORKERS, EVAL_INLINE
 from ai_trader.utils.logger import setup_logger
 from ai_trader.exchange_api import UpbitExchange
 from ai_trader.mock_exchange import MockExchange 
@@ -48,6 +61,15 @@ from ai_trader.data_manager import DataManager
 from ai_trader.signal_engine import SignalEngineOwlV1
 from ai_trader.risk_manager import RiskManager
 from ai_trader.position_manager import PositionManager
+from ai_trader.market_data_hub import MarketDataHub
+from ai_trader.candle_builder import CandleBuilder
+from ai_trader.price_snapshot import PriceSnapshotService
+from ai_trader.candle_store import CandleStore
+from ai_trader.market_catalogue import MarketCatalogue
+from ai_trader.order_book import OrderBookEngine
+from ai_trader.strategy.features import FeatureStore
+from ai_trader.candle_scheduler import ServerClock, CandleCloseScheduler, REASON_CLOSE
+from ai_trader.evaluation_executor import EvaluationExecutor
 
 # --- 전역 변수 및 설정 ---
 
@@ -65,16 +87,53 @@ public_exchange = UpbitExchange(access_key=None, secret_key=None)
 # 봇/잔고용 API (Private)
 private_exchange: Optional[UpbitExchange | MockExchange] = None 
 
+# 실시간 캔들 생성기 (허브의 체결 스트림 -> 1분봉/H1 캔들)
+candle_builder = CandleBuilder()
+
+# 현재가 스냅샷 (허브 ticker + 일괄 REST 조회)
+price_service = PriceSnapshotService(public_exchange)
+
+# 로컬 호가창 (허브의 orderbook 스트림)
+order_book_engine = OrderBookEngine()
+
+# [신규] (봉별 피처 프레임 캐시 - 지표/국면을 청산 확인과 신호 분석에서 공유)
+feature_store = FeatureStore()
+
+# [신규] (거래소 서버 시각 추정 - 허브 체결/ticker 메시지의 timestamp)
+server_clock = ServerClock()
+
+# [신규] (봉 마감 / 가격 변동 / 하트비트 이벤트로 봇 평가 - 동시 평가 수 제한)
+candle_scheduler = CandleCloseScheduler(server_clock)
+
+# (봉 중간 평가 기준 - 마지막 평가 가격 대비 변동 %)
+BOT_MOVE_TRIGGER_PCT = 1.0
+
+# [신규] (진입 신호 평가 프로세스 풀 - 캔들은 공유 메모리로 전달)
+evaluation_executor = EvaluationExecutor(max_workers=EVAL_WORKERS or None, inline=EVAL_INLINE)
+
+# 마켓 목록 캐시 (TTL 백그라운드 갱신)
+market_catalogue = MarketCatalogue(public_exchange)
+
+# 로컬 캔들 저장소 (거래소에서 받은 캔들을 디스크에 보관)
+candle_store = CandleStore(db_path=CANDLE_DB_FILE_PATH, mmap_dir=CANDLE_MMAP_DIR)
+
+# 차트(/api/ohlcv)용 DataManager (캔들 캐시는 봇의 DataManager와 공유됨)
+chart_data_manager = DataManager(exchange_api=public_exchange, candle_builder=candle_builder, candle_store=candle_store)
+
 # 봇 관리 딕셔너리
 active_bots: Dict[str, asyncio.Task] = {}
 
 # 자본 접근 동기화를 위한 Lock
 capital_lock = asyncio.Lock()
 
-# 업비트 틱(Ticker) WebSocket 관리
-upbit_ws_task: Optional[asyncio.Task] = None
-upbit_ws_client: Optional[websockets.WebSocketClientProtocol] = None
-current_ticker_symbols: Set[str] = {"KRW-BTC"} 
+# 업비트 WebSocket 허브 (봇 + GUI 차트가 연결 1개를 공유)
+market_hub = MarketDataHub()
+
+# (GUI 클라이언트별 허브 구독자 ID 접두사)
+GUI_CONSUMER_PREFIX = "gui:"
+
+def _gui_consumer_id(websocket: WebSocket) -> str:
+    return f"{GUI_CONSUMER_PREFIX}{id(websocket)}"
 
 # WebSocket 연결 관리 (GUI 클라이언트)
 class ConnectionManager:
@@ -90,15 +149,8 @@ class ConnectionManager:
         self.active_connections.remove(websocket)
         logger.info(f"WebSocket 연결 해제: {websocket.client}")
         
-        if len(self.active_connections) == 0:
-            logger.info("모든 GUI 클라이언트 연결 해제. 업비트 Ticker WebSocket 종료 중...")
-            global upbit_ws_task, upbit_ws_client
-            if upbit_ws_task:
-                upbit_ws_task.cancel()
-                upbit_ws_task = None
-            if upbit_ws_client:
-                logger.info("업비트 Ticker 태스크 취소됨.")
-                pass
+        # (이 클라이언트의 차트 구독만 해제 - 봇/다른 클라이언트의 구독은 유지)
+        market_hub.release(_gui_consumer_id(websocket))
 
     async def broadcast(self, message: dict):
         for connection in self.active_connections:
@@ -109,51 +161,15 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
-# --- 업비트 실시간 Ticker WebSocket 클라이언트 ---
-
-async def start_upbit_ticker_ws(symbols: List[str]):
-    global upbit_ws_client, manager, current_ticker_symbols
-    
-    current_ticker_symbols = set(symbols) 
-    if not symbols:
-        logger.warning("업비트 Ticker WS: 구독할 심볼이 없습니다. 연결을 시작하지 않습니다.")
-        return
-        
-    uri = "wss://api.upbit.com/websocket/v1"
-    
-    try:
-        async with websockets.connect(uri) as ws:
-            upbit_ws_client = ws 
-            
-            subscribe_msg = json.dumps([
-                {"ticket": f"athena-chart-{uuid.uuid4()}"}, 
-                {"type": "ticker", "codes": symbols} 
-            ])
-            await ws.send(subscribe_msg)
-            logger.info(f"업비트 Ticker WebSocket 연결 성공. [{', '.join(symbols)}] 구독 시작.")
-            
-            async for message in ws:
-                if isinstance(message, bytes):
-                    try:
-                        data = json.loads(message.decode('utf-8'))
-                        await manager.broadcast({
-                            "type": "tick",
-                            "payload": data
-                        })
-                    except json.JSONDecodeError:
-                        logger.warning("업비트 Ticker WS: JSON 디코딩 실패")
-                    except Exception as e:
-                        logger.error(f"업비트 Ticker WS: 틱 처리 중 오류: {e}")
+# --- 업비트 실시간 Ticker -> GUI 전달 ---
 
-    except asyncio.CancelledError:
-        logger.info(f"업비트 Ticker WS [{', '.join(symbols)}] 작업이 취소되었습니다 (심볼 변경 또는 서버 종료).")
-    except websockets.exceptions.ConnectionClosed as e:
-        logger.warning(f"업비트 Ticker WS [{', '.join(symbols)}] 연결 끊김 (재시도 필요): {e}")
-    except Exception as e:
-        logger.error(f"업비트 Ticker WS [{', '.join(symbols)}] 치명적 오류: {e}", exc_info=True)
-    finally:
-        upbit_ws_client = None
-        logger.info(f"업비트 Ticker WS [{', '.join(symbols)}] 연결 종료.")
+async def broadcast_gui_tick(data: Dict[str, Any]):
+    """ (MarketDataHub 리스너) GUI 차트가 구독 중인 심볼의 ticker만 전달 """
+    if data.get('code') in market_hub.symbols_for("ticker", consumer_prefix=GUI_CONSUMER_PREFIX):
+        await manager.broadcast({
+            "type": "tick",
+            "payload": data
+        })
 
 
 # --- FastAPI 수명 주기 (Lifespan) ---
@@ -167,17 +183,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"데이터베이스 초기화 실패: {e}")
     
-    global upbit_ws_task
-    if upbit_ws_task is None:
-        upbit_ws_task = asyncio.create_task(start_upbit_ticker_ws(list(current_ticker_symbols)))
+    candle_store.create_tables()
+    
+    market_hub.add_listener("ticker", broadcast_gui_tick)
+    market_hub.add_listener("trade", candle_builder.on_trade)
+    market_hub.add_listener("status", candle_builder.on_status)
+    market_hub.add_listener("ticker", price_service.on_ticker)
+    market_hub.add_listener("status", price_service.on_status)
+    market_hub.add_listener("orderbook", order_book_engine.on_orderbook)
+    market_hub.add_listener("status", order_book_engine.on_status)
+    market_hub.add_listener("trade", server_clock.on_message)
+    market_hub.add_listener("ticker", candle_scheduler.on_ticker)
+    market_hub.start()
+    candle_scheduler.start()
+    evaluation_executor.start()
+    price_service.start()
+    market_catalogue.start()
     
     yield 
     
     logger.info("--- Athena v1 (FastAPI) 서버 종료 중 ---")
     
-    if upbit_ws_task:
-        upbit_ws_task.cancel()
-        await upbit_ws_task
+    await market_hub.stop()
+    await candle_scheduler.stop()
+    await price_service.stop()
+    await market_catalogue.stop()
         
     if active_bots:
         logger.info(f"실행 중인 {len(active_bots)}개의 봇을 모두 중지합니다...")
@@ -188,6 +218,8 @@ async def lifespan(app: FastAPI):
         await asyncio.gather(*tasks, return_exceptions=True)
         logger.info("모든 봇이 중지되었습니다.")
     
+    evaluation_executor.shutdown()
+    
     await UpbitExchange.close_session()
     logger.info("aiohttp 클라이언트 세션 종료.")
 
@@ -222,8 +254,6 @@ class ChartSubscribeListModel(BaseModel):
 
 # --- 자산 요약 헬퍼 함수 ---
 async def _get_account_summary(exchange: UpbitExchange | MockExchange) -> Dict[str, Any]:
-    global public_exchange
-    
     all_balances_raw = await exchange.get_balance(ticker=None, verbose=True, use_cache=False)
     
     if not all_balances_raw or (isinstance(all_balances_raw, dict) and 'error' in all_balances_raw):
@@ -258,15 +288,14 @@ async def _get_account_summary(exchange: UpbitExchange | MockExchange) -> Dict[s
             })
 
     if tickers_to_fetch_price:
-        current_prices = await public_exchange.get_current_price(tickers_to_fetch_price)
-        all_markets_map = {m['market']: m['korean_name'] for m in await public_exchange.get_market_all()}
+        current_prices = await price_service.get_prices(tickers_to_fetch_price)
 
         for asset in account_summary:
             if asset['currency'] == 'KRW':
                 continue
             
             ticker = f"KRW-{asset['currency']}"
-            asset['name'] = all_markets_map.get(ticker, asset['currency']) 
+            asset['name'] = market_catalogue.korean_name(ticker, asset['currency'])
             
             current_price = 0.0
             if isinstance(current_prices, dict):
@@ -291,7 +320,7 @@ async def set_api_keys(keys: ApiKeyModel):
         # 1. 모의 투자 모드
         if keys.is_mock_trade:
             logger.info("--- 모의 투자 모드 활성화 ---")
-            private_exchange = MockExchange()
+            private_exchange = MockExchange(price_service=price_service, order_book_engine=order_book_engine)
             success_msg = f"모의 투자 모드 활성화. (가상 자본금: {private_exchange.STARTING_CAPITAL_KRW:,.0f}원)"
             
         # 2. 실전 매매 모드
@@ -352,9 +381,9 @@ async def get_account_summary():
 @app.get("/api/markets")
 async def get_all_markets():
     try:
-        markets = await public_exchange.get_market_all()
+        markets = await market_catalogue.get_krw_markets()
         if not markets:
-            logger.warning("get_market_all()이 빈 목록을 반환했습니다.")
+            logger.warning("마켓 목록 캐시가 비어 있습니다.")
             raise HTTPException(status_code=404, detail="업비트에서 마켓 목록을 가져오지 못했습니다.")
         return markets
     except Exception as e:
@@ -365,8 +394,19 @@ async def get_all_markets():
 async def get_ohlcv_data(symbol: str, interval: str = "minute60", count: int = 200):
     logger.debug(f"차트 데이터 요청: {symbol}, {interval}, {count}")
     try:
-        data_manager = DataManager(exchange_api=public_exchange)
-        df = await data_manager.fetch_ohlcv(symbol, interval, count)
+        # (memmap 배열이 있으면 DataFrame을 만들지 않고 바로 직렬화 - 'ts'는 이미 UTC epoch ms)
+        arrays = await chart_data_manager.fetch_ohlcv_arrays(symbol, interval, count)
+        if arrays is not None:
+            return [
+                {"open": o, "high": h, "low": l, "close": c, "time": t}
+                for o, h, l, c, t in zip(
+                    arrays['open'].tolist(), arrays['high'].tolist(),
+                    arrays['low'].tolist(), arrays['close'].tolist(),
+                    (arrays['ts'] // 1000).tolist()
+                )
+            ]
+        
+        df = await chart_data_manager.fetch_ohlcv(symbol, interval, count)
         
         if df.empty:
             logger.warning(f"OHLCV 데이터 없음: {symbol}, {interval}")
@@ -452,7 +492,11 @@ async def stop_bots(control: BotControlModel):
 
 @app.get("/api/status")
 async def get_status():
-    return {"running_bots": list(active_bots.keys())}
+    return {
+        "running_bots": list(active_bots.keys()),
+        # [신규] (신호 평가 메모 적중/실패 - 재평가를 생략한 횟수)
+        "signal_memo": SignalEngineOwlV1.memo_stats()
+    }
 
 
 # --- WebSocket 엔드포인트 ---
@@ -461,11 +505,11 @@ async def get_status():
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     
-    global current_ticker_symbols
     try:
+        gui_symbols = market_hub.symbols_for("ticker", consumer_prefix=GUI_CONSUMER_PREFIX)
         await websocket.send_json({
             "type": "info",
-            "payload": {"message": f"서버 연결 성공. 현재 차트 Ticker: {', '.join(current_ticker_symbols)}"}
+            "payload": {"message": f"서버 연결 성공. 현재 차트 Ticker: {', '.join(sorted(gui_symbols)) or '없음'}"}
         })
     except Exception:
         pass 
@@ -480,12 +524,8 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if isinstance(symbols, list):
                     logger.info(f"WebSocket 수신: 차트 구독 변경 요청 -> {symbols}")
-                    global upbit_ws_task
-                    
-                    if upbit_ws_task:
-                        upbit_ws_task.cancel()
-                    
-                    upbit_ws_task = asyncio.create_task(start_upbit_ticker_ws(symbols))
+                    # (허브 구독 목록만 교체 - 업비트 연결은 재사용)
+                    market_hub.set_symbols(_gui_consumer_id(websocket), symbols, streams=("ticker",))
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -502,7 +542,7 @@ async def trading_bot_task(symbol: str, exchange: UpbitExchange | MockExchange):
     global capital_lock 
     
     try:
-        data_manager = DataManager(exchange)
+        data_manager = DataManager(exchange, candle_builder=candle_builder, price_service=price_service, candle_store=candle_store)
         db = Database(DB_FILE_PATH)
         
         total_capital_temp = 1000000 
@@ -512,7 +552,6 @@ async def trading_bot_task(symbol: str, exchange: UpbitExchange | MockExchange):
         )
         
         position_manager = PositionManager(exchange, db, risk_manager, symbol, manager.broadcast)
-        signal_engine = SignalEngineOwlV1()
     
     except Exception as e:
         await manager.broadcast({
@@ -522,54 +561,79 @@ async def trading_bot_task(symbol: str, exchange: UpbitExchange | MockExchange):
         logger.error(f"[{symbol}] 봇 초기화 실패: {e}", exc_info=True)
         return
 
+    # (봇 심볼을 허브에 등록 - ticker/trade/orderbook 실시간 수신)
+    market_hub.acquire(f"bot:{symbol}", [symbol])
+    candle_builder.track(symbol)
+    trigger = candle_scheduler.register(symbol, "minute60", move_threshold_pct=BOT_MOVE_TRIGGER_PCT)
+
     try:
+        # [신규] (로컬 캔들 저장소 백필/누락 복구 - 긴 룩백, 재시작, 백테스트용 디스크 캔들)
+        await data_manager.prepare_history(symbol, "minute60")
+
         while True:
-            df_h1 = await data_manager.fetch_ohlcv(symbol, timeframe="minute60", count=200)
-            if df_h1.empty:
-                await asyncio.sleep(60)
-                continue
-            
-            current_price = df_h1.iloc[-1]['close']
-            current_position = position_manager.get_position(symbol)
-            
-            # 1. (포지션 보유 시) 청산 조건 확인
-            if current_position:
-                # [수정] (Owl v1.1) (S4 청산을 위해 df_h1 전체를 전달)
-                await position_manager.check_exit_conditions(current_position, df_h1)
-            
-            # 2. (포지션 미보유 시) 신규 진입 확인
-            if not current_position:
-                
-                signal_dict = signal_engine.generate_signal_owl(df_h1.copy(), symbol)
-                
-                # (Owl v1: Tactic 1(v3.5) 또는 Tactic 3(Range) 신호 감지 시)
-                if signal_dict:
-                    
+            # [수정] (고정 60초 대기 대신 봉 마감 / 가격 변동 / 하트비트 이벤트까지 대기)
+            reason = await trigger.wait()
+
+            current_price = None
+            try:
+                # (동시 평가 수 제한 - 봉 마감 직후 봇들이 한꺼번에 평가하지 않도록)
+                # (슬롯은 캔들 조회 + 지표/신호 평가까지만 - 잔고 조회/주문(대기 포함)은 슬롯을 반납한 뒤 실행)
+                async with candle_scheduler.slot():
+                    df_h1 = await data_manager.fetch_ohlcv(symbol, timeframe="minute60", count=200)
+                    if df_h1.empty:
+                        continue
+                    if reason == REASON_CLOSE:
+                        logger.debug(f"[{symbol}] H1 봉 마감 평가 (마지막 봉: {df_h1.index[-1]}).")
+
+                    current_price = df_h1.iloc[-1]['close']
+                    current_position = position_manager.get_position(symbol)
+
+                    # [수정] (피처는 청산 확인에만 사용 - 포지션이 있을 때만 계산, 진입 평가는 워커가 같은 봉으로 계산)
+                    # (청산 국면은 진입 신호(워커)와 같은 200봉 / 같은 커널로 계산 - 진입 국면과 기준이 같아야 S4가 실제 국면 전환에만 반응)
+                    features = None
+                    signal_dict = None
+                    if current_position:
+                        features = feature_store.get(symbol, "minute60", df_h1)
+                    else:
+                        # [수정] (신호 평가는 프로세스 풀에서 - 이벤트 루프는 결과만 대기)
+                        signal_dict = await evaluation_executor.evaluate(symbol, df_h1)
+
+                # 1. (포지션 보유 시) 청산 조건 확인
+                if current_position:
+                    # [수정] (Owl v1.1) (S4 청산을 위해 df_h1 전체를 전달)
+                    await position_manager.check_exit_conditions(current_position, df_h1, features)
+
+                # 2. (포지션 미보유 시) 신규 진입 - (Owl v1: Tactic 1(v3.5) 또는 Tactic 3(Range) 신호 감지 시)
+                elif signal_dict:
+
                     async with capital_lock:
                         logger.info(f"[{symbol}] 자본 Lock 획득. 잔고 확인 및 주문 시작...")
                         try:
                             current_krw_balance = await exchange.get_krw_balance(use_cache=False)
-                            
+
                             # (RiskManager가 (regime, sl, tp) 기반으로 동적 계산)
                             final_signal = risk_manager.calculate_position_size(
                                 signal_data=signal_dict,
                                 current_price=current_price,
-                                krw_balance=current_krw_balance 
+                                krw_balance=current_krw_balance,
+                                order_book=order_book_engine.get(symbol)
                             )
-                            
+
                             if final_signal:
                                 await position_manager.enter_position(final_signal)
-                        
+
                         except Exception as e:
                             await manager.broadcast({
                                 "type": "log",
                                 "payload": {"level": "warn", "message": f"[{symbol}] 진입 처리 중 오류 (Lock 내부): {e}"}
                             })
                             logger.warning(f"[{symbol}] 진입 처리 중 오류 (Lock 내부): {e}", exc_info=True)
-                        
+
                         logger.info(f"[{symbol}] 자본 Lock 해제.")
-                    
-            await asyncio.sleep(60) 
+
+            finally:
+                # (다음 가격 변동 기준 / 하트비트 갱신 - 캔들 조회 실패로 건너뛴 경우에도)
+                candle_scheduler.mark_evaluated(trigger, current_price)
 
     except asyncio.CancelledError:
         await manager.broadcast({
@@ -586,6 +650,11 @@ async def trading_bot_task(symbol: str, exchange: UpbitExchange | MockExchange):
         logger.error(f"[{symbol}] 봇 실행 중 치명적 오류: {e}", exc_info=True)
     
     finally:
+        candle_scheduler.unregister(trigger)
+        market_hub.release(f"bot:{symbol}")
+        candle_builder.untrack(symbol)
+        feature_store.reset(symbol)
+        evaluation_executor.release(symbol)
         active_bots.pop(symbol, None)
         logger.info(f"[{symbol}] 봇 태스크가 완전히 종료되었습니다.")
 
@@ -0,0 +1,76 @@
+# Athena_v1/tests/bench_indicators.py
+# [신규] 2024.11.17 - (요청) 지표 커널 벤치마크 (NumPy 커널 vs pandas 기준 구현 / pandas-ta 설치 시 함께 측정)
+"""
+지표 커널 벤치마크
+
+실행: python -m tests.bench_indicators [--bars 200] [--symbols 50] [--repeat 20]
+
+- 봇 1회 평가와 같은 크기(마켓당 H1 200개)로 EMA(50) / BBands(20) / RSI(14) / ATR(14)를 계산합니다.
+- pandas: 마켓마다 Series로 계산 (tests.reference_indicators - pandas-ta와 같은 공식)
+- numpy: 마켓마다 1차원 배열로 계산
+- numpy batch: (마켓 수, 봉 수) 배열 한 번에 계산
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from ai_trader import indicators
+from tests import reference_indicators as ref
+from tests.test_indicators import make_ohlc
+
+def _timeit(fn, repeat: int) -> float:
+    """ 최솟값 (ms) """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description="지표 커널 벤치마크")
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    frames = [make_ohlc(args.bars, seed) for seed in range(args.symbols)]
+    arrays = [{col: f[col].to_numpy() for col in ("high", "low", "close")} for f in frames]
+    batch = {col: np.stack([a[col] for a in arrays]) for col in ("high", "low", "close")}
+
+    def run_pandas():
+        for f in frames:
+            ref.ema(f["close"], 50); ref.bbands(f["close"], 20); ref.rsi(f["close"], 14)
+            ref.atr(f["high"], f["low"], f["close"], 14)
+
+    def run_numpy():
+        for a in arrays:
+            indicators.ema(a["close"], 50); indicators.bbands(a["close"], 20); indicators.rsi(a["close"], 14)
+            indicators.atr(a["high"], a["low"], a["close"], 14)
+
+    def run_batch():
+        indicators.ema(batch["close"], 50); indicators.bbands(batch["close"], 20); indicators.rsi(batch["close"], 14)
+        indicators.atr(batch["high"], batch["low"], batch["close"], 14)
+
+    cases = [("pandas", run_pandas), ("numpy", run_numpy), ("numpy batch", run_batch)]
+    try:
+        import pandas_ta as ta
+
+        def run_pandas_ta():
+            for f in frames:
+                ta.ema(f["close"], length=50); ta.bbands(f["close"], length=20); ta.rsi(f["close"], length=14)
+                ta.atr(f["high"], f["low"], f["close"], length=14)
+
+        cases.insert(0, ("pandas-ta", run_pandas_ta))
+    except ImportError:
+        print("(pandas-ta 미설치 - pandas 기준 구현과만 비교)")
+
+    results = {name: _timeit(fn, args.repeat) for name, fn in cases}
+    base = results["pandas"]
+    print(f"마켓 {args.symbols}개 x 봉 {args.bars}개 (EMA50 + BBands20 + RSI14 + ATR14, {args.repeat}회 중 최솟값)")
+    for name, ms in results.items():
+        print(f"  {name:<12} {ms:9.3f} ms  (pandas 대비 x{base / ms:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Athena_v1/tests/data/make_pandas_ta_golden.py
+# [신규] 2024.11.17 - (요청) pandas-ta 골든 값 생성 스크립트 (pandas-ta가 설치된 환경에서 1번 실행)
+"""
+pandas-ta 골든 값 생성
+
+pandas-ta 출력을 tests/data/pandas_ta_golden.npz에 저장합니다.
+(requirements.txt에는 pandas-ta가 없으므로 테스트는 이 파일과 비교 - 입력 캔들도 함께 저장)
+
+    python -m tests.data.make_pandas_ta_golden
+"""
+import numpy as np
+import pandas_ta as ta
+
+from tests.test_indicators import (
+    GOLDEN_PATH, EMA_LENGTHS, SMA_LENGTHS, RSI_LENGTHS, ATR_LENGTHS, BBANDS_PARAMS, BBANDS_COLUMNS, make_ohlc
+)
+
+def main():
+    ohlc = make_ohlc(1500)
+    h, l, c = (ohlc[col] for col in ("high", "low", "close"))
+    arrays = {"high": h.to_numpy(), "low": l.to_numpy(), "close": c.to_numpy()}
+
+    for length in EMA_LENGTHS:
+        arrays[f"ema_{length}"] = ta.ema(c, length=length).to_numpy()
+    for length in SMA_LENGTHS:
+        arrays[f"sma_{length}"] = ta.sma(c, length=length).to_numpy()
+    for length in RSI_LENGTHS:
+        arrays[f"rsi_{length}"] = ta.rsi(c, length=length).to_numpy()
+    arrays["true_range"] = ta.true_range(h, l, c).to_numpy()
+    for length in ATR_LENGTHS:
+        arrays[f"atr_{length}"] = ta.atr(h, l, c, length=length).to_numpy()
+    for length, std in BBANDS_PARAMS:
+        frame = ta.bbands(c, length=length, lower_std=std, upper_std=std)
+        for name, prefix in BBANDS_COLUMNS:
+            arrays[f"bbands_{length}_{std:g}_{name}"] = frame.filter(like=prefix).iloc[:, 0].to_numpy()
+
+    np.savez_compressed(GOLDEN_PATH, pandas_ta_version=np.array(ta.version), **arrays)
+    print(f"{GOLDEN_PATH}: pandas-ta {ta.version}, {len(arrays)}개 배열")
+
+if __name__ == "__main__":
+    main()
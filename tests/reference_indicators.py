@@ -0,0 +1,57 @@
+# Athena_v1/tests/reference_indicators.py
+# [신규] 2024.11.17 - (요청) 지표 기준 구현 (pandas-ta와 같은 pandas ewm/rolling 공식 - 골든 테스트/벤치마크용)
+# [수정] 2024.11.17 - (오류) pandas-ta 0.4 공식으로 수정 (BBands ddof=1, rma adjust=False, ATR SMA 시드, 첫 봉 TR)
+"""
+pandas-ta 0.4 기본 설정과 같은 공식의 pandas 기준 구현 (1차원 Series)
+
+- sma: rolling(N).mean()
+- ema: 처음 N-1개 NaN, N번째 = 처음 N개 SMA, 이후 ewm(span=N, adjust=False)
+- bbands: rolling 평균 ± k * rolling 표준편차(ddof=1), 밴드폭 = 100 * (U - L) / M, %B = (C - L) / (U - L)
+- rsi: rma = ewm(alpha=1/N, adjust=False).mean() (Wilder), 봉 수가 N개 이하면 NaN
+- atr: 처음 N-1개 NaN, N번째 = 처음 N개 TR 평균(첫 봉 TR = H - L), 이후 rma
+"""
+import numpy as np
+import pandas as pd
+
+def sma(close: pd.Series, length: int) -> pd.Series:
+    return close.rolling(length).mean()
+
+def ema(close: pd.Series, length: int) -> pd.Series:
+    seeded = close.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = close.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+def bbands(close: pd.Series, length: int = 20, std: float = 2.0) -> pd.DataFrame:
+    mid = close.rolling(length).mean()
+    dev = close.rolling(length).std(ddof=1)
+    lower, upper = mid - std * dev, mid + std * dev
+    return pd.DataFrame({
+        "lower": lower, "mid": mid, "upper": upper,
+        "bandwidth": 100.0 * (upper - lower) / mid,
+        "percent": (close - lower) / (upper - lower),
+    })
+
+def rma(x: pd.Series, length: int) -> pd.Series:
+    return x.ewm(alpha=1.0 / length, adjust=False).mean()
+
+def rsi(close: pd.Series, length: int = 14) -> pd.Series:
+    if len(close) <= length:
+        return pd.Series(np.nan, index=close.index)
+    change = close.diff()
+    gain = rma(change.clip(lower=0.0), length)
+    loss = rma((-change).clip(lower=0.0), length)
+    return 100.0 * gain / (gain + loss)
+
+def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    prev = close.shift(1)
+    return pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> pd.Series:
+    if len(close) <= length:
+        return pd.Series(np.nan, index=close.index)
+    tr = true_range(high, low, close)
+    seeded = tr.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = tr.iloc[:length].mean()
+    return rma(seeded, length)
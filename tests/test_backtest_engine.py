@@ -0,0 +1,124 @@
+# Athena_v1/tests/test_backtest_engine.py
+# [신규] 2024.11.17 - (요청) 백테스터 테스트 (봉별 판정 = generate_signal_owl, S1/S2/S4 청산 규칙)
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_trader.backtest.engine import (
+    Backtester, BacktestParams, bar_signals, slice_signals,
+    EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_REGIME, EXIT_END
+)
+from ai_trader.signal_engine import SignalEngineOwlV1
+from ai_trader.strategy.features import _ohlcv_values
+from ai_trader.strategy.panel import TACTIC_NONE, signal_dict
+
+SYMBOL = "KRW-TEST"
+WINDOW = 200
+
+def make_trending_h1(n: int, seed: int) -> pd.DataFrame:
+    """ 300봉마다 상승/횡보/하락 추세가 바뀌는 H1 캔들 (국면/전술이 고루 나오도록) """
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.choice([-0.002, 0.0, 0.002], n // 300 + 1), 300)[:n]
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1.0 + rng.normal(0.0, 0.002, n))
+    high = np.maximum(open_, close) * (1.0 + np.abs(rng.normal(0.0, 0.004, n)))
+    low = np.minimum(open_, close) * (1.0 - np.abs(rng.normal(0.0, 0.004, n)))
+    index = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": rng.random(n)}, index=index)
+
+# --- 봉별 판정 = 라이브 엔진 ---
+
+@pytest.mark.parametrize("seed", [2, 6])
+def test_bar_signals_match_generate_signal_owl(seed):
+    df = make_trending_h1(1000, seed)
+    signals = bar_signals(_ohlcv_values(df), WINDOW)
+    engine = SignalEngineOwlV1()
+
+    detected = 0
+    for k in range(len(signals.regime)):
+        window = df.iloc[k:k + WINDOW]
+        expected = engine.generate_signal_owl(window, SYMBOL)
+        if signals.tactic[k] == TACTIC_NONE:
+            assert expected is None, f"row {k}: {expected}"
+            continue
+        detected += 1
+        actual = signal_dict(signals, k, SYMBOL)
+        assert expected is not None, f"row {k}: {actual}"
+        assert {key: v for key, v in actual.items() if not isinstance(v, float)} == \
+            {key: v for key, v in expected.items() if not isinstance(v, float)}
+        assert actual["sl_price"] == pytest.approx(expected["sl_price"], rel=1e-12)
+        assert actual["tp_price"] == pytest.approx(expected["tp_price"], rel=1e-12)
+    assert detected > 0
+
+def test_precomputed_signals_match_direct_run():
+    df = make_trending_h1(1500, 1)
+    params = BacktestParams()
+    signals = bar_signals(_ohlcv_values(df), params.window)
+    direct = Backtester(params).run({SYMBOL: df})
+    reused = Backtester(params).run({SYMBOL: df}, {SYMBOL: signals})
+    pd.testing.assert_frame_equal(direct.trades, reused.trades)
+    pd.testing.assert_series_equal(direct.equity, reused.equity)
+    assert len(direct.trades) > 0
+
+    # (구간을 잘라도 같은 판정 - 앞쪽 window - 1개 봉은 판정용 과거 봉)
+    lo, hi = 400, 1100
+    part = df.iloc[lo - (params.window - 1):hi]
+    sliced = Backtester(params).run({SYMBOL: part}, {SYMBOL: slice_signals(signals, lo - (params.window - 1), hi - (params.window - 1))})
+    pd.testing.assert_frame_equal(Backtester(params).run({SYMBOL: part}).trades, sliced.trades)
+
+def test_signal_length_mismatch_raises():
+    df = make_trending_h1(400, 0)
+    signals = bar_signals(_ohlcv_values(df), WINDOW)
+    with pytest.raises(ValueError):
+        Backtester().run_symbol(SYMBOL, df.iloc[1:], signals)
+
+# --- 청산 규칙 (_find_exit) ---
+
+def bars(rows):
+    """ [(open, high, low, close), ...] -> o, h, l, c 배열 """
+    o, h, l, c = (np.array(col, dtype='float64') for col in zip(*rows))
+    return o, h, l, c
+
+def find_exit(rows, sl=95.0, tp=110.0, regime_exit_at=None):
+    o, h, l, c = bars(rows)
+    mask = np.zeros(len(c), dtype=bool)
+    if regime_exit_at is not None:
+        mask[regime_exit_at] = True
+    return Backtester._find_exit(0, o, h, l, c, sl, tp, mask)
+
+FLAT = (100.0, 101.0, 99.0, 100.0)
+
+def test_stop_loss_inside_bar():
+    assert find_exit([FLAT, FLAT, (100.0, 101.0, 94.0, 96.0)]) == (2, 95.0, EXIT_STOP_LOSS)
+
+def test_take_profit_inside_bar():
+    assert find_exit([FLAT, (100.0, 111.0, 99.0, 108.0)]) == (1, 110.0, EXIT_TAKE_PROFIT)
+
+def test_stop_wins_same_bar_tie():
+    # (같은 봉에서 손절/익절 모두 닿으면 봉 안 순서를 알 수 없으므로 손절)
+    assert find_exit([FLAT, (100.0, 112.0, 93.0, 105.0)]) == (1, 95.0, EXIT_STOP_LOSS)
+
+def test_gap_below_stop_fills_at_open():
+    assert find_exit([FLAT, (92.0, 93.0, 90.0, 91.0)]) == (1, 92.0, EXIT_STOP_LOSS)
+
+def test_gap_above_target_fills_at_open():
+    assert find_exit([FLAT, (115.0, 116.0, 113.0, 114.0)]) == (1, 115.0, EXIT_TAKE_PROFIT)
+
+def test_entry_bar_is_not_checked():
+    # (진입 봉(t) 자체의 고저가는 청산 조건에 쓰지 않음 - 다음 봉부터)
+    assert find_exit([(100.0, 120.0, 80.0, 100.0), FLAT, (100.0, 111.0, 99.0, 100.0)])[0] == 2
+
+def test_regime_exit_at_close():
+    assert find_exit([FLAT, FLAT, (100.0, 102.0, 98.0, 101.5)], regime_exit_at=2) == (2, 101.5, EXIT_REGIME)
+
+def test_stop_beats_regime_exit():
+    assert find_exit([FLAT, (100.0, 101.0, 94.0, 96.0)], regime_exit_at=1) == (1, 95.0, EXIT_STOP_LOSS)
+
+def test_end_of_data():
+    assert find_exit([FLAT] * 5) == (4, 100.0, EXIT_END)
+
+def test_exit_beyond_first_search_block():
+    # (탐색 구간(64봉 -> 256봉 ...) 경계를 넘어서도 첫 충족 봉)
+    rows = [FLAT] * 300
+    rows[150] = (100.0, 111.0, 99.0, 100.0)
+    assert find_exit(rows) == (150, 110.0, EXIT_TAKE_PROFIT)
@@ -0,0 +1,70 @@
+# Athena_v1/tests/test_candle_arrays.py
+# [신규] 2024.11.17 - (오류) memmap 캔들 배열 테스트 (꼬리 쓰기, 다른 프로세스의 쓰기와 겹친 읽기)
+import multiprocessing
+
+import numpy as np
+
+from ai_trader.candle_arrays import MappedCandleSeries, OHLCV_FIELDS
+
+CAPACITY = 64
+
+def bars(first_ts: int, count: int, generation: int):
+    """ ts = first_ts.., 모든 OHLCV 컬럼 = ts x 100000 + generation (행이 섞이면 컬럼 값이 어긋남) """
+    ts = np.arange(first_ts, first_ts + count, dtype='int64')
+    values = np.repeat((ts * 100000 + generation).astype('float64')[:, None], len(OHLCV_FIELDS), axis=1)
+    return ts, values
+
+def assert_consistent(views):
+    ts = views['ts']
+    if not len(ts):
+        return
+    assert np.all(np.diff(ts) == 1), "ts가 연속되지 않음"
+    for name in OHLCV_FIELDS:
+        column = views[name]
+        np.testing.assert_array_equal(column, views['open'], err_msg=f"{name} 컬럼이 다른 쓰기와 섞임")
+    np.testing.assert_array_equal(np.floor_divide(views["open"], 100000).astype('int64'), ts)
+
+def test_write_tail_overwrites_and_rolls(tmp_path):
+    series = MappedCandleSeries(str(tmp_path), CAPACITY)
+    series.write_tail(*bars(0, 50, 0))
+    series.write_tail(*bars(49, 30, 1)) # (마지막 1개 덮어쓰기 + 29개 추가 -> 용량 초과분 밀어냄)
+    views = series.view()
+    assert len(series) == CAPACITY
+    assert series.version % 2 == 0
+    np.testing.assert_array_equal(views['ts'], np.arange(79 - CAPACITY, 79))
+    assert views['close'][-31] == 48 * 100000 + 0
+    assert views['close'][-30] == 49 * 100000 + 1
+    assert not views['close'].flags.writeable
+
+    copied = series.view(5, copy=True)
+    series.write_tail(*bars(78, 1, 2))
+    assert copied['close'][-1] == 78 * 100000 + 1
+
+def _writer(path: str, rounds: int, ready):
+    series = MappedCandleSeries(path, CAPACITY)
+    ready.set()
+    for i in range(rounds):
+        # (꼬리 2개 덮어쓰기 + 1개 추가 - 용량이 차면 매번 전체를 밀어냄)
+        series.write_tail(*bars(i, 3, i))
+
+def test_concurrent_write_never_tears(tmp_path):
+    path = str(tmp_path)
+    series = MappedCandleSeries(path, CAPACITY)
+    series.write_tail(*bars(0, 3, 0))
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    writer = context.Process(target=_writer, args=(path, 20000, ready))
+    writer.start()
+    try:
+        ready.wait(30)
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            assert_consistent(series.view(copy=True))
+            reads += 1
+    finally:
+        writer.join(60)
+    assert writer.exitcode == 0
+    assert reads > 0
+    assert_consistent(series.view())
+    assert series.last_ts == 20000 + 1
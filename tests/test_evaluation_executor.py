@@ -0,0 +1,47 @@
+# Athena_v1/tests/test_evaluation_executor.py
+# [신규] 2024.11.17 - (오류) 풀 평가 = inline 평가 (심볼별 워커 고정, 워커 피벗/OB 상태가 이어져도 같은 결과)
+import asyncio
+
+from ai_trader.evaluation_executor import EvaluationExecutor
+from tests.test_backtest_engine import make_trending_h1
+
+SYMBOLS = {"KRW-AAA": 2, "KRW-BBB": 6, "KRW-CCC": 11} # (마켓: 캔들 시드)
+WINDOW = 200
+STEP = 2
+
+async def run_windows(executor: EvaluationExecutor, frames):
+    """ 봇 루프처럼 심볼들을 번갈아(동시에) 평가 -> {마켓: [봉별 결과]} """
+    results = {symbol: [] for symbol in frames}
+    for k in range(0, len(next(iter(frames.values()))) - WINDOW + 1, STEP):
+        signals = await asyncio.gather(*(executor.evaluate(symbol, df.iloc[k:k + WINDOW]) for symbol, df in frames.items()))
+        for symbol, signal in zip(frames, signals):
+            results[symbol].append(signal)
+    return results
+
+def test_pool_matches_inline():
+    frames = {symbol: make_trending_h1(700, seed).tz_localize("Asia/Seoul") for symbol, seed in SYMBOLS.items()}
+
+    inline = EvaluationExecutor(inline=True)
+    expected = asyncio.run(run_windows(inline, frames))
+
+    pool = EvaluationExecutor(max_workers=2)
+    pool.start()
+    try:
+        actual = asyncio.run(run_windows(pool, frames))
+        lanes = dict(pool._lanes)
+    finally:
+        pool.shutdown()
+
+    assert actual == expected
+    assert any(any(signals) for signals in expected.values())
+    # (심볼은 워커 1개에 고정 - 워커 2개에 나눠 배정)
+    assert sorted(lanes) == sorted(SYMBOLS)
+    assert set(lanes.values()) == {0, 1}
+
+def test_lane_is_sticky_after_release():
+    executor = EvaluationExecutor(max_workers=3)
+    executor._pools = [None] * 3 # (배정만 확인 - 프로세스는 띄우지 않음)
+    first = {symbol: executor._lane(symbol) for symbol in SYMBOLS}
+    assert sorted(first.values()) == [0, 1, 2]
+    executor.release("KRW-BBB")
+    assert executor._lane("KRW-BBB") == first["KRW-BBB"]
@@ -0,0 +1,69 @@
+# Athena_v1/tests/test_exit_regime.py
+# [신규] 2024.11.17 - (오류) 진입 국면(워커 평가)과 S4 청산 국면(봇 루프 FeatureStore)이 같은 프레임에서 같은지 확인
+import asyncio
+
+import pytest
+
+from ai_trader.data_models import Position
+from ai_trader.evaluation_executor import EvaluationExecutor, _read_frame
+from ai_trader.position_manager import PositionManager
+from ai_trader.signal_engine import SignalEngineOwlV1
+from ai_trader.strategy.features import FeatureFrame, FeatureStore, _ohlcv_values
+from tests.test_backtest_engine import make_trending_h1
+
+SYMBOL = "KRW-TEST"
+WINDOW = 200 # (봇 루프 fetch_ohlcv count)
+STEP = 7
+
+def worker_frame(executor: EvaluationExecutor, df):
+    """ 워커가 받는 프레임 (공유 메모리 쓰기 -> 읽기) """
+    ohlcv = _ohlcv_values(df)
+    shm = executor._write_frame(SYMBOL, df.index, ohlcv)
+    return _read_frame(shm.name, len(ohlcv))
+
+async def _broadcast(message):
+    pass
+
+@pytest.mark.parametrize("seed", [2, 6])
+def test_entry_and_exit_regime_agree(seed):
+    df = make_trending_h1(1000, seed).tz_localize("Asia/Seoul") # (DataManager.fetch_ohlcv와 같은 KST 인덱스)
+    executor = EvaluationExecutor(inline=True)
+    engine = SignalEngineOwlV1()
+    store = FeatureStore()
+    manager = PositionManager(None, None, None, SYMBOL, _broadcast)
+    closed = []
+
+    async def close_position(price, reason="ManualClose"):
+        closed.append(reason)
+    manager.close_position = close_position
+
+    regimes = set()
+    signals = 0
+    try:
+        for k in range(0, len(df) - WINDOW + 1, STEP):
+            window = df.iloc[k:k + WINDOW]
+            exit_features = store.get(SYMBOL, "minute60", window)
+            entry_regime = FeatureFrame.build(worker_frame(executor, window)).regime
+            assert exit_features.regime == entry_regime, f"row {k}"
+            regimes.add(entry_regime)
+
+            signal = engine.generate_signal_owl(window, SYMBOL)
+            if not signal:
+                continue
+            signals += 1
+            assert signal["regime"] == exit_features.regime
+
+            # (같은 봉에서 진입 직후 청산 확인 - S4가 발동하면 안 됨)
+            price = float(window["close"].iloc[-1])
+            manager.current_position = Position(
+                symbol=SYMBOL, position_type="LONG", entry_price=price, volume=1.0,
+                target_price=price * 10.0, stop_loss_price=price / 10.0,
+                entry_regime=signal["regime"], strategy_id=signal["tactic"]
+            )
+            asyncio.run(manager.check_exit_conditions(manager.current_position, window, exit_features))
+            assert closed == [], f"row {k}: {closed}"
+    finally:
+        executor.shutdown()
+
+    assert len(regimes) > 1
+    assert signals > 0
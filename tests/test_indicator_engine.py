@@ -0,0 +1,48 @@
+# Athena_v1/tests/test_indicator_engine.py
+# [신규] 2024.11.17 - (오류) 증분 지표 엔진 = NumPy 커널 (봉을 하나씩 넣고 미완성 봉을 수정해도 같은 값)
+import numpy as np
+
+from ai_trader import indicators as kernels
+from ai_trader.indicator_engine import IndicatorEngine
+from ai_trader.strategy.constants import (
+    RSI_PERIOD, RSI_COL, BBANDS_PERIOD, BBANDS_STD, REGIME_EMA_PERIOD, REGIME_EMA_COL,
+    BBANDS_LOW_COL, BBANDS_MID_COL, BBANDS_UPPER_COL, BBANDS_BANDWIDTH_COL, BBANDS_PERCENT_COL,
+)
+from tests.test_indicators import assert_same
+from tests.test_signal_memo import make_h1
+
+SYMBOL = "KRW-TEST"
+HISTORY = 60
+
+def expected_columns(close: np.ndarray):
+    bb = kernels.bbands(close, length=BBANDS_PERIOD, std=BBANDS_STD)
+    return {
+        REGIME_EMA_COL: kernels.ema(close, REGIME_EMA_PERIOD),
+        BBANDS_LOW_COL: bb.lower,
+        BBANDS_MID_COL: bb.mid,
+        BBANDS_UPPER_COL: bb.upper,
+        BBANDS_BANDWIDTH_COL: bb.bandwidth,
+        BBANDS_PERCENT_COL: bb.percent,
+        RSI_COL: kernels.rsi(close, length=RSI_PERIOD),
+    }
+
+def test_full_frame_matches_kernels():
+    df = make_h1(300)
+    history = IndicatorEngine(HISTORY).update_frame(SYMBOL, "minute60", df)
+    expected = expected_columns(df["close"].to_numpy())
+    for col, values in expected.items():
+        assert_same(history[col], values[-HISTORY:])
+
+def test_sliding_updates_match_kernels():
+    # (봉 1개씩 밀고, 미완성 봉 가격을 바꿔 같은 봉을 다시 넣어도 커널 값과 같음)
+    df = make_h1(400)
+    engine = IndicatorEngine(HISTORY)
+    for end in range(200, len(df) + 1, 17):
+        window = df.iloc[end - 200:end].copy()
+        engine.update_frame(SYMBOL, "minute60", window)
+        window.iloc[-1, window.columns.get_loc("close")] *= 1.003
+        history = engine.update_frame(SYMBOL, "minute60", window)
+        close = np.r_[df["close"].to_numpy()[:end - 1], window["close"].iloc[-1]]
+        expected = expected_columns(close)
+        for col, values in expected.items():
+            assert_same(history[col], values[-HISTORY:])
@@ -0,0 +1,143 @@
+# Athena_v1/tests/test_indicators.py
+# [신규] 2024.11.17 - (요청) NumPy 지표 커널 골든 테스트 (pandas 기준 구현 / pandas-ta 설치 시 pandas-ta와 비교)
+# [수정] 2024.11.17 - (요청) pandas-ta 비교를 저장된 골든 값(tests/data/pandas_ta_golden.npz)으로 항상 실행
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_trader import indicators
+from tests import reference_indicators as ref
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+# (pandas-ta 골든 값 - 파일과 비교 항목은 tests/data/make_pandas_ta_golden.py가 같이 씀)
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "pandas_ta_golden.npz")
+EMA_LENGTHS = (2, 9, 20, 50, 200)
+SMA_LENGTHS = (5, 20, 50)
+RSI_LENGTHS = (2, 14, 30)
+ATR_LENGTHS = (5, 14)
+BBANDS_PARAMS = ((20, 2.0), (10, 1.5))
+BBANDS_COLUMNS = (("lower", "BBL"), ("mid", "BBM"), ("upper", "BBU"), ("bandwidth", "BBB"), ("percent", "BBP"))
+
+def make_ohlc(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1.0 + np.abs(rng.normal(0.0, 0.004, n)))
+    low = np.minimum(open_, close) * (1.0 - np.abs(rng.normal(0.0, 0.004, n)))
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+
+def assert_same(actual: np.ndarray, expected) -> None:
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype='float64'), rtol=RTOL, atol=ATOL, equal_nan=True)
+
+@pytest.fixture(scope="module")
+def ohlc() -> pd.DataFrame:
+    return make_ohlc(1500)
+
+@pytest.mark.parametrize("length", [1, 5, 20, 50])
+def test_sma(ohlc, length):
+    assert_same(indicators.sma(ohlc["close"].to_numpy(), length), ref.sma(ohlc["close"], length))
+
+@pytest.mark.parametrize("length", [2, 9, 20, 50, 200])
+def test_ema(ohlc, length):
+    # (length가 길면 _ewm이 여러 블록으로 나눠 계산 - 블록 경계 포함)
+    assert_same(indicators.ema(ohlc["close"].to_numpy(), length), ref.ema(ohlc["close"], length))
+
+@pytest.mark.parametrize("length,std", [(20, 2.0), (10, 1.5)])
+def test_bbands(ohlc, length, std):
+    result = indicators.bbands(ohlc["close"].to_numpy(), length, std)
+    expected = ref.bbands(ohlc["close"], length, std)
+    for name in ("lower", "mid", "upper", "bandwidth", "percent"):
+        assert_same(getattr(result, name), expected[name])
+
+@pytest.mark.parametrize("length", [2, 14, 30])
+def test_rsi(ohlc, length):
+    assert_same(indicators.rsi(ohlc["close"].to_numpy(), length), ref.rsi(ohlc["close"], length))
+
+@pytest.mark.parametrize("length", [5, 14])
+def test_atr(ohlc, length):
+    h, l, c = (ohlc[col] for col in ("high", "low", "close"))
+    assert_same(indicators.true_range(h.to_numpy(), l.to_numpy(), c.to_numpy()), ref.true_range(h, l, c))
+    assert_same(indicators.atr(h.to_numpy(), l.to_numpy(), c.to_numpy(), length), ref.atr(h, l, c, length))
+
+def test_short_series_is_all_nan():
+    close = make_ohlc(10)["close"].to_numpy()
+    assert np.isnan(indicators.ema(close, 20)).all()
+    assert np.isnan(indicators.sma(close, 20)).all()
+    assert np.isnan(indicators.bbands(close, 20).mid).all()
+    assert np.isnan(indicators.rsi(close, 14)).all()
+
+def test_flat_series():
+    # (변동이 없으면 RSI / %B는 정의되지 않음 - pandas 기준 구현과 같이 NaN)
+    close = pd.Series(np.full(60, 100.0))
+    assert_same(indicators.rsi(close.to_numpy(), 14), ref.rsi(close, 14))
+    result = indicators.bbands(close.to_numpy(), 20)
+    assert_same(result.bandwidth, ref.bbands(close, 20)["bandwidth"])
+    assert np.isnan(result.percent).all()
+
+def test_batch_matches_rows():
+    # ((심볼 수, 봉 수) 배열 - 행마다 1차원 계산과 같음, axis=0 전치 배열도 같음)
+    frames = [make_ohlc(400, seed) for seed in range(5)]
+    close = np.stack([f["close"].to_numpy() for f in frames])
+    high = np.stack([f["high"].to_numpy() for f in frames])
+    low = np.stack([f["low"].to_numpy() for f in frames])
+
+    batch = {
+        "ema": indicators.ema(close, 50),
+        "sma": indicators.sma(close, 20),
+        "rsi": indicators.rsi(close, 14),
+        "atr": indicators.atr(high, low, close, 14),
+        "bbands": indicators.bbands(close, 20),
+    }
+    for i, frame in enumerate(frames):
+        h, l, c = (frame[col] for col in ("high", "low", "close"))
+        assert_same(batch["ema"][i], ref.ema(c, 50))
+        assert_same(batch["sma"][i], ref.sma(c, 20))
+        assert_same(batch["rsi"][i], ref.rsi(c, 14))
+        assert_same(batch["atr"][i], ref.atr(h, l, c, 14))
+        expected = ref.bbands(c, 20)
+        for name in ("lower", "mid", "upper", "bandwidth", "percent"):
+            assert_same(getattr(batch["bbands"], name)[i], expected[name])
+
+    assert_same(indicators.ema(close.T, 50, axis=0), batch["ema"].T)
+    assert_same(indicators.rsi(close.T, 14, axis=0), batch["rsi"].T)
+    assert_same(indicators.atr(high.T, low.T, close.T, 14, axis=0), batch["atr"].T)
+    assert_same(indicators.bbands(close.T, 20, axis=0).percent, batch["bbands"].percent.T)
+
+# --- pandas-ta 골든 값 (tests/data/make_pandas_ta_golden.py로 생성 - pandas-ta 설치 없이 비교) ---
+
+@pytest.fixture(scope="module")
+def golden():
+    with np.load(GOLDEN_PATH) as data:
+        return {name: data[name] for name in data.files}
+
+def test_golden_inputs_match_generator(golden, ohlc):
+    # (입력 캔들은 파일에 저장된 값을 쓰지만, 생성 당시와 같은 make_ohlc인지 확인)
+    for col in ("high", "low", "close"):
+        assert_same(ohlc[col].to_numpy(), golden[col])
+
+@pytest.mark.parametrize("length", EMA_LENGTHS)
+def test_ema_matches_pandas_ta(golden, length):
+    assert_same(indicators.ema(golden["close"], length), golden[f"ema_{length}"])
+
+@pytest.mark.parametrize("length", SMA_LENGTHS)
+def test_sma_matches_pandas_ta(golden, length):
+    assert_same(indicators.sma(golden["close"], length), golden[f"sma_{length}"])
+
+@pytest.mark.parametrize("length", RSI_LENGTHS)
+def test_rsi_matches_pandas_ta(golden, length):
+    assert_same(indicators.rsi(golden["close"], length), golden[f"rsi_{length}"])
+
+@pytest.mark.parametrize("length", ATR_LENGTHS)
+def test_atr_matches_pandas_ta(golden, length):
+    h, l, c = golden["high"], golden["low"], golden["close"]
+    assert_same(indicators.true_range(h, l, c), golden["true_range"])
+    assert_same(indicators.atr(h, l, c, length), golden[f"atr_{length}"])
+
+@pytest.mark.parametrize("length,std", BBANDS_PARAMS)
+def test_bbands_matches_pandas_ta(golden, length, std):
+    result = indicators.bbands(golden["close"], length, std)
+    for name, _ in BBANDS_COLUMNS:
+        assert_same(getattr(result, name), golden[f"bbands_{length}_{std:g}_{name}"])
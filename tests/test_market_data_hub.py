@@ -0,0 +1,90 @@
+# Athena_v1/tests/test_market_data_hub.py
+# [신규] 2024.11.17 - (성능) 시장 데이터 허브 리스너 전달 테스트 (느린 리스너가 수신 루프를 막지 않음)
+import asyncio
+import json
+import time
+
+from ai_trader.market_data_hub import MarketDataHub
+
+class FakeSocket:
+    """ 메시지 목록을 순서대로 내보내는 WebSocket 대용 """
+
+    def __init__(self, messages):
+        self.messages = [json.dumps(m).encode() for m in messages]
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for message in self.messages:
+            yield message
+
+def ticks(n, code="KRW-BTC"):
+    return [{"type": "ticker", "code": code, "trade_price": float(i)} for i in range(n)]
+
+def test_slow_listener_does_not_block_reads():
+    async def scenario():
+        hub = MarketDataHub()
+        fast, slow = [], []
+
+        async def slow_listener(data):
+            await asyncio.sleep(0.05)
+            slow.append(data["trade_price"])
+
+        hub.add_listener("ticker", fast.append)
+        hub.add_listener("ticker", slow_listener)
+        for listeners in hub._listeners.values():
+            for listener in listeners:
+                listener.start()
+
+        started = time.monotonic()
+        await hub._read_loop(FakeSocket(ticks(50)))
+        read_sec = time.monotonic() - started
+        await asyncio.sleep(0.01)
+
+        # (수신 루프는 느린 리스너(50 x 0.05초)를 기다리지 않음)
+        assert read_sec < 0.5
+        assert hub.get_last_price("KRW-BTC") == 49.0
+        assert [d["trade_price"] for d in fast] == [float(i) for i in range(50)]
+        assert len(slow) < 50
+
+        # (종료 시 남은 이벤트를 순서대로 처리)
+        hub.LISTENER_DRAIN_TIMEOUT_SEC = 10.0
+        await hub.stop()
+        assert slow == [float(i) for i in range(50)]
+
+    asyncio.run(scenario())
+
+def test_full_queue_drops_oldest():
+    async def scenario():
+        hub = MarketDataHub()
+        hub.LISTENER_QUEUE_SIZE = 5
+        received = []
+        hub.add_listener("ticker", received.append)
+
+        # (리스너 태스크 시작 전 10개 -> 최근 5개만 남음)
+        await hub._read_loop(FakeSocket(ticks(10)))
+        listener = hub._listeners["ticker"][0]
+        assert listener.dropped == 5
+        listener.start()
+        await hub.stop()
+        assert [d["trade_price"] for d in received] == [5.0, 6.0, 7.0, 8.0, 9.0]
+
+    asyncio.run(scenario())
+
+def test_listener_errors_are_isolated():
+    async def scenario():
+        hub = MarketDataHub()
+        received = []
+
+        def broken(data):
+            raise RuntimeError("boom")
+
+        hub.add_listener("ticker", broken)
+        hub.add_listener("ticker", received.append)
+        hub.start()
+        await hub._read_loop(FakeSocket(ticks(3)))
+        await hub.stop()
+        assert len(received) == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+# Athena_v1/tests/test_monte_carlo.py
+# [신규] 2024.11.17 - (요청) 몬테카를로 테스트 (최대 낙폭 계산, 원형 블록 부트스트랩, R 배수 변환)
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_trader.backtest.monte_carlo import MonteCarloSimulator, r_multiples_from_backtest
+
+R = [1.0, -1.0, 2.0, -0.5, 3.0, -1.0, 0.5]
+
+# --- 최대 낙폭 ---
+
+def test_max_drawdown_known_paths():
+    equity = np.array([
+        [1.0, 1.2, 0.9, 1.5, 1.2],  # (고점 1.2 -> 0.9: 25%)
+        [0.8, 0.9, 1.1, 1.0, 1.3],  # (시작 자산 1.0이 고점 -> 0.8: 20%)
+        [1.0, 1.1, 1.2, 1.3, 1.4],  # (단조 증가: 0%)
+        [1.0, 0.5, -0.2, 0.1, 0.3], # (0 아래 -> 100%로 제한)
+    ])
+    np.testing.assert_allclose(MonteCarloSimulator._max_drawdown_pct(equity), [25.0, 20.0, 0.0, 100.0])
+
+def test_max_drawdown_does_not_modify_input():
+    equity = np.array([[1.0, 0.5, 0.8]])
+    before = equity.copy()
+    MonteCarloSimulator._max_drawdown_pct(equity)
+    np.testing.assert_array_equal(equity, before)
+
+# --- 재표본 ---
+
+def test_bootstrap_draws_from_original_trades():
+    sim = MonteCarloSimulator(R, n_paths=200, n_trades=50, seed=1)
+    paths = sim.resample()
+    assert paths.shape == (200, 50)
+    assert set(np.unique(paths)) <= set(R)
+
+def test_block_bootstrap_uses_contiguous_circular_blocks():
+    r = np.arange(10, dtype='float64')  # (값 = 원래 위치)
+    sim = MonteCarloSimulator(r, n_paths=500, n_trades=23, block_size=4, seed=2)
+    paths = sim.resample()
+    assert paths.shape == (500, 23)
+    for start in range(0, 23, 4):
+        block = paths[:, start:start + 4]
+        # (블록 안에서는 원래 순서대로 1칸씩 - 끝에서 처음으로 이어짐)
+        np.testing.assert_array_equal(np.diff(block, axis=1) % 10, 1.0)
+
+def test_block_size_capped_at_trade_count():
+    assert MonteCarloSimulator(R, block_size=100).block_size == len(R)
+
+def test_empty_r_multiples_raise():
+    with pytest.raises(ValueError):
+        MonteCarloSimulator([np.nan, np.inf])
+
+# --- 실행 ---
+
+def test_run_is_deterministic_for_seed():
+    a = MonteCarloSimulator(R, n_paths=2000, block_size=2, seed=7).run()
+    b = MonteCarloSimulator(R, n_paths=2000, block_size=2, seed=7).run()
+    pd.testing.assert_frame_equal(a, b)
+
+def test_all_winning_trades_never_ruin():
+    report = MonteCarloSimulator([0.5, 1.0, 2.0], n_paths=1000, n_trades=100).run(risk_pcts=[1.0, 10.0])
+    assert (report["risk_of_ruin"] == 0).all()
+    assert (report["prob_loss"] == 0).all()
+    assert (report.filter(like="max_dd_p") == 0).all().all()
+
+def test_all_losing_trades_ruin_at_high_risk():
+    # (고정 금액: 거래당 -1R x 10% -> 5거래 만에 낙폭 50%)
+    report = MonteCarloSimulator([-1.0], n_paths=100, n_trades=10, ruin_drawdown_pct=50.0).run(risk_pcts=[1.0, 10.0])
+    assert report.loc[1.0, "risk_of_ruin"] == 0
+    assert report.loc[10.0, "risk_of_ruin"] == 1
+    assert report.loc[10.0, "return_p50"] == pytest.approx(-100.0)
+
+def test_compound_equity_stops_at_zero():
+    # (복리: 1 + f x R <= 0이면 자산 소진 - 낙폭 100%)
+    report = MonteCarloSimulator([-2.0], n_paths=10, n_trades=3, compound=True).run(risk_pcts=[60.0])
+    assert report.loc[60.0, "max_dd_p50"] == 100.0
+
+# --- R 배수 변환 ---
+
+def test_r_multiples_from_backtest():
+    trades = pd.DataFrame({
+        "exit_time": pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02"]),
+        "volume": [2.0, 1.0, 1.0],
+        "entry_price": [100.0, 50.0, 80.0],
+        "sl_price": [95.0, 40.0, 80.0],  # (마지막 거래: 리스크 0 -> 제외)
+        "pnl": [20.0, -10.0, 5.0],
+    })
+    # (청산 시각 순: 2024-01-01 -10 / (1 x 10), 2024-01-03 20 / (2 x 5))
+    np.testing.assert_allclose(r_multiples_from_backtest(trades), [-1.0, 2.0])
+    assert len(r_multiples_from_backtest(trades.iloc[:0])) == 0
@@ -0,0 +1,95 @@
+# Athena_v1/tests/test_rate_limiter.py
+# [신규] 2024.11.17 - (오류) 요청 스케줄러 테스트 (그룹 간 우선순위, 그룹 토큰, Remaining-Req 그룹 매핑)
+import asyncio
+
+from ai_trader.rate_limiter import (
+    RequestScheduler, route_request, parse_remaining_req,
+    PRIORITY_ORDER, PRIORITY_CANDLE, PRIORITY_QUOTATION, PRIORITY_ACCOUNT
+)
+
+async def start_waiters(scheduler, requests, order):
+    """ requests: [(이름, 경로 메서드, 경로)] -> 자리를 받은 순서대로 order에 기록하는 태스크 """
+    async def request(name, method, path):
+        await scheduler.acquire(*route_request(method, path))
+        order.append(name)
+
+    tasks = [asyncio.create_task(request(*r)) for r in requests]
+    await asyncio.sleep(0)
+    return tasks
+
+def test_priority_across_groups():
+    async def scenario():
+        scheduler = RequestScheduler(max_in_flight=1)
+        await scheduler.acquire("default") # (자리 1개를 먼저 차지)
+
+        order = []
+        tasks = await start_waiters(scheduler, [
+            ("accounts", "GET", "/v1/accounts"),
+            ("ticker", "GET", "/v1/ticker"),
+            ("candles", "GET", "/v1/candles/minutes/60"),
+            ("order", "POST", "/v1/orders"),
+        ], order)
+        assert order == []
+
+        for _ in range(len(tasks)):
+            scheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert order == ["order", "candles", "ticker", "accounts"]
+
+    asyncio.run(scenario())
+
+def test_group_without_tokens_does_not_block_other_groups():
+    async def scenario():
+        scheduler = RequestScheduler(group_limits={"candles": 1, "order": 8, "default": 30}, max_in_flight=8)
+        order = []
+        await scheduler.acquire("candles", PRIORITY_CANDLE) # (candles 토큰 소진)
+        tasks = await start_waiters(scheduler, [
+            ("candles", "GET", "/v1/candles/minutes/60"),
+            ("accounts", "GET", "/v1/accounts"),
+        ], order)
+        assert order == ["accounts"]
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=2.0) # (candles는 1초 뒤 토큰)
+        assert order == ["accounts", "candles"]
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_is_skipped():
+    async def scenario():
+        scheduler = RequestScheduler(max_in_flight=1)
+        await scheduler.acquire("default")
+        order = []
+        tasks = await start_waiters(scheduler, [("order", "POST", "/v1/orders"), ("ticker", "GET", "/v1/ticker")], order)
+        tasks[0].cancel()
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(tasks[1])
+        assert order == ["ticker"]
+        assert scheduler.in_flight == 1
+
+    asyncio.run(scenario())
+
+def test_unknown_header_group_maps_to_route_group():
+    async def scenario():
+        scheduler = RequestScheduler()
+        await scheduler.acquire("candles", PRIORITY_CANDLE)
+        scheduler.on_response("candles", 200, "group=candles-v2; min=599; sec=0")
+        scheduler.release()
+        assert set(scheduler.get_stats()) == {"candles"}
+        # (남은 요청 0 -> candles 그룹이 1초 대기)
+        bucket = scheduler._buckets["candles"]
+        assert bucket.time_until_token(asyncio.get_running_loop().time()) > 0.5
+
+        # (알려진 그룹명이면 헤더 그룹을 따름)
+        scheduler.on_response("default", 429, "group=order; min=100; sec=0")
+        assert scheduler.throttled_count == {"order": 1}
+
+    asyncio.run(scenario())
+
+def test_route_and_header_parsing():
+    assert route_request("POST", "/v1/orders") == ("order", PRIORITY_ORDER)
+    assert route_request("GET", "/v1/order") == ("default", PRIORITY_ACCOUNT)
+    assert route_request("GET", "/v1/candles/days") == ("candles", PRIORITY_CANDLE)
+    assert route_request("GET", "/v1/orderbook") == ("orderbook", PRIORITY_QUOTATION)
+    assert parse_remaining_req("group=default; min=1799; sec=29") == ("default", 29)
+    assert parse_remaining_req("garbage") is None
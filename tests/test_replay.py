@@ -0,0 +1,53 @@
+# Athena_v1/tests/test_replay.py
+# [신규] 2024.11.17 - (요청) 리플레이 하네스 테스트 (체결 재현성 / 재생 후 main 전역 객체, time/datetime 복원)
+# (VirtualTimeEventLoop._run_once는 asyncio 내부 _ready / _scheduled에 의존 - Python 버전이 바뀌면 이 테스트가 먼저 깨짐)
+import pandas as pd
+import pytest
+
+from ai_trader import candle_builder, candle_scheduler, data_manager, market_catalogue, order_book, price_snapshot, risk_manager
+from ai_trader.backtest.replay import run_replay
+from tests.test_backtest_engine import make_trending_h1
+
+main = pytest.importorskip("main")
+
+SEEDS = {"KRW-AAA": 11, "KRW-BBB": 1} # (마켓: 캔들 시드 - 두 마켓 모두 재생 구간에 진입/청산이 있음)
+BARS = 300 # (워밍업 200봉 + 재생 100봉)
+
+# (재생 중에만 바뀌어야 하는 main 전역 객체 / 모듈 시각 함수)
+APP_GLOBALS = (
+    "DB_FILE_PATH", "candle_store", "candle_builder", "price_service", "order_book_engine", "feature_store",
+    "server_clock", "candle_scheduler", "evaluation_executor", "market_hub", "active_bots", "capital_lock",
+)
+TIME_MODULES = (candle_scheduler, candle_builder, data_manager, market_catalogue, order_book, price_snapshot)
+DATETIME_MODULES = (data_manager, risk_manager)
+
+def snapshot():
+    return (
+        {name: getattr(main, name) for name in APP_GLOBALS},
+        [module.time for module in TIME_MODULES],
+        [module.datetime for module in DATETIME_MODULES],
+    )
+
+def replay(tmp_path, name: str):
+    frames = {symbol: make_trending_h1(BARS, seed) for symbol, seed in SEEDS.items()}
+    # (하트비트 1시간 - 봉 마감 / 가격 변동 평가만, 테스트 시간 단축)
+    return run_replay(frames, db_path=str(tmp_path / f"{name}.db"), heartbeat_sec=3600.0, app_module=main)
+
+def test_replay_is_deterministic_and_restores_globals(tmp_path):
+    before = snapshot()
+    first = replay(tmp_path, "first")
+    after_first = snapshot()
+    second = replay(tmp_path, "second")
+
+    assert set(first.fills["symbol"]) == set(SEEDS)
+    assert set(first.fills["side"]) == {"buy", "sell"}
+    pd.testing.assert_frame_equal(first.fills, second.fills)
+    pd.testing.assert_series_equal(first.equity, second.equity)
+    assert first.final_krw == second.final_krw
+    assert len(first.equity) == BARS - 200 - 1
+
+    for restored in (after_first, snapshot()):
+        assert restored[0].keys() == before[0].keys()
+        assert all(restored[0][name] is before[0][name] for name in APP_GLOBALS)
+        assert all(a is b for a, b in zip(restored[1], before[1]))
+        assert all(a is b for a, b in zip(restored[2], before[2]))
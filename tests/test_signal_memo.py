@@ -0,0 +1,102 @@
+# Athena_v1/tests/test_signal_memo.py
+# [신규] 2024.11.17 - (요청) 평가 메모 테스트 (SignalEngineOwlV1 / EvaluationExecutor 적중/실패)
+import asyncio
+
+import pandas as pd
+import pytest
+
+from ai_trader.evaluation_executor import EvaluationExecutor
+from ai_trader.signal_engine import SignalEngineOwlV1, evaluation_memo_key
+from ai_trader.strategy.features import _ohlcv_values
+from tests.test_indicators import make_ohlc
+
+SYMBOL = "KRW-TEST"
+
+def make_h1(n: int = 200, seed: int = 0) -> pd.DataFrame:
+    df = make_ohlc(n, seed)
+    df["volume"] = 1.0
+    df.index = pd.date_range("2024-01-01", periods=n, freq="h")
+    return df
+
+def counters():
+    return SignalEngineOwlV1.memo_hits, SignalEngineOwlV1.memo_misses
+
+def evaluate(engine: SignalEngineOwlV1, df: pd.DataFrame):
+    """ (결과, 적중 증가, 실패 증가) """
+    hits, misses = counters()
+    result = engine.generate_signal_owl(df, SYMBOL)
+    return result, SignalEngineOwlV1.memo_hits - hits, SignalEngineOwlV1.memo_misses - misses
+
+@pytest.fixture
+def engine() -> SignalEngineOwlV1:
+    return SignalEngineOwlV1()
+
+def test_same_bars_hit(engine):
+    df = make_h1()
+    first, _, missed = evaluate(engine, df)
+    second, hit, _ = evaluate(engine, df.copy())
+    assert (missed, hit) == (1, 1)
+    assert second == first
+
+def test_forming_bar_change_misses(engine):
+    df = make_h1()
+    evaluate(engine, df)
+    moved = df.copy()
+    moved.iloc[-1, moved.columns.get_loc("close")] *= 1.01
+    _, hit, missed = evaluate(engine, moved)
+    assert (hit, missed) == (0, 1)
+
+def test_new_bar_misses(engine):
+    df = make_h1(201)
+    evaluate(engine, df.iloc[:-1])
+    _, hit, missed = evaluate(engine, df.iloc[1:])
+    assert (hit, missed) == (0, 1)
+
+def test_volume_change_hits(engine):
+    # (메모 키는 봉 수 / 마지막 확정 봉 시각 / 미완성 봉 OHLC - 거래량만 바뀌면 재평가하지 않음)
+    df = make_h1()
+    evaluate(engine, df)
+    more = df.copy()
+    more.iloc[-1, more.columns.get_loc("volume")] += 5.0
+    _, hit, _ = evaluate(engine, more)
+    assert hit == 1
+
+def test_reset_memo_misses(engine):
+    df = make_h1()
+    evaluate(engine, df)
+    engine.reset_memo(SYMBOL)
+    _, hit, missed = evaluate(engine, df)
+    assert (hit, missed) == (0, 1)
+
+def test_cached_result_is_copied(engine, monkeypatch):
+    # (호출자가 결과 dict를 수정해도 메모는 바뀌지 않음)
+    monkeypatch.setattr(engine, "_evaluate", lambda *args: {"sl_price": 95.0, "tp_price": 110.0})
+    df = make_h1()
+    first, _, _ = evaluate(engine, df)
+    first["sl_price"] = -1.0
+    second, hit, _ = evaluate(engine, df)
+    assert hit == 1 and second["sl_price"] == 95.0
+
+def test_short_frame_is_not_memoized():
+    assert evaluation_memo_key(pd.date_range("2024-01-01", periods=1, freq="h"), [1.0, 1.0, 1.0, 1.0]) is None
+
+def test_engine_and_executor_keys_match():
+    df = make_h1()
+    assert SignalEngineOwlV1._memo_key(df, None) == evaluation_memo_key(df.index, _ohlcv_values(df)[-1, :4])
+
+def test_executor_memo_skips_worker():
+    # (풀 모드 - 같은 봉이면 부모 프로세스 메모에서 반환, 결과는 inline 평가와 같음)
+    df = make_h1()
+    executor = EvaluationExecutor(max_workers=1)
+    executor.start()
+    try:
+        async def run():
+            first = await executor.evaluate(SYMBOL, df)
+            hits, _ = counters()
+            second = await executor.evaluate(SYMBOL, df)
+            return first, second, SignalEngineOwlV1.memo_hits - hits
+        first, second, hit = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert hit == 1
+    assert first == second == SignalEngineOwlV1().generate_signal_owl(df, SYMBOL)
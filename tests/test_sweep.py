@@ -0,0 +1,86 @@
+# Athena_v1/tests/test_sweep.py
+# [신규] 2024.11.17 - (요청) 파라미터 스윕 테스트 (결과 캐시 / 데이터 키 / 순위 기준 / 풀 = inline / 오류 마켓 기록)
+import pandas as pd
+import pytest
+
+from ai_trader.backtest.engine import Backtester
+from ai_trader.backtest.sweep import SweepRunner, grid_space
+from tests.test_backtest_engine import make_trending_h1
+
+CELLS = grid_space({"reward_risk": [1.5, 2.0], "base_risk_pct": [0.5, 1.0]})
+
+def make_frames():
+    return {symbol: make_trending_h1(1000, seed) for symbol, seed in (("KRW-AAA", 2), ("KRW-BBB", 6))}
+
+def by_cell(board: pd.DataFrame) -> pd.DataFrame:
+    """ 셀별 정렬 (동점 셀의 순위는 결과가 들어온 순서에 따름) """
+    return board.drop(columns="cached").set_index("param_hash").sort_index()
+
+@pytest.fixture
+def backtest_runs(monkeypatch):
+    """ (inline 모드) Backtester.run 호출 횟수 """
+    calls = []
+    original = Backtester.run
+
+    def counted(self, frames, signals=None):
+        calls.append(self.params)
+        return original(self, frames, signals)
+    monkeypatch.setattr(Backtester, "run", counted)
+    return calls
+
+def test_rerun_uses_cache(tmp_path, backtest_runs):
+    cache_path = str(tmp_path / "sweep.db")
+    first = SweepRunner(make_frames(), cache_path=cache_path, inline=True).run(CELLS)
+    assert len(backtest_runs) == len(CELLS)
+    assert not first["cached"].any()
+    assert first["trades"].sum() > 0
+
+    second = SweepRunner(make_frames(), cache_path=cache_path, inline=True).run(CELLS)
+    assert len(backtest_runs) == len(CELLS) # (다시 실행한 백테스트 없음)
+    assert second["cached"].all()
+    pd.testing.assert_frame_equal(by_cell(first), by_cell(second))
+
+def test_data_change_invalidates_cache(tmp_path, backtest_runs):
+    cache_path = str(tmp_path / "sweep.db")
+    frames = make_frames()
+    runner = SweepRunner(frames, cache_path=cache_path, inline=True)
+    runner.run(CELLS)
+
+    frames["KRW-AAA"] = frames["KRW-AAA"].copy()
+    frames["KRW-AAA"].iloc[-1, frames["KRW-AAA"].columns.get_loc("close")] *= 1.01
+    changed = SweepRunner(frames, cache_path=cache_path, inline=True)
+    assert changed.data_key != runner.data_key
+
+    board = changed.run(CELLS)
+    assert len(backtest_runs) == 2 * len(CELLS)
+    assert not board["cached"].any()
+
+def test_max_drawdown_ranks_ascending(tmp_path):
+    board = SweepRunner(make_frames(), cache_path=str(tmp_path / "sweep.db"), rank_by="max_drawdown_pct", inline=True).run(CELLS)
+    assert board["max_drawdown_pct"].is_monotonic_increasing
+    assert board["max_drawdown_pct"].nunique() > 1
+    assert list(board.index) == list(range(1, len(CELLS) + 1))
+
+def test_pool_matches_inline(tmp_path):
+    inline = SweepRunner(make_frames(), cache_path=str(tmp_path / "inline.db"), inline=True).run(CELLS)
+    pool = SweepRunner(make_frames(), cache_path=str(tmp_path / "pool.db"), max_workers=2).run(CELLS)
+    pd.testing.assert_frame_equal(by_cell(inline), by_cell(pool))
+
+def test_failed_symbol_is_reported_and_not_cached(tmp_path, monkeypatch):
+    original = Backtester.run_symbol
+
+    def failing(self, symbol, df, signals=None):
+        if symbol == "KRW-BBB":
+            raise ValueError("broken candles")
+        return original(self, symbol, df, signals)
+    monkeypatch.setattr(Backtester, "run_symbol", failing)
+
+    frames = make_frames()
+    summary = Backtester().run(frames).summary()
+    assert summary["failed_symbols"] == ["KRW-BBB"]
+
+    cache_path = str(tmp_path / "sweep.db")
+    board = SweepRunner(frames, cache_path=cache_path, inline=True).run(CELLS)
+    assert all(failed == ["KRW-BBB"] for failed in board["failed_symbols"])
+    again = SweepRunner(frames, cache_path=cache_path, inline=True).run(CELLS)
+    assert not again["cached"].any() # (오류가 난 셀은 캐시하지 않고 다시 실행)
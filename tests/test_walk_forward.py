@@ -0,0 +1,47 @@
+# Athena_v1/tests/test_walk_forward.py
+# [신규] 2024.11.17 - (오류) 워크 포워드 프로세스 풀 모드 - 시간대 있는(KST) 인덱스에서 인라인 모드와 같은 결과
+import pandas as pd
+import pytest
+
+from ai_trader.backtest.sweep import attach_frames, grid_space, share_frames
+from ai_trader.backtest.walk_forward import WalkForwardOptimizer
+from tests.test_backtest_engine import make_trending_h1
+
+def kst_frames():
+    frames = {}
+    for i, symbol in enumerate(("KRW-AAA", "KRW-BBB")):
+        df = make_trending_h1(1500, i + 2)
+        df.index = df.index.tz_localize("Asia/Seoul")
+        frames[symbol] = df
+    return frames
+
+def test_share_frames_keeps_timezone():
+    frames = kst_frames()
+    shm, layout = share_frames(frames)
+    try:
+        for symbol, df in attach_frames(shm, layout).items():
+            pd.testing.assert_index_equal(df.index, frames[symbol].index)
+            pd.testing.assert_frame_equal(df, frames[symbol][df.columns], check_freq=False)
+    finally:
+        shm.close()
+        shm.unlink()
+
+def test_pool_matches_inline_on_tz_aware_index():
+    cells = grid_space({"reward_risk": [1.5, 2.0], "min_score": [10, 12]})
+    kwargs = dict(train_bars=500, test_bars=200, min_trades=1)
+    inline = WalkForwardOptimizer(kst_frames(), inline=True, **kwargs).run(cells)
+    pool = WalkForwardOptimizer(kst_frames(), max_workers=2, **kwargs).run(cells)
+
+    assert len(inline.windows) > 0
+    pd.testing.assert_frame_equal(inline.windows, pool.windows)
+    pd.testing.assert_frame_equal(inline.trades, pool.trades)
+    pd.testing.assert_series_equal(inline.equity, pool.equity)
+
+@pytest.mark.parametrize("inline", [True, False])
+def test_window_failure_raises(inline):
+    # (윈도우 실행 실패를 빈 결과로 삼키지 않음 - exit_reasons는 dict라 순위 기준으로 쓰면 워커에서 TypeError)
+    cells = grid_space({"reward_risk": [1.5, 2.0]})
+    optimizer = WalkForwardOptimizer(kst_frames(), train_bars=500, test_bars=200, min_trades=0,
+                                     rank_by="exit_reasons", max_workers=2, inline=inline)
+    with pytest.raises(TypeError):
+        optimizer.run(cells)